@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片归档基准测试
+把周数据复制成多个互不重叠的周目录后集成，对比两种输出：
+- 旧格式: 单个 indent=2 的 integrated_all_tweets.json（all_tweets + tweets_by_week，每条推文存两份）
+- 分片归档: 每周一个 gzip 压缩的 NDJSON 分片 + manifest.json（core/tweet_archive.py）
+报告写入耗时、磁盘大小，以及读取前 200 条（main_workflow 测试模式）和读取单周的耗时，并校验读出的推文一致
+
+用法:
+    python3 benchmarks/bench_archive.py [周目录或数据文件] --weeks 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+sys.path.insert(2, os.path.join(ROOT, 'benchmarks'))
+
+from bench_dedup import DEFAULT_WEEK, build_timeline, write_runs
+from core.raw_data_io import iter_tweets
+from core.tweet_archive import TweetArchive, write_archive
+from integrate_all_raw_data import find_all_raw_data_files, integrate_all_raw_data
+
+HEAD = 200
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分片归档基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--weeks', type=int, default=8, help='周目录数')
+    args = parser.parse_args()
+
+    week = list(iter_tweets(args.data))
+    window = len(week)
+    timeline = build_timeline(week, window * args.weeks)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        source_dir = os.path.join(base_dir, 'source')
+        write_runs(source_dir, timeline, window, window, args.weeks)
+        with contextlib.redirect_stdout(io.StringIO()):
+            integrated = integrate_all_raw_data(find_all_raw_data_files(source_dir))
+        # 经过一次 JSON 往返，使参照数据与读出的推文类型一致
+        integrated = json.loads(json.dumps(integrated, ensure_ascii=False))
+        all_tweets = integrated['all_tweets']
+        middle_week = list(integrated['tweets_by_week'])[args.weeks // 2]
+
+        json_path = os.path.join(base_dir, 'integrated_all_tweets.json')
+
+        def write_json():
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(integrated, f, ensure_ascii=False, indent=2)
+
+        def head_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['all_tweets'][:HEAD]
+
+        def week_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['tweets_by_week'][middle_week]
+
+        archive_dir = os.path.join(base_dir, 'integrated_all_tweets')
+        summary = {key: value for key, value in integrated.items() if key not in ('all_tweets', 'tweets_by_week')}
+
+        json_write, _ = timed(write_json)
+        json_head, json_head_result = timed(head_json)
+        json_week, json_week_result = timed(week_json)
+
+        archive_write, _ = timed(lambda: write_archive(archive_dir, integrated['tweets_by_week'].items(), summary))
+        archive_head, archive_head_result = timed(lambda: TweetArchive(archive_dir).head(HEAD))
+        archive_week, archive_week_result = timed(lambda: TweetArchive(archive_dir).load_week(middle_week))
+        archive_all = list(TweetArchive(archive_dir).iter_tweets())
+
+        json_mb = os.path.getsize(json_path) / 1024 / 1024
+        archive_mb = dir_size(archive_dir) / 1024 / 1024
+
+    head_ok = json_head_result == archive_head_result == all_tweets[:HEAD]
+    week_ok = json_week_result == archive_week_result
+    all_ok = archive_all == all_tweets
+
+    print("\n" + "=" * 60)
+    print(f"📊 分片归档基准（{args.weeks} 周，{len(all_tweets)} 条推文）")
+    print("=" * 60)
+    print(f"单个 JSON: 写入 {json_write:.2f}s  大小 {json_mb:7.1f} MB  "
+          f"前 {HEAD} 条 {json_head * 1000:7.1f}ms  单周 {json_week * 1000:7.1f}ms")
+    print(f"分片归档:  写入 {archive_write:.2f}s  大小 {archive_mb:7.1f} MB  "
+          f"前 {HEAD} 条 {archive_head * 1000:7.1f}ms  单周 {archive_week * 1000:7.1f}ms")
+    print(f"磁盘缩小 {json_mb / archive_mb:.1f}x  前 {HEAD} 条加速 {json_head / archive_head:.0f}x  "
+          f"单周加速 {json_week / archive_week:.1f}x")
+    print(f"前 {HEAD} 条一致: {'✅' if head_ok else '❌'}  单周一致: {'✅' if week_ok else '❌'}  "
+          f"全部推文一致: {'✅' if all_ok else '❌'}")
+    print("=" * 60)
+
+    if not (head_ok and week_ok and all_ok):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
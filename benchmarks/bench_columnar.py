@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式推文表基准测试
+把周数据复制多份模拟多周归档，对比逐条遍历推文字典的聚合与 TweetTable 上的向量化聚合：
+- KOL 活跃度汇总（integrate_all_raw_data 的推文数/点赞/转发/活跃周/每周 KOL 数）
+- 按互动数取 Top-K 推文
+- 按天统计推文数
+建表耗时单独报告，并校验两种实现结果完全一致
+
+用法:
+    python3 benchmarks/bench_columnar.py [周目录或数据文件] --copies 20 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+
+from core.columnar import HAS_NUMPY, TweetTable
+from core.raw_data_io import iter_tweets
+from integrate_all_raw_data import _summarize_kols_columnar, _summarize_kols_dicts
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+TOP_K = 20
+
+CREATED_AT_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+def legacy_kol_stats(tweets, week_names, week_sizes):
+    """旧实现：integrate_all_raw_data 原来的逐条统计"""
+    kol_stats = defaultdict(lambda: {'tweet_count': 0, 'total_likes': 0, 'total_retweets': 0, 'weeks': []})
+    week_unique_kols = []
+
+    start = 0
+    for week_name, size in zip(week_names, week_sizes):
+        week_tweets = tweets[start:start + size]
+        for tweet in week_tweets:
+            kol_info = tweet.get('kol_info', {})
+            if kol_info:
+                username = kol_info.get('username', 'unknown')
+                kol_stats[username]['tweet_count'] += 1
+                kol_stats[username]['total_likes'] += tweet.get('public_metrics', {}).get('like_count', 0)
+                kol_stats[username]['total_retweets'] += tweet.get('public_metrics', {}).get('retweet_count', 0)
+                if week_name not in kol_stats[username]['weeks']:
+                    kol_stats[username]['weeks'].append(week_name)
+        week_unique_kols.append(len(set(
+            t.get('kol_info', {}).get('username') for t in week_tweets if t.get('kol_info'))))
+        start += size
+
+    return dict(kol_stats), week_unique_kols
+
+
+def comparable(result):
+    """去掉 kol_info，只比较统计值"""
+    kol_stats, week_unique_kols = result
+    stats = [(username, {key: value for key, value in stats.items() if key != 'kol_info'})
+             for username, stats in kol_stats.items()]
+    return stats, week_unique_kols
+
+
+def dict_top_k(tweets, k):
+    engagement = [tweet.get('likeCount', 0) + tweet.get('retweetCount', 0) for tweet in tweets]
+    return sorted(range(len(tweets)), key=engagement.__getitem__, reverse=True)[:k]
+
+
+def dict_day_counts(tweets):
+    days = Counter()
+    for tweet in tweets:
+        created_at = datetime.strptime(tweet['created_at'], CREATED_AT_FORMAT)
+        days[created_at.astimezone(timezone.utc).strftime('%Y-%m-%d')] += 1
+    return dict(sorted(days.items()))
+
+
+def best_of(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列式推文表基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=20, help='周数据重复份数（每份视为一周）')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("❌ 需要 numpy: pip3 install numpy")
+        sys.exit(1)
+
+    week = list(iter_tweets(args.data))
+    tweets = week * args.copies
+    week_names = [f'week_{index:03d}' for index in range(args.copies)]
+    week_sizes = [len(week)] * args.copies
+
+    # KOL 活跃度汇总
+    legacy_time, legacy = best_of(lambda: legacy_kol_stats(tweets, week_names, week_sizes), args.repeat)
+    dicts_time, dicts = best_of(lambda: _summarize_kols_dicts(tweets, week_names, week_sizes), args.repeat)
+    columnar_time, columnar = best_of(lambda: _summarize_kols_columnar(tweets, week_names, week_sizes), args.repeat)
+    kol_match = comparable(legacy) == comparable(dicts) == comparable(columnar)
+
+    # 建表（含时间解析）后的查询
+    def build():
+        table = TweetTable.from_tweets(tweets)
+        table.timestamps
+        return table
+
+    build_time, table = best_of(build, args.repeat)
+    engagement = table.engagement()
+
+    dict_topk_time, dict_topk = best_of(lambda: dict_top_k(tweets, TOP_K), args.repeat)
+    table_topk_time, table_topk = best_of(lambda: table.top_k(table.engagement(), TOP_K).tolist(), args.repeat)
+    dict_days_time, dict_days = best_of(lambda: dict_day_counts(tweets), args.repeat)
+    table_days_time, table_days = best_of(table.day_counts, args.repeat)
+
+    topk_match = dict_topk == table_topk and len(engagement) == len(tweets)
+    days_match = dict_days == table_days
+    all_match = kol_match and topk_match and days_match
+
+    print("\n" + "=" * 60)
+    print(f"📊 列式推文表基准（{len(tweets)} 条推文，{args.copies} 周，{len(table.kol_names)} 位 KOL）")
+    print("=" * 60)
+    print("KOL 活跃度汇总:")
+    print(f"   旧实现: {legacy_time:.3f}s")
+    print(f"   逐条（无 numpy 回退）: {dicts_time:.3f}s")
+    print(f"   列式（含建表）: {columnar_time:.3f}s  加速 {legacy_time / columnar_time:.2f}x  "
+          f"结果一致: {'✅' if kol_match else '❌'}")
+    print(f"建表（全部指标 + 时间解析）: {build_time:.3f}s")
+    print(f"Top-{TOP_K} 互动推文: 逐条 {dict_topk_time * 1000:.1f}ms → 列式 {table_topk_time * 1000:.1f}ms  "
+          f"加速 {dict_topk_time / table_topk_time:.1f}x  结果一致: {'✅' if topk_match else '❌'}")
+    print(f"按天计数: 逐条 {dict_days_time * 1000:.1f}ms → 列式 {table_days_time * 1000:.1f}ms  "
+          f"加速 {dict_days_time / table_days_time:.1f}x  结果一致: {'✅' if days_match else '❌'}")
+    print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
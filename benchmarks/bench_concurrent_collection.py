@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KOL 并发采集基准测试
+使用本地假 API（FakeTwitterCollector）对比串行与并发采集的耗时，并校验输出一致
+
+用法:
+    python3 benchmarks/bench_concurrent_collection.py --kol-count 100 --latency 0.05 --concurrency 16
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'twitter_monitor'))
+
+from core.data_collector import KOLWeeklyDataCollector
+from core.fake_twitter_api import FakeTwitterCollector
+
+
+# 两次运行共用同一个“当前时间”，保证假 API 生成完全相同的推文
+NOW = datetime.now(timezone.utc)
+
+
+def run_once(kol_count, latency, concurrency, credits_per_second=None):
+    """运行一次采集，返回 (耗时, 数据)"""
+    fake_api = FakeTwitterCollector(latency=latency, now=NOW)
+    collector = KOLWeeklyDataCollector(collector=fake_api)
+
+    start = time.perf_counter()
+    data = collector.collect_weekly_tweets(
+        days=7,
+        kol_count=kol_count,
+        concurrency=concurrency,
+        credits_per_second=credits_per_second,
+    )
+    return time.perf_counter() - start, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KOL 并发采集基准测试')
+    parser.add_argument('--kol-count', type=int, default=100, help='KOL数量')
+    parser.add_argument('--latency', type=float, default=0.05, help='每次API调用的模拟延迟（秒）')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发数')
+    parser.add_argument('--credits-per-second', type=int, default=None, help='每秒 credits 预算')
+    args = parser.parse_args()
+
+    serial_time, serial_data = run_once(args.kol_count, args.latency, 1)
+    concurrent_time, concurrent_data = run_once(
+        args.kol_count, args.latency, args.concurrency, args.credits_per_second
+    )
+
+    # 校验：推文顺序、KOL分布、API用量必须一致
+    same_tweets = serial_data['tweets'] == concurrent_data['tweets']
+    same_distribution = (serial_data['metadata']['kol_tweet_distribution'] ==
+                         concurrent_data['metadata']['kol_tweet_distribution'])
+    same_usage = serial_data['metadata']['api_usage'] == concurrent_data['metadata']['api_usage']
+
+    print("\n" + "=" * 60)
+    print("📊 KOL 并发采集基准")
+    print("=" * 60)
+    print(f"KOL数量: {args.kol_count}, 模拟延迟: {args.latency}s/调用")
+    print(f"串行耗时:       {serial_time:.2f}s")
+    print(f"并发耗时 (x{args.concurrency}): {concurrent_time:.2f}s")
+    print(f"加速比:         {serial_time / concurrent_time:.1f}x")
+    print(f"输出一致: tweets={same_tweets}, distribution={same_distribution}, api_usage={same_usage}")
+    print("=" * 60)
+
+    if not (same_tweets and same_distribution and same_usage):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨周去重基准测试
+模拟每天运行一次 --days 7 采集：第 k 次采集覆盖按时间排列的推文中的一个 7 天滑动窗口，
+互动数随采集次数增长（likeCount = 原值 + k），写成多个周目录后分别以去重/不去重运行集成，
+报告推文数、输出大小、集成阶段保留内存与耗时，并校验：
+- 去重后每条推文只出现一次，推文数等于唯一推文数
+- 保留的互动指标来自最后一次采集到它的那次运行
+- 每周丢弃的重复条数之和等于总重复数
+- 奇数次采集转换为紧凑格式后（新旧格式混合），保留推文按自身格式读到的指标仍来自最后一次采集
+
+用法:
+    python3 benchmarks/bench_dedup.py [周目录或数据文件] --runs 14
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+
+from core.raw_data_io import iter_tweets, save_raw_data
+from core.timeutil import tweet_timestamp
+from core.tweet_schema import compact_tweet, metric
+from compact_raw_data import convert_week
+from integrate_all_raw_data import find_all_raw_data_files, integrate_all_raw_data
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+WINDOW_DAYS = 7
+
+
+def build_timeline(tweets, length):
+    """把周数据按时间排序后重复拼接到 length 条（重复份的推文ID加偏移，保证唯一）"""
+    base = sorted(tweets, key=lambda t: tweet_timestamp(t) or 0)
+    timeline = []
+    copy = 0
+    while len(timeline) < length:
+        for tweet in base:
+            tweet = dict(tweet)
+            tweet['id'] = str(int(tweet['id']) + copy * 10 ** 12)
+            timeline.append(tweet)
+        copy += 1
+    return timeline[:length]
+
+
+def write_runs(base_dir, timeline, window, step, runs, compact_runs=()):
+    """第 k 次采集写入 timeline[k*step : k*step+window]，互动数加 k；compact_runs 中的采集转换为紧凑格式"""
+    start = datetime(2025, 1, 1)
+    for k in range(runs):
+        tweets = []
+        for tweet in timeline[k * step:k * step + window]:
+            tweet = dict(tweet)
+            tweet['likeCount'] = tweet.get('likeCount', 0) + k
+            metrics = dict(tweet.get('public_metrics', {}))
+            metrics['like_count'] = metrics.get('like_count', 0) + k
+            tweet['public_metrics'] = metrics
+            tweets.append(tweet)
+
+        run_start = start + timedelta(days=k)
+        run_end = run_start + timedelta(days=WINDOW_DAYS)
+        week_dir = os.path.join(base_dir, f"week_{run_start:%Y-%m-%d}_to_{run_end:%Y-%m-%d}")
+        save_raw_data({'tweets': tweets, 'metadata': {
+            'collection_time': run_end.isoformat(),
+            'total_tweets': len(tweets),
+        }}, week_dir)
+        if k in compact_runs:
+            convert_week(week_dir, cold=False)
+
+
+def expected_metric(tweet, column, compact):
+    """原始推文在某次采集的格式下读到的指标（紧凑格式按 compact_tweet() 的投影）"""
+    return metric(compact_tweet(tweet) if compact else tweet, column)
+
+
+def run_integration(reports, dedup):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        integrated = integrate_all_raw_data(reports, dedup=dedup)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    integrated['metadata']['integration_date'] = None
+    size = len(json.dumps(integrated, ensure_ascii=False).encode('utf-8'))
+    return integrated, elapsed, retained / 1024 / 1024, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='跨周去重基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--runs', type=int, default=14, help='采集次数（每天一次）')
+    args = parser.parse_args()
+
+    week = list(iter_tweets(args.data))
+    window = len(week)
+    step = max(window // WINDOW_DAYS, 1)
+    timeline = build_timeline(week, window + (args.runs - 1) * step)
+
+    # 每条推文最后一次被采集到的运行序号（期望保留的互动数增量）
+    last_run = {}
+    for k in range(args.runs):
+        for tweet in timeline[k * step:k * step + window]:
+            last_run[tweet['id']] = k
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        write_runs(base_dir, timeline, window, step, args.runs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reports = find_all_raw_data_files(base_dir)
+
+        raw, raw_time, raw_memory, raw_size = run_integration(reports, dedup=False)
+        deduped, dedup_time, dedup_memory, dedup_size = run_integration(reports, dedup=True)
+
+    # 新旧格式混合：奇数次采集为紧凑格式，重复推文在两种格式之间互相刷新指标
+    compact_runs = set(range(1, args.runs, 2))
+    with tempfile.TemporaryDirectory() as base_dir:
+        write_runs(base_dir, timeline, window, step, args.runs, compact_runs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reports = find_all_raw_data_files(base_dir)
+        mixed, _, _, _ = run_integration(reports, dedup=True)
+
+    original = {tweet['id']: (tweet.get('likeCount', 0), tweet.get('public_metrics', {}).get('like_count', 0))
+                for tweet in timeline}
+    ids = [tweet['id'] for tweet in deduped['all_tweets']]
+    unique_ok = len(ids) == len(set(ids)) == len(last_run)
+    fresh_ok = all(
+        (tweet['likeCount'], tweet['public_metrics']['like_count']) ==
+        tuple(value + last_run[tweet['id']] for value in original[tweet['id']])
+        for tweet in deduped['all_tweets']
+    )
+    dropped = sum(week['duplicates_dropped'] for week in deduped['weekly_summaries'])
+    dropped_ok = dropped == deduped['statistics']['duplicates_dropped'] == len(raw['all_tweets']) - len(ids)
+    kol_ok = sum(kol['total_tweets'] for kol in deduped['kol_activity'].values()) <= len(ids)
+    timeline_by_id = {tweet['id']: tweet for tweet in timeline}
+    mixed_ok = len(mixed['all_tweets']) == len(last_run) and all(
+        metric(tweet, 'likes') == expected_metric(
+            timeline_by_id[tweet['id']], 'likes', last_run[tweet['id']] in compact_runs) + last_run[tweet['id']]
+        and metric(tweet, 'views') == expected_metric(
+            timeline_by_id[tweet['id']], 'views', last_run[tweet['id']] in compact_runs)
+        for tweet in mixed['all_tweets']
+    )
+    all_ok = unique_ok and fresh_ok and dropped_ok and kol_ok and mixed_ok
+
+    print("\n" + "=" * 60)
+    print(f"📊 跨周去重基准（{args.runs} 次采集，每次 {window} 条，唯一推文 {len(last_run)} 条）")
+    print("=" * 60)
+    print(f"不去重: {len(raw['all_tweets']):7d} 条  输出 {raw_size:7.1f} MB  "
+          f"保留内存 {raw_memory:7.1f} MB  {raw_time:.2f}s")
+    print(f"去重:   {len(ids):7d} 条  输出 {dedup_size:7.1f} MB  "
+          f"保留内存 {dedup_memory:7.1f} MB  {dedup_time:.2f}s")
+    print(f"丢弃重复: {dropped} 条；输出缩小 {raw_size / dedup_size:.1f}x，内存缩小 {raw_memory / dedup_memory:.1f}x")
+    print(f"推文唯一: {'✅' if unique_ok else '❌'}  指标取最新: {'✅' if fresh_ok else '❌'}  "
+          f"重复计数一致: {'✅' if dropped_ok else '❌'}  KOL 统计未重复计数: {'✅' if kol_ok else '❌'}")
+    print(f"混合格式刷新指标: {'✅' if mixed_ok else '❌'}")
+    print("=" * 60)
+
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
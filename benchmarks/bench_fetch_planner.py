@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应采集深度基准测试
+使用本地假 API（KOL发推频率从每天 0.1 到 8 条不等）模拟连续几周采集：前几周的元数据作为历史，
+最后一周分别以固定深度、自适应深度和不限深度（作为真值）采集，对比 API 调用次数和被截断遗漏的推文
+
+用法:
+    python3 benchmarks/bench_fetch_planner.py --kol-count 200 --history-weeks 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'twitter_monitor'))
+
+from core import data_collector
+from core.data_collector import KOLWeeklyDataCollector
+from core.fake_twitter_api import FakeTwitterCollector
+from core.fetch_planner import FetchPlanner
+from core.raw_data_io import save_raw_data
+
+NOW = datetime(2025, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def collect(now, kol_count, fetch_planner=None, max_tweets=None):
+    """在模拟时间 now 运行一次 7 天窗口采集"""
+    collector = KOLWeeklyDataCollector(collector=FakeTwitterCollector(latency=0, now=now))
+
+    # 采集窗口以 datetime.now() 为终点，这里固定为模拟时间
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.replace(tzinfo=None)
+
+    overrides = {'max_tweets_per_kol': max_tweets} if max_tweets else {}
+    with mock.patch.object(data_collector, 'datetime', FrozenDatetime), \
+            mock.patch.dict(data_collector.DATA_COLLECTION, overrides):
+        return collector.collect_weekly_tweets(
+            days=7, kol_count=kol_count, concurrency=1, fetch_planner=fetch_planner
+        )
+
+
+def planner_for(base_dir, now):
+    return FetchPlanner.from_reports(base_dir, before=now.replace(tzinfo=None) - timedelta(days=7))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='自适应采集深度基准测试')
+    parser.add_argument('--kol-count', type=int, default=200, help='KOL数量')
+    parser.add_argument('--history-weeks', type=int, default=3, help='作为历史的周数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        # 历史周：第一周固定深度，之后按已有历史自适应（与每周运行一致）
+        for k in range(args.history_weeks, 0, -1):
+            now = NOW - timedelta(days=7 * k)
+            data = collect(now, args.kol_count, planner_for(base_dir, now) if k < args.history_weeks else None)
+            date_range = data['metadata']['date_range']
+            save_raw_data(data, os.path.join(base_dir, f"week_{date_range['start']}_to_{date_range['end']}"))
+
+        planner = planner_for(base_dir, NOW)
+        fixed = collect(NOW, args.kol_count)
+        adaptive = collect(NOW, args.kol_count, planner)
+        truth = collect(NOW, args.kol_count, max_tweets=1000)
+
+    truth_ids = {t['id'] for t in truth['tweets']}
+    fixed_missed = len(truth_ids - {t['id'] for t in fixed['tweets']})
+    adaptive_missed = len(truth_ids - {t['id'] for t in adaptive['tweets']})
+    fixed_calls = fixed['metadata']['api_usage']['api_calls']
+    adaptive_calls = adaptive['metadata']['api_usage']['api_calls']
+    estimate = adaptive['metadata']['fetch_plan']['estimate']
+
+    print("\n" + "=" * 60)
+    print("📊 自适应采集深度基准（最后一周）")
+    print("=" * 60)
+    print(f"KOL数量: {args.kol_count}, 历史周数: {planner.weeks}, 窗口内推文（真值）: {len(truth_ids)} 条")
+    print(f"固定深度:   API调用 {fixed_calls} 次, 遗漏 {fixed_missed} 条, "
+          f"截断KOL {len(fixed['metadata']['fetch_plan']['truncated'])} 个")
+    print(f"自适应深度: API调用 {adaptive_calls} 次, 遗漏 {adaptive_missed} 条, "
+          f"截断KOL {len(adaptive['metadata']['fetch_plan']['truncated'])} 个")
+    print(f"节省: {1 - adaptive_calls / fixed_calls:.0%} API调用")
+    print(f"运行前预计: {estimate}")
+    print("=" * 60)
+
+    checks = [
+        ('自适应深度 API 调用更少', adaptive_calls < fixed_calls),
+        ('自适应深度遗漏不多于固定深度', adaptive_missed <= fixed_missed),
+    ]
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
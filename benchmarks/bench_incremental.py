@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量集成基准测试
+模拟每天一次的 --days 7 采集（7 天滑动窗口，写成多个周目录），逐周加入归档：
+每加入一周分别运行全量集成与增量集成，报告两者耗时随历史周数的变化，并校验：
+- 增量模式的汇总与全量集成一致（去掉 all_tweets / tweets_by_week 后逐字段比较）
+- 归档分片中的推文按周序逐条等于全量集成的 all_tweets，且各周分片与 tweets_by_week 一致
+- 只 touch 数据文件（内容不变）不触发重建；修改中间某周后全部重建，结果仍与全量一致
+
+用法:
+    python3 benchmarks/bench_incremental.py [周目录或数据文件] --runs 12
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+sys.path.insert(2, os.path.join(ROOT, 'benchmarks'))
+
+from bench_dedup import DEFAULT_WEEK, WINDOW_DAYS, build_timeline, write_runs
+from core.raw_data_io import TWEETS_FILE, iter_tweets
+from core.tweet_archive import ARCHIVE_DIR, TweetArchive
+from integrate_all_raw_data import find_all_raw_data_files, integrate_all_raw_data, integrate_incremental
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def matches_full(archive_dir, output_dir):
+    """增量输出是否与对同一归档的全量集成一致"""
+    reports = quiet(find_all_raw_data_files, archive_dir)
+    full = quiet(integrate_all_raw_data, reports)
+    all_tweets = full.pop('all_tweets')
+    tweets_by_week = full.pop('tweets_by_week')
+
+    archive = TweetArchive(os.path.join(output_dir, ARCHIVE_DIR))
+    summary = archive.summary()
+    for data in (full, summary):
+        data['metadata']['integration_date'] = None
+    streamed = list(archive.iter_tweets())
+    by_week = {name: archive.load_week(name) for name in archive.weeks()}
+
+    # 经过一次 JSON 往返再比较（元组/共享对象等差异不影响结果）
+    full = json.loads(json.dumps(full, ensure_ascii=False))
+    all_tweets = json.loads(json.dumps(all_tweets, ensure_ascii=False))
+    tweets_by_week = json.loads(json.dumps(tweets_by_week, ensure_ascii=False))
+    return summary == full and streamed == all_tweets and by_week == tweets_by_week
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量集成基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--runs', type=int, default=12, help='周目录数（每天一次采集）')
+    args = parser.parse_args()
+
+    week = list(iter_tweets(args.data))
+    window = len(week)
+    step = max(window // WINDOW_DAYS, 1)
+    timeline = build_timeline(week, window + (args.runs - 1) * step)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        source_dir = os.path.join(base_dir, 'source')
+        archive_dir = os.path.join(base_dir, 'archive')
+        output_dir = os.path.join(base_dir, 'output')
+        os.makedirs(archive_dir)
+        write_runs(source_dir, timeline, window, step, args.runs)
+
+        print("\n" + "=" * 60)
+        print(f"📊 增量集成基准（{args.runs} 个周目录，每个 {window} 条）")
+        print("=" * 60)
+        print(f"{'周数':>4s}  {'全量集成':>10s}  {'增量集成':>10s}")
+
+        full_times, incremental_times = [], []
+        for name in sorted(os.listdir(source_dir)):
+            shutil.copytree(os.path.join(source_dir, name), os.path.join(archive_dir, name))
+
+            start = time.perf_counter()
+            reports = quiet(find_all_raw_data_files, archive_dir)
+            full = quiet(integrate_all_raw_data, reports)
+            with open(os.path.join(base_dir, 'full.json'), 'w', encoding='utf-8') as f:
+                json.dump(full, f, ensure_ascii=False, indent=2)
+            full_times.append(time.perf_counter() - start)
+            del full
+
+            start = time.perf_counter()
+            reports = quiet(find_all_raw_data_files, archive_dir)
+            quiet(integrate_incremental, reports, output_dir)
+            incremental_times.append(time.perf_counter() - start)
+
+            print(f"{len(reports):4d}  {full_times[-1]:9.3f}s  {incremental_times[-1]:9.3f}s")
+
+        final_ok = matches_full(archive_dir, output_dir)
+
+        # 只 touch 不改内容：不应重建
+        weeks = sorted(os.listdir(archive_dir))
+        middle = os.path.join(archive_dir, weeks[len(weeks) // 2])
+        for name in os.listdir(middle):
+            os.utime(os.path.join(middle, name))
+        reports = quiet(find_all_raw_data_files, archive_dir)
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            integrate_incremental(reports, output_dir)
+        touch_time = time.perf_counter() - start
+        touch_ok = '重建' not in log.getvalue() and matches_full(archive_dir, output_dir)
+
+        # 修改中间一周：全部重建后仍与全量一致
+        tweets = list(iter_tweets(middle))
+        tweets[0]['likeCount'] = tweets[0].get('likeCount', 0) + 1000
+        with open(os.path.join(middle, TWEETS_FILE), 'w', encoding='utf-8') as f:
+            for tweet in tweets:
+                f.write(json.dumps(tweet, ensure_ascii=False) + '\n')
+        reports = quiet(find_all_raw_data_files, archive_dir)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            integrate_incremental(reports, output_dir)
+        rebuild_ok = '重建' in log.getvalue() and matches_full(archive_dir, output_dir)
+
+    print("-" * 60)
+    print(f"加入最后一周: 全量 {full_times[-1]:.3f}s → 增量 {incremental_times[-1]:.3f}s  "
+          f"加速 {full_times[-1] / incremental_times[-1]:.1f}x")
+    print(f"增量耗时（第 2 周 / 最后一周）: {incremental_times[1]:.3f}s / {incremental_times[-1]:.3f}s；"
+          f"无新周重跑: {touch_time:.3f}s")
+    print(f"结果与全量一致: {'✅' if final_ok else '❌'}  touch 不重建: {'✅' if touch_ok else '❌'}  "
+          f"修改中间周后重建一致: {'✅' if rebuild_ok else '❌'}")
+    print("=" * 60)
+
+    if not (final_ok and touch_ok and rebuild_ok):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量采集（KOL水位线）基准测试
+模拟连续两天各运行一次 7 天滚动窗口采集，对比第二次运行在全量/增量模式下的 API 调用次数，
+并校验增量模式没有遗漏全量模式采集到的推文（增量模式可能更多：缓存保留了超出 50 条上限的旧推文，
+沿用缓存的推文互动数是旧的，不按 min_engagement 丢弃），沿用缓存的推文都带 metrics_fetched_at；
+再以 refresh_days=0 运行一次，校验每个KOL都整页刷新了互动数，且本次采集到的推文与全量模式一致；
+最后用不支持 since_id 的采集器（与生产环境的 TwitterCollector 一样）运行增量模式，
+校验按水位线减少请求深度后仍没有遗漏推文
+
+用法:
+    python3 benchmarks/bench_incremental_collection.py --kol-count 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'twitter_monitor'))
+
+from core import data_collector
+from core.data_collector import KOLWeeklyDataCollector
+from core.fake_twitter_api import FakeTwitterCollector
+from core.tweet_schema import METRICS_FETCHED_AT
+from core.watermark_store import KOLWatermarkStore
+
+
+class NoSinceIdCollector(FakeTwitterCollector):
+    """不支持 since_id 的假采集器"""
+
+    def collect_user_tweets(self, username, max_tweets=50, include_replies=False):
+        return super().collect_user_tweets(username, max_tweets, include_replies)
+
+
+def collect(now, kol_count, watermark_store=None, api_class=FakeTwitterCollector):
+    """在模拟时间 now 运行一次采集"""
+    collector = KOLWeeklyDataCollector(collector=api_class(latency=0, now=now))
+
+    # 采集窗口以 datetime.now() 为终点，这里固定为模拟时间
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.replace(tzinfo=None)
+
+    with mock.patch.object(data_collector, 'datetime', FrozenDatetime):
+        return collector.collect_weekly_tweets(
+            days=7, kol_count=kol_count, concurrency=1, watermark_store=watermark_store
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量采集基准测试')
+    parser.add_argument('--kol-count', type=int, default=100, help='KOL数量')
+    args = parser.parse_args()
+
+    day1 = datetime.now(timezone.utc).replace(microsecond=0)
+    day2 = day1 + timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = KOLWatermarkStore(os.path.join(tmp_dir, 'kol_watermarks.json'))
+        collect(day1, args.kol_count, store)
+
+        full = collect(day2, args.kol_count)
+        day1_store = os.path.join(tmp_dir, 'day1.json')
+        no_since_store = os.path.join(tmp_dir, 'no_since_id.json')
+        for path in (day1_store, no_since_store):
+            with open(store.path, 'rb') as src, open(path, 'wb') as dst:
+                dst.write(src.read())
+        incremental = collect(day2, args.kol_count, KOLWatermarkStore(store.path))
+        refreshed = collect(day2, args.kol_count, KOLWatermarkStore(day1_store, refresh_days=0))
+        no_since = collect(day2, args.kol_count, KOLWatermarkStore(no_since_store), NoSinceIdCollector)
+
+    full_ids = {t['id'] for t in full['tweets']}
+    incremental_ids = {t['id'] for t in incremental['tweets']}
+    missing = full_ids - incremental_ids
+    full_calls = full['metadata']['api_usage']['api_calls']
+    incremental_calls = incremental['metadata']['api_usage']['api_calls']
+    refreshed_calls = refreshed['metadata']['api_usage']['api_calls']
+    no_since_calls = no_since['metadata']['api_usage']['api_calls']
+    no_since_missing = full_ids - {t['id'] for t in no_since['tweets']}
+    stats = incremental['metadata']['incremental']
+    refresh_stats = refreshed['metadata']['incremental']
+
+    # 增量运行中本次采集到的推文（不带 metrics_fetched_at）都比第一天的水位线新
+    day1_newest = max(int(t['id']) for t in collect(day1, args.kol_count)['tweets'])
+    stamped_ok = all((METRICS_FETCHED_AT in t) == (int(t['id']) <= day1_newest) for t in incremental['tweets']) \
+        and any(METRICS_FETCHED_AT in t for t in incremental['tweets'])
+    refresh_ok = refresh_stats['kols_metrics_refreshed'] == refresh_stats['kols_with_watermark'] > 0 and \
+        {t['id'] for t in refreshed['tweets'] if METRICS_FETCHED_AT not in t} == full_ids
+
+    print("\n" + "=" * 60)
+    print("📊 增量采集基准（第二天的滚动7天窗口）")
+    print("=" * 60)
+    print(f"KOL数量: {args.kol_count}")
+    print(f"全量模式 API调用: {full_calls} ({full['metadata']['api_usage']['total_credits']:,} credits)")
+    print(f"增量模式 API调用: {incremental_calls} ({incremental['metadata']['api_usage']['total_credits']:,} credits)")
+    print(f"节省: {1 - incremental_calls / full_calls:.0%}")
+    print(f"增量统计: {incremental['metadata']['incremental']}")
+    print(f"推文数: 全量 {len(full_ids)} 条, 增量 {len(incremental_ids)} 条, 增量遗漏 {len(missing)} 条")
+    print(f"整页刷新互动数: API调用 {refreshed_calls}, 刷新 {refresh_stats['refreshed_tweets']} 条")
+    print(f"不支持 since_id 的采集器: API调用 {no_since_calls}（节省 {1 - no_since_calls / full_calls:.0%}）, "
+          f"遗漏 {len(no_since_missing)} 条")
+    print("=" * 60)
+
+    checks = [
+        ('增量模式没有遗漏推文', not missing),
+        ('沿用缓存的推文带 metrics_fetched_at', stamped_ok),
+        ('到期的KOL整页刷新互动数，采集结果与全量一致', refresh_ok),
+        ('不支持 since_id 时按水位线减少深度，没有遗漏推文',
+         not no_since_missing and no_since_calls < full_calls and not no_since['metadata']['incremental']['since_id']),
+    ]
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
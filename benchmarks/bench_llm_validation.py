@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 产品验证基准测试
+用本地 LLM 替身（固定延迟、结果确定）对比逐条串行验证与多推文批量 + 并发验证，
+并校验两种方式验证出的产品完全一致；再用同一个响应缓存重跑，确认第二次不发 LLM 请求；
+最后用有缺陷的替身（批量响应缺推文、products 格式不对，逐条补验证失败）确认只丢失出问题的推文
+
+用法:
+    python3 benchmarks/bench_llm_validation.py [周目录或数据文件] --tweets 200 --batch-size 20 --concurrency 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from core.fake_llm import FakeLLM
+from core.llm_cache import LLMResponseCache
+from core.product_extractor import ProductExtractor
+from core.product_validator import ProductValidator
+from core.raw_data_io import iter_tweets
+from core.signal_detector import SignalDetector
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+def build_candidates(data, max_tweets):
+    """从周数据中提取候选产品（最多 max_tweets 条含候选的推文）"""
+    detector = SignalDetector()
+    extractor = ProductExtractor()
+
+    candidates = []
+    tweets_map = {}
+    for tweet in iter_tweets(data):
+        signals = detector.detect_signals(tweet.get('text', ''))
+        if not signals:
+            continue
+        found = extractor.extract_products_from_signaled_tweet(tweet, signals)
+        if not found:
+            continue
+        candidates.extend(found)
+        tweets_map[tweet.get('id', '')] = tweet
+        if len(tweets_map) >= max_tweets:
+            break
+
+    return candidates, tweets_map
+
+
+class LossyLLM(FakeLLM):
+    """批量响应缺少每批第一条推文、第二条推文的 products 不是列表，逐条验证一律失败"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lossy_ids = set()
+
+    def call_claude_json(self, prompt):
+        batch_match = re.search(r'```json\n(.*?)\n```', prompt, re.S)
+        if not batch_match:
+            raise RuntimeError('模拟逐条验证失败')
+        response = super().call_claude_json(prompt)
+        results = response['results']
+        with self._lock:
+            self.lossy_ids.update(str(item['tweet_id']) for item in results[:2])
+        if len(results) > 1:
+            results[1]['products'] = 'malformed'
+        response['results'] = results[1:]
+        return response
+
+
+def run(candidates, tweets_map, latency, batch_size, concurrency, cache=False, llm=None):
+    """运行一次验证，返回 (耗时, 验证结果, LLM调用次数)"""
+    llm = llm or FakeLLM(latency=latency)
+    validator = ProductValidator(llm=llm, concurrency=concurrency, cache=cache)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        validated = validator.validate_candidates(candidates, tweets_map, batch_size=batch_size)
+    return time.perf_counter() - start, validated, llm.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LLM 产品验证基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--tweets', type=int, default=200, help='参与验证的推文数')
+    parser.add_argument('--latency', type=float, default=0.05, help='替身每次调用的固定延迟（秒）')
+    parser.add_argument('--batch-size', type=int, default=20, help='每次调用打包的推文数')
+    parser.add_argument('--concurrency', type=int, default=4, help='并发批次数')
+    args = parser.parse_args()
+
+    candidates, tweets_map = build_candidates(args.data, args.tweets)
+
+    serial_time, serial_result, serial_calls = run(candidates, tweets_map, args.latency, 1, 1)
+    batch_time, batch_result, batch_calls = run(
+        candidates, tweets_map, args.latency, args.batch_size, args.concurrency
+    )
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold_time, cold_result, cold_calls = run(
+            candidates, tweets_map, args.latency, args.batch_size, args.concurrency,
+            cache=LLMResponseCache(cache_dir)
+        )
+        cache = LLMResponseCache(cache_dir)
+        warm_time, warm_result, warm_calls = run(
+            candidates, tweets_map, args.latency, args.batch_size, args.concurrency, cache=cache
+        )
+
+    match = serial_result == batch_result == cold_result == warm_result
+
+    # 批次中个别推文出问题时，其余推文的结果保留
+    lossy = LossyLLM(latency=0)
+    _, lossy_result, _ = run(candidates, tweets_map, 0, args.batch_size, args.concurrency, llm=lossy)
+    expected = [p for p in batch_result if str(p['tweet_id']) not in lossy.lossy_ids]
+    lossy_ok = json.dumps(lossy_result, sort_keys=True) == json.dumps(expected, sort_keys=True)
+
+    print("\n" + "=" * 60)
+    print("📊 LLM 产品验证基准（本地替身，单次调用延迟 "
+          f"{args.latency * 1000:.0f}ms）")
+    print("=" * 60)
+    print(f"推文: {len(tweets_map)} 条，候选产品 {len(candidates)} 个，验证通过 {len(batch_result)} 个")
+    print(f"逐条串行: {serial_time:.3f}s，LLM调用 {serial_calls} 次")
+    print(f"批量并发 (batch={args.batch_size}, 并发={args.concurrency}): "
+          f"{batch_time:.3f}s，LLM调用 {batch_calls} 次")
+    print(f"加速: {serial_time / batch_time:.1f}x")
+    print(f"缓存重跑: 首次 {cold_time:.3f}s / {cold_calls} 次调用，"
+          f"重跑 {warm_time:.3f}s / {warm_calls} 次调用（{cache.summary()}）")
+    print(f"输出一致: {'✅' if match else '❌'}  "
+          f"批次中个别推文失败时保留其余推文结果: {'✅' if lossy_ok else '❌'}（{len(expected)} 个产品）")
+    print("=" * 60)
+
+    if not match or warm_calls or not lossy_ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提及记录内存基准测试
+每个实现在独立子进程中运行，报告进程峰值 RSS 和聚合阶段 tracemalloc 统计的保留/峰值内存
+（加载推文的 JSON 解析往往先把 RSS 峰值顶高，聚合阶段的差别要看 tracemalloc），对比：
+- 推文分析：旧实现每个 (推文, 产品) 复制一份提及字典 vs 共享 TweetRecord + 下标数组
+- PK 产品提取：同上
+- 多周原始数据集成：旧实现逐条 tweet.copy() 且每条推文一个日期范围字典 vs 原地添加元数据、每周共用一个字典
+  （各周是同一份数据，关闭跨周去重以便与旧实现逐条比较）
+并校验两种实现的输出序列化后一致
+
+用法:
+    python3 benchmarks/bench_memory.py [周目录或数据文件] --copies 20
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+
+from analyze_tweets import aggregate_tweets
+from core.product_patterns import KIND_PRODUCT
+from core.raw_data_io import find_raw_data, iter_tweets
+from core.tweet_features import TweetFeatureExtractor
+from integrate_all_raw_data import integrate_all_raw_data, load_raw_tweets
+from integrate_product_knowledge_v3 import aggregate_product_mentions, normalize_product_name
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+VARIANTS = [
+    ('推文分析', 'analyze-legacy', 'analyze-records'),
+    ('PK 产品提取', 'pk-legacy', 'pk-records'),
+    ('多周原始数据集成', 'integrate-legacy', 'integrate-records'),
+]
+
+
+def peak_rss_mb():
+    """进程峰值 RSS（MB）"""
+    # Linux 上 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def traced(func):
+    """运行 func 并统计期间新分配且仍保留的内存和峰值（MB），结果对象保持存活"""
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024 / 1024, peak / 1024 / 1024
+
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+# ============ 旧实现 ============
+
+def legacy_analyze(tweets, extractor):
+    """旧实现：analyze_tweets 每个提及一个字典"""
+    product_mentions = defaultdict(list)
+    new_products = defaultdict(list)
+    for tweet in tweets:
+        text = tweet.get('text', '')
+        kol = tweet.get('kol_info', {})
+        created_at = tweet.get('created_at', '')
+        features = extractor.extract(text)
+        for product in features.products:
+            product_mentions[product].append({
+                'text': text,
+                'kol': kol.get('username'),
+                'rank': kol.get('rank'),
+                'followers': kol.get('followers'),
+                'likes': tweet.get('likeCount', 0),
+                'retweets': tweet.get('retweetCount', 0),
+                'created_at': created_at,
+                'sentiment': features.sentiment,
+                'is_new': features.is_new
+            })
+            if features.is_new:
+                new_products[product].append({
+                    'text': text,
+                    'kol': kol.get('username'),
+                    'rank': kol.get('rank'),
+                    'created_at': created_at
+                })
+    return product_mentions, new_products
+
+
+def legacy_pk(tweets, extractor):
+    """旧实现：integrate_product_knowledge_v3 每个提及一个字典"""
+    product_mentions = defaultdict(list)
+    for tweet in tweets:
+        text = tweet.get('text', '')
+        author = tweet.get('author', {})
+        kol = author.get('username', 'unknown') if isinstance(author, dict) else str(author)
+        features = extractor.extract(text)
+        for product in features.products:
+            product_mentions[normalize_product_name(product)].append({
+                'text': text,
+                'kol': kol,
+                'rank': tweet.get('rank', 0),
+                'followers': tweet.get('followers', 0),
+                'likes': tweet.get('likes', 0),
+                'retweets': tweet.get('retweets', 0),
+                'created_at': tweet.get('created_at', ''),
+                'sentiment': features.sentiment,
+                'is_new': features.launch_or_new
+            })
+    return product_mentions
+
+
+def legacy_integrate(reports):
+    """旧实现：integrate_all_raw_data 逐条 copy 推文"""
+    all_tweets = []
+    tweets_by_week = {}
+    for report in reports:
+        tweets, _ = load_raw_tweets(report['raw_data_path'])
+        week_tweets = []
+        for tweet in tweets:
+            tweet_with_meta = tweet.copy()
+            tweet_with_meta['source_week'] = report['week_name']
+            tweet_with_meta['source_date_range'] = {
+                'start': report.get('start_date'),
+                'end': report.get('end_date'),
+            }
+            week_tweets.append(tweet_with_meta)
+            all_tweets.append(tweet_with_meta)
+        tweets_by_week[report['week_name']] = week_tweets
+    return all_tweets, tweets_by_week
+
+
+# ============ 子进程 ============
+
+def run_variant(variant, data, copies):
+    """在当前进程中运行一个实现，返回 {'rss', 'retained', 'peak', 'digest'}"""
+    if variant.startswith('integrate'):
+        raw_data_path = str(find_raw_data(data))
+        reports = [{
+            'week_name': f'week_{index:03d}',
+            'raw_data_path': raw_data_path,
+            'file_size_mb': 0,
+            'start_date': f'2025-{index:03d}',
+            'end_date': f'2025-{index + 1:03d}',
+        } for index in range(copies)]
+        if variant == 'integrate-legacy':
+            (all_tweets, tweets_by_week), retained, peak = traced(lambda: legacy_integrate(reports))
+        else:
+            integrated, retained, peak = traced(lambda: integrate_all_raw_data(reports, dedup=False))
+            all_tweets, tweets_by_week = integrated['all_tweets'], integrated['tweets_by_week']
+        output = [all_tweets, tweets_by_week]
+
+    elif variant.startswith('analyze'):
+        tweets = [dict(tweet) for _ in range(copies) for tweet in iter_tweets(data)]
+        extractor = TweetFeatureExtractor()
+        extractor.extract('warm up')
+        if variant == 'analyze-legacy':
+            output, retained, peak = traced(lambda: list(legacy_analyze(tweets, extractor)))
+        else:
+            aggregates, retained, peak = traced(lambda: aggregate_tweets(tweets, extractor))
+            records = aggregates['tweets']
+            output = [
+                {product: [records[i].to_mention() for i in indices]
+                 for product, indices in aggregates['product_mentions'].items()},
+                {product: [{key: records[i].to_mention()[key] for key in ('text', 'kol', 'rank', 'created_at')}
+                           for i in indices]
+                 for product, indices in aggregates['new_products'].items()},
+            ]
+
+    else:
+        tweets = [dict(tweet) for _ in range(copies) for tweet in iter_tweets(data)]
+        extractor = TweetFeatureExtractor(product_kinds=(KIND_PRODUCT,))
+        extractor.extract('warm up')
+        if variant == 'pk-legacy':
+            output, retained, peak = traced(lambda: legacy_pk(tweets, extractor))
+        else:
+            aggregates, retained, peak = traced(lambda: aggregate_product_mentions(tweets, extractor))
+            records = aggregates['tweets']
+            output = {product: [records[i].to_mention() for i in indices]
+                      for product, indices in aggregates['product_mentions'].items()}
+
+    return {'rss': peak_rss_mb(), 'retained': retained, 'peak': peak, 'digest': digest(output)}
+
+
+def spawn(variant, data, copies):
+    """在新的子进程中运行一个实现（各实现的峰值 RSS 互不影响）"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), data, '--copies', str(copies), '--variant', variant],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='提及记录内存基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=20, help='周数据重复份数（模拟多周归档）')
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.data, args.copies)))
+        return
+
+    print("\n" + "=" * 60)
+    print(f"📊 提及记录内存基准（周数据 × {args.copies}）")
+    print("=" * 60)
+
+    all_match = True
+    for name, legacy_variant, records_variant in VARIANTS:
+        legacy = spawn(legacy_variant, args.data, args.copies)
+        records = spawn(records_variant, args.data, args.copies)
+        match = legacy['digest'] == records['digest']
+        all_match = all_match and match
+        print(f"{name}:")
+        for label, result in (('旧实现', legacy), ('新实现', records)):
+            print(f"   {label}: 保留 {result['retained']:7.1f} MB  聚合峰值 {result['peak']:7.1f} MB  "
+                  f"进程峰值 RSS {result['rss']:7.1f} MB")
+        print(f"   保留内存减少 {legacy['retained'] / records['retained']:.1f}x  "
+              f"输出一致: {'✅' if match else '❌'}")
+
+    print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
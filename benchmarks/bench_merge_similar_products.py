@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似产品合并基准测试
+对比两两比较（O(n²) SequenceMatcher）与字符前缀过滤分块的耗时，
+并校验两种模式选出的代表产品完全一致
+
+用法:
+    python3 benchmarks/bench_merge_similar_products.py --sizes 200 1000 5000 --pairwise-max 3000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'twitter_monitor'))
+
+from core.product_validator import ProductValidator
+
+
+SUFFIXES = ['', '', '', ' Pro', ' Mini', ' AI', ' Studio', ' 2', ' 3.5', ' Turbo', '-v2']
+
+
+def synthetic_products(n, seed=42):
+    """生成带大小写/版本/拼写变体的产品列表"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    bases = []
+    products = []
+    while len(products) < n:
+        if bases and rng.random() < 0.4:
+            # 已有产品的变体
+            name = rng.choice(bases) + rng.choice(SUFFIXES)
+            if rng.random() < 0.2:
+                name = name.lower()
+            if rng.random() < 0.2:
+                k = rng.randrange(len(name))
+                name = name[:k] + rng.choice(letters) + name[k + 1:]
+        else:
+            name = ' '.join(
+                ''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))).title()
+                for _ in range(rng.randint(1, 2))
+            )
+            bases.append(name)
+        products.append({'name': name, 'confidence': round(rng.random(), 2)})
+    return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相似产品合并基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000, 5000], help='产品数量')
+    parser.add_argument('--pairwise-max', type=int, default=3000, help='两两比较的最大规模（更大时跳过）')
+    args = parser.parse_args()
+
+    validator = ProductValidator()
+    all_match = True
+
+    print("\n" + "=" * 60)
+    print("📊 相似产品合并基准")
+    print("=" * 60)
+
+    for n in args.sizes:
+        products = synthetic_products(n)
+
+        start = time.perf_counter()
+        blocked = validator.merge_similar_products(products, method='blocked')
+        blocked_time = time.perf_counter() - start
+
+        line = f"n={n:>6}: 分块 {blocked_time:7.3f}s ({len(blocked)} 组)"
+        if n <= args.pairwise_max:
+            start = time.perf_counter()
+            pairwise = validator.merge_similar_products(products, method='pairwise')
+            pairwise_time = time.perf_counter() - start
+
+            match = [id(p) for p in pairwise] == [id(p) for p in blocked]
+            all_match = all_match and match
+            line += (f"  两两比较 {pairwise_time:7.3f}s ({len(pairwise)} 组)"
+                     f"  加速 {pairwise_time / blocked_time:.1f}x  输出一致: {'✅' if match else '❌'}")
+        print(line)
+
+    print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片并行分析基准测试
+把周数据复制多份模拟多周归档，分别以 1/2/4/... 个进程运行推文分析和 Product Knowledge 产品提取，
+报告耗时与加速比，并校验并行结果序列化后与串行逐字节一致
+
+用法:
+    python3 benchmarks/bench_parallel_analysis.py [周目录或数据文件] --copies 20 --workers 1 2 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+
+from analyze_tweets import analyze_tweets
+from core.parallel import DEFAULT_SHARD_SIZE
+from core.raw_data_io import iter_tweets, load_metadata
+from integrate_product_knowledge_v3 import extract_all_products_from_raw_data
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+def timed(func):
+    """运行一次（屏蔽进度输出），返回 (耗时, 序列化结果)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    elapsed = time.perf_counter() - start
+    return elapsed, json.dumps(result, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分片并行分析基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=20, help='推文重复份数（模拟多周归档）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='进程数列表')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='每个分片的推文数')
+    args = parser.parse_args()
+
+    tweets = list(iter_tweets(args.data)) * args.copies
+    metadata = dict(load_metadata(args.data), total_tweets=len(tweets))
+
+    stages = [
+        ('推文分析', lambda workers: analyze_tweets(
+            args.data, tweets=tweets, metadata=metadata, workers=workers, shard_size=args.shard_size)),
+        ('PK 产品提取', lambda workers: extract_all_products_from_raw_data(
+            args.data, tweets=tweets, metadata=metadata, workers=workers, shard_size=args.shard_size)),
+    ]
+
+    print("\n" + "=" * 60)
+    print(f"📊 分片并行分析基准（{len(tweets)} 条推文，CPU {os.cpu_count()} 核，每片 {args.shard_size} 条）")
+    print("=" * 60)
+
+    all_match = True
+    for name, run in stages:
+        baseline_time, baseline = timed(lambda: run(1))
+        print(f"{name}:")
+        print(f"   1 进程: {baseline_time:7.3f}s")
+        for workers in args.workers:
+            if workers <= 1:
+                continue
+            elapsed, output = timed(lambda: run(workers))
+            match = output == baseline
+            all_match = all_match and match
+            print(f"   {workers} 进程: {elapsed:7.3f}s  加速 {baseline_time / elapsed:.2f}x  "
+                  f"输出一致: {'✅' if match else '❌'}")
+
+    print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
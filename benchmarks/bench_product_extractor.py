@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产品提取基准测试
+对比旧实现（每次调用拼接模式并重新搜索信号词）与预编译模式库 + 信号位置复用的新实现，
+并校验两者在周数据的含信号推文上提取结果完全一致
+
+用法:
+    python3 benchmarks/bench_product_extractor.py [周目录或数据文件] --copies 10 --repeat 3
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from core.product_extractor import ProductExtractor
+from core.raw_data_io import iter_tweets
+from core.signal_detector import SignalDetector
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+class LegacyProductExtractor(ProductExtractor):
+    """旧实现：各策略每次调用都拼接模式字符串并重新搜索信号词"""
+
+    def extract_products_from_signaled_tweet(self, tweet, signals):
+        text = tweet.get('text', '')
+        products = []
+
+        for signal_info in signals:
+            signal = signal_info['signal']
+            category = signal_info['category']
+
+            # 根据信号类别选择提取策略
+            if category in ['launch', 'announcement']:
+                candidates = self._extract_near_signal(text, signal)
+
+            elif category == 'new':
+                candidates = self._extract_after_new(text, signal)
+
+            elif category == 'comparison':
+                candidates = self._extract_comparison_products(text, signal)
+
+            elif category in ['testing', 'availability']:
+                candidates = self._extract_action_target(text, signal)
+
+            else:
+                # 通用提取：信号词附近的大写词组
+                candidates = self._extract_capitalized_near(text, signal)
+
+            # 记录候选产品
+            for name in candidates:
+                # 过滤排除词
+                if name in self.exclude_terms:
+                    continue
+
+                # 过滤太短的词
+                if len(name) < 2:
+                    continue
+
+                products.append({
+                    'product_name': name.strip(),
+                    'tweet_id': tweet.get('id', ''),
+                    'tweet_text': text,
+                    'author': tweet.get('author_id', ''),
+                    'signal_category': category,
+                    'signal_word': signal,
+                    'confidence': self._calculate_initial_confidence(category, name),
+                })
+
+        return products
+
+    def _extract_near_signal(self, text, signal):
+        pattern = re.escape(signal)
+        match = re.search(pattern, text, re.IGNORECASE)
+
+        if not match:
+            return []
+
+        signal_pos = match.start()
+        products = []
+
+        # 策略1: 信号词之后的词组
+        after_text = text[signal_pos + len(signal):].strip()
+        # 匹配大写开头的词组，直到遇到特定词或标点
+        after_match = re.match(
+            r'^[,\s]*([A-Z][A-Za-z0-9\s\.\-]+?)(?:\s+(?:is|has|can|will|for|with|by|and|or|,|\.|!|\?|:|;))',
+            after_text
+        )
+
+        # 策略2: 信号词之前的词组
+        before_text = text[:signal_pos].strip()
+        before_match = re.search(r'([A-Z][A-Za-z0-9\s\.\-]+?)\s*$', before_text)
+
+        if after_match:
+            products.append(after_match.group(1).strip())
+        if before_match:
+            products.append(before_match.group(1).strip())
+
+        return products
+
+    def _extract_after_new(self, text, signal='new'):
+        pattern = rf'\b{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:is|has|can|model|tool|AI|from|by|,|\.|!|\?))'
+        matches = re.finditer(pattern, text, re.IGNORECASE)
+
+        products = []
+        for match in matches:
+            product_phrase = match.group(1).strip()
+
+            # 提取首个大写词（可能就是产品名）
+            first_word_match = re.match(r'^([A-Z][A-Za-z0-9\-\.]+)', product_phrase)
+            if first_word_match:
+                products.append(first_word_match.group(1))
+
+            # 如果是多个词，也保留完整短语
+            if len(product_phrase.split()) > 1:
+                products.append(product_phrase)
+
+        return products
+
+    def _extract_comparison_products(self, text, signal):
+        products = []
+
+        if signal.lower() == 'vs':
+            # "X vs Y" 模式
+            pattern = r'([A-Z][A-Za-z0-9\s\-\.]+?)\s+vs\.?\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                products.extend([match.group(1).strip(), match.group(2).strip()])
+
+        elif 'better than' in signal.lower() or 'beats' in signal.lower():
+            # "better than X" 模式
+            pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                products.append(match.group(1).strip())
+
+        elif 'alternative to' in signal.lower() or 'competitor to' in signal.lower():
+            # "alternative to X" 模式
+            pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                products.append(match.group(1).strip())
+
+        return products
+
+    def _extract_action_target(self, text, signal):
+        pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:and|or|,|\.|!|\?|:|;)|$)'
+        match = re.search(pattern, text, re.IGNORECASE)
+
+        if match:
+            return [match.group(1).strip()]
+
+        return []
+
+    def _extract_capitalized_near(self, text, signal, window=100):
+        match = re.search(re.escape(signal), text, re.IGNORECASE)
+        if not match:
+            return []
+
+        pos = match.start()
+        start = max(0, pos - window)
+        end = min(len(text), pos + len(signal) + window)
+        context = text[start:end]
+
+        # 提取所有大写开头的词组
+        pattern = r'\b([A-Z][A-Za-z0-9\-\.]+(?:\s+[A-Z][A-Za-z0-9\-\.]+)*)\b'
+        matches = re.finditer(pattern, context)
+
+        products = []
+        for match in matches:
+            product = match.group(1).strip()
+            if product and len(product) > 1:
+                products.append(product)
+
+        return products
+
+def run(extractor, batch):
+    return [extractor.extract_products_from_signaled_tweet(tweet, signals) for tweet, signals in batch]
+
+
+def best_of(func, repeat):
+    """运行 repeat 次，返回 (最短耗时, 最后一次结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='产品提取基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=10, help='含信号推文重复份数（模拟大批量）')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    detector = SignalDetector()
+    signaled = []
+    for tweet in iter_tweets(args.data):
+        signals = detector.detect_signals(tweet.get('text', ''))
+        if signals:
+            signaled.append((tweet, signals))
+    batch = signaled * args.copies
+
+    legacy = LegacyProductExtractor()
+    extractor = ProductExtractor()
+
+    legacy_time, legacy_result = best_of(lambda: run(legacy, batch), args.repeat)
+    new_time, new_result = best_of(lambda: run(extractor, batch), args.repeat)
+
+    match = legacy_result == new_result
+    candidates = sum(len(r) for r in new_result)
+
+    print("\n" + "=" * 60)
+    print("📊 产品提取基准")
+    print("=" * 60)
+    print(f"含信号推文: {len(signaled)} 条 × {args.copies} = {len(batch)} 条，候选产品 {candidates} 个")
+    print(f"旧实现: {legacy_time:.3f}s ({len(batch) / legacy_time:,.0f} 条/秒)")
+    print(f"新实现: {new_time:.3f}s ({len(batch) / new_time:,.0f} 条/秒)")
+    print(f"加速: {legacy_time / new_time:.2f}x  输出一致: {'✅' if match else '❌'}")
+    print("=" * 60)
+
+    if not match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
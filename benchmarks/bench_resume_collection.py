@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集重试与断点续跑基准测试
+使用本地假 API 注入暂时性失败（503）和进程中断：
+- 完整运行：暂时性失败（发生在翻页中途）全部由重试恢复，没有KOL丢失，失败尝试已发出的调用计入总数
+- 中断 + 续跑：推文流、API 调用总数和每个KOL的采集深度统计与完整运行一致，
+  检查点中已完成的KOL不再请求（对比节省的 API 调用）
+
+用法:
+    python3 benchmarks/bench_resume_collection.py --kol-count 200 --crash-after 120 --failure-rate 0.1 --failure-page 1
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'twitter_monitor'))
+
+from core import data_collector
+from core.collection_checkpoint import CollectionCheckpoint
+from core.data_collector import KOLWeeklyDataCollector
+from core.fake_twitter_api import FakeTwitterCollector, SimulatedCrash
+from core.raw_data_io import RawDataWriter, iter_tweets, TWEETS_FILE
+
+NOW = datetime(2025, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+# 基准中把退避缩短到毫秒级
+FAST_RETRY = {'max_retries': 3, 'retry_base_delay': 0.001, 'retry_max_delay': 0.01}
+
+
+class FrozenDatetime(datetime):
+    """采集窗口以 datetime.now() 为终点，这里固定为模拟时间"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW.replace(tzinfo=None)
+
+
+def run(staging_dir, fake_api, kol_count, concurrency, resume=False):
+    """按 collect_data.collect 的方式运行一次采集（写入暂存推文流并记检查点）"""
+    params = {'kol_count': kol_count, 'days': 7, 'incremental': False}
+    checkpoint = CollectionCheckpoint(staging_dir, params)
+    if resume:
+        assert checkpoint.load(), '检查点读取失败'
+        checkpoint.truncate_stream(os.path.join(staging_dir, TWEETS_FILE))
+
+    collector = KOLWeeklyDataCollector(collector=fake_api)
+    writer = RawDataWriter(staging_dir, append=resume)
+    try:
+        with mock.patch.object(data_collector, 'datetime', FrozenDatetime), \
+                mock.patch.dict(data_collector.DATA_COLLECTION, FAST_RETRY):
+            data = collector.collect_weekly_tweets(
+                days=7, kol_count=kol_count, concurrency=concurrency, writer=writer, checkpoint=checkpoint
+            )
+    finally:
+        writer.close()
+    return data, checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description='采集重试与断点续跑基准测试')
+    parser.add_argument('--kol-count', type=int, default=200, help='KOL数量')
+    parser.add_argument('--concurrency', type=int, default=4, help='并发采集的KOL数')
+    parser.add_argument('--crash-after', type=int, default=120, help='成功采集多少个KOL后模拟中断')
+    parser.add_argument('--failure-rate', type=float, default=0.1, help='返回暂时性失败的KOL比例')
+    parser.add_argument('--failure-page', type=int, default=1, help='暂时性失败发生在第几页（从 0 开始）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 完整运行（有暂时性失败，无中断）
+        full_api = FakeTwitterCollector(latency=0, now=NOW, failure_rate=args.failure_rate,
+                                        failure_page=args.failure_page)
+        start = time.perf_counter()
+        full, _ = run(os.path.join(tmp_dir, 'full'), full_api, args.kol_count, args.concurrency)
+        full_time = time.perf_counter() - start
+        full_ids = [t['id'] for t in iter_tweets(os.path.join(tmp_dir, 'full', TWEETS_FILE))]
+
+        # 中断的运行：推文流末尾再写半行，模拟中断时写了一半的KOL
+        staging_dir = os.path.join(tmp_dir, 'resume')
+        crash_api = FakeTwitterCollector(latency=0, now=NOW, failure_rate=args.failure_rate,
+                                         failure_page=args.failure_page, crash_after=args.crash_after)
+        try:
+            run(staging_dir, crash_api, args.kol_count, args.concurrency)
+            crashed = False
+        except SimulatedCrash:
+            crashed = True
+        with open(os.path.join(staging_dir, TWEETS_FILE), 'ab') as f:
+            f.write(b'{"id": "torn-write", "te')
+
+        checkpoint = CollectionCheckpoint(staging_dir, {'kol_count': args.kol_count, 'days': 7, 'incremental': False})
+        checkpoint.load()
+        done_before = dict(checkpoint.kols)
+
+        # 续跑
+        resume_api = FakeTwitterCollector(latency=0, now=NOW, failure_rate=args.failure_rate,
+                                          failure_page=args.failure_page)
+        resumed, _ = run(staging_dir, resume_api, args.kol_count, args.concurrency, resume=True)
+        resumed_ids = [t['id'] for t in iter_tweets(os.path.join(staging_dir, TWEETS_FILE))]
+
+    refetched = set(resume_api._attempts) & set(done_before)
+    reused_calls = sum(entry['api_calls'] for entry in done_before.values())
+    full_usage = full['metadata']['api_usage']
+
+    print("\n" + "=" * 60)
+    print("📊 采集重试与断点续跑基准")
+    print("=" * 60)
+    print(f"KOL数量: {args.kol_count}, 并发: {args.concurrency}, 暂时性失败比例: {args.failure_rate:.0%}")
+    print(f"完整运行: {len(full_ids)} 条推文, {full_usage['api_calls']} 次API调用, "
+          f"重试 {full_usage['retries']} 次, {full_time:.2f}s")
+    print(f"中断运行: 第 {args.crash_after} 个KOL后中断, 检查点记录 {len(done_before)} 个KOL已完成")
+    print(f"续跑: 请求 {len(resume_api._attempts)} 个KOL, 假API调用 {resume_api.api_calls} 次, "
+          f"复用检查点 {reused_calls} 次调用")
+    print(f"续跑元数据: {resumed['metadata'].get('resume')}")
+    print("=" * 60)
+
+    checks = [
+        ('暂时性失败全部由重试恢复', full_usage['retries'] == full_api.failures and 'failed_kols' not in full['metadata']),
+        ('API调用数包含失败尝试已发出的调用', full_usage['api_calls'] == full_api.api_calls),
+        ('中断在采集中途发生', crashed and 0 < len(done_before) < args.kol_count),
+        ('已完成的KOL没有重复请求', not refetched),
+        ('续跑推文流与完整运行逐条一致', resumed_ids == full_ids),
+        ('续跑元数据推文数与完整运行一致', resumed['metadata']['total_tweets'] == full['metadata']['total_tweets']),
+        ('API调用数（含复用）与完整运行一致',
+         resumed['metadata']['api_usage']['api_calls'] == full_usage['api_calls']),
+        ('KOL分布与完整运行一致',
+         resumed['metadata']['kol_tweet_distribution'] == full['metadata']['kol_tweet_distribution']),
+        ('采集深度统计（含复用的KOL）与完整运行一致',
+         resumed['metadata']['fetch_plan'] == full['metadata']['fetch_plan']),
+    ]
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
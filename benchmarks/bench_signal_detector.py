@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+信号检测基准测试
+对比逐个信号词 str.find 的旧实现与 Aho–Corasick 单次扫描实现的耗时，
+并校验两者在周数据上的 detect_signals / get_signal_statistics 输出完全一致
+
+用法:
+    python3 benchmarks/bench_signal_detector.py [周目录或数据文件] --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from config.config import RELEASE_SIGNALS
+from core.raw_data_io import iter_tweets
+from core.signal_detector import SignalDetector
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+class LegacySignalDetector:
+    """旧实现：每个信号词对全文做一次 str.find"""
+
+    def __init__(self):
+        self.signals = RELEASE_SIGNALS
+
+    def detect_signals(self, tweet_text):
+        text_lower = tweet_text.lower()
+        detected = []
+
+        for category, signal_list in self.signals.items():
+            for signal in signal_list:
+                pos = text_lower.find(signal.lower())
+                if pos != -1:
+                    detected.append({
+                        'category': category,
+                        'signal': signal,
+                        'position': pos,
+                    })
+
+        return detected
+
+    def get_signal_statistics(self, tweets):
+        signal_counts = {}
+        category_counts = {}
+
+        for tweet in tweets:
+            signals = self.detect_signals(tweet.get('text', ''))
+            for sig in signals:
+                signal_counts[sig['signal']] = signal_counts.get(sig['signal'], 0) + 1
+                category_counts[sig['category']] = category_counts.get(sig['category'], 0) + 1
+
+        return {
+            'signal_counts': dict(sorted(signal_counts.items(), key=lambda x: x[1], reverse=True)),
+            'category_counts': category_counts,
+            'total_signaled_tweets': len([t for t in tweets if self.detect_signals(t.get('text', ''))]),
+        }
+
+
+def best_of(func, repeat):
+    """运行 repeat 次，返回 (最短耗时, 最后一次结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='信号检测基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    tweets = list(iter_tweets(args.data))
+    texts = [t.get('text', '') for t in tweets]
+
+    legacy = LegacySignalDetector()
+    detector = SignalDetector()
+
+    legacy_time, legacy_signals = best_of(lambda: [legacy.detect_signals(t) for t in texts], args.repeat)
+    new_time, new_signals = best_of(lambda: [detector.detect_signals(t) for t in texts], args.repeat)
+
+    legacy_stats_time, legacy_stats = best_of(lambda: legacy.get_signal_statistics(tweets), args.repeat)
+    new_stats_time, new_stats = best_of(lambda: detector.get_signal_statistics(tweets), args.repeat)
+
+    signals_match = legacy_signals == new_signals
+    stats_match = legacy_stats == new_stats
+    total_hits = sum(len(detector.find_signal_hits(t)) for t in texts)
+    boundary_hits = sum(len(detector.detect_signals(t, word_boundary=True)) for t in texts)
+
+    print("\n" + "=" * 60)
+    print("📊 信号检测基准")
+    print("=" * 60)
+    print(f"推文数: {len(tweets)}，信号词数: {sum(len(v) for v in RELEASE_SIGNALS.values())}")
+    print(f"detect_signals:        旧 {legacy_time:.3f}s  新 {new_time:.3f}s  "
+          f"加速 {legacy_time / new_time:.1f}x  输出一致: {'✅' if signals_match else '❌'}")
+    print(f"get_signal_statistics: 旧 {legacy_stats_time:.3f}s  新 {new_stats_time:.3f}s  "
+          f"加速 {legacy_stats_time / new_stats_time:.1f}x  输出一致: {'✅' if stats_match else '❌'}")
+    print(f"全部出现位置: {total_hits} 处；单词边界模式下的信号: {boundary_hits} 个")
+    print("=" * 60)
+
+    if not (signals_match and stats_match):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文时间解析基准测试
+对一整周推文的 created_at 对比 dateutil.parser.parse（_filter_by_date 原来的做法）、
+datetime.strptime 与 core/timeutil.py 的固定格式解析，并校验三者得到的 epoch 秒和 UTC 日期完全一致
+
+用法:
+    python3 benchmarks/bench_timeutil.py [周目录或数据文件] --copies 5 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from core.raw_data_io import iter_tweets
+from core.timeutil import day_key, parse_twitter_time
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+CREATED_AT_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+def parse_dateutil(values):
+    from dateutil import parser
+    return [int(parser.parse(value).timestamp()) for value in values]
+
+
+def parse_strptime(values):
+    return [int(datetime.strptime(value, CREATED_AT_FORMAT).timestamp()) for value in values]
+
+
+def parse_fixed(values):
+    return [parse_twitter_time(value) for value in values]
+
+
+def days_datetime(timestamps):
+    return [datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d') for ts in timestamps]
+
+
+def days_fixed(timestamps):
+    return [day_key(ts) for ts in timestamps]
+
+
+def best_of(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文时间解析基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=5, help='推文重复份数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    values = [tweet.get('created_at') or tweet.get('createdAt') for tweet in iter_tweets(args.data)]
+    values = [value for value in values if value] * args.copies
+
+    try:
+        import dateutil  # noqa: F401
+        has_dateutil = True
+    except ImportError:
+        has_dateutil = False
+
+    strptime_time, strptime_result = best_of(lambda: parse_strptime(values), args.repeat)
+    fixed_time, fixed_result = best_of(lambda: parse_fixed(values), args.repeat)
+    match = fixed_result == strptime_result
+    if has_dateutil:
+        dateutil_time, dateutil_result = best_of(lambda: parse_dateutil(values), args.repeat)
+        match = match and fixed_result == dateutil_result
+
+    datetime_days_time, datetime_days = best_of(lambda: days_datetime(fixed_result), args.repeat)
+    fixed_days_time, fixed_days = best_of(lambda: days_fixed(fixed_result), args.repeat)
+    days_match = datetime_days == fixed_days
+
+    print("\n" + "=" * 60)
+    print(f"📊 推文时间解析基准（{len(values)} 条 created_at）")
+    print("=" * 60)
+    if has_dateutil:
+        print(f"dateutil.parser.parse: {dateutil_time:.3f}s ({len(values) / dateutil_time:,.0f} 条/秒)")
+    else:
+        print("dateutil.parser.parse: 未安装，跳过")
+    print(f"datetime.strptime:     {strptime_time:.3f}s ({len(values) / strptime_time:,.0f} 条/秒)")
+    print(f"固定格式解析:          {fixed_time:.3f}s ({len(values) / fixed_time:,.0f} 条/秒)")
+    if has_dateutil:
+        print(f"加速: 对 dateutil {dateutil_time / fixed_time:.1f}x，对 strptime {strptime_time / fixed_time:.1f}x  "
+              f"结果一致: {'✅' if match else '❌'}")
+    else:
+        print(f"加速: 对 strptime {strptime_time / fixed_time:.1f}x  结果一致: {'✅' if match else '❌'}")
+    print(f"按天分桶: datetime {datetime_days_time:.3f}s → day_key {fixed_days_time:.3f}s  "
+          f"加速 {datetime_days_time / fixed_days_time:.1f}x  结果一致: {'✅' if days_match else '❌'}")
+    print("=" * 60)
+
+    if not (match and days_match):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文特征提取基准测试
+对比旧的逐产品计算（每个产品重新做情感/新品判断，话题循环每个关键词重新小写化）
+与一次小写化的融合特征提取，并校验两者产出的逐推文特征完全一致
+
+用法:
+    python3 benchmarks/bench_tweet_features.py [周目录或数据文件] --copies 10 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from core.product_patterns import get_default_engine
+from core.raw_data_io import iter_tweets
+from core.tweet_features import TOPIC_KEYWORDS, TweetFeatureExtractor, get_sentiment, is_new_product_mention
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+def legacy_features(texts):
+    """旧实现：analyze_tweets 原来的逐推文循环"""
+    engine = get_default_engine()
+    records = []
+    for text in texts:
+        mentions = []
+        new_mentions = []
+        for product in engine.extract(text):
+            mentions.append((product, get_sentiment(text), is_new_product_mention(text)))
+            if is_new_product_mention(text):
+                new_mentions.append(product)
+        topics = tuple(keyword for keyword in TOPIC_KEYWORDS if keyword.lower() in text.lower())
+        records.append((mentions, new_mentions, topics))
+    return records
+
+
+def fused_features(texts):
+    """新实现：每条推文一次特征提取"""
+    extractor = TweetFeatureExtractor()
+    records = []
+    for text in texts:
+        features = extractor.extract(text)
+        mentions = [(product, features.sentiment, features.is_new) for product in features.products]
+        new_mentions = list(features.products) if features.is_new else []
+        records.append((mentions, new_mentions, features.topics))
+    return records
+
+
+def products_only(texts):
+    """只做产品识别（两种实现共同的部分）"""
+    engine = get_default_engine()
+    return [engine.extract(text) for text in texts]
+
+
+def best_of(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文特征提取基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=10, help='推文重复份数（模拟大批量）')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    texts = [tweet.get('text', '') for tweet in iter_tweets(args.data)] * args.copies
+
+    legacy_time, legacy_result = best_of(lambda: legacy_features(texts), args.repeat)
+    fused_time, fused_result = best_of(lambda: fused_features(texts), args.repeat)
+    products_time, _ = best_of(lambda: products_only(texts), args.repeat)
+
+    match = legacy_result == fused_result
+
+    print("\n" + "=" * 60)
+    print("📊 推文特征提取基准")
+    print("=" * 60)
+    print(f"推文: {len(texts)} 条")
+    print(f"旧实现: {legacy_time:.3f}s ({len(texts) / legacy_time:,.0f} 条/秒)")
+    print(f"融合实现: {fused_time:.3f}s ({len(texts) / fused_time:,.0f} 条/秒)")
+    print(f"其中产品识别: {products_time:.3f}s；情感/新品/话题部分 "
+          f"{legacy_time - products_time:.3f}s → {fused_time - products_time:.3f}s")
+    print(f"加速: {legacy_time / fused_time:.2f}x  输出一致: {'✅' if match else '❌'}")
+    print("=" * 60)
+
+    if not match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文索引基准测试
+在临时目录中把周数据复制多份写成一个推文流（写入时顺带建索引），
+对比"全量扫描推文流再过滤"与"按索引偏移读取"回答按 KOL / 日期 / 产品的查询，并校验结果一致；
+最后校验只更新修改时间时索引仍可用、原地改写同样长度的内容后索引判为过期
+
+用法:
+    python3 benchmarks/bench_tweet_index.py [周目录或数据文件] --copies 10 --queries 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from core.product_patterns import get_default_engine
+from core.raw_data_io import iter_tweets, load_metadata, resolve_raw_data, save_raw_data
+from core.timeutil import day_key, tweet_timestamp
+from core.tweet_index import (FIELD_DAY, FIELD_KOL, FIELD_PRODUCT, TweetIndex, TweetIndexBuilder,
+                              tweet_kol)
+
+
+DEFAULT_WEEK = os.path.join(ROOT, 'weekly_reports', 'week_2025-10-10_to_2025-10-17')
+
+
+def scan(data_dir, field, key):
+    """旧做法：读取并解析全部推文后过滤"""
+    engine = get_default_engine()
+    matched = []
+    for tweet in iter_tweets(data_dir):
+        if field == FIELD_KOL:
+            hit = tweet_kol(tweet) == key
+        elif field == FIELD_DAY:
+            timestamp = tweet_timestamp(tweet)
+            hit = timestamp is not None and day_key(timestamp) == key
+        else:
+            hit = key in engine.extract(tweet.get('text', ''))
+        if hit:
+            matched.append(tweet)
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推文索引基准测试')
+    parser.add_argument('data', nargs='?', default=DEFAULT_WEEK, help='周目录或数据文件')
+    parser.add_argument('--copies', type=int, default=10, help='周数据重复份数')
+    parser.add_argument('--queries', type=int, default=20, help='每个字段查询的键数（取推文数最多的键）')
+    args = parser.parse_args()
+
+    tweets = list(iter_tweets(args.data)) * args.copies
+
+    with tempfile.TemporaryDirectory() as week_dir:
+        plain_dir = os.path.join(week_dir, 'plain')
+        indexed_dir = os.path.join(week_dir, 'indexed')
+        data = {'tweets': tweets, 'metadata': load_metadata(args.data)}
+
+        start = time.perf_counter()
+        save_raw_data(data, plain_dir)
+        plain_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_raw_data(data, indexed_dir, index_builder=TweetIndexBuilder())
+        indexed_time = time.perf_counter() - start
+
+        index = TweetIndex.open(indexed_dir)
+
+        print("\n" + "=" * 60)
+        print(f"📊 推文索引基准（{len(tweets)} 条推文）")
+        print("=" * 60)
+        print(f"写入推文流: {plain_time:.3f}s；写入并建索引: {indexed_time:.3f}s "
+              f"(+{indexed_time - plain_time:.3f}s)")
+
+        all_match = True
+        with index:
+            for field in (FIELD_KOL, FIELD_DAY, FIELD_PRODUCT):
+                keys = sorted(index.keys(field), key=lambda key: index.count(field, key), reverse=True)
+                keys = keys[:args.queries]
+
+                # 全量扫描较慢，只对前 3 个键计时并校验，其余键只统计索引查询耗时
+                scan_keys = keys[:3]
+                start = time.perf_counter()
+                scanned = [scan(indexed_dir, field, key) for key in scan_keys]
+                scan_time = (time.perf_counter() - start) / max(len(scan_keys), 1)
+
+                start = time.perf_counter()
+                looked_up = [index.tweets(field, key) for key in keys]
+                index_time = (time.perf_counter() - start) / max(len(keys), 1)
+
+                match = scanned == looked_up[:len(scan_keys)]
+                all_match = all_match and match
+                hits = sum(len(result) for result in looked_up) / max(len(keys), 1)
+                print(f"{field:8s}: 平均命中 {hits:7.1f} 条  扫描 {scan_time * 1000:8.1f}ms/次 → "
+                      f"索引 {index_time * 1000:6.2f}ms/次  加速 {scan_time / index_time:6.1f}x  "
+                      f"结果一致: {'✅' if match else '❌'}")
+
+        # 过期判断：touch 后索引仍有效；同样长度的改写（首行推文ID末位换一个数字）后失效
+        _, tweets_path, _ = resolve_raw_data(indexed_dir)
+        os.utime(tweets_path)
+        touched = TweetIndex.open(indexed_dir)
+        touch_ok = touched is not None
+        if touched is not None:
+            touched.close()
+
+        with open(tweets_path, 'r+b') as f:
+            line = f.readline()
+            tweet_id = str(tweets[0]['id']).encode('utf-8')
+            pos = line.index(tweet_id) + len(tweet_id) - 1
+            f.seek(pos)
+            f.write(b'1' if line[pos:pos + 1] != b'1' else b'2')
+        stale_ok = TweetIndex.open(indexed_dir) is None
+        all_match = all_match and touch_ok and stale_ok
+
+        print(f"touch 后索引仍有效: {'✅' if touch_ok else '❌'}  "
+              f"同长度改写后索引过期: {'✅' if stale_ok else '❌'}")
+        print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑推文格式基准测试
+用合成周数据（原始格式，与采集器旧输出一致）和 scripts/compact_raw_data.py 转换后的紧凑格式对比：
+推文流大小、逐条读取耗时、全部载入后保留的内存，并校验推文分析和 PK 产品提取的输出一致
+
+用法:
+    python3 benchmarks/bench_tweet_schema.py --tweets 100000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+sys.path.insert(2, os.path.join(ROOT, 'benchmarks'))
+
+from analyze_tweets import aggregate_tweets
+from compact_raw_data import convert_week
+from core.product_patterns import KIND_PRODUCT
+from core.raw_data_io import METADATA_FILE, PAYLOAD_FILE, TWEETS_FILE, iter_tweets
+from core.tweet_features import TweetFeatureExtractor
+from integrate_product_knowledge_v3 import aggregate_product_mentions
+from synthetic import DEFAULT_SEED, write_week
+
+
+def file_mb(week_dir, name):
+    path = os.path.join(week_dir, name)
+    return os.path.getsize(path) / 1e6 if os.path.exists(path) else 0.0
+
+
+def parse_seconds(week_dir, repeat=3):
+    """逐条读取整周推文的耗时（取最好一次）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in iter_tweets(week_dir):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def retained_mb(week_dir):
+    """全部载入后保留的内存（MB）"""
+    tracemalloc.start()
+    tweets = list(iter_tweets(week_dir))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tweets
+    return current / 1024 / 1024
+
+
+def pipeline_digest(week_dir):
+    """推文分析和 PK 产品提取输出的摘要"""
+    tweets = list(iter_tweets(week_dir))
+    analysis = aggregate_tweets(tweets, TweetFeatureExtractor())
+    pk = aggregate_product_mentions(tweets, TweetFeatureExtractor(product_kinds=(KIND_PRODUCT,)))
+    output = [
+        {product: [analysis['tweets'][i].to_mention() for i in indices]
+         for product, indices in analysis['product_mentions'].items()},
+        {product: [pk['tweets'][i].to_mention() for i in indices]
+         for product, indices in pk['product_mentions'].items()},
+    ]
+    return hashlib.sha256(json.dumps(output, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='紧凑推文格式基准测试')
+    parser.add_argument('--tweets', type=int, default=100000, help='合成推文数')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_dir = os.path.join(tmp_dir, 'raw')
+        compact_dir = os.path.join(tmp_dir, 'compact')
+        write_week(raw_dir, args.tweets, args.seed)
+        shutil.copytree(raw_dir, compact_dir)
+
+        start = time.perf_counter()
+        convert_week(compact_dir, cold=True)
+        convert_seconds = time.perf_counter() - start
+
+        results = {}
+        for label, week_dir in (('原始格式', raw_dir), ('紧凑格式', compact_dir)):
+            results[label] = {
+                'tweets_mb': file_mb(week_dir, TWEETS_FILE),
+                'metadata_mb': file_mb(week_dir, METADATA_FILE),
+                'parse': parse_seconds(week_dir),
+                'retained': retained_mb(week_dir),
+                'digest': pipeline_digest(week_dir),
+            }
+        payload_mb = file_mb(compact_dir, PAYLOAD_FILE)
+
+    raw, compact = results['原始格式'], results['紧凑格式']
+
+    print("\n" + "=" * 60)
+    print(f"📊 紧凑推文格式基准（{args.tweets:,} 条合成推文）")
+    print("=" * 60)
+    for label, result in results.items():
+        print(f"{label}: 推文流 {result['tweets_mb']:7.1f} MB  元数据 {result['metadata_mb']:5.2f} MB  "
+              f"读取 {result['parse']:6.2f}s  保留内存 {result['retained']:7.1f} MB")
+    print(f"推文流缩小 {raw['tweets_mb'] / compact['tweets_mb']:.1f}x, 读取加速 {raw['parse'] / compact['parse']:.1f}x, "
+          f"内存减少 {raw['retained'] / compact['retained']:.1f}x")
+    print(f"转换耗时 {convert_seconds:.2f}s, 冷文件 {payload_mb:.1f} MB（gzip）")
+    print("=" * 60)
+
+    match = raw['digest'] == compact['digest']
+    print(f"{'✅' if match else '❌'} 推文分析和 PK 产品提取输出一致")
+
+    if not match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
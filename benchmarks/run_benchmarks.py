@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试套件
+在 benchmarks/synthetic.py 按固定种子生成的合成语料上，逐个规模测量流水线热点：
+- signal_detector: SignalDetector.find_tweets_with_signals
+- product_extractor: 含信号推文的 ProductExtractor 候选提取
+- analyze_tweets: 推文分析（特征提取 + 统计报告）
+- v3_extraction / v3_classification: Product Knowledge v3 产品提取与知识库分类（合成知识库）
+- merge_similar_products: 候选产品的相似名合并
+- archive_integration: 多周原始数据集成 + 分片归档写入
+
+每项取 --repeat 次中的最短耗时，并记录输出摘要（SHA-256 前 16 位）。结果保存为
+benchmarks/results/<提交>.json（工作区有未提交修改时加 -dirty），--compare 与之前保存的结果对比
+耗时变化，并标出输出摘要不一致（行为变化）的项
+
+用法:
+    python3 benchmarks/run_benchmarks.py --sizes 1000 10000 100000
+    python3 benchmarks/run_benchmarks.py --only signal_detector analyze_tweets --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+sys.path.insert(1, os.path.join(ROOT, 'scripts'))
+
+from analyze_tweets import analyze_tweets
+from core.metrics import code_version
+from core.product_extractor import ProductExtractor
+from core.product_validator import ProductValidator
+from core.raw_data_io import save_raw_data
+from core.signal_detector import SignalDetector
+from core.tweet_archive import write_archive
+from integrate_all_raw_data import find_all_raw_data_files, integrate_all_raw_data
+from integrate_product_knowledge_v3 import build_product_engine, classify_products, extract_all_products_from_raw_data
+from product_knowledge_index import ProductKnowledgeIndex
+from synthetic import DEFAULT_SEED, DEFAULT_START, generate_week, new_product_count, product_vocabulary, write_week
+
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+RESULTS_VERSION = 1
+
+# 两次结果耗时变化超过该比例时标出
+REGRESSION_THRESHOLD = 0.10
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def digest(value):
+    return hashlib.sha256(
+        json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:16]
+
+
+def best_of(func, repeat):
+    """运行 repeat 次，返回 (最短耗时, 最后一次结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def synthetic_knowledge(vocabulary):
+    """合成知识库：已知产品各一条（带小写键，与 load_product_knowledge 的格式一致）"""
+    pk_dict = {}
+    for i, name in enumerate(vocabulary['known'], 1):
+        product = {'id': f"p{i:04d}", 'name': name, 'company': 'Synthetic', 'mention_count': i}
+        pk_dict[name] = product
+        pk_dict[name.lower()] = product
+    return pk_dict
+
+
+# ============ 基准项 ============
+# 每项接收 Corpus，返回 (被计时的函数, 处理条数, 结果 -> 用于摘要的可序列化值)
+
+class Corpus:
+    """一个规模的合成语料（推文、元数据、含信号推文和派生数据按需构建并缓存）"""
+
+    def __init__(self, size, seed, work_dir):
+        self.size = size
+        self.seed = seed
+        self.work_dir = work_dir
+        week = generate_week(size, seed)
+        self.tweets = week['tweets']
+        self.metadata = week['metadata']
+        self.vocabulary = product_vocabulary(seed, new_product_count(size))
+        self._cache = {}
+
+    def cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def data_file(self):
+        """同一语料写成的周目录（analyze_tweets 等需要数据文件路径）"""
+        return self.cached('data_file', lambda: write_week(
+            os.path.join(self.work_dir, f"week_{self.size}"), self.size, self.seed))
+
+    @property
+    def signaled(self):
+        return self.cached('signaled', lambda: SignalDetector().find_tweets_with_signals(self.tweets))
+
+    @property
+    def knowledge(self):
+        def build():
+            pk_dict = synthetic_knowledge(self.vocabulary)
+            return pk_dict, ProductKnowledgeIndex(list(pk_dict.values())), build_product_engine(pk_dict)
+        return self.cached('knowledge', build)
+
+    @property
+    def twitter_products(self):
+        return self.cached('twitter_products', lambda: quiet(
+            extract_all_products_from_raw_data, self.data_file, self.knowledge[2],
+            tweets=self.tweets, metadata=self.metadata))
+
+    @property
+    def candidates(self):
+        """去重后的候选产品（与流水线一致：合并前先按规范化名去重）"""
+        def build():
+            extractor = ProductExtractor()
+            candidates = []
+            for tweet, signals in self.signaled:
+                candidates.extend(extractor.extract_products_from_signaled_tweet(tweet, signals))
+            return [{'name': candidate['product_name'], 'confidence': candidate['confidence']}
+                    for candidate in extractor.deduplicate_candidates(candidates)]
+        return self.cached('candidates', build)
+
+
+def bench_signal_detector(corpus):
+    detector = SignalDetector()
+    return (lambda: detector.find_tweets_with_signals(corpus.tweets), corpus.size,
+            lambda result: [(tweet['id'], signals) for tweet, signals in result])
+
+
+def bench_product_extractor(corpus):
+    extractor = ProductExtractor()
+    signaled = corpus.signaled
+    return (lambda: [extractor.extract_products_from_signaled_tweet(tweet, signals) for tweet, signals in signaled],
+            len(signaled), lambda result: result)
+
+
+def bench_analyze_tweets(corpus):
+    return (lambda: quiet(analyze_tweets, corpus.data_file, tweets=corpus.tweets, metadata=corpus.metadata),
+            corpus.size, lambda result: result)
+
+
+def bench_v3_extraction(corpus):
+    engine = corpus.knowledge[2]
+    data_file = corpus.data_file
+    return (lambda: quiet(extract_all_products_from_raw_data, data_file, engine,
+                          tweets=corpus.tweets, metadata=corpus.metadata),
+            corpus.size, lambda result: result)
+
+
+def bench_v3_classification(corpus):
+    pk_dict, index, _ = corpus.knowledge
+    twitter_products = corpus.twitter_products
+    return (lambda: quiet(classify_products, twitter_products, pk_dict, index=index),
+            len(twitter_products), lambda result: result)
+
+
+def bench_merge_similar_products(corpus):
+    validator = ProductValidator(cache=False)
+    candidates = corpus.candidates
+    return (lambda: validator.merge_similar_products(candidates), len(candidates),
+            lambda result: [product['name'] for product in result])
+
+
+def bench_archive_integration(corpus, weeks=4):
+    """语料按 KOL 顺序切成 weeks 份写成周目录（相邻两周各有一半推文重叠，覆盖跨周去重）"""
+    source_dir = os.path.join(corpus.work_dir, f"archive_source_{corpus.size}")
+    if not os.path.exists(source_dir):
+        step = max(corpus.size // (weeks + 1), 1)
+        for k in range(weeks):
+            start = DEFAULT_START + timedelta(days=7 * k)
+            end = start + timedelta(days=7)
+            tweets = corpus.tweets[k * step:(k + 2) * step]
+            metadata = dict(corpus.metadata, total_tweets=len(tweets),
+                            collection_time=end.isoformat(),
+                            date_range={'start': f"{start:%Y-%m-%d}", 'end': f"{end:%Y-%m-%d}"})
+            save_raw_data({'tweets': tweets, 'metadata': metadata},
+                          os.path.join(source_dir, f"week_{start:%Y-%m-%d}_to_{end:%Y-%m-%d}"))
+    reports = quiet(find_all_raw_data_files, source_dir)
+    archive_dir = os.path.join(corpus.work_dir, f"archive_{corpus.size}")
+
+    def run():
+        integrated = quiet(integrate_all_raw_data, reports)
+        summary = {key: value for key, value in integrated.items() if key not in ('all_tweets', 'tweets_by_week')}
+        return write_archive(archive_dir, integrated['tweets_by_week'].items(), summary)
+
+    return run, corpus.size, lambda manifest: manifest
+
+
+BENCHMARKS = {
+    'signal_detector': bench_signal_detector,
+    'product_extractor': bench_product_extractor,
+    'analyze_tweets': bench_analyze_tweets,
+    'v3_extraction': bench_v3_extraction,
+    'v3_classification': bench_v3_classification,
+    'merge_similar_products': bench_merge_similar_products,
+    'archive_integration': bench_archive_integration,
+}
+
+
+# ============ 结果保存与对比 ============
+
+def git_dirty():
+    try:
+        result = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                capture_output=True, text=True, timeout=10, cwd=ROOT)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+def default_output():
+    version = code_version() or datetime.now().strftime('%Y%m%d-%H%M%S')
+    if git_dirty():
+        version += '-dirty'
+    return os.path.join(RESULTS_DIR, f"{version}.json")
+
+
+def compare(results, baseline):
+    """打印与基准结果的对比，返回是否所有共同项的输出摘要一致"""
+    previous = {(item['bench'], item['size']): item for item in baseline['results']}
+    all_match = True
+
+    print(f"\n📊 对比 {baseline.get('code_version')}（{baseline.get('created_at', '')[:19]}）:")
+    for item in results:
+        old = previous.get((item['bench'], item['size']))
+        if old is None:
+            continue
+        change = (item['seconds'] - old['seconds']) / old['seconds'] if old['seconds'] else 0.0
+        flag = '⚠️ ' if change > REGRESSION_THRESHOLD else '  '
+        match = item['digest'] == old['digest']
+        all_match = all_match and match
+        print(f"{flag}{item['bench']:<24} n={item['size']:>8}: {old['seconds']:8.3f}s → {item['seconds']:8.3f}s "
+              f"({change * 100:+.0f}%)  输出一致: {'✅' if match else '❌'}")
+    return all_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description='基准测试套件（合成语料）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='语料规模（推文数）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='只运行指定项')
+    parser.add_argument('--output', help='结果文件（默认 benchmarks/results/<提交>.json）')
+    parser.add_argument('--no-save', action='store_true', help='不保存结果')
+    parser.add_argument('--compare', help='与之前保存的结果文件对比')
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    results = []
+
+    print("\n" + "=" * 60)
+    print(f"📊 基准测试套件（种子 {args.seed}，取 {args.repeat} 次最短）")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            start = time.perf_counter()
+            corpus = Corpus(size, args.seed, work_dir)
+            print(f"\n语料 n={size}: 生成 {time.perf_counter() - start:.2f}s")
+
+            for name in names:
+                func, items, view = BENCHMARKS[name](corpus)
+                seconds, result = best_of(func, args.repeat)
+                item = {
+                    'bench': name,
+                    'size': size,
+                    'items': items,
+                    'seconds': round(seconds, 6),
+                    'items_per_second': round(items / seconds, 1) if seconds else None,
+                    'digest': digest(view(result)),
+                }
+                results.append(item)
+                print(f"   {name:<24} {seconds:8.3f}s  {items:>9} 条  "
+                      f"{item['items_per_second'] or 0:>12,.0f} 条/秒  [{item['digest']}]")
+
+    report = {
+        'version': RESULTS_VERSION,
+        'code_version': code_version(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': sys.platform,
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    if not args.no_save:
+        output = args.output or default_output()
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {output}")
+
+    all_match = True
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            all_match = compare(results, json.load(f))
+
+    print("=" * 60)
+
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成推文语料生成器
+按固定种子生成与采集结果（raw_data.json / raw_tweets.ndjson）字段一致的推文，规模可从 1k 到 1M：
+- KOL 按排名呈长尾分布，推文按 KOL 排名顺序排列（与采集器输出一致）
+- 约 46% 的推文提及 1~3 个产品（规则产品名、带版本号的模型名、公司、知识库外的新产品名），
+  约 12% 的推文包含发布/讨论信号词，语言分布、文本长度与真实周数据接近
+- 同一种子、同一参数生成的语料逐字节一致，可在不同提交之间比较基准结果
+
+用法:
+    python3 benchmarks/synthetic.py /tmp/synthetic_week --tweets 100000 --seed 42 [--format json]
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'twitter_monitor'))
+
+from config.config import RELEASE_SIGNALS
+from core.product_patterns import PRODUCT_NAMES
+from core.raw_data_io import RawDataWriter, save_raw_data
+
+
+DEFAULT_SEED = 42
+DEFAULT_START = datetime(2025, 10, 10)
+
+# 产品提及 / 信号词的插入概率（加上信号词后跟的产品名，识别到产品的推文约 46%，含信号的约 12%）
+PRODUCT_RATE = 0.28
+SIGNAL_RATE = 0.11
+LANGS = [('en', 0.72), ('ja', 0.15), ('zh', 0.04), ('zxx', 0.02), ('es', 0.04), ('fr', 0.03)]
+
+VERSIONED_PRODUCTS = [
+    'GPT-5', 'GPT-4o', 'GPT-5 mini', 'GPT-5 codex', 'Claude 4.5 Sonnet', 'Claude Opus', 'Claude 3.7 Sonnet',
+    'Gemini 2.5 Pro', 'Gemini 2.5 Flash', 'Gemini 3', 'Llama 4', 'Llama 3.1', 'Mistral 7', 'Qwen2.5',
+]
+COMPANIES = ['Google', 'OpenAI', 'Anthropic', 'Microsoft', 'Meta', 'Apple', 'Nvidia', 'xAI']
+
+EN_WORDS = (
+    'the this that with for and but just really think model agents team code build open source '
+    'people today week release update demo paper benchmark results working on data training latency '
+    'context window pricing api users product launch feature great pretty fast slow better worse '
+    'interesting thread here is why how what we they you our new best'
+).split()
+JA_WORDS = 'これは 本当に 新しい モデル 使って みた 性能 が 高い 発表 された 今日 の ニュース です 試して'.split()
+ZH_WORDS = '这个 模型 真的 很强 今天 发布 了 新的 功能 大家 可以 试试 效果 不错'.split()
+
+SIGNAL_PHRASES = [(category, phrase) for category, phrases in RELEASE_SIGNALS.items() for phrase in phrases]
+
+CONSONANTS = 'bcdfghjklmnprstvwxz'
+VOWELS = 'aeiouy'
+
+
+def new_product_names(rng, count):
+    """知识库外的新产品名（大写开头的造词，部分带 AI / Studio 等后缀）"""
+    names = []
+    for _ in range(count):
+        name = ''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.4:
+            name += rng.choice(CONSONANTS)
+        name = name.title()
+        if rng.random() < 0.3:
+            name += rng.choice([' AI', ' Studio', ' Pro', ' 2'])
+        names.append(name)
+    return names
+
+
+def new_product_count(n):
+    """语料中知识库外新产品名的数量（随语料规模增长，每 100 条推文约一个）"""
+    return max(200, n // 100)
+
+
+def product_vocabulary(seed=DEFAULT_SEED, new_products=200):
+    """
+    语料使用的产品词表
+
+    Returns:
+        dict: {'known': 规则产品名 + 带版本号的模型名, 'companies': 公司, 'new': 新产品名}
+    """
+    rng = random.Random(seed)
+    return {
+        'known': list(PRODUCT_NAMES) + VERSIONED_PRODUCTS,
+        'companies': list(COMPANIES),
+        'new': new_product_names(rng, new_products),
+    }
+
+
+def _kol_counts(rng, n, kol_count):
+    """按排名长尾分布把 n 条推文分配给 KOL（约 15% 的 KOL 本周无推文）"""
+    weights = [0.0 if rng.random() < 0.15 else 1.0 / (rank ** 0.6) for rank in range(1, kol_count + 1)]
+    if not any(weights):
+        weights[0] = 1.0
+    total = sum(weights)
+    counts = [int(n * w / total) for w in weights]
+    # 取整剩余的推文按权重依次补给头部 KOL
+    order = sorted(range(kol_count), key=lambda i: -weights[i])
+    for i in range(n - sum(counts)):
+        counts[order[i % len(order)]] += 1
+    return counts
+
+
+def _text(rng, lang, vocabulary):
+    """按句组织的推文文本：句首大写、带标点，产品名和信号词插入随机句子中"""
+    cjk = lang in ('ja', 'zh')
+    words = JA_WORDS if lang == 'ja' else ZH_WORDS if lang == 'zh' else EN_WORDS
+    sentences = [[rng.choice(words) for _ in range(rng.randint(4, 12))] for _ in range(rng.randint(1, 4))]
+
+    def insert(phrase):
+        sentence = rng.choice(sentences)
+        sentence.insert(rng.randint(0, len(sentence)), phrase)
+
+    if rng.random() < PRODUCT_RATE:
+        for _ in range(min(3, 1 + int(rng.expovariate(1.8)))):
+            r = rng.random()
+            pool = vocabulary['known'] if r < 0.7 else vocabulary['companies'] if r < 0.85 else vocabulary['new']
+            insert(rng.choice(pool))
+
+    if rng.random() < SIGNAL_RATE:
+        _, phrase = rng.choice(SIGNAL_PHRASES)
+        # 信号词后常跟新产品名（产品提取器的主要候选来源）
+        follow = rng.choice(vocabulary['new']) if rng.random() < 0.6 else rng.choice(vocabulary['known'])
+        insert(f"{phrase} {follow}")
+
+    if cjk:
+        text = ''.join(' '.join(s) if any(w.isascii() for w in s) else ''.join(s) + '。' for s in sentences)
+    else:
+        text = ' '.join(' '.join(s)[:1].upper() + ' '.join(s)[1:] + rng.choice('..!?') for s in sentences)
+
+    if rng.random() < 0.3:
+        text = f"@user{rng.randint(1, 5000)} {text}"
+    url = 'https://t.co/' + ''.join(rng.choice('abcdefghijkLMNOPQ0123456789') for _ in range(10))
+    if lang == 'zxx':
+        return url
+    if rng.random() < 0.4:
+        text += ' ' + url
+    return text
+
+
+def generate_tweets(n, seed=DEFAULT_SEED, start=DEFAULT_START, days=7, kol_count=300, vocabulary=None):
+    """
+    按 KOL 排名顺序逐条生成推文（生成器，内存占用与 n 无关）
+
+    Args:
+        n: 推文数
+        seed: 随机种子
+        start: 时间窗口起点
+        days: 时间窗口天数
+        kol_count: KOL 数
+        vocabulary: 产品词表（默认 product_vocabulary(seed, new_product_count(n))）
+    """
+    rng = random.Random(seed)
+    vocabulary = vocabulary or product_vocabulary(seed, new_product_count(n))
+    langs, lang_weights = zip(*LANGS)
+    window = days * 86400
+    next_id = 1978000000000000000 + seed * 10 ** 12
+
+    for rank, count in enumerate(_kol_counts(rng, n, kol_count), 1):
+        username = f"kol_{rank:04d}"
+        followers = int(2_000_000 / rank ** 0.8) + rng.randint(0, 5000)
+        verified = rank <= 100 or rng.random() < 0.5
+        score = round(10000 / rank ** 0.5, 2)
+
+        for _ in range(count):
+            next_id += rng.randint(1, 10 ** 6)
+            created = (start + timedelta(seconds=rng.randrange(window))).strftime('%a %b %d %H:%M:%S +0000 %Y')
+            lang = rng.choices(langs, lang_weights)[0]
+            likes = int(rng.lognormvariate(2.5, 1.6))
+            retweets = int(likes * rng.random() * 0.2)
+            replies = int(likes * rng.random() * 0.1)
+
+            yield {
+                'id': str(next_id),
+                'text': _text(rng, lang, vocabulary),
+                'created_at': created,
+                'createdAt': created,
+                'likeCount': likes,
+                'retweetCount': retweets,
+                'replyCount': replies,
+                'viewCount': likes * rng.randint(20, 80),
+                'lang': lang,
+                'public_metrics': {
+                    'like_count': likes,
+                    'retweet_count': retweets,
+                    'reply_count': replies,
+                    'quote_count': int(retweets * rng.random() * 0.3),
+                },
+                'author': {
+                    'username': username,
+                    'name': username.replace('_', ' ').title(),
+                    'isVerified': verified,
+                    'followersCount': followers,
+                },
+                'kol_info': {
+                    'username': username,
+                    'rank': rank,
+                    'score': score,
+                    'is_top_100': rank <= 100,
+                    'followers': followers,
+                    'verified': verified,
+                },
+            }
+
+
+def build_metadata(kol_tweet_count, kol_count, start=DEFAULT_START, days=7):
+    """与采集器一致的元数据"""
+    end = start + timedelta(days=days)
+    total = sum(kol_tweet_count.values())
+    return {
+        'total_tweets': total,
+        'kol_count': kol_count,
+        'kol_with_tweets': len([c for c in kol_tweet_count.values() if c > 0]),
+        'date_range': {'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')},
+        'collection_time': end.isoformat(),
+        'kol_tweet_distribution': kol_tweet_count,
+        'api_usage': {'api_calls': kol_count, 'total_credits': kol_count * 300, 'cost_usd': kol_count * 0.003},
+        'synthetic': True,
+    }
+
+
+def generate_week(n, seed=DEFAULT_SEED, start=DEFAULT_START, days=7, kol_count=300):
+    """
+    生成一整周数据（全部推文在内存中）
+
+    Returns:
+        dict: {'tweets': [...], 'metadata': {...}}
+    """
+    tweets = list(generate_tweets(n, seed, start, days, kol_count))
+    counts = {f"kol_{rank:04d}": 0 for rank in range(1, kol_count + 1)}
+    for tweet in tweets:
+        counts[tweet['kol_info']['username']] += 1
+    return {'tweets': tweets, 'metadata': build_metadata(counts, kol_count, start, days)}
+
+
+def write_week(output_dir, n, seed=DEFAULT_SEED, start=DEFAULT_START, days=7, kol_count=300, fmt='ndjson'):
+    """
+    生成一周数据并写入周目录（ndjson 格式流式写入，1M 条也不需要全部载入内存）
+
+    Returns:
+        str: 主数据文件路径
+    """
+    if fmt == 'json':
+        return save_raw_data(generate_week(n, seed, start, days, kol_count), output_dir, fmt='json')
+
+    counts = {f"kol_{rank:04d}": 0 for rank in range(1, kol_count + 1)}
+    batch = []
+    with RawDataWriter(output_dir) as writer:
+        for tweet in generate_tweets(n, seed, start, days, kol_count):
+            counts[tweet['kol_info']['username']] += 1
+            batch.append(tweet)
+            if len(batch) >= 1000:
+                writer.append(batch)
+                batch = []
+        writer.append(batch)
+        return writer.finalize(output_dir, build_metadata(counts, kol_count, start, days))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成推文语料生成器')
+    parser.add_argument('output_dir', help='输出周目录')
+    parser.add_argument('--tweets', type=int, default=10000, help='推文数')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    parser.add_argument('--kol-count', type=int, default=300, help='KOL 数')
+    parser.add_argument('--days', type=int, default=7, help='时间窗口天数')
+    parser.add_argument('--format', choices=['ndjson', 'json'], default='ndjson',
+                        help='ndjson 为推文流 + 元数据，json 为旧格式 raw_data.json')
+    args = parser.parse_args()
+
+    path = write_week(args.output_dir, args.tweets, args.seed, days=args.days, kol_count=args.kol_count,
+                      fmt=args.format)
+    print(f"✅ 已生成 {args.tweets} 条推文: {path}")
+
+
+if __name__ == '__main__':
+    main()
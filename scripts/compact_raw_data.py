@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+把已有周数据转换为紧凑格式（见 twitter_monitor/core/tweet_schema.py）
+推文投影为固定字段、KOL 信息移入元数据 KOL 表，原始推文默认压缩保存为冷文件 raw_payload.ndjson.gz，
+同时重建推文索引；旧格式 raw_data.json 转换后删除（--keep-source 保留）。已是紧凑格式的周直接跳过
+
+用法:
+    python3 scripts/compact_raw_data.py weekly_reports/week_2025-10-10_to_2025-10-17
+    python3 scripts/compact_raw_data.py --base-dir weekly_reports [--no-cold] [--keep-source]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.raw_data_io import (PAYLOAD_FILE, METADATA_FILE, RawDataWriter, iter_tweets,
+                              load_metadata, resolve_raw_data)
+from core.tweet_index import TweetIndexBuilder
+from core.tweet_schema import COMPACT_SCHEMA, KOLS_FIELD, SCHEMA_FIELD, compact_tweet, tweet_kol
+
+
+BATCH_SIZE = 1000
+STAGING_DIR = '.compacting'
+
+
+def _dir_size(week_dir, names):
+    return sum(os.path.getsize(os.path.join(week_dir, name)) for name in names
+               if os.path.exists(os.path.join(week_dir, name)))
+
+
+def convert_week(week_dir, cold=True, keep_source=False):
+    """
+    转换一周数据
+
+    Args:
+        week_dir: 周目录
+        cold: 是否把原始推文压缩保存为冷文件
+        keep_source: 是否保留旧格式 raw_data.json
+
+    Returns:
+        dict: 转换统计（已是紧凑格式或没有数据时返回 None）
+    """
+    kind, data_path, _ = resolve_raw_data(week_dir)
+    if not os.path.exists(data_path):
+        return None
+    metadata = load_metadata(data_path)
+    if metadata.get(SCHEMA_FIELD) == COMPACT_SCHEMA:
+        return None
+
+    before = os.path.getsize(data_path)
+    if kind == 'ndjson':
+        before += _dir_size(week_dir, [METADATA_FILE])
+
+    # 新推文流先写入周目录下的暂存目录，全部写完后替换（源文件可能就是 raw_tweets.ndjson）
+    staging_dir = os.path.join(week_dir, STAGING_DIR)
+    kols = {}
+    with RawDataWriter(staging_dir, index_builder=TweetIndexBuilder(), cold_payload=cold) as writer:
+        tweets, payloads = [], []
+        for tweet in iter_tweets(data_path):
+            username = tweet_kol(tweet)
+            if username and tweet.get('kol_info') and username not in kols:
+                kols[username] = tweet['kol_info']
+            payloads.append(tweet)
+            tweets.append(compact_tweet(tweet, username))
+            if len(tweets) >= BATCH_SIZE:
+                writer.append(tweets, payloads)
+                tweets, payloads = [], []
+        writer.append(tweets, payloads)
+
+        metadata[SCHEMA_FIELD] = COMPACT_SCHEMA
+        metadata[KOLS_FIELD] = kols
+        tweets_path = writer.finalize(week_dir, metadata)
+        count = writer.count
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    if kind == 'json' and not keep_source:
+        os.remove(data_path)
+
+    return {
+        'tweets': count,
+        'kols': len(kols),
+        'size_before': before,
+        'size_after': os.path.getsize(tweets_path) + _dir_size(week_dir, [METADATA_FILE]),
+        'payload_size': _dir_size(week_dir, [PAYLOAD_FILE]) if cold else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把已有周数据转换为紧凑格式')
+    parser.add_argument('week_dirs', nargs='*', help='周目录')
+    parser.add_argument('--base-dir', default=None, help='转换该目录下所有 week_* 周目录')
+    parser.add_argument('--no-cold', action='store_true', help='不保存原始推文冷文件')
+    parser.add_argument('--keep-source', action='store_true', help='保留旧格式 raw_data.json')
+    args = parser.parse_args()
+
+    week_dirs = list(args.week_dirs)
+    if args.base_dir:
+        week_dirs += sorted(str(p) for p in Path(args.base_dir).glob('week_*') if p.is_dir())
+    if not week_dirs:
+        parser.error('请指定周目录或 --base-dir')
+
+    print("=" * 60)
+    print("📦 转换为紧凑推文格式")
+    print("=" * 60)
+    total_before = total_after = 0
+    for week_dir in week_dirs:
+        stats = convert_week(week_dir, cold=not args.no_cold, keep_source=args.keep_source)
+        name = os.path.basename(os.path.normpath(week_dir))
+        if stats is None:
+            print(f"   - {name}: 跳过（已是紧凑格式或没有数据）")
+            continue
+        total_before += stats['size_before']
+        total_after += stats['size_after']
+        cold_note = f", 冷文件 {stats['payload_size'] / 1e6:.2f} MB" if stats['payload_size'] else ''
+        print(f"   ✅ {name}: {stats['tweets']} 条推文, {stats['kols']} 个KOL, "
+              f"{stats['size_before'] / 1e6:.2f} MB → {stats['size_after'] / 1e6:.2f} MB{cold_note}")
+
+    if total_before:
+        print(f"\n合计: {total_before / 1e6:.2f} MB → {total_after / 1e6:.2f} MB "
+              f"({(1 - total_after / total_before) * 100:.0f}% 更小)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
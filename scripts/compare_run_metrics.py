@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比较两次运行的 run_metrics.json
+按 span 路径对比耗时和峰值内存、按名称对比计数器和分布的 p50 / p90，
+用于发现不同周或不同代码版本之间的性能回退
+
+用法:
+    python3 scripts/compare_run_metrics.py weekly_reports/week_A/ weekly_reports/week_B/
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.metrics import load_run_metrics
+
+
+def span_totals(metrics):
+    """按 span 路径汇总耗时（同一路径多次出现时累加）和峰值内存"""
+    totals = {}
+    for span in metrics.get('spans', []):
+        seconds, rss = totals.get(span['path'], (0.0, None))
+        seconds += span.get('seconds') or 0.0
+        peak = span.get('rss_peak_mb')
+        if peak is not None and (rss is None or peak > rss):
+            rss = peak
+        totals[span['path']] = (seconds, rss)
+    return totals
+
+
+def format_change(before, after):
+    if before is None or after is None:
+        return ''
+    if before == 0:
+        return '' if after == 0 else '  (新增)'
+    return f"  ({(after - before) / before * 100:+.0f}%)"
+
+
+def format_value(value, fmt):
+    return '-' if value is None else format(value, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较两次运行的 run_metrics.json')
+    parser.add_argument('before', help='基准运行（周目录或 run_metrics.json）')
+    parser.add_argument('after', help='对比运行（周目录或 run_metrics.json）')
+    args = parser.parse_args()
+
+    before = load_run_metrics(args.before)
+    after = load_run_metrics(args.after)
+
+    print("=" * 60)
+    print(f"📊 运行指标对比: {before.get('week')} @ {before.get('code_version')} → "
+          f"{after.get('week')} @ {after.get('code_version')}")
+    print("=" * 60)
+    print(f"总耗时: {before['wall_seconds']:.2f}s → {after['wall_seconds']:.2f}s"
+          f"{format_change(before['wall_seconds'], after['wall_seconds'])}")
+    print(f"峰值内存: {format_value(before.get('max_rss_mb'), '.1f')} MB → "
+          f"{format_value(after.get('max_rss_mb'), '.1f')} MB")
+
+    print("\n⏱️  阶段（耗时 / 峰值内存）:")
+    spans_before = span_totals(before)
+    spans_after = span_totals(after)
+    for path in list(spans_before) + [p for p in spans_after if p not in spans_before]:
+        seconds_before, rss_before = spans_before.get(path, (None, None))
+        seconds_after, rss_after = spans_after.get(path, (None, None))
+        print(f"   - {path}: {format_value(seconds_before, '.3f')}s → {format_value(seconds_after, '.3f')}s"
+              f"{format_change(seconds_before, seconds_after)}  "
+              f"[{format_value(rss_before, '.1f')} → {format_value(rss_after, '.1f')} MB]")
+
+    counters = sorted(set(before.get('counters', {})) | set(after.get('counters', {})))
+    if counters:
+        print("\n🔢 计数器:")
+        for name in counters:
+            value_before = before['counters'].get(name)
+            value_after = after['counters'].get(name)
+            print(f"   - {name}: {format_value(value_before, '')} → {format_value(value_after, '')}"
+                  f"{format_change(value_before, value_after)}")
+
+    distributions = sorted(set(before.get('distributions', {})) | set(after.get('distributions', {})))
+    if distributions:
+        print("\n📈 分布（p50 / p90）:")
+        for name in distributions:
+            dist_before = before['distributions'].get(name, {})
+            dist_after = after['distributions'].get(name, {})
+            print(f"   - {name}: "
+                  f"{format_value(dist_before.get('p50'), '.3f')} / {format_value(dist_before.get('p90'), '.3f')} → "
+                  f"{format_value(dist_after.get('p50'), '.3f')} / {format_value(dist_after.get('p90'), '.3f')}"
+                  f"{format_change(dist_before.get('p90'), dist_after.get('p90'))}")
+
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
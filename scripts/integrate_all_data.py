@@ -7,10 +7,17 @@ Twitter 数据集成工具
 
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+# 复用 twitter_monitor 的核心模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.archive_manifest import ArchiveManifest
+from core.raw_data_io import find_raw_data
+
 
 def find_all_weekly_reports(base_dir: str) -> List[Dict]:
     """查找所有周报目录"""
@@ -25,15 +32,15 @@ def find_all_weekly_reports(base_dir: str) -> List[Dict]:
     for item in reports_dir.iterdir():
         if item.is_dir() and item.name.startswith('week_'):
             # 检查是否有数据文件
-            raw_data = item / 'raw_data.json'
+            raw_data = find_raw_data(item)
             summary_data = item / 'analysis_summary.json'
 
             report_info = {
                 'directory': str(item),
                 'week_name': item.name,
-                'has_raw_data': raw_data.exists(),
+                'has_raw_data': raw_data is not None,
                 'has_summary': summary_data.exists(),
-                'raw_data_path': str(raw_data) if raw_data.exists() else None,
+                'raw_data_path': raw_data,
                 'summary_path': str(summary_data) if summary_data.exists() else None,
             }
 
@@ -62,13 +69,86 @@ def load_json_safe(file_path: str) -> Dict:
         return {}
 
 
-def integrate_all_data(weekly_reports: List[Dict]) -> Dict:
-    """集成所有数据"""
+def extract_week_partial(report: Dict, summary: Dict) -> Dict:
+    """
+    从一周的分析摘要中提取该周的部分汇总
+
+    Returns:
+        dict: {'data_source', 'week_data', 'total_tweets',
+               'products': {产品: [提及次数, 总互动]}, 'kols': {KOL: 推文数}}
+    """
+    # 提取周报摘要
+    week_summary = summary.get('summary', {})
+    products = summary.get('products', {})
+    new_products = summary.get('new_products', {})
+
+    # 周报条目
+    week_data = {
+        'week_name': report['week_name'],
+        'date_range': {
+            'start': report.get('start_date'),
+            'end': report.get('end_date'),
+        },
+        'statistics': {
+            'total_tweets': week_summary.get('total_tweets', 0),
+            'unique_products': week_summary.get('unique_products', 0),
+            'new_products': week_summary.get('new_products', 0),
+        },
+        'top_topics': week_summary.get('top_topics', {}),
+        'top_products': {},
+        'new_products_list': list(new_products.keys()) if new_products else [],
+    }
+
+    # 提取 Top 10 产品
+    sorted_products = sorted(
+        products.items(),
+        key=lambda x: x[1].get('mention_count', 0),
+        reverse=True
+    )
+    week_data['top_products'] = {
+        name: data.get('mention_count', 0)
+        for name, data in sorted_products[:10]
+    }
+
+    # KOL 推文数：kol_data 可能是整数（推文数）或字典（详细数据）
+    kols = {}
+    for kol_name, kol_data in summary.get('top_kols', {}).items():
+        if isinstance(kol_data, int):
+            kols[kol_name] = kol_data
+        elif isinstance(kol_data, dict):
+            kols[kol_name] = kol_data.get('tweet_count', 0)
+        else:
+            kols[kol_name] = 0
+
+    return {
+        'data_source': {
+            'week': report['week_name'],
+            'date_range': f"{report.get('start_date', 'N/A')} to {report.get('end_date', 'N/A')}",
+            'has_raw_data': report['has_raw_data'],
+        },
+        'week_data': week_data,
+        'total_tweets': week_summary.get('total_tweets', 0),
+        'products': {
+            name: [data.get('mention_count', 0), data.get('total_engagement', 0)]
+            for name, data in products.items()
+        },
+        'kols': kols,
+    }
+
+
+def merge_week_partials(total_weeks: int, partials: List[tuple]) -> Dict:
+    """
+    按周报顺序合并每周的部分汇总
+
+    Args:
+        total_weeks: 周报目录总数
+        partials: [(周报信息, extract_week_partial() 的结果), ...]
+    """
 
     integrated_data = {
         'metadata': {
             'integration_date': datetime.now().isoformat(),
-            'total_weeks': len(weekly_reports),
+            'total_weeks': total_weeks,
             'data_sources': [],
         },
         'weekly_reports': [],
@@ -88,65 +168,18 @@ def integrate_all_data(weekly_reports: List[Dict]) -> Dict:
     all_products_mentions = {}
     all_kols_activity = {}
 
-    for report in weekly_reports:
-        if not report['has_summary']:
-            continue
-
-        print(f"📊 处理: {report['week_name']}")
-
-        # 加载摘要数据
-        summary = load_json_safe(report['summary_path'])
-
-        if not summary:
-            continue
-
+    for report, partial in partials:
         # 记录数据源
-        integrated_data['metadata']['data_sources'].append({
-            'week': report['week_name'],
-            'date_range': f"{report.get('start_date', 'N/A')} to {report.get('end_date', 'N/A')}",
-            'has_raw_data': report['has_raw_data'],
-        })
-
-        # 提取周报摘要
-        week_summary = summary.get('summary', {})
-        products = summary.get('products', {})
-        new_products = summary.get('new_products', {})
+        integrated_data['metadata']['data_sources'].append(partial['data_source'])
 
         # 添加到周报列表
-        week_data = {
-            'week_name': report['week_name'],
-            'date_range': {
-                'start': report.get('start_date'),
-                'end': report.get('end_date'),
-            },
-            'statistics': {
-                'total_tweets': week_summary.get('total_tweets', 0),
-                'unique_products': week_summary.get('unique_products', 0),
-                'new_products': week_summary.get('new_products', 0),
-            },
-            'top_topics': week_summary.get('top_topics', {}),
-            'top_products': {},
-            'new_products_list': list(new_products.keys()) if new_products else [],
-        }
-
-        # 提取 Top 10 产品
-        sorted_products = sorted(
-            products.items(),
-            key=lambda x: x[1].get('mention_count', 0),
-            reverse=True
-        )
-        week_data['top_products'] = {
-            name: data.get('mention_count', 0)
-            for name, data in sorted_products[:10]
-        }
-
-        integrated_data['weekly_reports'].append(week_data)
+        integrated_data['weekly_reports'].append(partial['week_data'])
 
         # 更新统计
-        integrated_data['aggregated_statistics']['total_tweets_analyzed'] += week_summary.get('total_tweets', 0)
+        integrated_data['aggregated_statistics']['total_tweets_analyzed'] += partial['total_tweets']
 
         # 汇总产品数据
-        for product_name, product_data in products.items():
+        for product_name, (mention_count, engagement) in partial['products'].items():
             if product_name not in all_products_mentions:
                 all_products_mentions[product_name] = {
                     'total_mentions': 0,
@@ -154,25 +187,19 @@ def integrate_all_data(weekly_reports: List[Dict]) -> Dict:
                     'total_engagement': 0,
                 }
 
-            all_products_mentions[product_name]['total_mentions'] += product_data.get('mention_count', 0)
+            all_products_mentions[product_name]['total_mentions'] += mention_count
             all_products_mentions[product_name]['weeks_mentioned'].append(report['week_name'])
-            all_products_mentions[product_name]['total_engagement'] += product_data.get('total_engagement', 0)
+            all_products_mentions[product_name]['total_engagement'] += engagement
 
         # 汇总 KOL 数据
-        top_kols = summary.get('top_kols', {})
-        for kol_name, kol_data in top_kols.items():
+        for kol_name, tweet_count in partial['kols'].items():
             if kol_name not in all_kols_activity:
                 all_kols_activity[kol_name] = {
                     'total_tweets': 0,
                     'weeks_active': [],
                 }
 
-            # kol_data 可能是整数（推文数）或字典（详细数据）
-            if isinstance(kol_data, int):
-                all_kols_activity[kol_name]['total_tweets'] += kol_data
-            elif isinstance(kol_data, dict):
-                all_kols_activity[kol_name]['total_tweets'] += kol_data.get('tweet_count', 0)
-
+            all_kols_activity[kol_name]['total_tweets'] += tweet_count
             all_kols_activity[kol_name]['weeks_active'].append(report['week_name'])
 
         # 更新日期范围
@@ -204,6 +231,73 @@ def integrate_all_data(weekly_reports: List[Dict]) -> Dict:
     return integrated_data
 
 
+def integrate_all_data(weekly_reports: List[Dict]) -> Dict:
+    """集成所有数据"""
+    partials = []
+
+    for report in weekly_reports:
+        if not report['has_summary']:
+            continue
+
+        print(f"📊 处理: {report['week_name']}")
+
+        # 加载摘要数据
+        summary = load_json_safe(report['summary_path'])
+
+        if not summary:
+            continue
+
+        partials.append((report, extract_week_partial(report, summary)))
+
+    return merge_week_partials(len(weekly_reports), partials)
+
+
+def integrate_all_data_incremental(weekly_reports: List[Dict], manifest_path: str) -> Dict:
+    """
+    增量集成：只重新解析新增或变化（大小 / 内容哈希不同）的 analysis_summary.json，
+    其余周直接使用清单中缓存的部分汇总，再按周报顺序合并
+
+    Args:
+        weekly_reports: find_all_weekly_reports() 的结果
+        manifest_path: 清单文件路径
+    """
+    manifest = ArchiveManifest(manifest_path)
+    partials = []
+    current = set()
+    parsed = 0
+
+    for report in weekly_reports:
+        if not report['has_summary']:
+            continue
+
+        week_name = report['week_name']
+        current.add(week_name)
+        unchanged, fingerprint = manifest.check(week_name, report['summary_path'])
+
+        if unchanged:
+            partial = manifest.get(week_name)['partial']
+            if partial is not None:
+                # 原始数据可能在摘要之后补齐
+                partial['data_source']['has_raw_data'] = report['has_raw_data']
+        else:
+            print(f"📊 处理: {week_name}")
+            parsed += 1
+            summary = load_json_safe(report['summary_path'])
+            partial = extract_week_partial(report, summary) if summary else None
+            manifest.set(week_name, report['summary_path'], fingerprint, partial=partial)
+
+        if partial is not None:
+            partials.append((report, partial))
+
+    for week_name in list(manifest.weeks):
+        if week_name not in current:
+            manifest.remove(week_name)
+    manifest.save()
+
+    print(f"📋 解析 {parsed} 周，复用缓存 {len(current) - parsed} 周")
+    return merge_week_partials(len(weekly_reports), partials)
+
+
 def generate_integration_report(integrated_data: Dict, output_path: str):
     """生成集成报告（Markdown 格式）"""
 
@@ -297,9 +391,19 @@ def generate_integration_report(integrated_data: Dict, output_path: str):
 
 
 def main():
+    import argparse
+
     # 配置路径
-    base_dir = "/Users/wenyongteng/twitter hot news/weekly_monitor/weekly_reports"
-    output_dir = "/Users/wenyongteng/vibe_coding/twitter_product_trends-20251022/data_sources"
+    parser = argparse.ArgumentParser(description='Twitter 周报数据集成')
+    parser.add_argument('--base-dir', default="/Users/wenyongteng/twitter hot news/weekly_monitor/weekly_reports",
+                        help='周报根目录')
+    parser.add_argument('--output-dir', default="/Users/wenyongteng/vibe_coding/twitter_product_trends-20251022/data_sources",
+                        help='输出目录')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：只解析新增或变化的周摘要，其余周使用缓存的部分汇总')
+    args = parser.parse_args()
+    base_dir = args.base_dir
+    output_dir = args.output_dir
 
     # 确保输出目录存在
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -316,7 +420,11 @@ def main():
 
     # 集成数据
     print("🔄 开始集成数据...")
-    integrated_data = integrate_all_data(weekly_reports)
+    if args.incremental:
+        manifest_path = os.path.join(output_dir, 'integration_state', 'summary_manifest.json')
+        integrated_data = integrate_all_data_incremental(weekly_reports, manifest_path)
+    else:
+        integrated_data = integrate_all_data(weekly_reports)
 
     # 保存 JSON
     json_output_path = os.path.join(output_dir, "integrated_twitter_data.json")
@@ -2,19 +2,38 @@
 # -*- coding: utf-8 -*-
 """
 Twitter 原始数据集成工具
-遍历所有周报目录，提取所有 raw_data.json 中的推文数据
+遍历所有周报目录，提取所有原始推文数据（raw_tweets.ndjson 或旧格式 raw_data.json）
 """
 
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
-from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+# 复用 twitter_monitor 的核心模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.archive_manifest import ArchiveManifest
+from core.columnar import HAS_NUMPY, TweetTable, np
+from core.raw_data_io import find_raw_data, iter_tweets, load_metadata
+from core.tweet_archive import ARCHIVE_DIR, TweetArchive, is_archive, update_archive, write_archive
+from core.tweet_schema import METRICS_FETCHED_AT, is_compact, metric_values, set_metric_values
+from core.watermark_store import tweet_id_int
+
+
+# 增量模式的状态目录（清单和每周去重状态）；推文和汇总与全量模式一样写入分片归档
+INCREMENTAL_STATE_DIR = 'integration_state'
+# 早期增量模式的输出（推文流 + 汇总），增量运行时删除
+LEGACY_INCREMENTAL_FILES = ('integrated_all_tweets.ndjson', 'integrated_all_tweets_summary.json')
+
+# 跨周去重时额外刷新的原始格式字段（不属于规范指标列，两份推文都是原始格式时才有）
+RAW_ONLY_METRIC_FIELDS = ('bookmarkCount',)
 
 
 def find_all_raw_data_files(base_dir: str) -> List[Dict]:
-    """查找所有包含 raw_data.json 的周报目录"""
+    """查找所有包含原始推文数据的周报目录"""
     reports_dir = Path(base_dir)
 
     if not reports_dir.exists():
@@ -25,10 +44,10 @@ def find_all_raw_data_files(base_dir: str) -> List[Dict]:
 
     for item in reports_dir.iterdir():
         if item.is_dir() and item.name.startswith('week_'):
-            raw_data_path = item / 'raw_data.json'
+            raw_data_path = find_raw_data(item)
 
-            if raw_data_path.exists():
-                file_size = raw_data_path.stat().st_size / (1024 * 1024)  # MB
+            if raw_data_path:
+                file_size = Path(raw_data_path).stat().st_size / (1024 * 1024)  # MB
 
                 report_info = {
                     'directory': str(item),
@@ -52,40 +71,225 @@ def find_all_raw_data_files(base_dir: str) -> List[Dict]:
     return raw_data_files
 
 
-def load_raw_tweets(file_path: str) -> List[Dict]:
-    """加载原始推文数据"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # raw_data.json 的结构可能是 {'tweets': [...]} 或直接是列表
-        if isinstance(data, dict):
-            tweets = data.get('tweets', [])
-            metadata = data.get('metadata', {})
-        else:
-            tweets = data
-            metadata = {}
-
-        return tweets, metadata
+def load_raw_tweets(file_path: str) -> Tuple[Iterator[Dict], Dict]:
+    """
+    加载原始推文数据
 
+    Returns:
+        (推文生成器, 元数据)。推文逐条读取，不会一次性载入整周数据
+    """
+    try:
+        metadata = load_metadata(file_path)
     except Exception as e:
         print(f"⚠️  加载失败 {file_path}: {e}")
-        return [], {}
+        return iter(()), {}
+
+    def tweets():
+        try:
+            yield from iter_tweets(file_path)
+        except Exception as e:
+            print(f"⚠️  加载失败 {file_path}: {e}")
+
+    return tweets(), metadata
+
+
+def _summarize_kols_columnar(tweets: List[Dict], week_names: List[str], week_sizes: List[int]) -> Tuple[Dict, List[int]]:
+    """列式实现：推文数/点赞/转发按 KOL 分组求和，活跃周由 (KOL, 周) 编号去重得到"""
+    table = TweetTable.from_tweets(tweets, metric_source='public_metrics', columns=('likes', 'retweets'))
+    n_kols = len(table.kol_names)
+    n_weeks = len(week_names)
+
+    counts = table.kol_count().tolist()
+    likes = table.kol_sum('likes').tolist()
+    retweets = table.kol_sum('retweets').tolist()
+
+    rows = np.flatnonzero(table.kol_index >= 0)
+    codes = table.kol_index[rows].astype(np.int64)
+    week_of_row = np.repeat(np.arange(n_weeks, dtype=np.int64), week_sizes)[rows]
+
+    # 每位 KOL 首次出现的推文（KOL 详细信息取自这条推文）
+    _, first = np.unique(codes, return_index=True)
+    first_rows = rows[first].tolist()
+
+    # (KOL, 周) 去重后按 KOL、周序排列
+    pairs = np.unique(codes * n_weeks + week_of_row)
+    pair_kols = pairs // n_weeks
+    pair_weeks = pairs % n_weeks
+    boundaries = np.searchsorted(pair_kols, np.arange(1, n_kols))
+    kol_weeks = np.split(pair_weeks, boundaries)
+    week_unique_kols = np.bincount(pair_weeks, minlength=n_weeks).tolist()
+
+    kol_stats = {}
+    for code, username in enumerate(table.kol_names):
+        kol_stats[username] = {
+            'kol_info': tweets[first_rows[code]]['kol_info'],
+            'tweet_count': counts[code],
+            'total_likes': likes[code],
+            'total_retweets': retweets[code],
+            # 同名周（重复的周报目录）只记一次
+            'weeks': list(dict.fromkeys(week_names[week] for week in kol_weeks[code].tolist())),
+        }
 
+    return kol_stats, week_unique_kols
 
-def integrate_all_raw_data(raw_data_files: List[Dict]) -> Dict:
-    """集成所有原始推文数据"""
 
-    integrated_data = {
+def _summarize_kols_dicts(tweets: List[Dict], week_names: List[str], week_sizes: List[int]) -> Tuple[Dict, List[int]]:
+    """逐条实现（未安装 numpy 时使用）"""
+    kol_stats = {}
+    week_unique_kols = []
+
+    start = 0
+    for week_name, size in zip(week_names, week_sizes):
+        week_kols = set()
+        for tweet in tweets[start:start + size]:
+            kol_info = tweet.get('kol_info', {})
+            if not kol_info:
+                continue
+            username = kol_info.get('username', 'unknown')
+            week_kols.add(username)
+
+            stats = kol_stats.get(username)
+            if stats is None:
+                stats = kol_stats[username] = {
+                    'kol_info': kol_info, 'tweet_count': 0, 'total_likes': 0, 'total_retweets': 0, 'weeks': [],
+                }
+            stats['tweet_count'] += 1
+            stats['total_likes'] += tweet.get('public_metrics', {}).get('like_count', 0)
+            stats['total_retweets'] += tweet.get('public_metrics', {}).get('retweet_count', 0)
+            if week_name not in stats['weeks']:
+                stats['weeks'].append(week_name)
+
+        week_unique_kols.append(len(week_kols))
+        start += size
+
+    return kol_stats, week_unique_kols
+
+
+def summarize_kols(tweets: List[Dict], week_names: List[str], week_sizes: List[int]) -> Tuple[Dict, List[int]]:
+    """
+    按 KOL 汇总推文数、点赞、转发和活跃周
+
+    推文已跨周去重且点赞/转发需逐条累加，不使用各周的 KOL 倒排索引（core/tweet_index.py）
+
+    Args:
+        tweets: 按周依次排列的推文
+        week_names: 周名称（与 week_sizes 对齐）
+        week_sizes: 每周的推文数
+
+    Returns:
+        tuple: (kol_stats, week_unique_kols)
+            kol_stats: {username: {'kol_info', 'tweet_count', 'total_likes', 'total_retweets', 'weeks'}}，
+                按 KOL 首次出现顺序排列
+            week_unique_kols: 每周的 KOL 数
+    """
+    if not week_names:
+        return {}, []
+    if HAS_NUMPY:
+        return _summarize_kols_columnar(tweets, week_names, week_sizes)
+    return _summarize_kols_dicts(tweets, week_names, week_sizes)
+
+
+def dedup_key(tweet: Dict):
+    """去重键：数字推文ID转为整数（比字符串省内存），其他ID原样使用，没有ID返回 None"""
+    tweet_id = tweet.get('id')
+    if tweet_id is None:
+        return None
+    numeric_id = tweet_id_int(tweet_id)
+    return numeric_id if numeric_id is not None else tweet_id
+
+
+def refresh_metrics(kept: Dict, tweet: Dict):
+    """
+    用更新一次采集到的推文刷新已保留推文的互动指标
+
+    两份推文可能格式不同（旧周为原始格式、新周为紧凑格式）：按指标列读取更新的一份，
+    再按保留推文自身的格式写入，metric() 读到的始终是刷新后的值
+    """
+    set_metric_values(kept, metric_values(tweet))
+    if not is_compact(kept) and not is_compact(tweet):
+        for field in RAW_ONLY_METRIC_FIELDS:
+            if field in tweet:
+                kept[field] = tweet[field]
+
+    # 互动指标的采集时间随之更新（更新的一份是本次采集的就不再标记旧值）
+    if tweet.get(METRICS_FETCHED_AT):
+        kept[METRICS_FETCHED_AT] = tweet[METRICS_FETCHED_AT]
+    else:
+        kept.pop(METRICS_FETCHED_AT, None)
+
+
+def integrate_week(tweets: Iterator[Dict], report: Dict, collected_at: str, seen: Dict,
+                   dedup: bool = True, refreshed: set = None) -> Tuple[List[Dict], int, int]:
+    """
+    并入一周的推文：原地添加周信息，并按推文ID跨周去重
+
+    Args:
+        tweets: 这一周的推文
+        report: 周报信息（find_all_raw_data_files() 的一项）
+        collected_at: 这一周的采集时间（用于判断哪份互动指标更新；增量采集沿用缓存的推文以其
+            metrics_fetched_at 为准）
+        seen: 去重键 → (保留的推文, 其指标的采集时间)，跨周共享，原地更新
+        dedup: 是否去重
+        refreshed: 可选，记录被这一周刷新了指标的去重键
+
+    Returns:
+        tuple: (保留的推文, 读取的推文数, 丢弃的重复数)
+    """
+    week_name = report['week_name']
+
+    # 推文由调用方刚加载、没有其他引用，直接原地添加元数据（不再逐条 copy）；
+    # 同一周的推文共用一个日期范围字典
+    source_date_range = {
+        'start': report.get('start_date'),
+        'end': report.get('end_date'),
+    }
+    week_tweets = []
+    loaded = 0
+    duplicates = 0
+    for tweet in tweets:
+        loaded += 1
+
+        key = dedup_key(tweet) if dedup else None
+        if key is not None:
+            metrics_at = tweet.get(METRICS_FETCHED_AT) or collected_at
+            previous = seen.get(key)
+            if previous is not None:
+                # 重复推文：只在这份采集更新时刷新指标
+                duplicates += 1
+                kept, kept_collected_at = previous
+                if metrics_at >= kept_collected_at:
+                    refresh_metrics(kept, tweet)
+                    seen[key] = (kept, metrics_at)
+                    if refreshed is not None:
+                        refreshed.add(key)
+                continue
+            seen[key] = (tweet, metrics_at)
+
+        tweet['source_week'] = week_name
+        tweet['source_date_range'] = source_date_range
+        week_tweets.append(tweet)
+
+    return week_tweets, loaded, duplicates
+
+
+def collection_time(report: Dict, metadata: Dict) -> str:
+    """采集时间（新格式元数据中的 collection_time，缺失时用周开始日期）"""
+    return metadata.get('collection_time') or report.get('start_date') or ''
+
+
+def new_integrated_data(total_weeks: int) -> Dict:
+    """空的集成结果"""
+    return {
         'metadata': {
             'integration_date': datetime.now().isoformat(),
-            'total_weeks': len(raw_data_files),
+            'total_weeks': total_weeks,
             'data_sources': [],
         },
         'all_tweets': [],  # 所有推文的集合
         'tweets_by_week': {},  # 按周分组的推文
         'statistics': {
             'total_tweets': 0,
+            'duplicates_dropped': 0,
             'total_kols': 0,
             'date_range': {
                 'earliest': None,
@@ -96,9 +300,88 @@ def integrate_all_raw_data(raw_data_files: List[Dict]) -> Dict:
         'weekly_summaries': [],  # 每周摘要
     }
 
-    all_kols = set()
-    kol_tweets = defaultdict(list)
-    kol_stats = defaultdict(lambda: {'tweet_count': 0, 'total_likes': 0, 'total_retweets': 0, 'weeks': []})
+
+def record_week(integrated_data: Dict, report: Dict, tweet_count: int, duplicates: int):
+    """记录一周的数据源、周摘要（unique_kols 在 KOL 汇总后填入）并更新总数和日期范围"""
+    week_name = report['week_name']
+    integrated_data['statistics']['duplicates_dropped'] += duplicates
+
+    # 记录数据源
+    integrated_data['metadata']['data_sources'].append({
+        'week': week_name,
+        'date_range': f"{report.get('start_date', 'N/A')} to {report.get('end_date', 'N/A')}",
+        'tweet_count': tweet_count,
+        'duplicates_dropped': duplicates,
+        'file_size_mb': report['file_size_mb'],
+    })
+
+    integrated_data['weekly_summaries'].append({
+        'week_name': week_name,
+        'date_range': {
+            'start': report.get('start_date'),
+            'end': report.get('end_date'),
+        },
+        'tweet_count': tweet_count,
+        'duplicates_dropped': duplicates,
+        'unique_kols': 0,
+    })
+    integrated_data['statistics']['total_tweets'] += tweet_count
+
+    # 更新日期范围
+    start_date = report.get('start_date')
+    end_date = report.get('end_date')
+
+    if start_date:
+        if not integrated_data['statistics']['date_range']['earliest'] or \
+           start_date < integrated_data['statistics']['date_range']['earliest']:
+            integrated_data['statistics']['date_range']['earliest'] = start_date
+
+    if end_date:
+        if not integrated_data['statistics']['date_range']['latest'] or \
+           end_date > integrated_data['statistics']['date_range']['latest']:
+            integrated_data['statistics']['date_range']['latest'] = end_date
+
+
+def fill_kol_activity(integrated_data: Dict, kol_stats: Dict, week_unique_kols: List[int]):
+    """写入 KOL 活跃度统计和每周 KOL 数"""
+    for week_summary, unique_kols in zip(integrated_data['weekly_summaries'], week_unique_kols):
+        week_summary['unique_kols'] = unique_kols
+
+    for username, stats in kol_stats.items():
+        kol_info = stats['kol_info']
+        integrated_data['kol_activity'][username] = {
+            'username': username,
+            'rank': kol_info.get('rank'),
+            'followers': kol_info.get('followers'),
+            'verified': kol_info.get('verified', False),
+            'score': kol_info.get('score'),
+            'total_tweets': stats['tweet_count'],
+            'total_likes': stats['total_likes'],
+            'total_retweets': stats['total_retweets'],
+            'weeks_active': stats['weeks'],
+            'avg_likes_per_tweet': round(stats['total_likes'] / stats['tweet_count'], 1) if stats['tweet_count'] > 0 else 0,
+        }
+
+    integrated_data['statistics']['total_kols'] = len(kol_stats)
+
+
+def integrate_all_raw_data(raw_data_files: List[Dict], dedup: bool = True) -> Dict:
+    """
+    集成所有原始推文数据
+
+    Args:
+        raw_data_files: find_all_raw_data_files() 的结果（按开始日期排序）
+        dedup: 按推文ID跨周去重（默认开启）。重叠的采集窗口中同一条推文只保留首次出现的一份，
+            互动指标取采集时间最新的一份；每周丢弃的重复条数记录在 duplicates_dropped 中
+    """
+
+    integrated_data = new_integrated_data(len(raw_data_files))
+
+    week_names = []
+    week_sizes = []
+
+    # 去重键 → (保留的推文, 其指标的采集时间)
+    seen = {}
 
     for report in raw_data_files:
         print(f"📊 处理: {report['week_name']} ({report['file_size_mb']} MB)")
@@ -106,103 +389,222 @@ def integrate_all_raw_data(raw_data_files: List[Dict]) -> Dict:
         # 加载推文数据
         tweets, metadata = load_raw_tweets(report['raw_data_path'])
 
-        if not tweets:
+        week_name = report['week_name']
+
+        # all_tweets 和 tweets_by_week 引用同一批推文对象
+        week_tweets, loaded, duplicates = integrate_week(
+            tweets, report, collection_time(report, metadata), seen, dedup)
+
+        integrated_data['all_tweets'].extend(week_tweets)
+
+        if not loaded:
             print(f"  ⚠️  没有推文数据")
             continue
 
-        week_name = report['week_name']
+        if duplicates:
+            print(f"  ♻️  丢弃重复推文 {duplicates} 条（保留 {len(week_tweets)} 条）")
 
-        # 记录数据源
-        integrated_data['metadata']['data_sources'].append({
-            'week': week_name,
-            'date_range': f"{report.get('start_date', 'N/A')} to {report.get('end_date', 'N/A')}",
-            'tweet_count': len(tweets),
-            'file_size_mb': report['file_size_mb'],
-        })
-
-        # 为每条推文添加周信息
-        week_tweets = []
-        for tweet in tweets:
-            # 添加元数据
-            tweet_with_meta = tweet.copy()
-            tweet_with_meta['source_week'] = week_name
-            tweet_with_meta['source_date_range'] = {
-                'start': report.get('start_date'),
-                'end': report.get('end_date'),
-            }
-
-            week_tweets.append(tweet_with_meta)
-            integrated_data['all_tweets'].append(tweet_with_meta)
-
-            # 统计 KOL 活跃度
-            kol_info = tweet.get('kol_info', {})
-            if kol_info:
-                username = kol_info.get('username', 'unknown')
-                all_kols.add(username)
-                kol_tweets[username].append(tweet_with_meta)
-
-                # 更新统计
-                kol_stats[username]['tweet_count'] += 1
-                kol_stats[username]['total_likes'] += tweet.get('public_metrics', {}).get('like_count', 0)
-                kol_stats[username]['total_retweets'] += tweet.get('public_metrics', {}).get('retweet_count', 0)
-                if week_name not in kol_stats[username]['weeks']:
-                    kol_stats[username]['weeks'].append(week_name)
-
-                # 保存 KOL 详细信息
-                if username not in integrated_data['kol_activity']:
-                    integrated_data['kol_activity'][username] = {
-                        'username': username,
-                        'rank': kol_info.get('rank'),
-                        'followers': kol_info.get('followers'),
-                        'verified': kol_info.get('verified', False),
-                        'score': kol_info.get('score'),
-                    }
+        week_names.append(week_name)
+        week_sizes.append(len(week_tweets))
 
         # 保存按周分组的推文
         integrated_data['tweets_by_week'][week_name] = week_tweets
 
-        # 周摘要
-        week_summary = {
-            'week_name': week_name,
-            'date_range': {
-                'start': report.get('start_date'),
-                'end': report.get('end_date'),
-            },
-            'tweet_count': len(week_tweets),
-            'unique_kols': len(set(t.get('kol_info', {}).get('username') for t in week_tweets if t.get('kol_info'))),
-        }
+        record_week(integrated_data, report, len(week_tweets), duplicates)
+
+    # KOL 活跃度统计
+    kol_stats, week_unique_kols = summarize_kols(integrated_data['all_tweets'], week_names, week_sizes)
+    fill_kol_activity(integrated_data, kol_stats, week_unique_kols)
 
-        integrated_data['weekly_summaries'].append(week_summary)
-        integrated_data['statistics']['total_tweets'] += len(week_tweets)
+    return integrated_data
 
-        # 更新日期范围
-        start_date = report.get('start_date')
-        end_date = report.get('end_date')
 
-        if start_date:
-            if not integrated_data['statistics']['date_range']['earliest'] or \
-               start_date < integrated_data['statistics']['date_range']['earliest']:
-                integrated_data['statistics']['date_range']['earliest'] = start_date
+def weeks_overlap(a: Dict, b: Dict) -> bool:
+    """两个周报的日期范围是否重叠（缺少日期时保守地视为重叠）"""
+    if not (a.get('start_date') and a.get('end_date') and b.get('start_date') and b.get('end_date')):
+        return True
+    return a['start_date'] <= b['end_date'] and b['start_date'] <= a['end_date']
+
+
+def _week_state_path(state_dir: str, week_name: str) -> str:
+    return os.path.join(state_dir, 'weeks', week_name + '.json')
+
+
+def _write_week_state(state_dir: str, week_name: str, week_tweets: List[Dict], collected_at: str, seen: Dict):
+    """保存一周的去重状态：指标被后续采集刷新过的推文及其指标的采集时间"""
+    refreshed_at = {}
+    for tweet in week_tweets:
+        key = dedup_key(tweet)
+        if key is not None and key in seen and seen[key][1] != collected_at:
+            refreshed_at[str(key)] = seen[key][1]
+
+    path = _week_state_path(state_dir, week_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'refreshed_at': refreshed_at}, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def _week_kols(week_tweets: List[Dict], week_name: str) -> Tuple[Dict, int]:
+    """一周的 KOL 部分汇总 {username: {'kol_info', 'tweet_count', 'total_likes', 'total_retweets'}} 和 KOL 数"""
+    kol_stats, week_unique_kols = summarize_kols(week_tweets, [week_name], [len(week_tweets)])
+    for stats in kol_stats.values():
+        del stats['weeks']
+    return kol_stats, week_unique_kols[0] if week_unique_kols else 0
+
+
+def _merge_week_kols(entries: List[Tuple[str, Dict]]) -> Tuple[Dict, List[int]]:
+    """按周序合并每周的 KOL 部分汇总，结果与对全部推文调用 summarize_kols() 一致"""
+    kol_stats = {}
+    week_unique_kols = []
+    for week_name, entry in entries:
+        week_unique_kols.append(entry['unique_kols'])
+        for username, partial in entry['kols'].items():
+            stats = kol_stats.get(username)
+            if stats is None:
+                stats = kol_stats[username] = {
+                    'kol_info': partial['kol_info'], 'tweet_count': 0, 'total_likes': 0, 'total_retweets': 0,
+                    'weeks': [],
+                }
+            stats['tweet_count'] += partial['tweet_count']
+            stats['total_likes'] += partial['total_likes']
+            stats['total_retweets'] += partial['total_retweets']
+            if week_name not in stats['weeks']:
+                stats['weeks'].append(week_name)
+    return kol_stats, week_unique_kols
+
+
+def integrate_incremental(raw_data_files: List[Dict], output_dir: str, dedup: bool = True) -> Dict:
+    """
+    增量集成：只解析新增的周，合并进缓存的每周部分汇总，并把新周写成归档分片
+
+    输出目录中：
+    - integrated_all_tweets/: 与全量模式相同的分片归档（每周一个分片 + 清单 + 汇总），
+      汇总与 integrate_all_raw_data() 的结果一致（不含 all_tweets / tweets_by_week）
+    - integration_state/: 清单（每周数据文件的大小、修改时间、SHA-256 和 KOL 部分汇总）与每周去重状态
+
+    只有新周排在所有已缓存周之后、已缓存周的数据文件都未变化且归档分片完好时才走增量路径；
+    任何已缓存周变化、删除或新周插在中间时全部重建。
+    去重只比对日期范围与新周重叠的已缓存周（周目录只包含其日期范围内的推文），
+    这些周的推文被刷新了指标时只重写它们的分片，因此新增一周的成本与历史周数无关
+
+    Args:
+        raw_data_files: find_all_raw_data_files() 的结果（按开始日期排序）
+        output_dir: 输出目录
+        dedup: 按推文ID跨周去重
+
+    Returns:
+        dict: 汇总（即写入归档 summary.json 的内容）
+    """
+    state_dir = os.path.join(output_dir, INCREMENTAL_STATE_DIR)
+    archive_dir = os.path.join(output_dir, ARCHIVE_DIR)
+    manifest = ArchiveManifest(os.path.join(state_dir, 'manifest.json'), settings={'dedup': dedup})
+
+    names = [report['week_name'] for report in raw_data_files]
+    cached = list(manifest.weeks)
+    archive = TweetArchive(archive_dir) if is_archive(archive_dir) else None
+
+    reusable = cached == names[:len(cached)] and archive is not None and \
+        archive.weeks() == [name for name in cached if manifest.get(name)['loaded']] and archive.is_intact()
+    for report in raw_data_files[:len(cached)] if reusable else ():
+        unchanged, _ = manifest.check(report['week_name'], report['raw_data_path'])
+        if not unchanged:
+            print(f"  🔁 {report['week_name']} 数据已变化，全部重建")
+            reusable = False
+            break
+
+    if not reusable:
+        if cached:
+            print("  🔁 已缓存的周与当前数据不一致，全部重建")
+        manifest.clear()
+        cached = []
+
+    new_reports = raw_data_files[len(cached):]
+    print(f"📋 已缓存 {len(cached)} 周，需处理 {len(new_reports)} 周")
+
+    # 载入与新周日期重叠的已缓存周的推文，作为去重和刷新指标的对象
+    seen = {}
+    key_week = {}
+    loaded_tweets = {}
+    for name in cached:
+        entry = manifest.get(name)
+        if not dedup or not entry['tweet_count'] or \
+           not any(weeks_overlap(entry['report'], report) for report in new_reports):
+            continue
+        with open(_week_state_path(state_dir, name), 'r', encoding='utf-8') as state_file:
+            refreshed_at = json.load(state_file)['refreshed_at']
+        week_tweets = archive.load_week(name)
+        for tweet in week_tweets:
+            key = dedup_key(tweet)
+            if key is not None:
+                seen[key] = (tweet, refreshed_at.get(str(key), entry['collected_at']))
+                key_week[key] = name
+        loaded_tweets[name] = week_tweets
+
+    # 解析新周
+    refreshed = set()
+    new_tweets = {}
+    write_weeks = {}
+    for report in new_reports:
+        print(f"📊 处理: {report['week_name']} ({report['file_size_mb']} MB)")
+        name = report['week_name']
+        unchanged, fingerprint = manifest.check(name, report['raw_data_path'])
+        tweets, metadata = load_raw_tweets(report['raw_data_path'])
+        collected_at = collection_time(report, metadata)
+        week_tweets, loaded, duplicates = integrate_week(tweets, report, collected_at, seen, dedup, refreshed)
+
+        if not loaded:
+            print(f"  ⚠️  没有推文数据")
+        elif duplicates:
+            print(f"  ♻️  丢弃重复推文 {duplicates} 条（保留 {len(week_tweets)} 条）")
+
+        manifest.set(name, report['raw_data_path'], fingerprint,
+                     report=report, collected_at=collected_at, loaded=loaded,
+                     tweet_count=len(week_tweets), duplicates_dropped=duplicates)
+        new_tweets[name] = week_tweets
+        if loaded:
+            write_weeks[name] = week_tweets
+
+    # 被刷新了指标的已缓存周重写其分片（分片彼此独立，其余已缓存周原样保留）
+    touched = [name for name in cached if name in {key_week[key] for key in refreshed if key in key_week}]
+    if touched:
+        print(f"  ✏️  刷新已缓存周的互动指标: {', '.join(touched)}")
+    for name in touched:
+        write_weeks[name] = loaded_tweets[name]
+
+    # 后面的新周也可能刷新前面新周的指标，KOL 部分汇总和去重状态在全部新周解析完后再计算
+    for name, week_tweets in {**new_tweets, **write_weeks}.items():
+        entry = manifest.get(name)
+        entry['kols'], entry['unique_kols'] = _week_kols(week_tweets, name)
+        _write_week_state(state_dir, name, week_tweets, entry['collected_at'], seen)
+
+    # 由每周部分汇总合并出整体汇总（不再读取推文）
+    summary = new_integrated_data(len(raw_data_files))
+    del summary['all_tweets']
+    del summary['tweets_by_week']
+
+    entries = []
+    for name in manifest.weeks:
+        entry = manifest.get(name)
+        if not entry['loaded']:
+            continue
+        entries.append((name, entry))
+        record_week(summary, entry['report'], entry['tweet_count'], entry['duplicates_dropped'])
 
-        if end_date:
-            if not integrated_data['statistics']['date_range']['latest'] or \
-               end_date > integrated_data['statistics']['date_range']['latest']:
-                integrated_data['statistics']['date_range']['latest'] = end_date
+    kol_stats, week_unique_kols = _merge_week_kols(entries)
+    fill_kol_activity(summary, kol_stats, week_unique_kols)
 
-    # 更新 KOL 统计
-    for username, stats in kol_stats.items():
-        if username in integrated_data['kol_activity']:
-            integrated_data['kol_activity'][username].update({
-                'total_tweets': stats['tweet_count'],
-                'total_likes': stats['total_likes'],
-                'total_retweets': stats['total_retweets'],
-                'weeks_active': stats['weeks'],
-                'avg_likes_per_tweet': round(stats['total_likes'] / stats['tweet_count'], 1) if stats['tweet_count'] > 0 else 0,
-            })
+    # 先更新归档（分片和汇总，最后是归档清单），再保存状态清单：
+    # 中途中断时两份清单的周或分片大小对不上，下次运行全部重建
+    update_archive(archive_dir, [name for name, _ in entries], write_weeks, summary)
+    manifest.save()
 
-    integrated_data['statistics']['total_kols'] = len(all_kols)
+    for file_name in LEGACY_INCREMENTAL_FILES:
+        path = os.path.join(output_dir, file_name)
+        if os.path.exists(path):
+            os.remove(path)
 
-    return integrated_data
+    return summary
 
 
 def generate_integration_report(integrated_data: Dict, output_path: str):
@@ -220,7 +622,7 @@ def generate_integration_report(integrated_data: Dict, output_path: str):
 
 ## 📊 总体统计
 
-- **推文总数**: {stats['total_tweets']:,} 条
+- **推文总数**: {stats['total_tweets']:,} 条（跨周去重丢弃 {stats.get('duplicates_dropped', 0):,} 条）
 - **KOL 总数**: {stats['total_kols']} 位
 - **数据时间范围**: {stats['date_range']['earliest']} 至 {stats['date_range']['latest']}
 
@@ -233,7 +635,7 @@ def generate_integration_report(integrated_data: Dict, output_path: str):
     for week in integrated_data['weekly_summaries']:
         report += f"""### {week['week_name']}
 **时间**: {week['date_range']['start']} 至 {week['date_range']['end']}
-- 推文数: {week['tweet_count']:,} 条
+- 推文数: {week['tweet_count']:,} 条（重复 {week.get('duplicates_dropped', 0):,} 条）
 - KOL 数: {week['unique_kols']} 位
 
 """
@@ -274,7 +676,7 @@ def generate_integration_report(integrated_data: Dict, output_path: str):
 ---
 
 **生成工具**: Claude Code - Twitter Raw Data Integration Script
-**完整数据**: 见 `integrated_all_tweets.json`
+**完整数据**: 见 `integrated_all_tweets/`（每周一个压缩分片 + manifest.json）或 `integrated_all_tweets.json`
 
 **数据结构说明**:
 - `all_tweets`: 所有推文的完整列表（包含推文内容、KOL 信息、互动数据）
@@ -290,16 +692,30 @@ def generate_integration_report(integrated_data: Dict, output_path: str):
 
 
 def main():
+    import argparse
+
     # 配置路径
-    base_dir = "/Users/wenyongteng/twitter hot news/weekly_monitor/weekly_reports"
-    output_dir = "/Users/wenyongteng/vibe_coding/twitter_product_trends-20251022/data_sources"
+    parser = argparse.ArgumentParser(description='Twitter 原始数据集成')
+    parser.add_argument('--base-dir', default="/Users/wenyongteng/twitter hot news/weekly_monitor/weekly_reports",
+                        help='周报根目录')
+    parser.add_argument('--output-dir', default="/Users/wenyongteng/vibe_coding/twitter_product_trends-20251022/data_sources",
+                        help='输出目录')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：只解析新增的周，写入或刷新分片归档中对应周的分片（integrated_all_tweets/）')
+    parser.add_argument('--no-dedup', action='store_true', help='不做跨周去重')
+    parser.add_argument('--format', choices=['sharded', 'json'], default='sharded',
+                        help='全量模式的输出格式：sharded 为每周一个 gzip 压缩的 NDJSON 分片 + 清单'
+                             '（integrated_all_tweets/），json 为单个 integrated_all_tweets.json')
+    args = parser.parse_args()
+    base_dir = args.base_dir
+    output_dir = args.output_dir
 
     # 确保输出目录存在
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
     print("🔍 开始扫描所有周报目录...")
 
-    # 查找所有 raw_data.json
+    # 查找所有原始推文数据
     raw_data_files = find_all_raw_data_files(base_dir)
 
     print(f"\n📊 找到 {len(raw_data_files)} 个包含原始数据的周报:")
@@ -307,18 +723,39 @@ def main():
         print(f"  - {f['week_name']}: {f['file_size_mb']} MB")
     print()
 
-    # 集成数据
-    print("🔄 开始集成所有原始推文数据...\n")
-    integrated_data = integrate_all_raw_data(raw_data_files)
-
-    # 保存完整 JSON（包含所有推文）
-    json_output_path = os.path.join(output_dir, "integrated_all_tweets.json")
-    print(f"\n💾 保存完整数据...")
-    with open(json_output_path, 'w', encoding='utf-8') as f:
-        json.dump(integrated_data, f, ensure_ascii=False, indent=2)
-
-    print(f"✅ 完整数据已保存: {json_output_path}")
-    file_size = Path(json_output_path).stat().st_size / (1024 * 1024)
+    if args.incremental:
+        print("🔄 开始增量集成原始推文数据...\n")
+        integrated_data = integrate_incremental(raw_data_files, output_dir, dedup=not args.no_dedup)
+        json_output_path = os.path.join(output_dir, ARCHIVE_DIR)
+        print(f"\n✅ 分片归档已更新: {json_output_path} ({len(TweetArchive(json_output_path).weeks())} 个分片)")
+    else:
+        # 集成数据
+        print("🔄 开始集成所有原始推文数据...\n")
+        integrated_data = integrate_all_raw_data(raw_data_files, dedup=not args.no_dedup)
+
+        if args.format == 'sharded':
+            # 每周一个压缩分片，推文只存一份；汇总单独保存
+            json_output_path = os.path.join(output_dir, ARCHIVE_DIR)
+            print(f"\n💾 保存分片归档...")
+            summary = {key: value for key, value in integrated_data.items()
+                       if key not in ('all_tweets', 'tweets_by_week')}
+            manifest = write_archive(json_output_path, integrated_data['tweets_by_week'].items(), summary)
+
+            print(f"✅ 分片归档已保存: {json_output_path} ({len(manifest['weeks'])} 个分片)")
+        else:
+            # 保存完整 JSON（包含所有推文）
+            json_output_path = os.path.join(output_dir, "integrated_all_tweets.json")
+            print(f"\n💾 保存完整数据...")
+            with open(json_output_path, 'w', encoding='utf-8') as f:
+                json.dump(integrated_data, f, ensure_ascii=False, indent=2)
+
+            print(f"✅ 完整数据已保存: {json_output_path}")
+
+    output_path = Path(json_output_path)
+    if output_path.is_dir():
+        file_size = sum(item.stat().st_size for item in output_path.iterdir()) / (1024 * 1024)
+    else:
+        file_size = output_path.stat().st_size / (1024 * 1024)
     print(f"   文件大小: {file_size:.2f} MB")
 
     # 生成报告
@@ -331,12 +768,13 @@ def main():
     print("📊 数据集成完成！")
     print("="*70)
     print(f"总推文数: {integrated_data['statistics']['total_tweets']:,} 条")
+    print(f"跨周去重: 丢弃 {integrated_data['statistics']['duplicates_dropped']:,} 条重复推文")
     print(f"总 KOL 数: {integrated_data['statistics']['total_kols']} 位")
     print(f"数据周数: {integrated_data['metadata']['total_weeks']} 周")
     print(f"时间范围: {integrated_data['statistics']['date_range']['earliest']} "
           f"至 {integrated_data['statistics']['date_range']['latest']}")
     print(f"\n输出文件:")
-    print(f"  - 完整推文 JSON: {json_output_path} ({file_size:.2f} MB)")
+    print(f"  - 推文数据: {json_output_path} ({file_size:.2f} MB)")
     print(f"  - 集成报告: {report_output_path}")
     print("="*70)
 
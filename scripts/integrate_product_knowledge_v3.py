@@ -2,71 +2,43 @@
 # -*- coding: utf-8 -*-
 """
 Product Knowledge 集成脚本 v3
-直接从 raw_data.json 提取所有产品（不限于 Top 30）
+直接从原始推文数据（raw_tweets.ndjson 或旧格式 raw_data.json）提取所有产品（不限于 Top 30）
 """
 
 import json
-import re
+import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, Counter
 from typing import Dict, List, Set
 
+# 复用 twitter_monitor 的核心模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
 
-# ============ 产品提取逻辑 (复用 analyze_tweets.py) ============
-
-def extract_products(text: str) -> List[str]:
-    """从文本中提取产品名"""
-    products = set()
-
-    # 产品提取规则 (复用 analyze_tweets.py 的逻辑)
-    patterns = [
-        # AI 模型和产品
-        r'\b(GPT-[0-9o]+(?:\s+(?:mini|turbo|pro|high|minimal|codex))?)\b',
-        r'\b(Claude(?:\s+[0-9.]+)?(?:\s+(?:Opus|Sonnet|Haiku))?)\b',
-        r'\b(Gemini(?:\s+[0-9.]+)?(?:\s+(?:Pro|Flash|Ultra|Nano\s+Banana))?)\b',
-        r'\b(Llama\s+[0-9.]+)\b',
-        r'\b(Mistral\s+[0-9.]+)\b',
-        r'\b(DeepSeek(?:\s+V[0-9.]+)?(?:\s+(?:Exp|R1))?)\b',
-        r'\b(Qwen(?:[0-9.]+)?)\b',
-
-        # 公司和平台
-        r'\b(OpenAI|Anthropic|Google|Meta|xAI|Microsoft)\b',
-        r'\b(ChatGPT|Copilot|Cursor|Midjourney)\b',
-        r'\b(GitHub\s+Copilot|VS\s+Code)\b',
-
-        # 工具和应用
-        r'\b(Sora|DALL-E|Stable\s+Diffusion|Seedream)\b',
-        r'\b(NotebookLM|Lovable|Replit|Vercel)\b',
-        r'\b(Perplexity|Grok)\b',
-    ]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if len(match.groups()) > 0:
-                products.add(match.group(1) if match.group(1) else match.group(0))
-            else:
-                products.add(match.group(0))
-
-    return list(products)
-
-
-def get_sentiment(text: str) -> str:
-    """简单情感分析"""
-    positive_words = ['love', 'amazing', 'great', 'awesome', 'excellent', 'fantastic', 'incredible', 'best']
-    negative_words = ['hate', 'terrible', 'awful', 'bad', 'poor', 'disappointed', 'worst', 'sucks']
-
-    text_lower = text.lower()
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
-
-    if pos_count > neg_count:
-        return 'positive'
-    elif neg_count > pos_count:
-        return 'negative'
-    else:
-        return 'neutral'
+from core.metrics import get_run_metrics
+from core.product_patterns import KIND_PRODUCT, ProductPatternEngine, get_default_engine, knowledge_terms
+from core.parallel import DEFAULT_SHARD_SIZE, map_shards, resolve_workers
+from core.raw_data_io import iter_tweets, load_metadata, week_dir_of
+from core.records import MentionIndex, TweetRecord
+from core.timeutil import tweet_timestamp
+from core.tweet_index import FIELD_PRODUCT, open_index
+from core.tweet_features import TweetFeatureExtractor, get_sentiment
+from core.tweet_schema import tweet_author
+from product_knowledge_index import DEFAULT_FUZZY_THRESHOLD, ProductKnowledgeIndex
+
+
+# ============ 产品提取逻辑 (与 analyze_tweets.py 共用 core/product_patterns.py) ============
+
+def build_product_engine(pk_dict: Dict) -> ProductPatternEngine:
+    """用 Product Knowledge 的产品名和别名构建产品识别引擎"""
+    names, aliases = knowledge_terms(pk_dict.values())
+    return ProductPatternEngine(knowledge_names=names, aliases=aliases)
+
+
+def extract_products(text: str, engine: ProductPatternEngine = None) -> List[str]:
+    """从文本中提取产品名（只取产品，不含发布对象和未知账号的@提及）"""
+    engine = engine or get_default_engine()
+    return engine.extract(text, kinds=(KIND_PRODUCT,))
 
 
 # ============ Product Knowledge 数据库操作 ============
@@ -155,28 +127,41 @@ def normalize_product_name(name: str) -> str:
     return name
 
 
-def match_product_to_knowledge(product_name: str, pk_dict: Dict) -> tuple:
+def load_product_knowledge_index(pk_version_path: str) -> ProductKnowledgeIndex:
+    """加载 Product Knowledge 索引（持久化在 products_list.json 旁，知识库变化时自动重建）"""
+    products_file = Path(pk_version_path) / "products_list.json"
+
+    if not products_file.exists():
+        return ProductKnowledgeIndex([])
+
+    return ProductKnowledgeIndex.for_products_file(products_file)
+
+
+def match_product_to_knowledge(product_name: str, pk_dict: Dict,
+                               index: ProductKnowledgeIndex = None,
+                               fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD) -> tuple:
     """
     匹配产品到知识库
     返回: (匹配类型, 规范名称, 知识数据)
     匹配类型: 'exact' | 'fuzzy' | 'new'
+
+    index 为空时临时从 pk_dict 构建（批量匹配时应传入共享索引）
     """
     normalized = normalize_product_name(product_name)
 
-    # 精确匹配
-    if normalized in pk_dict:
-        kb_product = pk_dict[normalized]
-        return ('exact', kb_product.get('name', normalized), kb_product)
+    if index is None:
+        index = ProductKnowledgeIndex(list(pk_dict.values()))
 
-    # 大小写不敏感匹配
-    if normalized.lower() in pk_dict:
-        kb_product = pk_dict[normalized.lower()]
+    # 精确匹配（原写法 / 大小写不敏感 / 别名）
+    match_type, kb_product = index.lookup(normalized)
+    if kb_product is not None:
         return ('exact', kb_product.get('name', normalized), kb_product)
 
-    # 模糊匹配 (简化版)
-    for kb_name, kb_product in pk_dict.items():
-        if kb_name.lower() == normalized.lower():
-            return ('fuzzy', kb_product.get('name', kb_name), kb_product)
+    # 模糊匹配（三元组候选 + Dice 相似度）
+    candidates = index.fuzzy_candidates(normalized, threshold=fuzzy_threshold, limit=1)
+    if candidates:
+        _, surface, kb_product = candidates[0]
+        return ('fuzzy', kb_product.get('name', surface), kb_product)
 
     # 没找到 -> 新产品
     return ('new', normalized, None)
@@ -184,81 +169,171 @@ def match_product_to_knowledge(product_name: str, pk_dict: Dict) -> tuple:
 
 # ============ 主处理流程 ============
 
-def extract_all_products_from_raw_data(raw_data_file: str) -> Dict:
-    """从 raw_data.json 提取所有产品 (不限于 Top 30)"""
-
-    print(f"\n📂 读取原始推文数据: {raw_data_file}")
-
-    with open(raw_data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def new_product_aggregates() -> Dict:
+    """空的部分聚合结果（串行处理和并行分片共用同一结构）"""
+    return {
+        'total_tweets': 0,
+        'tweets': [],  # 提到产品的推文（TweetRecord）
+        'product_mentions': MentionIndex(),  # product -> 推文下标
+        'sentiment_stats': defaultdict(Counter),  # product -> {positive: N, neutral: M, ...}
+        'kol_mentions': defaultdict(set),  # product -> {kol1, kol2, ...}
+    }
 
-    tweets = data.get('tweets', [])
-    print(f"   - 推文总数: {len(tweets)}")
 
-    # 产品统计
-    product_mentions = defaultdict(list)  # product -> [tweets]
-    sentiment_stats = defaultdict(Counter)  # product -> {positive: N, neutral: M, ...}
-    kol_mentions = defaultdict(set)  # product -> {kol1, kol2, ...}
+def aggregate_product_mentions(tweets, extractor: TweetFeatureExtractor, aggregates: Dict = None,
+                               expected_total=None, precomputed=None) -> Dict:
+    """
+    把推文中的产品提及累加到部分聚合结果中
+
+    Args:
+        tweets: 推文（可迭代）
+        extractor: 推文特征提取器（只提取产品）
+        aggregates: 已有的部分聚合结果（默认新建）
+        expected_total: 推文总数（传入时每 500 条打印一次进度）
+        precomputed: 与 tweets 一一对应的已提取特征（可选，传入时不再调用 extractor）
+    """
+    if aggregates is None:
+        aggregates = new_product_aggregates()
+    precomputed = iter(precomputed) if precomputed is not None else None
 
-    print(f"\n🔍 提取所有产品...")
+    records = aggregates['tweets']
+    product_mentions = aggregates['product_mentions']
+    sentiment_stats = aggregates['sentiment_stats']
+    kol_mentions = aggregates['kol_mentions']
 
-    for i, tweet in enumerate(tweets, 1):
-        if i % 500 == 0:
-            print(f"   处理进度: {i}/{len(tweets)}")
+    for tweet in tweets:
+        aggregates['total_tweets'] += 1
+        i = aggregates['total_tweets']
+        if expected_total is not None and i % 500 == 0:
+            print(f"   处理进度: {i}/{expected_total}")
 
         text = tweet.get('text', '')
-        author = tweet.get('author', {})
-        kol = author.get('username', 'unknown') if isinstance(author, dict) else str(author)
+        kol = tweet_author(tweet) or 'unknown'
+
+        # 提取特征（产品、情感、新品标记，一次小写化）
+        features = next(precomputed) if precomputed is not None else extractor.extract(text)
+        if not features.known_products:
+            continue
 
-        # 提取产品
-        products = extract_products(text)
+        # 每条推文只存一份记录，各产品的提及只记下标
+        index = len(records)
+        records.append(TweetRecord(
+            text, kol, tweet.get('rank', 0), tweet.get('followers', 0),
+            tweet.get('likes', 0), tweet.get('retweets', 0), tweet.get('created_at', ''),
+            features.sentiment, features.launch_or_new,
+        ))
 
-        for product in products:
+        for product in features.known_products:
             # 标准化产品名
             product = normalize_product_name(product)
 
             # 记录提及
-            product_mentions[product].append({
-                'text': text,
-                'kol': kol,
-                'rank': tweet.get('rank', 0),
-                'followers': tweet.get('followers', 0),
-                'likes': tweet.get('likes', 0),
-                'retweets': tweet.get('retweets', 0),
-                'created_at': tweet.get('created_at', ''),
-                'sentiment': get_sentiment(text),
-                'is_new': 'launch' in text.lower() or 'new' in text.lower()
-            })
+            product_mentions[product].append(index)
 
             # 统计
-            sentiment_stats[product][get_sentiment(text)] += 1
+            sentiment_stats[product][features.sentiment] += 1
             if kol:  # 确保 kol 不为空
                 kol_mentions[product].add(kol)
 
+    return aggregates
+
+
+def merge_product_aggregates(aggregates: Dict, part: Dict) -> Dict:
+    """把后一个分片的部分聚合结果合并进来（按推文顺序合并时与串行处理一致）"""
+    aggregates['total_tweets'] += part['total_tweets']
+    offset = len(aggregates['tweets'])
+    aggregates['tweets'].extend(part['tweets'])
+    aggregates['product_mentions'].merge(part['product_mentions'], offset)
+    for product, counts in part['sentiment_stats'].items():
+        aggregates['sentiment_stats'][product].update(counts)
+    for product, kols in part['kol_mentions'].items():
+        aggregates['kol_mentions'][product].update(kols)
+    return aggregates
+
+
+_worker_extractor = None
+
+
+def _init_extract_worker(engine: ProductPatternEngine):
+    """工作进程初始化：构建一次只提取产品的特征提取器"""
+    global _worker_extractor
+    _worker_extractor = TweetFeatureExtractor(engine, product_kinds=(KIND_PRODUCT,))
+
+
+def _aggregate_shard(tweets) -> Dict:
+    """进程池中处理一个分片"""
+    return aggregate_product_mentions(tweets, _worker_extractor)
+
+
+def extract_all_products_from_raw_data(raw_data_file: str, engine: ProductPatternEngine = None,
+                                       tweets: List[Dict] = None, metadata: Dict = None,
+                                       workers: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+                                       features: List = None) -> Dict:
+    """
+    从原始推文数据提取所有产品 (不限于 Top 30)，推文以流式逐条处理，每条推文只扫描一次
+
+    tweets / metadata 为已加载的推文和元数据（可选，传入时不再读取数据文件）；
+    features 为与 tweets 一一对应的已提取特征（可选，进程内流水线与推文分析共用，传入时不再扫描推文）；
+    workers > 1 时推文按 shard_size 分片交给进程池，部分结果按顺序合并，输出与串行一致
+    """
+
+    print(f"\n📂 读取原始推文数据: {raw_data_file}")
+
+    if metadata is None:
+        metadata = load_metadata(raw_data_file)
+    expected_total = metadata.get('total_tweets', '?')
+    print(f"   - 推文总数: {expected_total}")
+
+    print(f"\n🔍 提取所有产品...")
+
+    source = iter_tweets(raw_data_file) if tweets is None else tweets
+    engine = engine or get_default_engine()
+
+    if features is not None:
+        print("   - 使用已提取的特征")
+        aggregates = aggregate_product_mentions(source, None, expected_total=expected_total, precomputed=features)
+    elif workers > 1:
+        print(f"   - 并行: {workers} 个进程，每个分片 {shard_size} 条")
+        aggregates = new_product_aggregates()
+        shards = map_shards(_aggregate_shard, source, workers, shard_size,
+                            initializer=_init_extract_worker, initargs=(engine,))
+        for part in shards:
+            merge_product_aggregates(aggregates, part)
+            print(f"   处理进度: {aggregates['total_tweets']}/{expected_total}")
+    else:
+        extractor = TweetFeatureExtractor(engine, product_kinds=(KIND_PRODUCT,))
+        aggregates = aggregate_product_mentions(source, extractor, expected_total=expected_total)
+
+    records = aggregates['tweets']
+    product_mentions = aggregates['product_mentions']
+    sentiment_stats = aggregates['sentiment_stats']
+
     print(f"\n✅ 提取完成!")
     print(f"   - 识别产品: {len(product_mentions)} 个")
 
     # 构造 twitter_products 数据结构
     twitter_products = {}
 
-    for product, mentions in product_mentions.items():
+    for product, indices in product_mentions.items():
+        mentions = [records[index] for index in indices]
+
         # 按互动数排序
         sorted_mentions = sorted(
             mentions,
-            key=lambda x: x['likes'] + x['retweets'],
+            key=lambda x: x.engagement,
             reverse=True
         )
 
         # Top KOLs (按提及次数)
-        kol_counts = Counter([m['kol'] for m in mentions])
+        kol_counts = Counter([m.kol for m in mentions])
         top_kols = [kol for kol, _ in kol_counts.most_common(5)]
 
         twitter_products[product] = {
             'mention_count': len(mentions),
             'top_kols': top_kols,
             'sentiment': dict(sentiment_stats[product]),
-            'total_engagement': sum(m['likes'] + m['retweets'] for m in mentions),
-            'sample_tweets': sorted_mentions[:3]  # Top 3 推文
+            'total_engagement': sum(m.engagement for m in mentions),
+            'sample_tweets': [m.to_mention() for m in sorted_mentions[:3]]  # Top 3 推文
         }
 
     return twitter_products
@@ -276,7 +351,9 @@ def is_company_entity(product_name: str) -> bool:
     return product_name in companies
 
 
-def classify_products(twitter_products: Dict, pk_dict: Dict) -> Dict:
+def classify_products(twitter_products: Dict, pk_dict: Dict,
+                      index: ProductKnowledgeIndex = None,
+                      fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD) -> Dict:
     """分类产品: 新产品 vs 已有产品 vs 公司实体"""
 
     new_products = []
@@ -295,9 +372,14 @@ def classify_products(twitter_products: Dict, pk_dict: Dict) -> Dict:
 
     print(f"   - 知识库产品数: {len(unique_kb_products)}")
 
+    if index is None:
+        index = ProductKnowledgeIndex(list(pk_dict.values()))
+
+    metrics = get_run_metrics()
     for product_name, twitter_data in twitter_products.items():
         # 首先检查是否为公司实体
         if is_company_entity(product_name):
+            metrics.incr('kb_matching.company')
             companies.append({
                 'name': product_name,
                 'twitter_data': twitter_data,
@@ -305,7 +387,10 @@ def classify_products(twitter_products: Dict, pk_dict: Dict) -> Dict:
             })
             continue
 
-        match_type, canonical_name, kb_data = match_product_to_knowledge(product_name, pk_dict)
+        match_type, canonical_name, kb_data = match_product_to_knowledge(
+            product_name, pk_dict, index=index, fuzzy_threshold=fuzzy_threshold
+        )
+        metrics.incr(f"kb_matching.{match_type}")
 
         if match_type == 'exact':
             # 已有产品
@@ -478,8 +563,56 @@ def generate_enhanced_report(classification: Dict, output_file: str, date_range:
     print(f"\n✅ 增强版报告已生成: {output_file}")
 
 
-def update_product_knowledge(new_products: List[Dict], pk_version_path: str) -> str:
-    """更新 Product Knowledge 数据库"""
+def find_first_mentions(raw_data_file: str, names: List[str], engine: ProductPatternEngine = None) -> Dict:
+    """
+    用周数据的推文索引查找产品的首次提及推文（只读取命中的推文，不扫描整周数据）
+
+    产品名与 extract_all_products_from_raw_data 一致：索引按同一识别引擎建立（不一致时重建），
+    索引键经 normalize_product_name 归并后查找，命中的推文再按只取产品（KIND_PRODUCT）的规则核对
+
+    Args:
+        raw_data_file: 周目录或数据文件
+        names: 产品名（normalize_product_name 之后的名称）
+        engine: 提取产品时使用的识别引擎（默认内置产品词表）
+
+    Returns:
+        dict: {产品名: 最早的推文}；没有索引（旧格式数据）或索引中没有该产品时不包含
+    """
+    engine = engine or get_default_engine()
+    index = open_index(raw_data_file, engine=engine)
+    if index is None:
+        return {}
+
+    keys_by_name = defaultdict(list)
+    for key in index.keys(FIELD_PRODUCT):
+        keys_by_name[normalize_product_name(key)].append(key)
+
+    first_mentions = {}
+    with index:
+        for name in names:
+            offsets = sorted({offset for key in keys_by_name.get(name, [])
+                              for offset in index.offsets(FIELD_PRODUCT, key)})
+            tweets = []
+            for offset in offsets:
+                tweet = index.read_at(offset)
+                if tweet_timestamp(tweet) is None:
+                    continue
+                products = extract_products(tweet.get('text', ''), engine)
+                if any(normalize_product_name(product) == name for product in products):
+                    tweets.append(tweet)
+            if tweets:
+                first_mentions[name] = min(tweets, key=tweet_timestamp)
+    return first_mentions
+
+
+def update_product_knowledge(new_products: List[Dict], pk_version_path: str, raw_data_file: str = None,
+                             engine: ProductPatternEngine = None) -> str:
+    """
+    更新 Product Knowledge 数据库
+
+    raw_data_file 为本周原始数据（可选）：提供时通过推文索引找到每个新产品的首次提及推文，
+    填入 first_mention_time / first_mention_tweet_id；engine 为提取这些产品时使用的识别引擎
+    """
 
     if not new_products:
         print("\n⚠️  没有新产品需要添加到数据库")
@@ -501,13 +634,16 @@ def update_product_knowledge(new_products: List[Dict], pk_version_path: str) ->
     # 计算新的 ID
     max_id = max([p.get('id', 0) for p in products_list], default=0)
 
+    first_mentions = (find_first_mentions(raw_data_file, [p['name'] for p in new_products], engine)
+                      if raw_data_file else {})
+
     # 添加新产品
     for i, new_product in enumerate(new_products, 1):
         name = new_product['name']
         twitter_data = new_product['twitter_data']
 
-        # 找到首次提及的推文
-        first_tweet = twitter_data.get('sample_tweets', [{}])[-1]  # 最后一条通常最早
+        # 找到首次提及的推文（没有索引时退回样例推文的最后一条，通常最早）
+        first_tweet = first_mentions.get(name) or twitter_data.get('sample_tweets', [{}])[-1]
 
         products_list.append({
             'id': max_id + i,
@@ -516,7 +652,7 @@ def update_product_knowledge(new_products: List[Dict], pk_version_path: str) ->
             'versions': [],
             'mention_count': twitter_data.get('mention_count', 0),
             'first_mention_time': first_tweet.get('created_at', datetime.now().isoformat()),
-            'first_mention_tweet_id': None,  # 需要从原始数据获取
+            'first_mention_tweet_id': first_tweet.get('id'),
             'confidence': 0.7  # 默认置信度
         })
 
@@ -564,20 +700,19 @@ def update_product_knowledge(new_products: List[Dict], pk_version_path: str) ->
     return str(new_version_path)
 
 
-def main(raw_data_file: str):
-    """主流程"""
-
-    print("=" * 80)
-    print("🚀 Product Knowledge Integration v3 (处理所有产品)")
-    print("=" * 80)
+def load_knowledge_state(config: Dict = None) -> Dict:
+    """
+    加载 Product Knowledge 状态（知识库、索引、产品识别引擎、模糊匹配阈值）
 
-    # 1. 从 raw_data.json 提取所有产品
-    twitter_products = extract_all_products_from_raw_data(raw_data_file)
+    进程内流水线可以预先加载一次，在多次集成之间共享
 
-    # 2. 加载 Product Knowledge
-    config_file = Path(__file__).parent.parent / "config" / "integration_config.json"
-    with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    Args:
+        config: integration_config.json 内容（默认从 config/ 读取）
+    """
+    if config is None:
+        config_file = Path(__file__).parent.parent / "config" / "integration_config.json"
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
 
     pk_project_path = Path(config['product_knowledge']['project_path'])
     pk_current_version = config['product_knowledge']['current_version']
@@ -585,35 +720,90 @@ def main(raw_data_file: str):
 
     pk_dict = load_product_knowledge(str(pk_version_path))
 
+    return {
+        'pk_version_path': pk_version_path,
+        'pk_dict': pk_dict,
+        'index': load_product_knowledge_index(str(pk_version_path)),
+        # 知识库产品名和别名一并编入识别引擎
+        'engine': build_product_engine(pk_dict),
+        'fuzzy_threshold': config['product_knowledge'].get('api_config', {}).get(
+            'fuzzy_threshold', DEFAULT_FUZZY_THRESHOLD
+        ),
+    }
+
+
+def main(raw_data_file: str, tweets: List[Dict] = None, metadata: Dict = None,
+         knowledge: Dict = None, interactive: bool = True, workers: int = 1, features: List = None):
+    """
+    主流程
+
+    Args:
+        raw_data_file: 原始推文数据（周目录 / raw_tweets.ndjson / raw_data.json）
+        tweets: 已加载的推文（可选，进程内流水线传入，避免重复读取）
+        metadata: 已加载的元数据（可选）
+        knowledge: load_knowledge_state() 的结果（可选）
+        interactive: 发现新产品时是否询问更新 Product Knowledge（False 时跳过）
+        workers: 产品提取的并行进程数（1 为串行）
+        features: 与 tweets 一一对应的已提取特征（可选，须由 knowledge['engine'] 提取）
+    """
+
+    print("=" * 80)
+    print("🚀 Product Knowledge Integration v3 (处理所有产品)")
+    print("=" * 80)
+
+    metrics = get_run_metrics()
+
+    # 1. 加载 Product Knowledge
+    if knowledge is None:
+        with metrics.span('load_knowledge'):
+            knowledge = load_knowledge_state()
+    pk_version_path = knowledge['pk_version_path']
+    pk_dict = knowledge['pk_dict']
+
+    if metadata is None:
+        metadata = load_metadata(raw_data_file)
+
+    # 2. 从原始推文数据提取所有产品
+    with metrics.span('extraction', workers=workers):
+        twitter_products = extract_all_products_from_raw_data(
+            raw_data_file, knowledge['engine'], tweets=tweets, metadata=metadata, workers=workers,
+            features=features
+        )
+    metrics.incr('extraction.products', len(twitter_products))
+
     # 3. 分类产品
-    classification = classify_products(twitter_products, pk_dict)
+    with metrics.span('kb_matching'):
+        classification = classify_products(
+            twitter_products, pk_dict, index=knowledge['index'], fuzzy_threshold=knowledge['fuzzy_threshold']
+        )
 
     # 4. 生成报告
-    week_dir = Path(raw_data_file).parent
+    week_dir = Path(week_dir_of(raw_data_file))
     output_file = week_dir / "enhanced_report_v3.md"
 
-    with open(raw_data_file, 'r', encoding='utf-8') as f:
-        raw_data = json.load(f)
-
-    date_range = raw_data.get('metadata', {}).get('date_range', {})
-    date_range['total_tweets'] = len(raw_data.get('tweets', []))
+    date_range = dict(metadata.get('date_range', {}))
+    date_range['total_tweets'] = metadata.get('total_tweets', 'N/A')
 
-    generate_enhanced_report(classification, str(output_file), date_range)
+    with metrics.span('report_rendering'):
+        generate_enhanced_report(classification, str(output_file), date_range)
 
     # 5. 保存分类结果
     classification_file = week_dir / "product_classification_v3.json"
-    with open(classification_file, 'w', encoding='utf-8') as f:
-        json.dump(classification, f, ensure_ascii=False, indent=2)
+    with metrics.span('write_classification'):
+        with open(classification_file, 'w', encoding='utf-8') as f:
+            json.dump(classification, f, ensure_ascii=False, indent=2)
 
     print(f"✅ 产品分类已保存: {classification_file}")
 
     # 6. 更新 Product Knowledge (可选)
-    if classification['new_products']:
+    if classification['new_products'] and interactive:
         update_pk = input(f"\n发现 {len(classification['new_products'])} 个新产品。是否更新 Product Knowledge? (y/n): ")
         if update_pk.lower() == 'y':
             new_version_path = update_product_knowledge(
                 classification['new_products'],
-                str(pk_version_path)
+                str(pk_version_path),
+                raw_data_file=raw_data_file,
+                engine=knowledge['engine']
             )
             print(f"\n💡 提示: 记得更新配置文件中的 current_version 为: {Path(new_version_path).name}")
 
@@ -621,13 +811,20 @@ def main(raw_data_file: str):
     print("✅ 完成!")
     print("=" * 80)
 
+    return classification
+
 
 if __name__ == "__main__":
-    import sys
+    import argparse
 
     if len(sys.argv) < 2:
-        print("用法: python integrate_product_knowledge_v3.py <raw_data.json>")
+        print("用法: python integrate_product_knowledge_v3.py <raw_tweets.ndjson | raw_data.json | 周目录> [--workers N]")
         sys.exit(1)
 
-    raw_data_file = sys.argv[1]
-    main(raw_data_file)
+    parser = argparse.ArgumentParser(description='Product Knowledge 集成 v3')
+    parser.add_argument('raw_data_file', help='raw_tweets.ndjson | raw_data.json | 周目录')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='产品提取的并行进程数（默认 1 串行，0 使用全部 CPU）')
+    args = parser.parse_args()
+
+    main(args.raw_data_file, workers=resolve_workers(args.workers))
@@ -13,6 +13,10 @@ from datetime import datetime
 from twitter_collector import TwitterCollector
 from product_processor import ProductProcessor
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.tweet_archive import ARCHIVE_DIR, TweetArchive, is_archive
+
 
 def main_workflow(days=7, kol_count=300, test_mode=False):
     """
@@ -43,17 +47,23 @@ def main_workflow(days=7, kol_count=300, test_mode=False):
         if test_mode:
             # 测试模式: 使用已有数据
             print("   🧪 测试模式: 使用已有数据")
-            data_file = Path(__file__).parent.parent / "data_sources" / "integrated_all_tweets.json"
-
-            if not data_file.exists():
-                print(f"   ❌ 测试数据不存在: {data_file}")
+            data_dir = Path(__file__).parent.parent / "data_sources"
+            archive_dir = data_dir / ARCHIVE_DIR
+            data_file = data_dir / "integrated_all_tweets.json"
+
+            if is_archive(archive_dir):
+                # 分片归档：只解压前200条所在的压缩块
+                raw_tweets = TweetArchive(archive_dir).head(200)
+            elif data_file.exists():
+                import json
+                with open(data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                raw_tweets = data.get('all_tweets', [])[:200]  # 只用前200条测试
+            else:
+                print(f"   ❌ 测试数据不存在: {archive_dir}")
                 return None
 
-            import json
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            raw_tweets = data.get('all_tweets', [])[:200]  # 只用前200条测试
             print(f"   ✅ 加载测试数据: {len(raw_tweets)} 条推文")
 
         else:
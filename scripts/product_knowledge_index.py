@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Product Knowledge 索引
+精确 / casefold / 别名哈希表 + 三元组（trigram）倒排索引，
+产品匹配不再线性扫描整个知识库；索引持久化在 products_list.json 旁边，知识库文件变化时自动重建
+"""
+
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+INDEX_FILE = "products_index.json"
+INDEX_VERSION = 2
+
+DEFAULT_FUZZY_THRESHOLD = 0.85
+
+
+def iter_knowledge_products(data) -> List[Dict]:
+    """
+    从 products_list.json 内容中取出产品记录
+
+    支持两种格式:
+    - list 格式: {"total_products": N, "products": [{...}, ...]}
+    - 旧的字典格式: {"产品名": {...}, ...}
+    """
+    if isinstance(data, dict) and isinstance(data.get('products'), list):
+        return [p for p in data['products'] if isinstance(p, dict) and 'name' in p]
+
+    if isinstance(data, dict):
+        products = []
+        for name, product in data.items():
+            if isinstance(product, dict):
+                products.append(product if 'name' in product else {**product, 'name': name})
+        return products
+
+    return []
+
+
+def trigrams(text: str) -> set:
+    """casefold 后的字符三元组（首尾补空格，短名称也能产生三元组）"""
+    padded = f"  {' '.join(text.casefold().split())} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductKnowledgeIndex:
+    """Product Knowledge 产品索引"""
+
+    def __init__(self, products: List[Dict], state: Optional[Dict] = None):
+        """
+        构建索引
+
+        Args:
+            products: 产品记录列表（同一产品重复出现时只索引一次）
+            state: 已持久化的索引状态（从索引文件加载时传入，直接恢复词条、哈希表和三元组倒排表）
+        """
+        self.products = []
+        seen = set()
+        for product in products:
+            key = product.get('id', id(product))
+            if key in seen:
+                continue
+            seen.add(key)
+            self.products.append(product)
+
+        if state is not None:
+            self.surfaces = [tuple(surface) for surface in state['surfaces']]
+            self._exact = state['exact']
+            self._casefold = state['casefold']
+            self._trigrams = state['trigrams']
+            self._trigram_counts = state['trigram_counts']
+            return
+
+        # 词条: (写法, 产品序号, 是否别名)；产品名优先于别名
+        self.surfaces = []
+        self._exact = {}
+        self._casefold = {}
+        for is_alias in (False, True):
+            for position, product in enumerate(self.products):
+                names = (product.get('aliases') or []) if is_alias else [product['name']]
+                for surface in names:
+                    if not surface or surface in self._exact:
+                        continue
+                    surface_id = len(self.surfaces)
+                    self.surfaces.append((surface, position, is_alias))
+                    self._exact[surface] = surface_id
+                    self._casefold.setdefault(surface.casefold(), surface_id)
+
+        self._trigrams = {}
+        self._trigram_counts = []
+        for surface_id, (surface, _, _) in enumerate(self.surfaces):
+            grams = trigrams(surface)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(surface_id)
+
+    def __len__(self):
+        return len(self.products)
+
+    def lookup(self, name: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        精确查找（原写法 → casefold）
+
+        Returns:
+            tuple: (匹配类型, 产品记录)，匹配类型为 'exact' | 'alias' | None
+        """
+        surface_id = self._exact.get(name)
+        if surface_id is None:
+            surface_id = self._casefold.get(name.casefold())
+        if surface_id is None:
+            return None, None
+
+        _, position, is_alias = self.surfaces[surface_id]
+        return ('alias' if is_alias else 'exact'), self.products[position]
+
+    def fuzzy_candidates(self, name: str, threshold: float = DEFAULT_FUZZY_THRESHOLD,
+                         limit: int = 5) -> List[Tuple[float, str, Dict]]:
+        """
+        模糊候选：只对与查询共享三元组的词条计算 Dice 系数
+
+        Args:
+            name: 产品名
+            threshold: 最低相似度
+            limit: 最多返回的候选数
+
+        Returns:
+            list: [(相似度, 匹配到的写法, 产品记录), ...]，按相似度降序
+        """
+        query = trigrams(name)
+        shared = Counter()
+        for gram in query:
+            for surface_id in self._trigrams.get(gram, ()):
+                shared[surface_id] += 1
+
+        best = {}
+        for surface_id, count in shared.items():
+            score = 2 * count / (len(query) + self._trigram_counts[surface_id])
+            if score < threshold:
+                continue
+            surface, position, _ = self.surfaces[surface_id]
+            if position not in best or score > best[position][0]:
+                best[position] = (score, surface, self.products[position])
+
+        candidates = sorted(best.values(), key=lambda c: (-c[0], c[1]))
+        return candidates[:limit]
+
+    # ============ 持久化 ============
+
+    @staticmethod
+    def _fingerprint(products_file: Path) -> Dict:
+        stat = products_file.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def save(self, index_file: Path, products_file: Path):
+        """写入索引文件（完整索引状态 + 知识库文件指纹，用于判断索引是否过期）"""
+        payload = {
+            'version': INDEX_VERSION,
+            'source': self._fingerprint(products_file),
+            'product_count': len(self.products),
+            'surfaces': self.surfaces,
+            'exact': self._exact,
+            'casefold': self._casefold,
+            'trigrams': self._trigrams,
+            'trigram_counts': self._trigram_counts,
+        }
+        tmp_file = Path(str(index_file) + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+
+    @classmethod
+    def for_products_file(cls, products_file, data=None) -> 'ProductKnowledgeIndex':
+        """
+        加载知识库文件对应的索引（索引文件缺失或过期时重建并保存）
+
+        Args:
+            products_file: products_list.json 路径
+            data: 已读取的 products_list.json 内容（可选，避免重复读取）
+
+        Returns:
+            ProductKnowledgeIndex
+        """
+        products_file = Path(products_file)
+        if data is None:
+            with open(products_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        products = iter_knowledge_products(data)
+
+        index_file = products_file.parent / INDEX_FILE
+        if index_file.exists():
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if (payload.get('version') == INDEX_VERSION and
+                        payload.get('source') == cls._fingerprint(products_file)):
+                    index = cls(products, state=payload)
+                    if len(index) == payload['product_count']:
+                        return index
+            except (OSError, ValueError, KeyError):
+                pass
+
+        index = cls(products)
+        try:
+            index.save(index_file, products_file)
+        except OSError as e:
+            print(f"⚠️  无法保存 Product Knowledge 索引: {e}")
+        return index
@@ -13,6 +13,18 @@ from typing import Dict, List, Optional
 from collections import defaultdict
 import time
 
+from product_knowledge_index import ProductKnowledgeIndex
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.llm_cache import LLMResponseCache, make_cache_key
+from core.metrics import get_run_metrics
+
+# 提取 prompt 模板版本（修改 prompt 或返回格式时递增，使旧的缓存响应失效）
+EXTRACTION_TEMPLATE_VERSION = "extraction-v1"
+
+DEFAULT_LLM_CACHE_DIR = Path(__file__).resolve().parent.parent / "weekly_reports" / "llm_cache"
+
 # 添加 product_knowledge 到 Python Path
 PRODUCT_KNOWLEDGE_PATH = Path("/Users/wenyongteng/vibe_coding/product_knowledge-20251022")
 sys.path.insert(0, str(PRODUCT_KNOWLEDGE_PATH))
@@ -56,6 +68,15 @@ class ProductProcessor:
         self.max_workers = extraction_config.get('max_workers', 8)
         self.rate_limit_delay = extraction_config.get('rate_limit_delay', 0.5)
 
+        # LLM 响应缓存（重跑同一批推文时不再请求）
+        self.llm_cache = None
+        if extraction_config.get('cache_enabled', True):
+            self.llm_cache = LLMResponseCache(
+                extraction_config.get('cache_dir', str(DEFAULT_LLM_CACHE_DIR)),
+                max_bytes=extraction_config.get('cache_max_bytes', 200 * 1024 * 1024),
+            )
+        self.llm_calls = 0
+
         # Product Knowledge 配置
         self.pk_project_path = Path(pk_config.get('project_path'))
         self.pk_current_version = pk_config.get('current_version')
@@ -67,8 +88,9 @@ class ProductProcessor:
             api_key=self.api_key
         )
 
-        # 加载现有产品数据库
+        # 加载现有产品数据库及其索引
         self.existing_products = self._load_existing_products()
+        self.product_index = self._load_product_index()
 
         # 提取结果
         self.extraction_result = None
@@ -91,6 +113,15 @@ class ProductProcessor:
 
         return products
 
+    def _load_product_index(self) -> ProductKnowledgeIndex:
+        """加载产品索引（名称 / 别名哈希表，持久化在 products_list.json 旁）"""
+        products_file = self.pk_versions_dir / self.pk_current_version / "products_list.json"
+
+        if not products_file.exists():
+            return ProductKnowledgeIndex([])
+
+        return ProductKnowledgeIndex.for_products_file(products_file, data=self.existing_products)
+
     def process(self, tweets: List[Dict]) -> Dict:
         """
         处理推文,提取和匹配产品
@@ -116,7 +147,9 @@ class ProductProcessor:
             "extraction_metadata": {
                 "timestamp": datetime.now().isoformat(),
                 "total_tweets": len(tweets),
-                "model_used": self.model
+                "model_used": self.model,
+                "llm_calls": self.llm_calls,
+                "llm_cache": dict(self.llm_cache.stats) if self.llm_cache is not None else None
             },
             "summary": {
                 "total_products_extracted": len(extracted_products),
@@ -139,6 +172,9 @@ class ProductProcessor:
         print(f"      - 新产品: {len(matched_results['new_products'])}")
         print(f"      - 已有产品: {len(matched_results['matched_products'])}")
         print(f"      - 新版本: {len(matched_results['new_releases'])}")
+        print(f"      - LLM调用: {self.llm_calls} 次")
+        if self.llm_cache is not None:
+            print(f"      - LLM缓存: {self.llm_cache.summary()}")
 
         return self.extraction_result
 
@@ -161,7 +197,8 @@ class ProductProcessor:
             # 构建批次文本
             batch_text = self._build_batch_text(batch)
 
-            # 调用 LLM 提取
+            # 调用 LLM 提取（命中缓存时不发请求）
+            calls_before = self.llm_calls
             products = self._call_llm_extract(batch_text, batch)
 
             # 去重
@@ -171,8 +208,8 @@ class ProductProcessor:
                     all_products.append(product)
                     product_names_seen.add(product_name)
 
-            # 速率限制
-            if i + self.batch_size < len(tweets):
+            # 速率限制（只在实际请求了 LLM 后等待）
+            if self.llm_calls > calls_before and i + self.batch_size < len(tweets):
                 time.sleep(self.rate_limit_delay)
 
         print(f"   ✅ 提取完成: {len(all_products)} 个不同产品")
@@ -190,7 +227,15 @@ class ProductProcessor:
         return "\n\n".join(batch_lines)
 
     def _call_llm_extract(self, batch_text: str, tweets: List[Dict]) -> List[Dict]:
-        """调用 LLM 提取产品"""
+        """调用 LLM 提取产品（响应按模型 + 模板版本 + 推文文本缓存）"""
+
+        metrics = get_run_metrics()
+        cache_key = make_cache_key(self.model, EXTRACTION_TEMPLATE_VERSION, batch_text)
+        if self.llm_cache is not None:
+            products = self.llm_cache.get(cache_key)
+            if products is not None:
+                metrics.incr('llm.cache_hits')
+                return self._attach_related_tweets(products, tweets)
 
         prompt = f"""你是一个专业的产品信息提取助手。请从以下推文中提取所有提到的**技术产品、工具、服务、平台或应用**。
 
@@ -220,12 +265,20 @@ class ProductProcessor:
 注意: 只返回JSON数组,不要有其他文字。"""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=2000
-            )
+            self.llm_calls += 1
+            metrics.incr('llm.calls')
+            metrics.incr('llm.prompt_chars', len(prompt))
+            with metrics.timed('llm.latency_s'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=2000
+                )
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                metrics.incr('llm.prompt_tokens', usage.prompt_tokens or 0)
+                metrics.incr('llm.completion_tokens', usage.completion_tokens or 0)
 
             content = response.choices[0].message.content.strip()
 
@@ -241,20 +294,27 @@ class ProductProcessor:
 
             products = json.loads(content)
 
-            # 添加推文引用
-            for product in products:
-                tweet_indices = product.get('mentioned_in_tweet_indices', [])
-                product['related_tweets'] = [
-                    tweets[idx - 1] for idx in tweet_indices
-                    if 0 < idx <= len(tweets)
-                ]
+            if self.llm_cache is not None and isinstance(products, list):
+                self.llm_cache.put(cache_key, products)
 
-            return products
+            return self._attach_related_tweets(products, tweets)
 
         except Exception as e:
             print(f"      ⚠️  提取失败: {e}")
+            metrics.incr('llm.errors')
             return []
 
+    def _attach_related_tweets(self, products: List[Dict], tweets: List[Dict]) -> List[Dict]:
+        """添加推文引用"""
+        for product in products:
+            tweet_indices = product.get('mentioned_in_tweet_indices', [])
+            product['related_tweets'] = [
+                tweets[idx - 1] for idx in tweet_indices
+                if 0 < idx <= len(tweets)
+            ]
+
+        return products
+
     def _match_products(self, extracted_products: List[Dict], tweets: List[Dict]) -> Dict:
         """匹配现有产品"""
 
@@ -269,29 +329,15 @@ class ProductProcessor:
             product_name = product.get('name', '').lower()
             version = product.get('version')
 
-            # 检查是否在现有数据库中
-            existing = None
-            for existing_name, existing_data in self.existing_products.items():
-                # 跳过非字典类型的值
-                if not isinstance(existing_data, dict):
-                    continue
-
-                if existing_name.lower() == product_name:
-                    existing = existing_data
-                    break
-
-                # 检查别名
-                aliases = existing_data.get('aliases', [])
-                if product_name in [a.lower() for a in aliases]:
-                    existing = existing_data
-                    break
+            # 检查是否在现有数据库中（名称或别名，大小写不敏感）
+            match_type, existing = self.product_index.lookup(product_name)
 
             if existing:
                 # 已有产品
                 matched_products.append({
                     **product,
                     'existing_data': existing,
-                    'match_type': 'exact' if existing_name.lower() == product_name else 'alias'
+                    'match_type': match_type
                 })
 
                 # 检查是否有新版本
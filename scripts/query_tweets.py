@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文查询工具
+按 KOL / UTC 日期 / 产品查询一周的推文，使用周目录中的推文索引（tweet_index.json + tweet_index.bin），
+只读取命中的推文；索引缺失或过期时先重建，旧格式 raw_data.json 退回全量扫描
+
+用法:
+    python3 scripts/query_tweets.py <周目录> --kol sama
+    python3 scripts/query_tweets.py <周目录> --day 2025-10-16 --count
+    python3 scripts/query_tweets.py <周目录> --product Claude --limit 5
+    python3 scripts/query_tweets.py <周目录> --list product
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 复用 twitter_monitor 的核心模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "twitter_monitor"))
+
+from core.tweet_index import FIELD_DAY, FIELD_KOL, FIELD_PRODUCT, FIELDS, open_index, select_tweets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按 KOL / 日期 / 产品查询推文')
+    parser.add_argument('data', help='周目录 / raw_tweets.ndjson')
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument('--kol', help='KOL 用户名')
+    query.add_argument('--day', help='UTC 日期 YYYY-MM-DD')
+    query.add_argument('--product', help='产品名称')
+    query.add_argument('--list', choices=FIELDS, help='列出某个字段的所有键及推文数')
+    parser.add_argument('--count', action='store_true', help='只输出命中条数')
+    parser.add_argument('--limit', type=int, default=None, help='最多输出的推文数')
+    args = parser.parse_args()
+
+    if args.list:
+        index = open_index(args.data)
+        if index is None:
+            print("❌ 旧格式数据没有推文索引")
+            sys.exit(1)
+        with index:
+            keys = sorted(index.keys(args.list), key=lambda key: index.count(args.list, key), reverse=True)
+            for key in keys[:args.limit]:
+                print(f"{index.count(args.list, key):6d}  {key}")
+        return
+
+    if args.kol:
+        field, key = FIELD_KOL, args.kol
+    elif args.day:
+        field, key = FIELD_DAY, args.day
+    else:
+        field, key = FIELD_PRODUCT, args.product
+
+    tweets = select_tweets(args.data, field, key)
+
+    if args.count:
+        print(len(tweets))
+        return
+
+    for tweet in tweets[:args.limit]:
+        print(json.dumps(tweet, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
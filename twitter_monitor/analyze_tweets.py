@@ -5,162 +5,199 @@
 """
 
 import json
-import re
+import os
 from collections import defaultdict, Counter
 from typing import List, Dict, Set
 from datetime import datetime
 
+from core.metrics import get_run_metrics
+from core.product_patterns import get_default_engine
+from core.parallel import DEFAULT_SHARD_SIZE, map_shards, resolve_workers
+from core.raw_data_io import iter_tweets, load_metadata, load_raw_data, week_dir_of
+from core.tweet_schema import metric
+from core.records import MentionIndex, TweetRecord
+from core.timeutil import day_key, tweet_timestamp
+from core.tweet_features import TweetFeatureExtractor, get_sentiment, is_new_product_mention
+
 def load_data(file_path: str) -> Dict:
-    """加载推文数据"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """加载推文数据（支持周目录、raw_tweets.ndjson 和旧格式 raw_data.json）"""
+    return load_raw_data(file_path)
 
 def extract_products(text: str) -> List[str]:
-    """提取产品/工具名称"""
-    # 常见产品关键词模式
-    product_patterns = [
-        # AI工具
-        r'\b(ChatGPT|GPT-?[0-9o]+|Claude|Gemini|Copilot|Cursor|Codeium|V0|Bolt|Windsurf|Lovable|Replit|Midjourney|DALL-E|Stable Diffusion|RunwayML|Suno|Udio)\b',
-        # 开发工具
-        r'\b(VS Code|WebStorm|IntelliJ|Xcode|Figma|Framer|Webflow|Notion|Linear|Slack|Discord|Telegram)\b',
-        # AI模型
-        r'\b(Llama ?[0-9.]+|DeepSeek|Qwen|GLM-?[0-9.]+|Mistral|Falcon|Mixtral|Grok)\b',
-        # AI平台
-        r'\b(HuggingFace|Replicate|Together AI|Anthropic|OpenAI|Google AI|Perplexity|Poe|Character\.AI)\b',
-        # 新产品关键词
-        r'(launched|releasing|introduced|unveils?|announces?|debuts?|drops?)\s+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)',
-        # @mentions of products
-        r'@([a-zA-Z0-9_]+)',
-    ]
-
-    products = set()
-    text_lower = text.lower()
-
-    for pattern in product_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if len(match.groups()) > 0:
-                products.add(match.group(1) if match.group(1) else match.group(0))
-            else:
-                products.add(match.group(0))
-
-    return list(products)
-
-def is_new_product_mention(text: str) -> bool:
-    """判断是否提到新产品"""
-    new_product_keywords = [
-        'launch', 'just released', 'announcing', 'new', 'released',
-        'unveil', 'debut', 'introduce', 'coming soon', 'now available',
-        '刚发布', '新推出', '新功能', '即将发布', '今天发布'
-    ]
-
-    text_lower = text.lower()
-    return any(keyword in text_lower for keyword in new_product_keywords)
-
-def get_sentiment(text: str) -> str:
-    """简单情感分析"""
-    positive_words = ['love', 'amazing', 'great', 'awesome', 'excellent', 'fantastic', 'incredible', 'best']
-    negative_words = ['hate', 'terrible', 'awful', 'bad', 'poor', 'disappointed', 'worst', 'sucks']
-
-    text_lower = text.lower()
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
-
-    if pos_count > neg_count:
-        return 'positive'
-    elif neg_count > pos_count:
-        return 'negative'
-    else:
-        return 'neutral'
-
-def analyze_tweets(data_file: str) -> Dict:
-    """分析推文"""
-    print("📊 开始分析推文...")
-
-    data = load_data(data_file)
-    tweets = data['tweets']
-
-    print(f"总推文数: {len(tweets)}")
-
-    # 产品统计
-    product_mentions = defaultdict(list)  # product -> [tweets]
-    new_products = defaultdict(list)
-
-    # 话题统计
-    topics = Counter()
-
-    # KOL活跃度
-    top_kol_tweets = defaultdict(int)
-
-    # 按日期统计
-    daily_tweets = defaultdict(int)
+    """提取产品/工具名称（产品名、发布对象和@提及，见 core/product_patterns.py）"""
+    return get_default_engine().extract(text)
+
+def first_mentioned(mentions: List[TweetRecord]) -> str:
+    """最早一条提及的发布时间（按时间戳比较，无法解析的时间排在最后）"""
+    earliest = min(mentions, key=lambda m: (m.timestamp is None, m.timestamp or 0))
+    return earliest.created_at
+
+def new_aggregates() -> Dict:
+    """空的部分聚合结果（串行处理和并行分片共用同一结构）"""
+    return {
+        'total_tweets': 0,
+        'tweets': [],                           # 提到产品的推文（TweetRecord）
+        'product_mentions': MentionIndex(),     # product -> 推文下标
+        'new_products': MentionIndex(),
+        'topics': Counter(),                    # 话题统计
+        'top_kol_tweets': defaultdict(int),     # KOL活跃度
+        'daily_tweets': defaultdict(int),       # 按日期统计
+    }
 
-    print("处理推文中...")
-    for i, tweet in enumerate(tweets, 1):
-        if i % 200 == 0:
-            print(f"  进度: {i}/{len(tweets)}")
+def aggregate_tweets(tweets, extractor: TweetFeatureExtractor, aggregates: Dict = None,
+                     expected_total=None, precomputed=None) -> Dict:
+    """
+    把推文累加到部分聚合结果中
+
+    Args:
+        tweets: 推文（可迭代）
+        extractor: 推文特征提取器
+        aggregates: 已有的部分聚合结果（默认新建）
+        expected_total: 推文总数（传入时每 200 条打印一次进度）
+        precomputed: 与 tweets 一一对应的已提取特征（可选，传入时不再调用 extractor）
+    """
+    if aggregates is None:
+        aggregates = new_aggregates()
+    precomputed = iter(precomputed) if precomputed is not None else None
+
+    records = aggregates['tweets']
+    product_mentions = aggregates['product_mentions']
+    new_products = aggregates['new_products']
+    topics = aggregates['topics']
+    top_kol_tweets = aggregates['top_kol_tweets']
+    daily_tweets = aggregates['daily_tweets']
+
+    for tweet in tweets:
+        aggregates['total_tweets'] += 1
+        i = aggregates['total_tweets']
+        if expected_total is not None and i % 200 == 0:
+            print(f"  进度: {i}/{expected_total}")
 
         text = tweet.get('text', '')
         kol = tweet.get('kol_info', {})
         created_at = tweet.get('created_at', '')
-
-        # 提取产品
-        products = extract_products(text)
-        for product in products:
-            product_mentions[product].append({
-                'text': text,
-                'kol': kol.get('username'),
-                'rank': kol.get('rank'),
-                'followers': kol.get('followers'),
-                'likes': tweet.get('likeCount', 0),
-                'retweets': tweet.get('retweetCount', 0),
-                'created_at': created_at,
-                'sentiment': get_sentiment(text),
-                'is_new': is_new_product_mention(text)
-            })
-
-            if is_new_product_mention(text):
-                new_products[product].append({
-                    'text': text,
-                    'kol': kol.get('username'),
-                    'rank': kol.get('rank'),
-                    'created_at': created_at
-                })
-
-        # 提取话题（简单的关键词统计）
-        keywords = ['AI', 'AGI', 'LLM', 'ML', 'agent', 'model', 'open source',
-                   'coding', 'development', 'design', 'startup', 'funding']
-        for keyword in keywords:
-            if keyword.lower() in text.lower():
-                topics[keyword] += 1
+        timestamp = tweet_timestamp(tweet)
+
+        # 提取特征（产品、情感、新品标记、话题，一次小写化）
+        features = next(precomputed) if precomputed is not None else extractor.extract(text)
+        if features.products:
+            # 每条推文只存一份记录，各产品的提及只记下标
+            index = len(records)
+            records.append(TweetRecord(
+                text, kol.get('username'), kol.get('rank'), kol.get('followers'),
+                metric(tweet, 'likes'), metric(tweet, 'retweets'), created_at,
+                features.sentiment, features.is_new, timestamp,
+            ))
+
+            for product in features.products:
+                product_mentions[product].append(index)
+                if features.is_new:
+                    new_products[product].append(index)
+
+        # 话题统计（简单的关键词统计）
+        topics.update(features.topics)
 
         # KOL活跃度（仅Top 100）
         if kol.get('is_top_100'):
             top_kol_tweets[kol.get('username')] += 1
 
-        # 日期统计
-        try:
-            date = created_at.split()[2:4]  # Mon Oct 14
-            date_str = ' '.join(date)
-            daily_tweets[date_str] += 1
-        except:
-            pass
+        # 日期统计（UTC 日期 YYYY-MM-DD）
+        if timestamp is not None:
+            daily_tweets[day_key(timestamp)] += 1
+
+    return aggregates
+
+def merge_aggregates(aggregates: Dict, part: Dict) -> Dict:
+    """
+    把后一个分片的部分聚合结果合并进来
+
+    分片按推文顺序合并时，提及列表的顺序和各字典的键顺序（即排序时的并列顺序）都与串行处理一致
+    """
+    aggregates['total_tweets'] += part['total_tweets']
+    offset = len(aggregates['tweets'])
+    aggregates['tweets'].extend(part['tweets'])
+    for key in ('product_mentions', 'new_products'):
+        aggregates[key].merge(part[key], offset)
+    aggregates['topics'].update(part['topics'])
+    for key in ('top_kol_tweets', 'daily_tweets'):
+        for name, count in part[key].items():
+            aggregates[key][name] += count
+    return aggregates
+
+_worker_extractor = None
+
+def _init_worker(engine):
+    """工作进程初始化：构建一次特征提取器"""
+    global _worker_extractor
+    _worker_extractor = TweetFeatureExtractor(engine)
+
+def _aggregate_shard(tweets) -> Dict:
+    """进程池中处理一个分片"""
+    return aggregate_tweets(tweets, _worker_extractor)
+
+def analyze_tweets(data_file: str, tweets: List[Dict] = None, metadata: Dict = None,
+                   workers: int = 1, shard_size: int = DEFAULT_SHARD_SIZE, engine=None,
+                   features: List = None) -> Dict:
+    """
+    分析推文
+
+    Args:
+        data_file: 数据文件（周目录 / raw_tweets.ndjson / raw_data.json）
+        tweets: 已加载的推文（可选，传入时不再读取数据文件）
+        metadata: 已加载的元数据（可选）
+        workers: 并行进程数（1 为串行，结果与串行完全一致）
+        shard_size: 并行时每个分片的推文数
+        engine: 产品识别引擎（可选，进程内流水线传入与 Product Knowledge 集成共用的引擎；默认内置产品词表）
+        features: 与 tweets 一一对应的已提取特征（可选，进程内流水线传入，与 Product Knowledge 集成共用）
+    """
+    print("📊 开始分析推文...")
+
+    if metadata is None:
+        metadata = load_metadata(data_file)
+    expected_total = metadata.get('total_tweets', '?')
+
+    print(f"总推文数: {expected_total}")
+
+    source = iter_tweets(data_file) if tweets is None else tweets
+
+    metrics = get_run_metrics()
+    with metrics.span('extract_features', workers=workers):
+        if features is not None:
+            print("处理推文中（使用已提取的特征）...")
+            aggregates = aggregate_tweets(source, None, expected_total=expected_total, precomputed=features)
+        elif workers > 1:
+            print(f"处理推文中（{workers} 个进程，每个分片 {shard_size} 条）...")
+            aggregates = new_aggregates()
+            for part in map_shards(_aggregate_shard, source, workers, shard_size,
+                                   initializer=_init_worker, initargs=(engine,)):
+                merge_aggregates(aggregates, part)
+                print(f"  进度: {aggregates['total_tweets']}/{expected_total}")
+        else:
+            print("处理推文中...")
+            aggregates = aggregate_tweets(source, TweetFeatureExtractor(engine), expected_total=expected_total)
+    metrics.incr('analysis.tweets', aggregates['total_tweets'])
+
+    total_tweets = aggregates['total_tweets']
+    records = aggregates['tweets']
+    product_mentions = aggregates['product_mentions']
+    new_products = aggregates['new_products']
+    topics = aggregates['topics']
+    top_kol_tweets = aggregates['top_kol_tweets']
+    daily_tweets = aggregates['daily_tweets']
 
     print("\n生成统计报告...")
 
-    # 按提及次数排序产品
-    sorted_products = sorted(
-        product_mentions.items(),
-        key=lambda x: len(x[1]),
-        reverse=True
-    )
+    # 按提及次数排序产品（只展开 Top 30 的提及记录）
+    sorted_products = [
+        (product, [records[index] for index in indices])
+        for product, indices in sorted(product_mentions.items(), key=lambda x: len(x[1]), reverse=True)[:30]
+    ]
 
-    # 按提及次数排序新产品
-    sorted_new_products = sorted(
-        new_products.items(),
-        key=lambda x: len(x[1]),
-        reverse=True
-    )
+    # 按提及次数排序新产品（只展开 Top 20）
+    sorted_new_products = [
+        (product, [records[index] for index in indices])
+        for product, indices in sorted(new_products.items(), key=lambda x: len(x[1]), reverse=True)[:20]
+    ]
 
     # 按推文数排序Top KOL
     sorted_top_kols = sorted(
@@ -171,48 +208,53 @@ def analyze_tweets(data_file: str) -> Dict:
 
     result = {
         'summary': {
-            'total_tweets': len(tweets),
+            'total_tweets': total_tweets,
             'unique_products': len(product_mentions),
             'new_products': len(new_products),
             'top_topics': dict(topics.most_common(10)),
-            'date_range': data['metadata']['date_range'],
+            'date_range': metadata['date_range'],
         },
         'products': {
             product: {
                 'mention_count': len(mentions),
-                'top_kols': sorted([m['kol'] for m in mentions if m['rank'] and m['rank'] <= 20])[:5],
-                'sentiment': Counter([m['sentiment'] for m in mentions]),
-                'total_engagement': sum(m['likes'] + m['retweets'] for m in mentions),
-                'sample_tweets': mentions[:3]  # 前3条
+                'top_kols': sorted([m.kol for m in mentions if m.rank and m.rank <= 20])[:5],
+                'sentiment': Counter([m.sentiment for m in mentions]),
+                'total_engagement': sum(m.engagement for m in mentions),
+                'sample_tweets': [m.to_mention() for m in mentions[:3]]  # 前3条
             }
-            for product, mentions in sorted_products[:30]  # Top 30产品
+            for product, mentions in sorted_products  # Top 30产品
         },
         'new_products': {
             product: {
                 'mention_count': len(mentions),
-                'first_mentioned': min([m['created_at'] for m in mentions]),
-                'discoverers': [{'kol': m['kol'], 'rank': m['rank']} for m in mentions],
-                'sample_tweets': [m['text'] for m in mentions[:2]]
+                'first_mentioned': first_mentioned(mentions),
+                'discoverers': [{'kol': m.kol, 'rank': m.rank} for m in mentions],
+                'sample_tweets': [m.text for m in mentions[:2]]
             }
-            for product, mentions in sorted_new_products[:20]  # Top 20新产品
+            for product, mentions in sorted_new_products  # Top 20新产品
         },
         'top_kols': dict(sorted_top_kols),
-        'daily_distribution': dict(daily_tweets)
+        'daily_distribution': dict(sorted(daily_tweets.items()))
     }
 
     return result
 
-if __name__ == '__main__':
-    import sys
-
-    data_file = sys.argv[1] if len(sys.argv) > 1 else 'weekly_reports/week_2025-10-10_to_2025-10-17/raw_data.json'
+def save_analysis(result: Dict, data_file: str) -> str:
+    """把分析结果写入数据所在周目录的 analysis_summary.json"""
+    output_file = os.path.join(week_dir_of(data_file), 'analysis_summary.json')
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return output_file
 
-    result = analyze_tweets(data_file)
+def run_analysis(data_file: str, tweets: List[Dict] = None, metadata: Dict = None, workers: int = 1,
+                 engine=None, features: List = None) -> Dict:
+    """分析推文、保存结果并打印摘要（命令行和 weekly_monitor.py 进程内流水线共用）"""
+    result = analyze_tweets(data_file, tweets=tweets, metadata=metadata, workers=workers, engine=engine,
+                            features=features)
 
     # 保存结果
-    output_file = data_file.replace('raw_data.json', 'analysis_summary.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    with get_run_metrics().span('write_summary'):
+        output_file = save_analysis(result, data_file)
 
     print(f"\n✅ 分析完成！")
     print(f"📁 结果已保存: {output_file}")
@@ -225,3 +267,18 @@ if __name__ == '__main__':
     print(f"\nTop 10 提及最多的产品:")
     for i, (product, info) in enumerate(list(result['products'].items())[:10], 1):
         print(f"  {i}. {product}: {info['mention_count']}次提及")
+
+    return result
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='推文分析')
+    parser.add_argument('data_file', nargs='?',
+                        default='weekly_reports/week_2025-10-10_to_2025-10-17/raw_data.json',
+                        help='周目录 / raw_tweets.ndjson / raw_data.json')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行分析的进程数（默认 1 串行，0 使用全部 CPU）')
+    args = parser.parse_args()
+
+    run_analysis(args.data_file, workers=resolve_workers(args.workers))
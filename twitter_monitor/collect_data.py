@@ -7,24 +7,34 @@ KOL推文数据采集工具
     python3 collect_data.py --days 7 --kol-count 200
 
 输出:
-    weekly_reports/week_YYYY-MM-DD_to_YYYY-MM-DD/raw_data.json
+    weekly_reports/week_YYYY-MM-DD_to_YYYY-MM-DD/raw_tweets.ndjson   # 推文流（每行一条）
+    weekly_reports/week_YYYY-MM-DD_to_YYYY-MM-DD/raw_metadata.json   # 元数据
+    （--format json 时输出旧格式 raw_data.json）
 
 说明:
     - 只采集数据，不做任何分析
-    - 输出标准的JSON格式
+    - 推文在采集过程中逐个KOL追加写入，读取见 core/raw_data_io.py
+    - 每个KOL写入后记入检查点，中断后用 --resume 续跑，已完成的KOL不再请求
+    - 按往周元数据中的发推频率为每个KOL选择请求深度（--fixed-depth 关闭）
+    - 推文以紧凑格式写入（见 core/tweet_schema.py），--cold-payload 时原始 API 返回另存 raw_payload.ndjson.gz
     - 可用于后续的任何分析工具
 """
 
 import sys
 import os
-import json
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # 添加当前目录到路径
 sys.path.append(os.path.dirname(__file__))
 
 from core.data_collector import KOLWeeklyDataCollector
+from core.watermark_store import KOLWatermarkStore
+from core.raw_data_io import RawDataWriter, save_raw_data, TWEETS_FILE, PAYLOAD_STAGING_FILE
+from core.tweet_index import TweetIndexBuilder
+from core.collection_checkpoint import CollectionCheckpoint
+from core.fetch_planner import FetchPlanner
+from config.config import DATA_COLLECTION
 
 
 def main():
@@ -38,6 +48,15 @@ def main():
 
     # 采集Top 300 KOL过去30天的推文
     python3 collect_data.py --days 30 --kol-count 300
+
+    # 每日运行滚动7天窗口，只请求上次采集之后的新推文
+    python3 collect_data.py --days 7 --kol-count 300 --incremental
+
+    # 16 个KOL并发采集，限制每秒 3000 credits
+    python3 collect_data.py --days 7 --kol-count 300 --concurrency 16 --credits-per-second 3000
+
+    # 上次运行中断后续跑（参数须与中断的运行一致）
+    python3 collect_data.py --days 7 --kol-count 300 --resume
         """
     )
 
@@ -46,25 +65,137 @@ def main():
     parser.add_argument('--kol-count', type=int, default=200,
                        choices=[100, 200, 300],
                        help='采集Top N个KOL（默认200）')
+    parser.add_argument('--concurrency', type=int, default=None,
+                       help='并发采集的KOL数（默认读取配置，1 为串行）')
+    parser.add_argument('--credits-per-second', type=int, default=None,
+                       help='每秒 credits 预算（默认不限流）')
+    parser.add_argument('--incremental', action='store_true',
+                       help='增量采集：只请求每个KOL上次水位线之后的新推文')
+    parser.add_argument('--format', choices=['ndjson', 'json'], default='ndjson',
+                       help='输出格式：ndjson 推文流 + 元数据（默认）或旧格式 raw_data.json')
+    parser.add_argument('--resume', action='store_true',
+                       help='从上次中断运行的检查点续跑（仅 ndjson 格式）')
+    parser.add_argument('--fixed-depth', action='store_true',
+                       help='每个KOL使用固定请求深度，不按历史发推频率自适应')
+    parser.add_argument('--cold-payload', action='store_true',
+                       help='原始 API 返回另存冷文件 raw_payload.ndjson.gz（仅 ndjson 格式）')
 
     args = parser.parse_args()
 
+    collect(
+        days=args.days,
+        kol_count=args.kol_count,
+        concurrency=args.concurrency,
+        credits_per_second=args.credits_per_second,
+        incremental=args.incremental,
+        fmt=args.format,
+        resume=args.resume,
+        adaptive_depth=False if args.fixed_depth else None,
+        cold_payload=True if args.cold_payload else None,
+    )
+
+
+def collect(days=7, kol_count=200, concurrency=None, credits_per_second=None, incremental=False, fmt='ndjson',
+            resume=False, adaptive_depth=None, cold_payload=None):
+    """
+    采集推文并写入周目录（路径相对于当前工作目录）
+
+    Args:
+        days: 采集过去N天的推文
+        kol_count: Top N KOL
+        concurrency: 并发采集的KOL数（None 读取配置）
+        credits_per_second: 每秒 credits 预算（None 不限流）
+        incremental: 是否按水位线增量采集
+        fmt: 'ndjson'（推文流 + 元数据）或 'json'（旧格式 raw_data.json）
+        resume: 是否从暂存目录的检查点续跑（仅 ndjson；检查点参数与本次不一致时抛出 ValueError）
+        adaptive_depth: 是否按往周发推频率选择每个KOL的请求深度（None 读取配置）
+        cold_payload: 是否把原始 API 返回另存冷文件（None 读取配置，仅 ndjson 紧凑格式）
+
+    Returns:
+        tuple: (输出文件路径, {'tweets': [...], 'metadata': {...}})
+    """
     print("\n" + "="*80)
     print("📊 KOL推文数据采集工具")
     print("="*80)
     print(f"\n配置:")
-    print(f"   - KOL范围: Top {args.kol_count}")
-    print(f"   - 时间范围: 过去 {args.days} 天")
+    print(f"   - KOL范围: Top {kol_count}")
+    print(f"   - 时间范围: 过去 {days} 天")
 
     # 初始化采集器
     print(f"\n🔍 开始采集推文...")
     collector = KOLWeeklyDataCollector()
 
+    watermark_store = None
+    if incremental:
+        watermark_store = KOLWatermarkStore(
+            DATA_COLLECTION['watermark_file'],
+            retention_days=max(DATA_COLLECTION['watermark_retention_days'], days),
+            refresh_days=DATA_COLLECTION.get('watermark_refresh_days')
+        )
+
+    # 推文边采集边写入暂存推文流并记入检查点，完成后移动到周目录
+    writer = None
+    checkpoint = None
+    compact = DATA_COLLECTION.get('compact_tweets', False)
+    if cold_payload is None:
+        cold_payload = DATA_COLLECTION.get('cold_payload', False)
+    if fmt == 'ndjson':
+        staging_dir = os.path.join('weekly_reports', '.collecting')
+        checkpoint = CollectionCheckpoint(staging_dir, {
+            'kol_count': kol_count,
+            'days': days,
+            'incremental': incremental,
+            'compact': compact,
+            'cold_payload': cold_payload,
+        })
+        if resume:
+            if not checkpoint.load():
+                raise ValueError(
+                    f"无法续跑: {checkpoint.path} 不存在或参数不一致（检查点参数: {checkpoint.stored_params()}）"
+                )
+            checkpoint.truncate_stream(os.path.join(staging_dir, TWEETS_FILE),
+                                       os.path.join(staging_dir, PAYLOAD_STAGING_FILE))
+            print(f"   - 从检查点续跑: {len(checkpoint.kols)} 个KOL已完成")
+        elif checkpoint.exists():
+            print(f"   ⚠️ 发现未完成运行的检查点，本次重新采集（续跑请加 --resume）")
+        writer = RawDataWriter(staging_dir, append=resume, index_builder=TweetIndexBuilder(),
+                               cold_payload=compact and cold_payload)
+    elif resume:
+        raise ValueError("--resume 仅支持 ndjson 格式")
+
+    # 从窗口开始之前的周学习每个KOL的发推频率
+    fetch_planner = None
+    if adaptive_depth is None:
+        adaptive_depth = DATA_COLLECTION.get('adaptive_fetch_depth', False)
+    if adaptive_depth:
+        window_start = checkpoint.window[0] if checkpoint is not None and checkpoint.window \
+            else datetime.now() - timedelta(days=days)
+        fetch_planner = FetchPlanner.from_reports(
+            'weekly_reports',
+            before=window_start,
+            history_weeks=DATA_COLLECTION.get('fetch_history_weeks', 4),
+            default_depth=DATA_COLLECTION.get('max_tweets_per_kol', 50),
+            page_size=DATA_COLLECTION.get('page_size', 20),
+            max_depth=DATA_COLLECTION.get('fetch_depth_max', 200),
+            headroom=DATA_COLLECTION.get('fetch_depth_headroom', 1.5),
+        )
+
     # 采集数据
-    data = collector.collect_weekly_tweets(
-        days=args.days,
-        kol_count=args.kol_count
-    )
+    try:
+        data = collector.collect_weekly_tweets(
+            days=days,
+            kol_count=kol_count,
+            concurrency=concurrency,
+            credits_per_second=credits_per_second,
+            watermark_store=watermark_store,
+            writer=writer,
+            checkpoint=checkpoint,
+            fetch_planner=fetch_planner,
+            compact=compact
+        )
+    finally:
+        if writer is not None:
+            writer.close()
 
     # 创建输出目录
     date_range = data['metadata']['date_range']
@@ -72,12 +203,13 @@ def main():
         'weekly_reports',
         f"week_{date_range['start']}_to_{date_range['end']}"
     )
-    os.makedirs(output_dir, exist_ok=True)
 
     # 保存数据
-    output_file = os.path.join(output_dir, 'raw_data.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if writer is not None:
+        output_file = writer.finalize(output_dir, data['metadata'])
+        checkpoint.remove()
+    else:
+        output_file = save_raw_data(data, output_dir, fmt='json')
 
     # 输出统计信息
     print(f"\n✅ 数据采集完成!")
@@ -98,6 +230,8 @@ def main():
 
     print("\n" + "="*80)
 
+    return output_file, data
+
 
 if __name__ == '__main__':
     main()
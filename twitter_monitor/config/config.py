@@ -8,6 +8,22 @@ DATA_COLLECTION = {
     'days': 7,                      # 过去N天
     'exclude_retweets': True,       # 排除转发
     'min_engagement': 5,            # 最低互动数
+    'concurrency': 8,               # 并发采集的KOL数（1 为串行）
+    'credits_per_second': None,     # 每秒 credits 预算（None 不限流）
+    'watermark_file': 'weekly_reports/kol_watermarks.json',  # 增量采集的KOL水位线文件
+    'watermark_retention_days': 30, # 水位线缓存推文保留天数（需不小于最大采集窗口）
+    'watermark_refresh_days': 3,    # 缓存推文的互动数超过这么多天未刷新时，该KOL不带 since_id 整页请求一次
+    'max_retries': 3,               # 单个KOL暂时性失败（网络错误、429/5xx）的最多重试次数
+    'retry_base_delay': 1.0,        # 首次重试的退避上限（秒），之后按指数增长并全抖动
+    'retry_max_delay': 30.0,        # 单次退避上限（秒）
+    'max_tweets_per_kol': 50,       # 每个KOL的固定请求深度（没有历史或关闭自适应时使用）
+    'page_size': 20,                # 每次 API 调用返回的推文数
+    'adaptive_fetch_depth': True,   # 按往周发推频率为每个KOL选择请求深度
+    'fetch_depth_max': 200,         # 自适应深度上限
+    'fetch_depth_headroom': 1.5,    # 预计推文数的放大系数
+    'fetch_history_weeks': 4,       # 学习发推频率使用的最近周数
+    'compact_tweets': True,         # 推文投影为紧凑格式（固定字段，KOL信息只在元数据中存一份）
+    'cold_payload': False,          # 原始 API 返回另存冷文件 raw_payload.ndjson.gz
 }
 
 # 新产品发现配置
@@ -15,8 +31,11 @@ PRODUCT_DISCOVERY = {
     'min_mentions': 1,              # 最少提及次数
     'min_kol_count': 1,             # 最少KOL数量
     'min_top100_kol': 0,            # 最少Top100 KOL（0表示不要求）
-    'llm_batch_size': 50,           # LLM批处理大小
+    'llm_batch_size': 50,           # LLM批处理大小（每次调用打包的推文数，1 为逐条验证）
+    'llm_concurrency': 4,           # 并发的LLM批次数（1 为串行）
+    'llm_requests_per_second': None,  # 每秒LLM请求预算（None 不限流）
     'confidence_threshold': 0.6,    # LLM验证置信度阈值
+    'merge_method': 'auto',         # 相似产品合并: pairwise / blocked（字符前缀过滤分块）/ auto（按数量选择）
 }
 
 # 行业洞察配置
@@ -36,6 +55,14 @@ LLM = {
     # API key从环境变量ANTHROPIC_API_KEY读取
 }
 
+# LLM响应缓存配置（重跑同一周时复用已有的验证/提取结果）
+LLM_CACHE = {
+    'enabled': True,
+    'cache_dir': 'weekly_reports/llm_cache',  # 缓存目录（每个响应一个JSON文件）
+    'max_bytes': 200 * 1024 * 1024, # 缓存总大小上限，超出时淘汰最久未访问的条目
+    'max_entries': None,            # 条目数上限（None 不限制）
+}
+
 # 输出配置
 OUTPUT = {
     'format': ['markdown', 'json'],
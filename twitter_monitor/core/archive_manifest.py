@@ -0,0 +1,120 @@
+"""
+归档清单模块
+记录每个周目录数据文件的指纹（大小、修改时间、内容 SHA-256）以及该周缓存的部分聚合结果，
+增量集成时据此判断哪些周是新增或变化的，只重新解析这些周，其余周直接复用缓存
+"""
+
+import hashlib
+import json
+import os
+
+
+MANIFEST_VERSION = 1
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def sha256_file(path):
+    """计算文件内容的 SHA-256（分块读取）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    """
+    计算数据文件指纹
+
+    Args:
+        path: 数据文件路径
+        previous: 上次记录的指纹（可选）。大小和修改时间都未变时直接沿用，不重新读取文件
+
+    Returns:
+        dict: {'size', 'mtime_ns', 'sha256'}
+    """
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        return previous
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256_file(path)}
+
+
+class ArchiveManifest:
+    """
+    周数据归档清单（JSON 文件持久化）
+
+    每周一个条目：{'path': 数据文件路径, 'fingerprint': 指纹, ...调用方的缓存字段}，
+    条目按写入顺序保存
+    """
+
+    def __init__(self, path, settings=None):
+        """
+        初始化
+
+        Args:
+            path: 清单文件路径
+            settings: 影响缓存结果的参数（如是否去重）。与已保存的不一致时丢弃全部缓存
+        """
+        self.path = path
+        self.settings = settings or {}
+        self.weeks = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get('version') == MANIFEST_VERSION and data.get('settings', {}) == self.settings:
+                self.weeks = data.get('weeks', {})
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def __contains__(self, week_name):
+        return week_name in self.weeks
+
+    def get(self, week_name):
+        """获取某周的条目（不存在返回 None）"""
+        return self.weeks.get(week_name)
+
+    def check(self, week_name, path):
+        """
+        检查某周的数据文件是否与清单记录一致
+
+        修改时间变了但内容哈希相同（例如文件被复制或 touch）时仍视为未变化
+
+        Returns:
+            tuple: (是否未变化, 当前指纹)
+        """
+        entry = self.weeks.get(week_name)
+        previous = entry.get('fingerprint') if entry and entry.get('path') == str(path) else None
+        fingerprint = file_fingerprint(path, previous)
+        unchanged = previous is not None and \
+            fingerprint['size'] == previous['size'] and fingerprint['sha256'] == previous['sha256']
+        if unchanged and fingerprint is not previous:
+            entry['fingerprint'] = fingerprint
+        return unchanged, fingerprint
+
+    def set(self, week_name, path, fingerprint, **fields):
+        """记录某周的指纹和缓存字段（替换旧条目）"""
+        self.weeks[week_name] = {'path': str(path), 'fingerprint': fingerprint, **fields}
+
+    def remove(self, week_name):
+        self.weeks.pop(week_name, None)
+
+    def clear(self):
+        self.weeks = {}
+
+    def save(self):
+        """原子写入清单文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'settings': self.settings, 'weeks': self.weeks},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
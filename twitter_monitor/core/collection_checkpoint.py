@@ -0,0 +1,147 @@
+"""
+采集检查点模块
+采集过程中每个KOL的推文追加到暂存推文流后，立即记录该KOL已完成（推文数、API调用数、采集深度统计）
+以及推文流当时的字节数；运行中断后可从检查点续跑：已完成的KOL不再请求（不重复消耗 credits），
+推文流截断到最后一次记录的位置（丢弃写了一半、尚未记入检查点的KOL），再继续追加
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+CHECKPOINT_FILE = 'checkpoint.json'
+CHECKPOINT_VERSION = 1
+
+
+class CollectionCheckpoint:
+    """
+    一次采集运行的检查点（JSON 文件持久化，与暂存推文流放在同一目录）
+    """
+
+    def __init__(self, staging_dir, params=None):
+        """
+        初始化（不读取已有检查点，续跑时调用 load()）
+
+        Args:
+            staging_dir: 暂存目录
+            params: 影响采集结果的参数（KOL数、天数、是否增量等）。续跑时必须与检查点中的一致
+        """
+        self.path = os.path.join(staging_dir, CHECKPOINT_FILE)
+        self.params = params or {}
+        self.window = None
+        self.kols = {}
+        self.failed = {}
+        self.stream_size = 0
+        self.payload_size = 0
+        self.resumed = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """
+        读取已有检查点以续跑
+
+        Returns:
+            bool: 是否成功读取（文件不存在、版本或参数不一致时返回 False，状态保持为空）
+        """
+        if not self.exists():
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != CHECKPOINT_VERSION or data.get('params') != self.params:
+            return False
+
+        window = data.get('window')
+        self.window = (datetime.fromisoformat(window['start']), datetime.fromisoformat(window['end'])) \
+            if window else None
+        self.kols = data.get('kols', {})
+        self.failed = data.get('failed', {})
+        self.stream_size = data.get('stream_size', 0)
+        self.payload_size = data.get('payload_size', 0)
+        self.resumed = True
+        return True
+
+    def stored_params(self):
+        """已有检查点记录的参数（无法读取时返回 None）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('params')
+        except (OSError, ValueError):
+            return None
+
+    def set_window(self, start_date, end_date):
+        """记录采集时间范围（续跑沿用同一范围，输出到同一周目录）"""
+        self.window = (start_date, end_date)
+        self.save()
+
+    def is_done(self, username):
+        return username in self.kols
+
+    def record(self, username, tweet_count, api_calls, stream_size, payload_size=0, fetch_stats=None):
+        """
+        记录一个KOL已完成（推文须已写入并刷新到暂存推文流）
+
+        Args:
+            username: KOL用户名
+            tweet_count: 推文数
+            api_calls: 本次运行的API调用次数（之前运行中该KOL失败消耗的调用一并记入）
+            stream_size: 写入该KOL推文后暂存推文流的字节数
+            payload_size: 写入该KOL推文后暂存冷文件的字节数（未启用冷文件时为 0）
+            fetch_stats: 该KOL的采集深度统计（depth / window_tweets / truncated，续跑时写回元数据 fetch_plan）
+        """
+        self.kols[username] = {'tweets': tweet_count, 'api_calls': api_calls + self.failed_calls(username),
+                               'fetch': fetch_stats}
+        self.failed.pop(username, None)
+        self.stream_size = stream_size
+        self.payload_size = payload_size
+        self.save()
+
+    def failed_calls(self, username):
+        """之前的运行中该KOL失败的尝试累计消耗的API调用数"""
+        entry = self.failed.get(username)
+        return entry.get('api_calls', 0) if isinstance(entry, dict) else 0
+
+    def record_failure(self, username, error, api_calls=0):
+        """记录重试用尽仍失败的KOL及其消耗的API调用（不算完成，续跑时重新请求，调用数跨运行累计）"""
+        self.failed[username] = {'error': str(error), 'api_calls': api_calls + self.failed_calls(username)}
+        self.save()
+
+    def truncate_stream(self, stream_path, payload_path=None):
+        """把暂存推文流（以及冷文件）截断到检查点记录的字节数（丢弃未记入检查点的尾部）"""
+        for path, size in ((stream_path, self.stream_size), (payload_path, self.payload_size)):
+            if path is None or not os.path.exists(path):
+                continue
+            if os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def save(self):
+        """原子写入检查点文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        window = {'start': self.window[0].isoformat(), 'end': self.window[1].isoformat()} if self.window else None
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': CHECKPOINT_VERSION,
+                'params': self.params,
+                'window': window,
+                'kols': self.kols,
+                'failed': self.failed,
+                'stream_size': self.stream_size,
+                'payload_size': self.payload_size,
+                'updated_at': datetime.now().isoformat(),
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        """运行完成后删除检查点"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
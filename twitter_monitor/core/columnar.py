@@ -0,0 +1,237 @@
+"""
+列式推文表
+把推文的互动指标、KOL、发布时间抽成 NumPy 列（文本单独放在字符串池中），
+按 KOL 求和、Top-K、按天分桶等聚合直接在数组上向量化计算，不再逐条遍历嵌套字典
+
+NumPy 为可选依赖：未安装时 HAS_NUMPY 为 False，调用方应回退到逐条计算
+"""
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from core.timeutil import parse_twitter_time
+from core.tweet_schema import PUBLIC_METRICS_KEYS, TOP_LEVEL_KEYS, is_compact
+from core.watermark_store import tweet_id_int
+
+
+# 指标列
+METRIC_COLUMNS = ('likes', 'retweets', 'replies', 'views', 'quotes')
+
+# 指标来源：推文顶层字段（analyze_tweets 使用）或 public_metrics（integrate_all_raw_data 使用），
+# 字段对应关系见 core/tweet_schema.py；紧凑格式的推文只有 public_metrics
+
+# 缺失的推文ID / 发布时间
+MISSING = -1
+
+SECONDS_PER_DAY = 86400
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise ImportError("列式推文表需要 numpy: pip3 install numpy")
+
+
+def parse_created_at(created_at):
+    """Twitter 时间字符串（Thu Oct 16 13:20:19 +0000 2025）转为 epoch 秒，无法解析时返回 MISSING"""
+    timestamp = parse_twitter_time(created_at)
+    return MISSING if timestamp is None else timestamp
+
+
+def grouped_sum(codes, values, n_groups):
+    """
+    按分组编号求和（编号为 -1 的行忽略）
+
+    Args:
+        codes: 每行的分组编号（int 数组）
+        values: 每行的数值（int 数组）
+        n_groups: 分组数
+
+    Returns:
+        np.ndarray: 长度为 n_groups 的 int64 数组
+    """
+    valid = codes >= 0
+    # bincount 的加权结果为 float64，互动数总和远小于 2**53，转回整数是精确的
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+    return sums.astype(np.int64)
+
+
+def grouped_count(codes, n_groups):
+    """按分组编号计数（编号为 -1 的行忽略）"""
+    return np.bincount(codes[codes >= 0], minlength=n_groups).astype(np.int64)
+
+
+def stable_top_k(values, k):
+    """
+    取最大的 k 个值的下标，按值降序；值相同时保持原顺序
+
+    与 sorted(range(n), key=values.__getitem__, reverse=True)[:k] 结果一致，
+    但只对候选部分排序（argpartition 选出第 k 大的值作为门槛）
+
+    Returns:
+        np.ndarray: 下标数组
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.argsort(-values, kind='stable')
+
+    threshold = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > threshold)
+    ties = np.flatnonzero(values == threshold)[:k - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def bucket_counts(timestamps, width=SECONDS_PER_DAY):
+    """
+    按固定宽度的时间桶计数（忽略缺失时间）
+
+    Returns:
+        tuple: (桶起点 epoch 秒数组, 计数数组)，按时间升序
+    """
+    valid = timestamps != MISSING
+    buckets, counts = np.unique(timestamps[valid] // width, return_counts=True)
+    return buckets * width, counts
+
+
+class TweetTable:
+    """
+    列式推文表
+
+    - ids: 推文ID（int64，非数字ID为 MISSING；首次访问时才解析）
+    - kol_index: KOL 编号（int32，指向 kol_names；没有 kol_info 的推文为 -1）
+    - timestamps: 发布时间（int64 epoch 秒，无法解析为 MISSING；首次访问时才解析 created_at）
+    - metrics: {列名: int64 数组}，列见 METRIC_COLUMNS
+    - texts: 推文文本（字符串池，与行一一对应）
+    """
+
+    def __init__(self, raw_ids, kol_index, kol_names, created_at, metrics, texts):
+        self.raw_ids = raw_ids
+        self.kol_index = kol_index
+        self.kol_names = kol_names
+        self.created_at = created_at
+        self.metrics = metrics
+        self.texts = texts
+        self._ids = None
+        self._timestamps = None
+
+    @classmethod
+    def from_tweets(cls, tweets, metric_source='top_level', columns=METRIC_COLUMNS):
+        """
+        从推文字典构建
+
+        Args:
+            tweets: 推文（可迭代）
+            metric_source: 'top_level'（likeCount 等顶层字段）或 'public_metrics'（紧凑格式的推文总是取 public_metrics）
+            columns: 要抽取的指标列（默认全部）
+
+        Returns:
+            TweetTable
+        """
+        _require_numpy()
+        keys = PUBLIC_METRICS_KEYS if metric_source == 'public_metrics' else TOP_LEVEL_KEYS
+        metric_keys = [(column, keys[column]) for column in columns]
+        public_keys = [(column, PUBLIC_METRICS_KEYS[column]) for column in columns]
+
+        raw_ids = []
+        kols = []
+        created_at = []
+        texts = []
+        values = {column: [] for column in columns}
+        kol_codes = {}
+
+        for tweet in tweets:
+            raw_ids.append(tweet.get('id'))
+            texts.append(tweet.get('text', ''))
+            created_at.append(tweet.get('created_at'))
+
+            # KOL 编号按首次出现顺序分配（与逐条统计时字典的插入顺序一致）
+            kol_info = tweet.get('kol_info', {})
+            if kol_info:
+                username = kol_info.get('username', 'unknown')
+                kols.append(kol_codes.setdefault(username, len(kol_codes)))
+            else:
+                kols.append(-1)
+
+            if metric_source == 'public_metrics':
+                source, source_keys = tweet.get('public_metrics', {}), metric_keys
+            elif is_compact(tweet):
+                source, source_keys = tweet.get('public_metrics', {}), public_keys
+            else:
+                source, source_keys = tweet, metric_keys
+            for column, key in source_keys:
+                values[column].append(source.get(key) or 0)
+
+        return cls(
+            raw_ids=raw_ids,
+            kol_index=np.array(kols, dtype=np.int32),
+            kol_names=list(kol_codes),
+            created_at=created_at,
+            metrics={column: np.array(column_values, dtype=np.int64) for column, column_values in values.items()},
+            texts=texts,
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def ids(self):
+        """推文ID列（int64）"""
+        if self._ids is None:
+            ids = (tweet_id_int(value) for value in self.raw_ids)
+            self._ids = np.array([MISSING if value is None else value for value in ids], dtype=np.int64)
+        return self._ids
+
+    @property
+    def timestamps(self):
+        """发布时间列（int64 epoch 秒）"""
+        if self._timestamps is None:
+            self._timestamps = np.array([parse_created_at(value) for value in self.created_at], dtype=np.int64)
+        return self._timestamps
+
+    def column(self, name):
+        """指标列"""
+        return self.metrics[name]
+
+    def engagement(self, columns=('likes', 'retweets')):
+        """互动数（默认 likes + retweets）"""
+        total = np.zeros(len(self), dtype=np.int64)
+        for column in columns:
+            total += self.metrics[column]
+        return total
+
+    def kol_sum(self, values):
+        """
+        按 KOL 求和
+
+        Args:
+            values: 指标列名或与行对齐的数组
+
+        Returns:
+            np.ndarray: 与 kol_names 对齐的 int64 数组
+        """
+        if isinstance(values, str):
+            values = self.metrics[values]
+        return grouped_sum(self.kol_index, values, len(self.kol_names))
+
+    def kol_count(self, mask=None):
+        """按 KOL 计数推文（可选行掩码）"""
+        codes = self.kol_index if mask is None else self.kol_index[mask]
+        return grouped_count(codes, len(self.kol_names))
+
+    def top_k(self, values, k):
+        """最大的 k 行（按值降序，值相同时保持原顺序）"""
+        if isinstance(values, str):
+            values = self.metrics[values]
+        return stable_top_k(values, k)
+
+    def day_counts(self):
+        """按 UTC 日期统计推文数 {YYYY-MM-DD: 条数}，按日期升序"""
+        starts, counts = bucket_counts(self.timestamps, SECONDS_PER_DAY)
+        days = starts.astype('datetime64[s]').astype('datetime64[D]').astype(str)
+        return dict(zip(days.tolist(), counts.tolist()))
@@ -5,14 +5,41 @@
 
 import sys
 import os
+import inspect
+import math
+import threading
 from datetime import datetime, timedelta
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 添加父目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from twitter_collector import TwitterCollector
 from config.config import DATA_COLLECTION
+from core.metrics import get_run_metrics
+from core.rate_limiter import RateLimiter
+from core.retry import attempt_calls, call_with_retry
+from core.timeutil import day_key, to_epoch, tweet_timestamp
+from core.tweet_index import TweetIndexBuilder
+from core import raw_data_io
+from core.raw_data_io import iter_tweets
+from core.tweet_schema import (COMPACT_SCHEMA, KOLS_FIELD, METRICS_FETCHED_AT, SCHEMA_FIELD, attach_kol, compact_tweet,
+                                kol_record)
+from core.watermark_store import tweet_id_int
+
+
+# 每次调用 /twitter/user/last_tweets 消耗 300 credits
+# $20 可以买 2,000,000 credits
+CREDITS_PER_CALL = 300
+CREDITS_PER_DOLLAR = 2000000 / 20  # 100,000 credits per dollar
+
+
+class KOLFetchError(Exception):
+    """重试用尽或遇到非暂时性错误后仍失败的KOL，api_calls 为所有尝试消耗的 API 调用数"""
+
+    def __init__(self, error, api_calls):
+        super().__init__(str(error))
+        self.error = error
+        self.api_calls = api_calls
 
 
 class KOLWeeklyDataCollector:
@@ -20,20 +47,36 @@ class KOLWeeklyDataCollector:
     KOL周度数据采集器
     """
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, collector=None):
         """
         初始化采集器
 
         Args:
             api_key: Twitter API密钥
+            collector: 自定义底层采集器（需实现 collect_user_tweets，
+                       例如 core.fake_twitter_api.FakeTwitterCollector）
         """
         # 使用Twitter API密钥（不是Claude API密钥）
         self.api_key = api_key or 'e734db59d601492e9406f6b6d30c22aa'
-        self.collector = TwitterCollector(self.api_key)
+
+        if collector is None:
+            from twitter_collector import TwitterCollector
+            collector = TwitterCollector(self.api_key)
+        self.collector = collector
+
+        # 底层采集器是否支持 since_id 增量请求
+        self._supports_since_id = 'since_id' in inspect.signature(
+            self.collector.collect_user_tweets
+        ).parameters
 
         # 加载KOL数据
         self.kol_data = self._load_kol_data()
 
+        # 本次运行的重试次数和每个KOL的采集深度统计（并发采集时多线程写入）
+        self.retries = 0
+        self.fetch_stats = {}
+        self._stats_lock = threading.Lock()
+
     def _load_kol_data(self):
         """加载KOL数据"""
         import csv
@@ -77,26 +120,16 @@ class KOLWeeklyDataCollector:
         Returns:
             list: 过滤后的推文
         """
-        from dateutil import parser
+        # 采集时解析一次发布时间写入推文（created_ts），后续过滤和分桶直接使用
+        start_ts = to_epoch(start_date)
+        end_ts = to_epoch(end_date)
 
         filtered = []
         for tweet in tweets:
-            created_at = tweet.get('created_at') or tweet.get('createdAt')
-            if not created_at:
-                continue
-
-            try:
-                # 解析推文时间
-                tweet_date = parser.parse(created_at)
-                # 移除时区信息进行比较
-                tweet_date = tweet_date.replace(tzinfo=None)
-
-                # 检查是否在范围内
-                if start_date <= tweet_date <= end_date:
-                    filtered.append(tweet)
-            except Exception as e:
-                # 解析失败，跳过该推文
-                continue
+            # 解析失败或没有时间的推文跳过
+            timestamp = tweet_timestamp(tweet)
+            if timestamp is not None and start_ts <= timestamp <= end_ts:
+                filtered.append(tweet)
 
         return filtered
 
@@ -112,13 +145,217 @@ class KOLWeeklyDataCollector:
         """
         return sorted(self.kol_data, key=lambda x: x['rank'])[:n]
 
-    def collect_weekly_tweets(self, days=7, kol_count=300):
+    def _depth_since_watermark(self, username, watermark_store, max_tweets, end_date):
+        """
+        采集器不支持 since_id 时的请求深度：按水位线之后经过的时间和缓存推文的发推频率估计新推文数
+        （多请求一条以确认与缓存衔接），按页取整，不超过 max_tweets
+        """
+        since = watermark_store.watermark_time(username)
+        rate = watermark_store.tweet_rate(username)
+        if since is None or rate is None:
+            return max_tweets
+
+        days = max(0.0, to_epoch(end_date) - since) / 86400
+        page_size = DATA_COLLECTION.get('page_size', 20)
+        expected = rate * days * DATA_COLLECTION.get('fetch_depth_headroom', 1.5) + 1
+        return min(max(1, math.ceil(expected / page_size)) * page_size, max_tweets)
+
+    def _collect_kol_tweets(self, kol, start_date, end_date, rate_limiter=None, watermark_store=None,
+                            max_tweets=None):
+        """
+        采集单个KOL的推文并完成过滤（返回过滤后的原始 API 推文）
+
+        Args:
+            kol: KOL信息
+            start_date: 开始日期
+            end_date: 结束日期
+            rate_limiter: credits 限流器（可选）
+            watermark_store: KOL水位线存储（可选，启用增量采集）
+            max_tweets: 请求深度（默认 DATA_COLLECTION['max_tweets_per_kol']）
+
+        Returns:
+            tuple: (tweets, api_calls)，api_calls 包含失败后重试的尝试消耗的调用
+
+        Raises:
+            KOLFetchError: 重试后仍失败（带上所有尝试消耗的调用数）
+        """
+        username = kol['username']
+        metrics = get_run_metrics()
+        if max_tweets is None:
+            max_tweets = DATA_COLLECTION.get('max_tweets_per_kol', 50)
+
+        # 增量模式：只请求水位线之后的新推文；缓存推文的互动数该刷新时整页请求一次。
+        # 采集器不支持 since_id 时无法在水位线处停止翻页，改为按预计的新推文数减少请求深度
+        kwargs = {}
+        depth = max_tweets
+        since_id = watermark_store.since_id(username) if watermark_store is not None else None
+        if since_id and not watermark_store.needs_refresh(username):
+            if self._supports_since_id:
+                kwargs['since_id'] = since_id
+            else:
+                depth = self._depth_since_watermark(username, watermark_store, max_tweets, end_date)
+
+        # 本KOL所有尝试的次数和失败尝试消耗的调用数
+        attempts = [0]
+        failed_calls = [0]
+
+        def fetch(count):
+            # 每次尝试预占一次调用的 credits，分页产生的额外调用在返回后补扣
+            attempts[0] += 1
+            if rate_limiter:
+                with metrics.timed('collection.rate_limit_wait_s'):
+                    rate_limiter.acquire(CREDITS_PER_CALL)
+
+            # 使用新的用户推文收集方法
+            with metrics.timed('collection.kol_latency_s'):
+                return self.collector.collect_user_tweets(
+                    username=username,
+                    max_tweets=count,
+                    include_replies=False,  # 不包含回复
+                    **kwargs
+                )
+
+        def on_retry(attempt, error, delay):
+            failed_calls[0] += attempt_calls(error)
+            with self._stats_lock:
+                self.retries += 1
+            metrics.incr('collection.retries')
+            print(f"   ↻ {username} 第 {attempt + 1} 次重试（{delay:.1f}s 后）: {error}")
+
+        def fetch_with_retry(count):
+            # 暂时性失败（网络错误、429 / 5xx）按带抖动的指数退避重试
+            try:
+                return call_with_retry(
+                    lambda: fetch(count),
+                    max_retries=DATA_COLLECTION.get('max_retries', 3),
+                    base_delay=DATA_COLLECTION.get('retry_base_delay', 1.0),
+                    max_delay=DATA_COLLECTION.get('retry_max_delay', 30.0),
+                    on_retry=on_retry,
+                )
+            except Exception as e:
+                raise KOLFetchError(e, calls + failed_calls[0] + attempt_calls(e)) from e
+
+        calls = 0
+        tweets, calls = fetch_with_retry(depth)
+
+        # 减少的深度没有取到水位线（新推文比预计多）：按原深度重新请求，避免与缓存之间出现缺口
+        if depth < max_tweets and len(tweets) >= depth:
+            since = tweet_id_int(since_id)
+            if since is None or all((tweet_id_int(t.get('id')) or 0) > since for t in tweets):
+                tweets, extra_calls = fetch_with_retry(max_tweets)
+                calls += extra_calls
+                depth = max_tweets
+        calls += failed_calls[0]
+
+        if rate_limiter and calls > attempts[0]:
+            with metrics.timed('collection.rate_limit_wait_s'):
+                rate_limiter.acquire(CREDITS_PER_CALL * (calls - attempts[0]))
+
+        # 返回满深度且最旧的推文仍在窗口内：窗口没有覆盖完，更早的推文被截断
+        # （按水位线减少深度且已与缓存衔接时，更早的推文由缓存补上）
+        timestamps = [ts for ts in map(tweet_timestamp, tweets) if ts is not None]
+        truncated = depth == max_tweets and len(tweets) >= max_tweets and bool(timestamps) and \
+            min(timestamps) > to_epoch(start_date)
+
+        # 合并上次已采集的推文，并推进水位线
+        if watermark_store is not None:
+            tweets = watermark_store.merge(username, tweets, full_fetch='since_id' not in kwargs and depth == max_tweets)
+
+        # 过滤时间范围
+        tweets = self._filter_by_date(tweets, start_date, end_date)
+
+        # 窗口内的原始推文数（过滤转发、低互动之前），供下次规划采集深度
+        with self._stats_lock:
+            self.fetch_stats[username] = {'depth': max_tweets, 'window_tweets': len(tweets), 'truncated': truncated}
+
+        # 过滤转发（如果配置要求）
+        if DATA_COLLECTION['exclude_retweets']:
+            tweets = [t for t in tweets if not t.get('text', '').startswith('RT @')]
+
+        # 过滤低互动（如果配置要求）。沿用缓存的推文（带 metrics_fetched_at）互动数是旧的，
+        # 不据此丢弃，等下次刷新互动数时再判断
+        min_engagement = DATA_COLLECTION.get('min_engagement', 0)
+        if min_engagement > 0:
+            tweets = [
+                t for t in tweets
+                if METRICS_FETCHED_AT in t or
+                (t.get('public_metrics', {}).get('like_count', 0) +
+                 t.get('public_metrics', {}).get('retweet_count', 0)) >= min_engagement
+            ]
+
+        # KOL信息在 collect_weekly_tweets 中添加（紧凑格式只引用KOL用户名）
+        return tweets, calls
+
+    def _iter_kol_results(self, top_kols, start_date, end_date, concurrency, credits_per_second,
+                          watermark_store=None, fetch_depths=None):
+        """
+        按KOL顺序产出采集结果（并发模式下结果按原顺序重排）
+
+        Args:
+            fetch_depths: {username: 请求深度}（可选，缺省使用固定深度）
+
+        Yields:
+            tuple: (index, kol, tweets, api_calls, error)
+        """
+        rate_limiter = RateLimiter(credits_per_second) if credits_per_second else None
+
+        if concurrency <= 1:
+            for i, kol in enumerate(top_kols, 1):
+                try:
+                    tweets, calls = self._collect_kol_tweets(
+                        kol, start_date, end_date, rate_limiter, watermark_store,
+                        fetch_depths.get(kol['username']) if fetch_depths else None
+                    )
+                    yield i, kol, tweets, calls, None
+                except Exception as e:
+                    yield i, kol, [], e.api_calls if isinstance(e, KOLFetchError) else 0, e
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(
+                    self._collect_kol_tweets, kol, start_date, end_date, rate_limiter, watermark_store,
+                    fetch_depths.get(kol['username']) if fetch_depths else None
+                ): i
+                for i, kol in enumerate(top_kols, 1)
+            }
+
+            # 乱序完成的结果先缓存，保证输出顺序与串行模式一致
+            pending = {}
+            next_index = 1
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    tweets, calls = future.result()
+                    pending[i] = (tweets, calls, None)
+                except Exception as e:
+                    pending[i] = ([], e.api_calls if isinstance(e, KOLFetchError) else 0, e)
+
+                while next_index in pending:
+                    tweets, calls, error = pending.pop(next_index)
+                    yield next_index, top_kols[next_index - 1], tweets, calls, error
+                    next_index += 1
+
+    def collect_weekly_tweets(self, days=7, kol_count=300, concurrency=None, credits_per_second=None,
+                              watermark_store=None, writer=None, checkpoint=None, fetch_planner=None, compact=None):
         """
         收集KOL周度推文
 
         Args:
             days: 过去N天
             kol_count: KOL数量
+            concurrency: 并发采集的KOL数（默认读取 DATA_COLLECTION['concurrency']，1 为串行）
+            credits_per_second: 每秒 credits 预算（默认读取 DATA_COLLECTION['credits_per_second']，None 不限流）
+            watermark_store: KOLWatermarkStore 实例（可选）。提供时只请求每个KOL水位线之后的新推文，
+                             并与上次缓存的推文合并；运行结束后自动保存
+            writer: RawDataWriter 实例（可选）。提供时每个KOL的推文采集完成后立即追加写入推文流
+            checkpoint: CollectionCheckpoint 实例（可选，需同时提供 writer）。每个KOL写入推文流后立即记入检查点；
+                        检查点是续跑读取的（resumed）时沿用其时间范围，已完成的KOL不再请求，
+                        其推文从暂存推文流读回
+            fetch_planner: FetchPlanner 实例（可选）。提供时按KOL历史发推频率选择请求深度，
+                           否则每个KOL使用固定深度 DATA_COLLECTION['max_tweets_per_kol']
+            compact: 是否把推文投影为紧凑格式（见 core/tweet_schema.py，默认读取 DATA_COLLECTION['compact_tweets']）。
+                     紧凑格式的推文以共享引用挂上 kol_info，KOL 表写入元数据 kols；writer 启用冷文件时原始推文写入冷文件
 
         Returns:
             dict: {
@@ -126,82 +363,131 @@ class KOLWeeklyDataCollector:
                 'metadata': {...}
             }
         """
+        if concurrency is None:
+            concurrency = DATA_COLLECTION.get('concurrency', 1)
+        if compact is None:
+            compact = DATA_COLLECTION.get('compact_tweets', False)
+        if credits_per_second is None:
+            credits_per_second = DATA_COLLECTION.get('credits_per_second')
+
         print(f"📊 开始收集数据...")
         print(f"   - KOL范围: Top {kol_count}")
         print(f"   - 时间范围: 过去{days}天")
-
-        # 计算时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        if concurrency > 1:
+            print(f"   - 并发数: {concurrency}")
+        if credits_per_second:
+            print(f"   - Credits预算: {credits_per_second:,}/秒")
+        if watermark_store is not None:
+            print(f"   - 增量模式: 已有 {len(watermark_store)} 个KOL水位线")
+            if not self._supports_since_id:
+                print(f"   ⚠️ 底层采集器不支持 since_id，无法在水位线处停止翻页："
+                      f"改为按水位线之后的预计推文数减少请求深度，节省的 credits 少于 since_id 请求")
+
+        # 计算时间范围（续跑沿用检查点记录的范围）
+        if checkpoint is not None and checkpoint.window is not None:
+            start_date, end_date = checkpoint.window
+        else:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days)
+            if checkpoint is not None:
+                checkpoint.set_window(start_date, end_date)
 
         # 获取Top KOL
         top_kols = self.get_top_kols(kol_count)
+        kols = {kol['username']: kol_record(kol) for kol in top_kols}
         print(f"   - 已加载 {len(top_kols)} 个KOL")
 
         # API成本跟踪
         api_calls = 0  # API调用次数
+        self.retries = 0
+        self.fetch_stats = {}
+
+        # 自适应采集深度
+        fetch_depths = None
+        plan_summary = None
+        if fetch_planner is not None:
+            fetch_depths, plan_summary = fetch_planner.plan([kol['username'] for kol in top_kols], days)
+            print(f"   - 自适应深度: {plan_summary['kols_with_history']} 个KOL有历史, "
+                  f"加深 {plan_summary['kols_deeper']} 个, 减浅 {plan_summary['kols_shallower']} 个")
 
         # 收集推文
         all_tweets = []
         kol_tweet_count = {}
+        failed_kols = []
+
+        # 续跑：检查点中已完成的KOL直接复用暂存推文流中的推文
+        pending_kols = top_kols
+        reused_calls = 0
+        if checkpoint is not None and checkpoint.resumed:
+            done = [kol for kol in top_kols if checkpoint.is_done(kol['username'])]
+            pending_kols = [kol for kol in top_kols if not checkpoint.is_done(kol['username'])]
+            for kol in done:
+                entry = checkpoint.kols[kol['username']]
+                kol_tweet_count[kol['username']] = entry['tweets']
+                reused_calls += entry['api_calls']
+                if entry.get('fetch') is not None:
+                    self.fetch_stats[kol['username']] = entry['fetch']
+            # 上次运行中重试后仍失败的KOL已消耗的调用也计入（这些KOL本次重新请求）
+            reused_calls += sum(checkpoint.failed_calls(kol['username']) for kol in pending_kols)
+            api_calls += reused_calls
+            if writer is not None and writer.count == 0:
+                all_tweets.extend(attach_kol(tweet, kols) if compact else tweet for tweet in iter_tweets(writer.path))
+            print(f"   - 续跑: {len(done)} 个KOL已完成（{len(all_tweets)} 条推文），剩余 {len(pending_kols)} 个")
+
+        metrics = get_run_metrics()
+        results = self._iter_kol_results(
+            pending_kols, start_date, end_date, concurrency, credits_per_second, watermark_store, fetch_depths
+        )
+        with metrics.span('fetch_kols', kol_count=len(pending_kols), concurrency=concurrency):
+            for i, kol, tweets, calls, error in results:
+                username = kol['username']
+                metrics.incr('collection.kols')
+
+                if error is not None:
+                    print(f"   ⚠️ 收集 {username} 的推文失败: {error}")
+                    metrics.incr('collection.kol_errors')
+                    failed_kols.append(username)
+                    api_calls += calls
+                    if checkpoint is not None:
+                        checkpoint.record_failure(username, error, calls)
+                    continue
+
+                # 紧凑格式只保留固定字段并引用KOL表，否则逐条添加KOL信息
+                if compact:
+                    payloads = tweets
+                    tweets = [attach_kol(compact_tweet(tweet, username), kols) for tweet in payloads]
+                else:
+                    payloads = None
+                    for tweet in tweets:
+                        tweet['kol_info'] = kol_record(kol)
 
-        for i, kol in enumerate(top_kols, 1):
-            username = kol['username']
-
-            try:
-                # 使用新的用户推文收集方法
-                tweets, calls = self.collector.collect_user_tweets(
-                    username=username,
-                    max_tweets=50,  # 每个KOL最多50条
-                    include_replies=False  # 不包含回复
-                )
                 api_calls += calls  # 累加API调用次数
-
-                # 过滤时间范围
-                tweets = self._filter_by_date(tweets, start_date, end_date)
-
-                # 过滤转发（如果配置要求）
-                if DATA_COLLECTION['exclude_retweets']:
-                    tweets = [t for t in tweets if not t.get('text', '').startswith('RT @')]
-
-                # 过滤低互动（如果配置要求）
-                min_engagement = DATA_COLLECTION.get('min_engagement', 0)
-                if min_engagement > 0:
-                    tweets = [
-                        t for t in tweets
-                        if (t.get('public_metrics', {}).get('like_count', 0) +
-                            t.get('public_metrics', {}).get('retweet_count', 0)) >= min_engagement
-                    ]
-
-                # 添加KOL信息到每条推文
-                for tweet in tweets:
-                    tweet['kol_info'] = {
-                        'username': username,
-                        'rank': kol['rank'],
-                        'score': kol['score'],
-                        'is_top_100': kol['rank'] <= 100,
-                        'followers': kol['followers'],
-                        'verified': kol['verified'],
-                    }
-
                 all_tweets.extend(tweets)
+                if writer is not None:
+                    writer.append(tweets, payloads)
                 kol_tweet_count[username] = len(tweets)
 
+                if checkpoint is not None:
+                    # 先保存水位线再记检查点：两次写入之间中断时，续跑重新请求该KOL，
+                    # 水位线合并会补回缓存的推文，不会丢失
+                    if watermark_store is not None:
+                        watermark_store.save()
+                    checkpoint.record(username, len(tweets), calls, writer.size, writer.payload_size,
+                                      self.fetch_stats.get(username))
+
                 if i % 10 == 0:
-                    print(f"   进度: {i}/{len(top_kols)} KOL, 已收集 {len(all_tweets)} 条推文")
+                    print(f"   进度: {i}/{len(pending_kols)} KOL, 已收集 {len(all_tweets)} 条推文")
 
-            except Exception as e:
-                print(f"   ⚠️ 收集 {username} 的推文失败: {e}")
-                continue
+        # KOL分布按排名顺序排列（续跑时复用的KOL与新采集的KOL交错）
+        kol_tweet_count = {kol['username']: kol_tweet_count[kol['username']]
+                           for kol in top_kols if kol['username'] in kol_tweet_count}
 
-        # 计算API成本
-        # 每次调用 /twitter/user/last_tweets 消耗 300 credits
-        # $20 可以买 2,000,000 credits
-        credits_per_call = 300
-        credits_per_dollar = 2000000 / 20  # 100,000 credits per dollar
+        metrics.incr('collection.api_calls', api_calls)
+        metrics.incr('collection.tweets', len(all_tweets))
 
-        total_credits = api_calls * credits_per_call
-        total_cost_usd = total_credits / credits_per_dollar
+        # 计算API成本
+        total_credits = api_calls * CREDITS_PER_CALL
+        total_cost_usd = total_credits / CREDITS_PER_DOLLAR
 
         # 构建元数据
         metadata = {
@@ -218,8 +504,36 @@ class KOLWeeklyDataCollector:
                 'api_calls': api_calls,
                 'total_credits': total_credits,
                 'cost_usd': round(total_cost_usd, 4),
+                'retries': self.retries,
+            }
+        }
+
+        if compact:
+            metadata[SCHEMA_FIELD] = COMPACT_SCHEMA
+            metadata[KOLS_FIELD] = kols
+        if failed_kols:
+            metadata['failed_kols'] = failed_kols
+        if checkpoint is not None and checkpoint.resumed:
+            metadata['resume'] = {
+                'kols_reused': len(top_kols) - len(pending_kols),
+                'api_calls_reused': reused_calls,
             }
+
+        if watermark_store is not None:
+            watermark_store.save()
+            metadata['incremental'] = dict(watermark_store.stats, since_id=self._supports_since_id)
+
+        # 每个KOL的请求深度、窗口内原始推文数和是否截断（下次运行的 FetchPlanner 从中学习）
+        fetched = [kol['username'] for kol in top_kols if kol['username'] in self.fetch_stats]
+        metadata['fetch_plan'] = {
+            'adaptive': fetch_planner is not None,
+            'default_depth': DATA_COLLECTION.get('max_tweets_per_kol', 50),
+            'depths': {username: self.fetch_stats[username]['depth'] for username in fetched},
+            'window_tweets': {username: self.fetch_stats[username]['window_tweets'] for username in fetched},
+            'truncated': [username for username in fetched if self.fetch_stats[username]['truncated']],
         }
+        if plan_summary is not None:
+            metadata['fetch_plan']['estimate'] = plan_summary
 
         print(f"\n✅ 数据收集完成!")
         print(f"   - 总推文数: {metadata['total_tweets']}")
@@ -228,6 +542,24 @@ class KOLWeeklyDataCollector:
         print(f"   - API调用次数: {api_calls}")
         print(f"   - 消耗Credits: {total_credits:,}")
         print(f"   - 成本: ${total_cost_usd:.4f} USD")
+        if self.retries:
+            print(f"   - 重试: {self.retries} 次")
+        if failed_kols:
+            print(f"   - 重试后仍失败的KOL: {len(failed_kols)} 个")
+        if plan_summary is not None:
+            fixed_calls = plan_summary['estimated_calls_fixed']
+            planned_calls = plan_summary['estimated_calls_planned']
+            print(f"   - 自适应深度预计: API调用 {fixed_calls} → {planned_calls} 次"
+                  f"（节省 {(fixed_calls - planned_calls) * CREDITS_PER_CALL:,} credits）, "
+                  f"截断遗漏 {plan_summary['estimated_missed_fixed']} → {plan_summary['estimated_missed_planned']} 条")
+        if metadata['fetch_plan']['truncated']:
+            print(f"   - 窗口未覆盖完的KOL: {len(metadata['fetch_plan']['truncated'])} 个（下次运行加深）")
+        if watermark_store is not None:
+            stats = watermark_store.stats
+            print(f"   - 增量: {stats['kols_with_watermark']} 个KOL使用水位线, "
+                  f"新推文 {stats['new_tweets']} 条, 刷新互动数 {stats['refreshed_tweets']} 条, "
+                  f"复用缓存 {stats['cached_tweets_reused']} 条（互动数为旧值，带 {METRICS_FETCHED_AT}）, "
+                  f"整页刷新 {stats['kols_metrics_refreshed']} 个KOL")
 
         return {
             'tweets': all_tweets,
@@ -257,7 +589,8 @@ class KOLWeeklyDataCollector:
         # 日期索引
         date_index = {}
         for tweet in tweets:
-            date = tweet.get('created_at', '')[:10]  # YYYY-MM-DD
+            timestamp = tweet_timestamp(tweet)
+            date = day_key(timestamp) if timestamp is not None else ''  # YYYY-MM-DD（UTC）
             if date not in date_index:
                 date_index[date] = []
             date_index[date].append(tweet)
@@ -272,20 +605,17 @@ class KOLWeeklyDataCollector:
             'all_tweets': tweets,
         }
 
-    def save_raw_data(self, data, output_dir):
+    def save_raw_data(self, data, output_dir, fmt='ndjson'):
         """
         保存原始数据
 
         Args:
             data: 数据
             output_dir: 输出目录
+            fmt: 'ndjson'（推文流 + 元数据旁路文件 + 推文索引，默认）或 'json'（旧格式 raw_data.json）
         """
-        os.makedirs(output_dir, exist_ok=True)
-
-        # 保存为JSON
-        output_file = os.path.join(output_dir, 'raw_data.json')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        index_builder = TweetIndexBuilder() if fmt == 'ndjson' else None
+        output_file = raw_data_io.save_raw_data(data, output_dir, fmt=fmt, index_builder=index_builder)
 
         print(f"💾 原始数据已保存: {output_file}")
 
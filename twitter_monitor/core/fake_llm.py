@@ -0,0 +1,96 @@
+"""
+本地 LLM 替身
+模拟 LLMHelper.call_claude_json 的返回结构和调用延迟，结果只由推文和候选决定（确定性），
+用于离线基准测试产品验证的批处理/并发收益
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+
+
+# 替身认为不是产品的候选（公司名、通用词）
+NON_PRODUCTS = {'ai', 'google', 'openai', 'anthropic', 'meta', 'microsoft', 'the', 'this', 'today', 'new'}
+
+# 单条推文 prompt 中的推文、候选段落和候选行（候选名可能跨行）
+SINGLE_TEXT_RE = re.compile(r'【推文内容】\n"(.*)"\n\n【候选产品】\n(.*?)\n\n【任务】', re.S)
+SINGLE_CANDIDATE_RE = re.compile(r'^- (.+?) \(信号: .*?, 类别: (\w+)\)$', re.M | re.S)
+
+
+def _stable_fraction(*parts):
+    """由输入决定的 [0, 1) 伪随机数"""
+    digest = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+class FakeLLM:
+    """
+    假的 LLM 客户端（与 LLMHelper.call_claude_json 接口兼容）
+    """
+
+    def __init__(self, latency=0.5, per_tweet_latency=0.01):
+        """
+        初始化
+
+        Args:
+            latency: 每次调用的固定延迟（秒，模拟网络往返和首 token 时间）
+            per_tweet_latency: 每条推文增加的延迟（秒，模拟输入输出 token）
+        """
+        self.latency = latency
+        self.per_tweet_latency = per_tweet_latency
+
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _judge(self, tweet_text, candidates):
+        """确定性地判断一条推文的候选"""
+        products = []
+        for name, category in candidates:
+            clean = name.strip()
+            if not clean or clean.lower() in NON_PRODUCTS or not clean[0].isupper():
+                continue
+            score = _stable_fraction(tweet_text, clean)
+            products.append({
+                'name': clean,
+                'type': 'model' if any(ch.isdigit() for ch in clean) else 'tool',
+                'is_new_release': category in ('launch', 'announcement'),
+                'confidence': round(0.4 + 0.6 * score, 2),
+                'reasoning': 'fake',
+            })
+
+        return {'is_about_product': bool(products), 'products': products}
+
+    def call_claude_json(self, prompt):
+        """
+        模拟一次 JSON 调用
+
+        支持单条推文的验证 prompt 和批量验证 prompt（```json 代码块中的推文列表）
+        """
+        with self._lock:
+            self.calls += 1
+
+        batch_match = re.search(r'```json\n(.*?)\n```', prompt, re.S)
+        if batch_match:
+            items = json.loads(batch_match.group(1))
+            time.sleep(self.latency + self.per_tweet_latency * len(items))
+            return {
+                'results': [
+                    {
+                        'tweet_id': item['tweet_id'],
+                        **self._judge(
+                            item['text'],
+                            [(c['name'], c.get('category', '')) for c in item['candidates']]
+                        ),
+                    }
+                    for item in items
+                ]
+            }
+
+        text_match = SINGLE_TEXT_RE.search(prompt)
+        time.sleep(self.latency + self.per_tweet_latency)
+        if not text_match:
+            return {'is_about_product': False, 'products': []}
+
+        return self._judge(text_match.group(1), SINGLE_CANDIDATE_RE.findall(text_match.group(2)))
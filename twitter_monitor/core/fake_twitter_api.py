@@ -0,0 +1,188 @@
+"""
+本地 Twitter API 替身
+模拟 TwitterCollector.collect_user_tweets 的返回结构和网络延迟，用于离线基准测试；
+可注入暂时性失败（503）和进程崩溃，用于重试与断点续跑的基准测试
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from core.watermark_store import TWITTER_EPOCH_MS, tweet_id_int
+
+
+# 假时间线的固定起点
+TIMELINE_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeAPIError(Exception):
+    """模拟的 HTTP 错误（带 status_code，与 requests 风格的异常一致；api_calls 为本次尝试已发出的请求数）"""
+
+    def __init__(self, status_code, message='', api_calls=1):
+        super().__init__(f"{status_code} {message}".strip())
+        self.status_code = status_code
+        self.api_calls = api_calls
+
+
+class SimulatedCrash(BaseException):
+    """模拟进程中断（继承 BaseException，不会被采集器的错误处理和重试吞掉）"""
+
+
+class FakeTwitterCollector:
+    """
+    假的 Twitter 采集器（与 TwitterCollector 接口兼容）
+    """
+
+    def __init__(self, latency=0.2, page_size=20, seed=42, now=None, failure_rate=0.0, failures_per_user=1,
+                 failure_page=0, crash_after=None):
+        """
+        初始化
+
+        Args:
+            latency: 每次 API 调用的模拟延迟（秒）
+            page_size: 每页返回的推文数（每页计为一次 API 调用）
+            seed: 随机种子（同一用户名总是生成相同的推文）
+            now: 模拟的当前时间（UTC，默认当前时间）
+            failure_rate: 返回暂时性失败（503）的用户比例（按种子和用户名确定）
+            failures_per_user: 被选中的用户前几次请求失败，之后成功
+            failure_page: 失败发生在第几页（从 0 开始，超过总页数时为最后一页），之前的页已计为调用
+            crash_after: 成功返回这么多个用户后，所有请求抛出 SimulatedCrash（None 不模拟中断）
+        """
+        self.latency = latency
+        self.page_size = page_size
+        self.seed = seed
+        self.now = now or datetime.now(timezone.utc)
+        self.failure_rate = failure_rate
+        self.failures_per_user = failures_per_user
+        self.failure_page = failure_page
+        self.crash_after = crash_after
+
+        self.api_calls = 0
+        self.failures = 0
+        self.users_served = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def _inject_faults(self, username):
+        """
+        按配置抛出模拟的中断；返回本次请求是否应在翻页中途返回暂时性失败
+        """
+        with self._lock:
+            if self.crash_after is not None and self.users_served >= self.crash_after:
+                raise SimulatedCrash(f"模拟中断（已完成 {self.users_served} 个用户）")
+
+            attempt = self._attempts.get(username, 0)
+            self._attempts[username] = attempt + 1
+            failing = random.Random(f"{self.seed}:{username}:failure").random() < self.failure_rate
+            return failing and attempt < self.failures_per_user
+
+    def _user_timeline(self, username, count):
+        """
+        生成用户截至 now 的最近 count 条推文（从新到旧）
+
+        推文时间从固定起点按用户的发推频率向前推进，因此不同 now 下的时间线相互一致，
+        可用于模拟增量采集
+        """
+        rng = random.Random(f"{self.seed}:{username}")
+        tweets_per_day = rng.choice([0.1, 0.5, 1, 2, 4, 8])
+        followers = rng.randint(1000, 2000000)
+
+        events = []
+        created = TIMELINE_START + timedelta(hours=rng.uniform(0, 24))
+        seq = 0
+        while created <= self.now:
+            events.append((seq, created))
+            created += timedelta(days=rng.expovariate(tweets_per_day))
+            seq += 1
+
+        tweets = []
+        for seq, created in reversed(events[-count:] if count else []):
+            item_rng = random.Random(f"{self.seed}:{username}:{seq}")
+            likes = int(item_rng.paretovariate(1.2) * 3)
+            retweets = int(likes * item_rng.uniform(0, 0.3))
+            replies = int(likes * item_rng.uniform(0, 0.1))
+            created_at = created.strftime('%a %b %d %H:%M:%S +0000 %Y')
+            tweet_id = str((int(created.timestamp() * 1000) - TWITTER_EPOCH_MS) << 22 | (seq & 0x3FFFFF))
+
+            text = item_rng.choice([
+                f"Just tried the new Claude {item_rng.randint(3, 5)}.{item_rng.randint(0, 9)} model, amazing results",
+                f"OpenAI just released GPT-{item_rng.randint(4, 6)} for everyone",
+                "Thoughts on AI agents and the future of coding",
+                "RT @someone: Gemini is now available in more countries",
+                f"Cursor vs Windsurf for day {seq}",
+            ])
+
+            tweets.append({
+                'id': tweet_id,
+                'text': text,
+                'created_at': created_at,
+                'createdAt': created_at,
+                'likeCount': likes,
+                'retweetCount': retweets,
+                'replyCount': replies,
+                'viewCount': likes * 40,
+                'lang': 'en',
+                'public_metrics': {
+                    'like_count': likes,
+                    'retweet_count': retweets,
+                    'reply_count': replies,
+                    'quote_count': 0,
+                },
+                'author': {
+                    'username': username,
+                    'name': username,
+                    'isVerified': False,
+                    'followersCount': followers,
+                },
+            })
+
+        return tweets
+
+    def collect_user_tweets(self, username, max_tweets=50, include_replies=False, since_id=None):
+        """
+        模拟采集用户推文
+
+        Args:
+            username: 用户名
+            max_tweets: 最多返回的推文数
+            include_replies: 是否包含回复（假 API 忽略）
+            since_id: 只返回比该ID更新的推文，翻页越过该ID后立即停止
+
+        Returns:
+            tuple: (tweets, api_calls)
+        """
+        failing = self._inject_faults(username)
+
+        timeline = self._user_timeline(username, max_tweets)
+        since = tweet_id_int(since_id)
+        page_starts = range(0, max(len(timeline), 1), self.page_size)
+        failure_page = min(self.failure_page, len(page_starts) - 1) if failing else None
+
+        tweets = []
+        calls = 0
+        for page_index, page_start in enumerate(page_starts):
+            page = timeline[page_start:page_start + self.page_size]
+            calls += 1
+
+            if page_index == failure_page:
+                with self._lock:
+                    self.failures += 1
+                    self.api_calls += calls
+                raise FakeAPIError(503, 'Service Unavailable', api_calls=calls)
+
+            if since is not None:
+                newer = [t for t in page if tweet_id_int(t['id']) > since]
+                tweets.extend(newer)
+                if len(newer) < len(page):
+                    break
+            else:
+                tweets.extend(page)
+
+        time.sleep(self.latency * calls)
+
+        with self._lock:
+            self.api_calls += calls
+            self.users_served += 1
+
+        return tweets, calls
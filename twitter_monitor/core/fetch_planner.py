@@ -0,0 +1,194 @@
+"""
+自适应采集深度模块
+根据往周元数据估计每个KOL的发推频率，为本次采集窗口选择刚好覆盖窗口的请求深度（max_tweets，按页取整）：
+低频KOL少翻页节省 credits，高频KOL加深避免窗口内的推文被 50 条上限截断
+"""
+
+import math
+import os
+from datetime import datetime
+
+from core.raw_data_io import find_raw_data, load_metadata
+
+
+# 旧元数据只有过滤后（去转发、低互动）的推文数，按此倍数估计原始推文数
+FILTERED_TO_RAW = 2.0
+
+# 旧元数据没有截断记录时，过滤后推文数达到固定深度的这个比例即视为被截断
+SATURATION_RATIO = 0.8
+
+
+def _week_days(metadata):
+    """元数据时间范围的天数（无法解析时返回 None）"""
+    date_range = metadata.get('date_range') or {}
+    try:
+        start = datetime.strptime(date_range['start'], '%Y-%m-%d')
+        end = datetime.strptime(date_range['end'], '%Y-%m-%d')
+    except (KeyError, TypeError, ValueError):
+        return None
+    days = (end - start).days
+    return days if days > 0 else None
+
+
+class FetchPlanner:
+    """
+    按KOL历史发推频率规划采集深度
+    """
+
+    def __init__(self, default_depth=50, page_size=20, max_depth=200, headroom=1.5):
+        """
+        初始化
+
+        Args:
+            default_depth: 固定深度（没有历史的KOL使用，也是估算节省时的对照）
+            page_size: 每次 API 调用返回的推文数（深度按页取整，每页计一次调用）
+            max_depth: 深度上限
+            headroom: 估计推文数的放大系数（覆盖发推频率的周间波动）
+        """
+        self.default_depth = default_depth
+        self.page_size = page_size
+        self.max_depth = max_depth
+        self.headroom = headroom
+
+        # username -> [{'rate': 每天原始推文数, 'truncated': bool, 'depth': 当周深度}]，按时间从新到旧
+        self._history = {}
+        self.weeks = 0
+
+    @classmethod
+    def from_reports(cls, base_dir, before=None, history_weeks=4, **kwargs):
+        """
+        从周目录的元数据学习
+
+        Args:
+            base_dir: 周报目录（weekly_reports）
+            before: 只使用开始日期早于该时间的周（datetime，默认全部）
+            history_weeks: 最多使用最近几周
+
+        Returns:
+            FetchPlanner
+        """
+        planner = cls(**kwargs)
+        if not os.path.isdir(base_dir):
+            return planner
+
+        weeks = []
+        for name in os.listdir(base_dir):
+            week_dir = os.path.join(base_dir, name)
+            if not (name.startswith('week_') and os.path.isdir(week_dir)):
+                continue
+            data_path = find_raw_data(week_dir)
+            if data_path is None:
+                continue
+            try:
+                metadata = load_metadata(data_path)
+            except (OSError, ValueError):
+                continue
+            start = (metadata.get('date_range') or {}).get('start', '')
+            if before is not None and start >= before.strftime('%Y-%m-%d'):
+                continue
+            weeks.append((start, metadata))
+
+        weeks.sort(key=lambda x: x[0], reverse=True)
+        for _, metadata in weeks[:history_weeks]:
+            planner.add_week(metadata)
+        return planner
+
+    def add_week(self, metadata):
+        """
+        加入一周的元数据（按从新到旧的顺序加入）
+
+        优先使用 fetch_plan 中记录的窗口内原始推文数和截断情况；旧元数据只有 kol_tweet_distribution，
+        按 FILTERED_TO_RAW 估计原始推文数
+        """
+        days = _week_days(metadata)
+        distribution = metadata.get('kol_tweet_distribution') or {}
+        if days is None or not distribution:
+            return
+
+        fetch_plan = metadata.get('fetch_plan') or {}
+        window_tweets = fetch_plan.get('window_tweets') or {}
+        truncated = set(fetch_plan.get('truncated') or [])
+        depths = fetch_plan.get('depths') or {}
+        default_depth = fetch_plan.get('default_depth', self.default_depth)
+
+        for username, kept in distribution.items():
+            if username in window_tweets:
+                raw = window_tweets[username]
+                is_truncated = username in truncated
+            else:
+                raw = kept * FILTERED_TO_RAW
+                is_truncated = kept >= default_depth * SATURATION_RATIO
+            self._history.setdefault(username, []).append({
+                'rate': raw / days,
+                'truncated': is_truncated,
+                'depth': depths.get(username, default_depth),
+            })
+        self.weeks += 1
+
+    def has_history(self, username):
+        return username in self._history
+
+    def expected_tweets(self, username, days):
+        """窗口内预计的原始推文数（取历史各周最高频率，没有历史时返回 None）"""
+        history = self._history.get(username)
+        if not history:
+            return None
+        return max(week['rate'] for week in history) * days
+
+    def _round_to_page(self, count):
+        return max(1, math.ceil(count / self.page_size)) * self.page_size
+
+    def depth(self, username, days):
+        """
+        KOL本次的采集深度
+
+        没有历史时使用固定深度；上一周被截断（窗口未覆盖）时至少加倍
+        """
+        expected = self.expected_tweets(username, days)
+        if expected is None:
+            return self.default_depth
+
+        depth = self._round_to_page(expected * self.headroom)
+        last = self._history[username][0]
+        if last['truncated']:
+            depth = max(depth, last['depth'] * 2)
+        return min(depth, self.max_depth)
+
+    def pages(self, depth):
+        """深度对应的最多 API 调用次数"""
+        return max(1, math.ceil(depth / self.page_size))
+
+    def plan(self, usernames, days):
+        """
+        规划一组KOL的采集深度
+
+        Returns:
+            tuple: ({username: depth}, 估算摘要)
+        """
+        depths = {username: self.depth(username, days) for username in usernames}
+
+        fixed_calls = planned_calls = 0
+        fixed_missed = planned_missed = 0.0
+        deeper = shallower = 0
+        for username, depth in depths.items():
+            fixed_calls += self.pages(self.default_depth)
+            planned_calls += self.pages(depth)
+            deeper += depth > self.default_depth
+            shallower += depth < self.default_depth
+
+            expected = self.expected_tweets(username, days)
+            if expected is not None:
+                fixed_missed += max(0.0, expected - self.default_depth)
+                planned_missed += max(0.0, expected - depth)
+
+        summary = {
+            'history_weeks': self.weeks,
+            'kols_with_history': sum(1 for username in usernames if self.has_history(username)),
+            'kols_deeper': deeper,
+            'kols_shallower': shallower,
+            'estimated_calls_fixed': fixed_calls,
+            'estimated_calls_planned': planned_calls,
+            'estimated_missed_fixed': round(fixed_missed),
+            'estimated_missed_planned': round(planned_missed),
+        }
+        return depths, summary
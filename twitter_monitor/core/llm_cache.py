@@ -0,0 +1,181 @@
+"""
+LLM 响应缓存模块
+按 (模型, prompt 模板版本, 规范化推文文本, 候选) 的哈希把 LLM 的 JSON 响应存到磁盘，
+重跑同一周（--skip-collection、周窗口重叠）时直接复用，不再重复请求
+"""
+
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    """规范化推文文本（NFC + 合并空白），避免排版差异导致缓存未命中"""
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def make_cache_key(model, template_version, text, candidates=()):
+    """
+    计算缓存键
+
+    Args:
+        model: 模型名
+        template_version: prompt 模板版本（模板修改时递增，旧缓存自然失效）
+        text: 推文文本（多条推文时为拼接后的文本）
+        candidates: 候选（可 JSON 序列化的列表，顺序有意义）
+
+    Returns:
+        str: sha256 十六进制摘要
+    """
+    payload = json.dumps(
+        [model, template_version, normalize_text(text), list(candidates)],
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    内容寻址的 LLM 响应缓存（每个条目一个 JSON 文件，按访问时间做 LRU 淘汰）
+    """
+
+    def __init__(self, cache_dir, max_bytes=None, max_entries=None):
+        """
+        初始化
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节，None 不限制）
+            max_entries: 条目数上限（None 不限制）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        # 键 -> 文件大小，按最近访问顺序排列（dict 保持插入顺序，末尾为最新）
+        self._entries = {}
+        self._total_bytes = 0
+        self._load_entries()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def _load_entries(self):
+        """扫描缓存目录，按文件修改时间（即最近访问时间）重建 LRU 顺序"""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        found = []
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(shard_dir, name))
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key):
+        """
+        读取缓存
+
+        Returns:
+            缓存的响应（每次读取都是新对象，可以放心修改），未命中返回 None
+        """
+        path = self._path(key)
+        with self._lock:
+            if key in self._entries:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = json.load(f)
+                    os.utime(path)
+                    self._entries[key] = self._entries.pop(key)
+                    self.stats['hits'] += 1
+                    return value
+                except (OSError, ValueError):
+                    self._forget(key)
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, value):
+        """写入缓存（原子替换），超出上限时淘汰最久未访问的条目"""
+        path = self._path(key)
+        data = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                size = os.path.getsize(path)
+            except OSError as e:
+                print(f"   ⚠️ 写入LLM缓存失败: {e}")
+                return
+
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self.stats['writes'] += 1
+            self._evict()
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        """淘汰最久未访问的条目，直到满足大小和数量上限（保留刚写入的条目）"""
+        while len(self._entries) > 1 and (
+                (self.max_bytes is not None and self._total_bytes > self.max_bytes) or
+                (self.max_entries is not None and len(self._entries) > self.max_entries)):
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
+            try:
+                os.remove(self._path(oldest))
+            except OSError:
+                pass
+            self.stats['evictions'] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def summary(self):
+        """缓存统计（一行文本）"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / lookups * 100 if lookups else 0.0
+        return (f"命中 {self.stats['hits']} / 未命中 {self.stats['misses']} ({hit_rate:.1f}%), "
+                f"写入 {self.stats['writes']}, 淘汰 {self.stats['evictions']}, "
+                f"共 {len(self._entries)} 条 / {self._total_bytes / 1024 / 1024:.1f}MB")
+
+
+def open_default_cache():
+    """按 LLM_CACHE 配置打开缓存（未启用时返回 None）"""
+    from config.config import LLM_CACHE
+
+    if not LLM_CACHE.get('enabled', True):
+        return None
+    return LLMResponseCache(
+        LLM_CACHE['cache_dir'],
+        max_bytes=LLM_CACHE.get('max_bytes'),
+        max_entries=LLM_CACHE.get('max_entries'),
+    )
@@ -0,0 +1,280 @@
+"""
+运行指标模块
+为周流水线各阶段记录 span（耗时 + 峰值 RSS）、计数器（API 调用、LLM token、缓存命中等）
+和分布（每个 KOL 的采集延迟、每次 LLM 调用的延迟），运行结束后写成周目录中的 run_metrics.json，
+便于比较不同周、不同代码版本之间的性能变化
+
+各阶段通过 get_run_metrics() 取得当前运行的指标对象，不需要层层传参；
+weekly_monitor.py 在运行开始时调用 start_run() 创建新的指标对象
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+METRICS_FILE = 'run_metrics.json'
+METRICS_VERSION = 1
+
+# RSS 采样间隔（秒）
+SAMPLE_INTERVAL = 0.05
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_mb():
+    """当前进程的常驻内存（MB，读取 /proc/self/statm；不支持的平台返回 None）"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb(who='self'):
+    """进程（who='children' 时为已结束的子进程）的历史峰值 RSS（MB，不支持的平台返回 None）"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if who == 'children' else resource.RUSAGE_SELF)
+    # macOS 上 ru_maxrss 单位为字节，Linux 上为 KB
+    return usage.ru_maxrss / 1024 / 1024 if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+
+
+def code_version():
+    """当前代码的 git 提交（不在 git 仓库中时返回 None）"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None if result.returncode == 0 else None
+
+
+def summarize_distribution(values):
+    """分布摘要：次数、总和、均值、p50 / p90 / p99、最大值"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    count = len(ordered)
+
+    def percentile(p):
+        return ordered[min(count - 1, int(p * count))]
+
+    total = sum(ordered)
+    return {
+        'count': count,
+        'total': round(total, 6),
+        'mean': round(total / count, 6),
+        'p50': round(percentile(0.50), 6),
+        'p90': round(percentile(0.90), 6),
+        'p99': round(percentile(0.99), 6),
+        'max': round(ordered[-1], 6),
+    }
+
+
+class _Span:
+    __slots__ = ('name', 'path', 'attrs', 'start', 'seconds', 'rss_start', 'rss_peak')
+
+    def __init__(self, name, path, attrs):
+        self.name = name
+        self.path = path
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.seconds = None
+        self.rss_start = current_rss_mb()
+        self.rss_peak = self.rss_start
+
+    def to_dict(self):
+        data = {
+            'name': self.name,
+            'path': self.path,
+            'seconds': round(self.seconds, 6) if self.seconds is not None else None,
+            'rss_start_mb': round(self.rss_start, 1) if self.rss_start is not None else None,
+            'rss_peak_mb': round(self.rss_peak, 1) if self.rss_peak is not None else None,
+        }
+        if self.attrs:
+            data['attrs'] = self.attrs
+        return data
+
+
+class RunMetrics:
+    """
+    一次运行的指标（线程安全：计数器和分布可在采集线程池中更新）
+    """
+
+    def __init__(self, sample_interval=SAMPLE_INTERVAL):
+        """
+        初始化
+
+        Args:
+            sample_interval: span 打开期间采样 RSS 的间隔（秒）；不支持读取当前 RSS 的平台上
+                span 的峰值为进程截至该 span 结束时的历史峰值
+        """
+        self.started_at = datetime.now()
+        self.sample_interval = sample_interval
+        self.spans = []
+        self.counters = {}
+        self.distributions = {}
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open = []
+        self._sampler = None
+        self._stop = threading.Event()
+
+    # ---- span ----
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        记录一个阶段的耗时和峰值 RSS（可嵌套，path 为 'parent/child'；异常照常抛出，span 仍会记录）
+
+        Args:
+            name: 阶段名
+            **attrs: 附加属性（需可 JSON 序列化）
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = '/'.join([s.name for s in stack] + [name])
+
+        item = _Span(name, path, attrs)
+        with self._lock:
+            self.spans.append(item)
+            self._open.append(item)
+        self._ensure_sampler(item)
+        stack.append(item)
+        try:
+            yield item
+        finally:
+            stack.pop()
+            item.seconds = time.perf_counter() - item.start
+            rss = current_rss_mb()
+            if rss is None:
+                rss = peak_rss_mb()
+            with self._lock:
+                self._open.remove(item)
+                if rss is not None and (item.rss_peak is None or rss > item.rss_peak):
+                    item.rss_peak = rss
+
+    def _ensure_sampler(self, item):
+        if item.rss_start is None or self._sampler is not None:
+            return
+        with self._lock:
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+                self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss_mb()
+            if rss is None:
+                return
+            with self._lock:
+                for item in self._open:
+                    if rss > item.rss_peak:
+                        item.rss_peak = rss
+
+    # ---- 计数器与分布 ----
+
+    def incr(self, name, value=1):
+        """计数器累加"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """记录分布中的一个观测值（如一次调用的延迟秒数）"""
+        with self._lock:
+            self.distributions.setdefault(name, []).append(value)
+
+    @contextmanager
+    def timed(self, name):
+        """把一段代码的耗时记入分布 name（异常时同样记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # ---- 输出 ----
+
+    def to_dict(self, **extra):
+        """
+        可 JSON 序列化的指标
+
+        Args:
+            **extra: 合并到顶层的字段（如周目录、运行方式；子进程方式可传 children_max_rss_mb）
+        """
+        finished_at = datetime.now()
+        with self._lock:
+            spans = [item.to_dict() for item in self.spans]
+            counters = dict(sorted(self.counters.items()))
+            distributions = {name: summarize_distribution(values)
+                             for name, values in sorted(self.distributions.items())}
+
+        data = {
+            'version': METRICS_VERSION,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': finished_at.isoformat(),
+            'wall_seconds': round((finished_at - self.started_at).total_seconds(), 3),
+            'code_version': code_version(),
+            'argv': sys.argv,
+            'python': platform.python_version(),
+            'platform': sys.platform,
+            'max_rss_mb': peak_rss_mb(),
+        }
+        data.update(extra)
+        data['spans'] = spans
+        data['counters'] = counters
+        data['distributions'] = distributions
+        return data
+
+    def write(self, week_dir, **extra):
+        """
+        原子写入周目录的 run_metrics.json
+
+        Returns:
+            str: 文件路径
+        """
+        self._stop.set()
+        path = os.path.join(str(week_dir), METRICS_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(**extra), f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+        return path
+
+
+_current = RunMetrics()
+
+
+def get_run_metrics():
+    """当前运行的指标对象"""
+    return _current
+
+
+def start_run(**kwargs):
+    """开始一次新的运行（替换当前指标对象）"""
+    global _current
+    _current = RunMetrics(**kwargs)
+    return _current
+
+
+def load_run_metrics(path):
+    """读取 run_metrics.json（path 可为周目录）"""
+    if os.path.isdir(path):
+        path = os.path.join(path, METRICS_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
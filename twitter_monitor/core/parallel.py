@@ -0,0 +1,66 @@
+"""
+分片并行模块
+把推文流切成连续分片交给进程池处理，按分片顺序产出各分片的部分聚合结果；
+调用方按顺序合并，结果与串行处理完全一致
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+# 每个分片的推文数
+DEFAULT_SHARD_SIZE = 2000
+
+
+def resolve_workers(workers):
+    """进程数（None 或 <=0 表示使用全部 CPU）"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def iter_shards(items, shard_size=DEFAULT_SHARD_SIZE):
+    """把可迭代对象切成连续的列表分片"""
+    iterator = iter(items)
+    while True:
+        shard = list(islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def map_shards(func, items, workers, shard_size=DEFAULT_SHARD_SIZE, initializer=None, initargs=()):
+    """
+    在进程池中对每个分片执行 func，按分片顺序产出结果
+
+    同时在途的分片不超过 workers * 2 个，推文流不会被一次性切分到内存中
+
+    Args:
+        func: 分片处理函数（模块级函数，可被 pickle）
+        items: 推文等可迭代对象
+        workers: 进程数（1 时在当前进程内逐片执行）
+        shard_size: 每个分片的条数
+        initializer: 每个工作进程启动时调用的函数（用于传入识别引擎等共享状态）
+        initargs: initializer 的参数
+
+    Yields:
+        func(shard) 的返回值
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for shard in iter_shards(items, shard_size):
+            yield func(shard)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        in_flight = deque()
+        for shard in iter_shards(items, shard_size):
+            in_flight.append(executor.submit(func, shard))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
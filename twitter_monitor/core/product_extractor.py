@@ -4,16 +4,102 @@
 """
 
 import re
-from config.config import EXCLUDE_TERMS
+from config.config import EXCLUDE_TERMS, RELEASE_SIGNALS
+
+
+# 与信号词无关的静态模式（模块加载时编译一次）
+AFTER_SIGNAL_RE = re.compile(
+    r'^[,\s]*([A-Z][A-Za-z0-9\s\.\-]+?)(?:\s+(?:is|has|can|will|for|with|by|and|or|,|\.|!|\?|:|;))'
+)
+BEFORE_SIGNAL_RE = re.compile(r'([A-Z][A-Za-z0-9\s\.\-]+?)\s*$')
+FIRST_WORD_RE = re.compile(r'^([A-Z][A-Za-z0-9\-\.]+)')
+VS_RE = re.compile(
+    r'([A-Z][A-Za-z0-9\s\-\.]+?)\s+vs\.?\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)',
+    re.IGNORECASE
+)
+# VS_RE 的必要条件与其产品词组的字符集，用于快速排除和确定扫描起点
+VS_SEPARATOR_RE = re.compile(r'\svs\.?\s', re.IGNORECASE)
+VS_PHRASE_CHAR_RE = re.compile(r'[A-Za-z0-9\s\-\.]', re.IGNORECASE)
+CAPITALIZED_RE = re.compile(r'\b([A-Z][A-Za-z0-9\-\.]+(?:\s+[A-Z][A-Za-z0-9\-\.]+)*)\b')
+VERSION_RE = re.compile(r'\d+\.?\d*')
+
+
+def compile_signal_patterns(signal):
+    """
+    编译单个信号词的全部提取模式
+
+    Args:
+        signal: 信号词
+
+    Returns:
+        dict: {'signal': ..., 'after_new': ..., 'object': ..., 'action': ...}
+    """
+    escaped = re.escape(signal)
+    return {
+        # 信号词本身
+        'signal': re.compile(escaped, re.IGNORECASE),
+        # "new X"
+        'after_new': re.compile(
+            rf'\b{escaped}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:is|has|can|model|tool|AI|from|by|,|\.|!|\?))',
+            re.IGNORECASE
+        ),
+        # "better than X" / "alternative to X"
+        'object': re.compile(
+            rf'{escaped}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)',
+            re.IGNORECASE
+        ),
+        # "tried X" / "using X"
+        'action': re.compile(
+            rf'{escaped}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:and|or|,|\.|!|\?|:|;)|$)',
+            re.IGNORECASE
+        ),
+    }
 
 
 class ProductExtractor:
     """
     产品名称提取器（基于信号词）
+
+    每个信号词的提取模式在初始化时预编译；
+    各提取策略直接使用 SignalDetector 给出的信号位置，不再重新搜索信号词
     """
 
     def __init__(self):
         self.exclude_terms = EXCLUDE_TERMS
+        self._patterns = {}
+        for signal_list in RELEASE_SIGNALS.values():
+            for signal in signal_list:
+                if signal not in self._patterns:
+                    self._patterns[signal] = compile_signal_patterns(signal)
+
+    def _signal_patterns(self, signal):
+        """获取信号词的预编译模式（不在信号词库中的信号词首次使用时编译）"""
+        patterns = self._patterns.get(signal)
+        if patterns is None:
+            patterns = compile_signal_patterns(signal)
+            self._patterns[signal] = patterns
+        return patterns
+
+    def _locate_signal(self, text, signal, position=None):
+        """
+        确定信号词在原文中的起始位置
+
+        Args:
+            text: 文本
+            signal: 信号词
+            position: SignalDetector 给出的位置（在小写文本中计算，
+                      个别 Unicode 字符小写后长度会变化，因此先校验再使用）
+
+        Returns:
+            int: 起始位置（未找到返回 None）
+        """
+        pattern = self._signal_patterns(signal)['signal']
+
+        if position is not None and pattern.match(text, position):
+            return position
+
+        match = pattern.search(text)
+        return match.start() if match else None
 
     def extract_products_from_signaled_tweet(self, tweet, signals):
         """
@@ -32,23 +118,24 @@ class ProductExtractor:
         for signal_info in signals:
             signal = signal_info['signal']
             category = signal_info['category']
+            position = signal_info.get('position')
 
             # 根据信号类别选择提取策略
             if category in ['launch', 'announcement']:
-                candidates = self._extract_near_signal(text, signal)
+                candidates = self._extract_near_signal(text, signal, position)
 
             elif category == 'new':
-                candidates = self._extract_after_new(text, signal)
+                candidates = self._extract_after_new(text, signal, position)
 
             elif category == 'comparison':
-                candidates = self._extract_comparison_products(text, signal)
+                candidates = self._extract_comparison_products(text, signal, position)
 
             elif category in ['testing', 'availability']:
-                candidates = self._extract_action_target(text, signal)
+                candidates = self._extract_action_target(text, signal, position)
 
             else:
                 # 通用提取：信号词附近的大写词组
-                candidates = self._extract_capitalized_near(text, signal)
+                candidates = self._extract_capitalized_near(text, signal, position=position)
 
             # 记录候选产品
             for name in candidates:
@@ -72,7 +159,7 @@ class ProductExtractor:
 
         return products
 
-    def _extract_near_signal(self, text, signal):
+    def _extract_near_signal(self, text, signal, position=None):
         """
         提取信号词附近的产品名
 
@@ -80,26 +167,21 @@ class ProductExtractor:
         - "Google just released Gemini 2.0" → ["Gemini 2.0"]
         - "Anthropic announced Claude 3.5" → ["Claude 3.5"]
         """
-        pattern = re.escape(signal)
-        match = re.search(pattern, text, re.IGNORECASE)
+        signal_pos = self._locate_signal(text, signal, position)
 
-        if not match:
+        if signal_pos is None:
             return []
 
-        signal_pos = match.start()
         products = []
 
         # 策略1: 信号词之后的词组
         after_text = text[signal_pos + len(signal):].strip()
         # 匹配大写开头的词组，直到遇到特定词或标点
-        after_match = re.match(
-            r'^[,\s]*([A-Z][A-Za-z0-9\s\.\-]+?)(?:\s+(?:is|has|can|will|for|with|by|and|or|,|\.|!|\?|:|;))',
-            after_text
-        )
+        after_match = AFTER_SIGNAL_RE.match(after_text)
 
         # 策略2: 信号词之前的词组
         before_text = text[:signal_pos].strip()
-        before_match = re.search(r'([A-Z][A-Za-z0-9\s\.\-]+?)\s*$', before_text)
+        before_match = BEFORE_SIGNAL_RE.search(before_text)
 
         if after_match:
             products.append(after_match.group(1).strip())
@@ -108,7 +190,7 @@ class ProductExtractor:
 
         return products
 
-    def _extract_after_new(self, text, signal='new'):
+    def _extract_after_new(self, text, signal='new', position=None):
         """
         提取 "new X" 中的X
 
@@ -116,15 +198,19 @@ class ProductExtractor:
         - "the new Claude model" → ["Claude"]
         - "introducing new Gemini" → ["Gemini"]
         """
-        pattern = rf'\b{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:is|has|can|model|tool|AI|from|by|,|\.|!|\?))'
-        matches = re.finditer(pattern, text, re.IGNORECASE)
+        # 信号词首次出现之前不可能有匹配，从该位置开始扫描
+        signal_pos = self._locate_signal(text, signal, position)
+        if signal_pos is None:
+            return []
+
+        matches = self._signal_patterns(signal)['after_new'].finditer(text, signal_pos)
 
         products = []
         for match in matches:
             product_phrase = match.group(1).strip()
 
             # 提取首个大写词（可能就是产品名）
-            first_word_match = re.match(r'^([A-Z][A-Za-z0-9\-\.]+)', product_phrase)
+            first_word_match = FIRST_WORD_RE.match(product_phrase)
             if first_word_match:
                 products.append(first_word_match.group(1))
 
@@ -134,7 +220,7 @@ class ProductExtractor:
 
         return products
 
-    def _extract_comparison_products(self, text, signal):
+    def _extract_comparison_products(self, text, signal, position=None):
         """
         从对比句中提取产品
 
@@ -143,31 +229,35 @@ class ProductExtractor:
         - "better than X" → [X]
         """
         products = []
+        signal_lower = signal.lower()
 
-        if signal.lower() == 'vs':
-            # "X vs Y" 模式
-            pattern = r'([A-Z][A-Za-z0-9\s\-\.]+?)\s+vs\.?\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                products.extend([match.group(1).strip(), match.group(2).strip()])
+        if signal_lower == 'vs':
+            # "X vs Y" 模式：信号词库的 'vs' 也会命中 "devs" 等词，先确认存在独立的 vs，
+            # 再从其所在词组的开头扫描（匹配不可能从更早的位置开始）
+            separator = VS_SEPARATOR_RE.search(text)
+            if not separator:
+                return products
 
-        elif 'better than' in signal.lower() or 'beats' in signal.lower():
-            # "better than X" 模式
-            pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                products.append(match.group(1).strip())
+            start = separator.start()
+            while start > 0 and VS_PHRASE_CHAR_RE.match(text, start - 1):
+                start -= 1
 
-        elif 'alternative to' in signal.lower() or 'competitor to' in signal.lower():
-            # "alternative to X" 模式
-            pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s|,|\.|\?|!|$)'
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = VS_RE.search(text, start)
             if match:
-                products.append(match.group(1).strip())
+                products.extend([match.group(1).strip(), match.group(2).strip()])
+
+        elif ('better than' in signal_lower or 'beats' in signal_lower or
+              'alternative to' in signal_lower or 'competitor to' in signal_lower):
+            # "better than X" / "alternative to X" 模式
+            signal_pos = self._locate_signal(text, signal, position)
+            if signal_pos is not None:
+                match = self._signal_patterns(signal)['object'].search(text, signal_pos)
+                if match:
+                    products.append(match.group(1).strip())
 
         return products
 
-    def _extract_action_target(self, text, signal):
+    def _extract_action_target(self, text, signal, position=None):
         """
         提取动作的目标产品
 
@@ -175,15 +265,18 @@ class ProductExtractor:
         - "tried X" → [X]
         - "using X" → [X]
         """
-        pattern = rf'{re.escape(signal)}\s+([A-Z][A-Za-z0-9\s\-\.]+?)(?:\s+(?:and|or|,|\.|!|\?|:|;)|$)'
-        match = re.search(pattern, text, re.IGNORECASE)
+        signal_pos = self._locate_signal(text, signal, position)
+        if signal_pos is None:
+            return []
+
+        match = self._signal_patterns(signal)['action'].search(text, signal_pos)
 
         if match:
             return [match.group(1).strip()]
 
         return []
 
-    def _extract_capitalized_near(self, text, signal, window=100):
+    def _extract_capitalized_near(self, text, signal, window=100, position=None):
         """
         提取信号词附近的大写词组（通用方法）
 
@@ -191,22 +284,20 @@ class ProductExtractor:
             text: 文本
             signal: 信号词
             window: 窗口大小
+            position: 信号词位置（SignalDetector 给出，可选）
 
         Returns:
             list: 产品候选
         """
-        match = re.search(re.escape(signal), text, re.IGNORECASE)
-        if not match:
+        pos = self._locate_signal(text, signal, position)
+        if pos is None:
             return []
 
-        pos = match.start()
         start = max(0, pos - window)
         end = min(len(text), pos + len(signal) + window)
-        context = text[start:end]
 
-        # 提取所有大写开头的词组
-        pattern = r'\b([A-Z][A-Za-z0-9\-\.]+(?:\s+[A-Z][A-Za-z0-9\-\.]+)*)\b'
-        matches = re.finditer(pattern, context)
+        # 提取所有大写开头的词组（在窗口内匹配，边界语义与切片一致）
+        matches = CAPITALIZED_RE.finditer(text[start:end])
 
         products = []
         for match in matches:
@@ -242,7 +333,7 @@ class ProductExtractor:
 
         # 根据产品名特征调整
         # 包含版本号（更可靠）
-        if re.search(r'\d+\.?\d*', product_name):
+        if VERSION_RE.search(product_name):
             base_confidence += 0.1
 
         # 包含常见后缀（更可靠）
@@ -0,0 +1,297 @@
+"""
+产品识别模块
+把产品规则、Product Knowledge 产品名和别名编译为一个组合正则，每条推文只扫描一次，
+输出规范化的产品名（analyze_tweets.py 与 integrate_product_knowledge_v3.py 共用）
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+
+
+# 产品 / 公司名（字面量，大小写不敏感匹配，按此写法输出）
+PRODUCT_NAMES = [
+    # AI工具
+    'ChatGPT', 'Claude', 'Gemini', 'Copilot', 'GitHub Copilot', 'Cursor', 'Codeium', 'V0', 'Bolt',
+    'Windsurf', 'Lovable', 'Replit', 'Midjourney', 'DALL-E', 'Stable Diffusion', 'RunwayML',
+    'Suno', 'Udio', 'Sora', 'Seedream', 'NotebookLM', 'Vercel',
+    # 开发工具
+    'VS Code', 'WebStorm', 'IntelliJ', 'Xcode', 'Figma', 'Framer', 'Webflow', 'Notion', 'Linear',
+    'Slack', 'Discord', 'Telegram',
+    # AI模型
+    'DeepSeek', 'Qwen', 'Mistral', 'Falcon', 'Mixtral', 'Grok',
+    # AI平台 / 公司
+    'HuggingFace', 'Replicate', 'Together AI', 'Anthropic', 'OpenAI', 'Google AI', 'Perplexity',
+    'Poe', 'Character.AI', 'Google', 'Meta', 'xAI', 'Microsoft',
+]
+
+# 带版本号的产品系列（必须带版本号或型号后缀，裸名称由 PRODUCT_NAMES 匹配）
+VERSIONED_PATTERNS = [
+    r'GPT-?[0-9o]+(?:\s+(?:mini|turbo|pro|high|minimal|codex))?',
+    r'Claude(?:\s+[0-9][0-9.]*(?:\s+(?:Opus|Sonnet|Haiku))?|\s+(?:Opus|Sonnet|Haiku))',
+    r'Gemini(?:\s+[0-9][0-9.]*(?:\s+(?:Pro|Flash|Ultra|Nano\s+Banana))?|\s+(?:Pro|Flash|Ultra|Nano\s+Banana))',
+    r'Llama\s*[0-9][0-9.]*',
+    r'Mistral\s+[0-9][0-9.]*',
+    r'DeepSeek(?:\s+V[0-9][0-9.]*(?:\s+(?:Exp|R1))?|\s+(?:Exp|R1))',
+    r'Qwen[0-9][0-9.]*',
+    r'GLM-?[0-9][0-9.]*',
+]
+
+# 版本化产品名中各单词的规范写法（如 "gpt-4o mini" → "GPT-4o mini"）
+CANONICAL_WORDS = [
+    'GPT', 'Claude', 'Opus', 'Sonnet', 'Haiku', 'Gemini', 'Pro', 'Flash', 'Ultra', 'Nano', 'Banana',
+    'Llama', 'Mistral', 'DeepSeek', 'V', 'Exp', 'R', 'Qwen', 'GLM',
+]
+
+# 发布动词后的大写词组（发布对象）
+LAUNCH_PATTERN = (
+    r'\b(?:launched|releasing|introduced|unveils?|announces?|debuts?|drops?)\s+'
+    r'(?P<launch_target>(?-i:[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?))'
+)
+
+# @提及
+MENTION_PATTERN = r'@(?P<handle>[a-zA-Z0-9_]+)'
+
+KIND_PRODUCT = 'product'
+KIND_MENTION = 'mention'
+KIND_LAUNCH = 'launch'
+ALL_KINDS = (KIND_PRODUCT, KIND_MENTION, KIND_LAUNCH)
+
+
+def _trie_regex(terms):
+    """
+    把一组字面量编译为前缀合并的正则（同一前缀下较长的分支优先，贪婪匹配得到最长词）
+
+    Args:
+        terms: 字面量列表（单词间空格匹配任意空白）
+
+    Returns:
+        str: 正则片段（为空时返回 None）
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r'\s+' if ch == ' ' else re.escape(ch)
+            branches.append(atom + build(node[ch]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # 当前节点已是完整词：更长的分支可选
+            return '(?:' + body + ')?'
+        return body
+
+    if not trie:
+        return None
+    return build(trie)
+
+
+def _bounded(fragment):
+    """两端要求不与单词字符相连（兼容以标点开头/结尾的产品名）"""
+    return r'(?<!\w)(?:' + fragment + r')(?!\w)'
+
+
+def _is_term(term):
+    """可编入词条 trie 的产品名 / 别名（空词条会让组合正则匹配空串）"""
+    return isinstance(term, str) and bool(term.strip())
+
+
+def knowledge_terms(products):
+    """
+    从 Product Knowledge 产品记录中收集产品名与别名
+
+    Args:
+        products: 产品记录（含 name / aliases 的字典）的可迭代对象，可有重复
+
+    Returns:
+        tuple: (产品名列表, {别名: 产品名})
+    """
+    names = []
+    aliases = {}
+    seen = set()
+    for product in products:
+        if not isinstance(product, dict) or 'name' not in product:
+            continue
+        key = product.get('id', product['name'])
+        if key in seen or not _is_term(product['name']):
+            continue
+        seen.add(key)
+        names.append(product['name'])
+        for alias in product.get('aliases', []) or []:
+            if _is_term(alias):
+                aliases.setdefault(alias, product['name'])
+    return names, aliases
+
+
+class ProductPatternEngine:
+    """
+    组合产品识别引擎
+
+    规则、产品名和知识库词条编译为一个带命名分组的正则，按位置从左到右扫描一次；
+    同一位置若有多个产品词条可匹配，取最长者
+    """
+
+    def __init__(self, knowledge_names=None, aliases=None):
+        """
+        初始化
+
+        Args:
+            knowledge_names: Product Knowledge 产品名（大小写敏感匹配，避免把普通单词当作产品）
+            aliases: {别名: 产品名}（大小写敏感匹配）
+        """
+        aliases = aliases or {}
+
+        # 规范写法表
+        self._names_lower = {name.lower(): name for name in PRODUCT_NAMES}
+        self._knowledge = {}
+        for name in knowledge_names or []:
+            if _is_term(name):
+                self._knowledge[name] = name
+        for alias, name in aliases.items():
+            if _is_term(alias):
+                self._knowledge.setdefault(alias, name)
+        self._words = {word.lower(): word for word in CANONICAL_WORDS}
+
+        versioned = r'\b(?:' + '|'.join(VERSIONED_PATTERNS) + r')\b'
+        names = _bounded(_trie_regex(PRODUCT_NAMES))
+        knowledge_fragment = _trie_regex(self._knowledge)
+        knowledge = _bounded('(?-i:' + knowledge_fragment + ')') if knowledge_fragment else None
+
+        # 单独编译的产品子模式，用于在同一位置选出最长匹配
+        self._product_res = [re.compile(versioned, re.IGNORECASE), re.compile(names, re.IGNORECASE)]
+        if knowledge:
+            self._product_res.append(re.compile(knowledge, re.IGNORECASE))
+
+        branches = [
+            LAUNCH_PATTERN,
+            MENTION_PATTERN,
+            '(?P<versioned>' + versioned + ')',
+            '(?P<name>' + names + ')',
+        ]
+        if knowledge:
+            branches.append('(?P<knowledge>' + knowledge + ')')
+        self.pattern = re.compile('|'.join(branches), re.IGNORECASE)
+        self._signature = None
+
+    @property
+    def signature(self):
+        """引擎指纹（组合正则和知识库词条的摘要）：用同一引擎建立的产品索引键才能直接查询"""
+        if self._signature is None:
+            payload = json.dumps([self.pattern.pattern, sorted(self._knowledge.items())], ensure_ascii=False)
+            self._signature = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+        return self._signature
+
+    def canonical_name(self, surface):
+        """
+        规范化产品名
+
+        Args:
+            surface: 文本中出现的写法
+
+        Returns:
+            str: 规范名（知识库名 > 内置产品名 > 按单词规范写法）
+        """
+        surface = ' '.join(surface.split())
+
+        if surface in self._knowledge:
+            return self._knowledge[surface]
+        lower = surface.lower()
+        if lower in self._names_lower:
+            return self._names_lower[lower]
+
+        return re.sub(r'[A-Za-z]+', lambda m: self._words.get(m.group(0).lower(), m.group(0)), surface)
+
+    def known_name(self, surface):
+        """已知产品（知识库或内置产品名）的规范名，未知返回 None"""
+        if surface in self._knowledge:
+            return self._knowledge[surface]
+        return self._names_lower.get(surface.lower())
+
+    def _longest_product_end(self, text, start):
+        end = start
+        for regex in self._product_res:
+            match = regex.match(text, start)
+            if match and match.end() > end:
+                end = match.end()
+        return end
+
+    def scan(self, text):
+        """
+        扫描文本中的所有识别结果
+
+        Args:
+            text: 文本
+
+        Returns:
+            list: [(kind, 规范名, start, end), ...]，按位置排序
+                  kind 为 'product' / 'mention'（未知账号的@提及）/ 'launch'（发布动词后的对象）
+        """
+        hits = []
+        pos = 0
+        search = self.pattern.search
+
+        while True:
+            match = search(text, pos)
+            if not match:
+                break
+
+            if match.group('launch_target') is not None:
+                start, end = match.span('launch_target')
+                hits.append((KIND_LAUNCH, ' '.join(match.group('launch_target').split()), start, end))
+                # 发布对象本身可能就是已知产品，从对象处继续扫描
+                pos = start
+
+            elif match.group('handle') is not None:
+                handle = match.group('handle')
+                known = self.known_name(handle)
+                if known:
+                    hits.append((KIND_PRODUCT, known, match.start('handle'), match.end()))
+                else:
+                    hits.append((KIND_MENTION, handle, match.start(), match.end()))
+                pos = match.end()
+
+            else:
+                start = match.start()
+                end = self._longest_product_end(text, start)
+                if end == start:
+                    # 空匹配：至少前进一个字符，避免原地循环
+                    pos = start + 1
+                    continue
+                hits.append((KIND_PRODUCT, self.canonical_name(text[start:end]), start, end))
+                pos = end
+
+        return hits
+
+    def extract(self, text, kinds=ALL_KINDS):
+        """
+        提取文本中的产品名（去重，按首次出现顺序）
+
+        Args:
+            text: 文本
+            kinds: 需要的结果类型
+
+        Returns:
+            list: 规范化的产品名
+        """
+        names = []
+        seen = set()
+        for kind, name, _, _ in self.scan(text):
+            if kind in kinds and name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+
+@lru_cache(maxsize=1)
+def get_default_engine():
+    """不含知识库词条的共享引擎"""
+    return ProductPatternEngine()
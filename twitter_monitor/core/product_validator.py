@@ -3,12 +3,85 @@
 使用LLM验证提取的产品候选
 """
 
+import json
 import sys
 import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from difflib import SequenceMatcher
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from utils.llm_helper import LLMHelper
 from config.config import PRODUCT_DISCOVERY
+from core.llm_cache import make_cache_key, open_default_cache
+from core.metrics import get_run_metrics
+from core.rate_limiter import RateLimiter
+
+
+# 产品名相似度阈值（SequenceMatcher.ratio）
+SIMILARITY_THRESHOLD = 0.7
+
+# 验证 prompt 模板版本（修改 prompt 或返回格式时递增，使旧的缓存响应失效）
+VALIDATION_TEMPLATE_VERSION = 'validation-v1'
+
+# merge_method='auto' 时，不超过该数量的产品仍使用两两比较
+PAIRWISE_MERGE_LIMIT = 200
+
+
+def _names_similar(name1, name2, overlap=None):
+    """
+    两个（小写）产品名是否相似：互相包含，或相似度超过阈值
+
+    Args:
+        name1, name2: 小写产品名（相似度按 SequenceMatcher(None, name1, name2) 计算）
+        overlap: 两个名称的共同字符数（可选，即 quick_ratio 的匹配数）。
+                 分块时由预先建好的字符词元集合求交得到，避免为每一对重建字符统计
+    """
+    # 包含关系也认为相似
+    if name1 in name2 or name2 in name1:
+        return True
+
+    # 长度差太大时相似度不可能超过阈值
+    if 2 * min(len(name1), len(name2)) / (len(name1) + len(name2)) <= SIMILARITY_THRESHOLD:
+        return False
+
+    # quick_ratio 是 ratio 的上界且与参数顺序无关
+    if overlap is None:
+        quick_ratio = SequenceMatcher(None, name1, name2).quick_ratio()
+    else:
+        quick_ratio = 2.0 * overlap / (len(name1) + len(name2))
+    if quick_ratio <= SIMILARITY_THRESHOLD:
+        return False
+
+    return SequenceMatcher(None, name1, name2).ratio() > SIMILARITY_THRESHOLD
+
+
+def _char_tokens(name):
+    """名称的字符多重集：第 k 次出现的字符记为词元 '字符k'，两个名称的共同词元数即 quick_ratio 的匹配数"""
+    seen = Counter()
+    tokens = []
+    for ch in name:
+        tokens.append(f'{ch}{seen[ch]}')
+        seen[ch] += 1
+    return tokens
+
+
+def _min_overlap(length):
+    """
+    长度为 length 的名称与任何名称相似度超过阈值所需的最少共同字符数
+
+    ratio = 2M / (len1 + len2) 且 M 不超过共同字符数 m，长度过滤又要求较短者 > t·较长者 / (2 - t)，
+    因此 m > t·length / (2 - t)（减去 1e-9 只会让结果偏小，分块仍然完整）
+    """
+    t = SIMILARITY_THRESHOLD
+    return int(t * length / (2 - t) - 1e-9) + 1
+
+
+def _result_products(result):
+    """LLM 验证结果中的产品列表（products 不是列表时为空，跳过不是字典的项）"""
+    products = result.get('products')
+    if not isinstance(products, list):
+        return []
+    return [product for product in products if isinstance(product, dict)]
 
 
 class ProductValidator:
@@ -16,22 +89,70 @@ class ProductValidator:
     产品验证器（基于LLM）
     """
 
-    def __init__(self, model='deepseek-v3.1-terminus'):
-        self.llm = LLMHelper(model=model)
-        self.confidence_threshold = PRODUCT_DISCOVERY['confidence_threshold']
+    def __init__(self, model='deepseek-v3.1-terminus', llm=None, concurrency=None, requests_per_second=None,
+                 cache=None):
+        """
+        初始化
 
-    def validate_candidates(self, candidates, tweets_map, batch_size=50):
+        Args:
+            model: LLM模型名
+            llm: LLM客户端（可选，需提供 call_claude_json；默认首次验证时创建 LLMHelper）
+            concurrency: 并发的LLM批次数（默认读取 PRODUCT_DISCOVERY['llm_concurrency']）
+            requests_per_second: 每秒LLM请求预算（默认读取配置，None 不限流）
+            cache: LLM响应缓存（LLMResponseCache；None 按 LLM_CACHE 配置打开，False 不使用缓存）
+        """
+        self.model = model
+        self._llm = llm
+        if cache is None:
+            cache = open_default_cache()
+        self.cache = None if cache is False else cache
+        self.confidence_threshold = PRODUCT_DISCOVERY['confidence_threshold']
+        self.merge_method = PRODUCT_DISCOVERY.get('merge_method', 'auto')
+        self.batch_size = PRODUCT_DISCOVERY.get('llm_batch_size', 50)
+        self.concurrency = concurrency or PRODUCT_DISCOVERY.get('llm_concurrency', 1)
+        if requests_per_second is None:
+            requests_per_second = PRODUCT_DISCOVERY.get('llm_requests_per_second')
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+    @property
+    def llm(self):
+        """LLM客户端（首次验证时创建，合并等本地操作不需要）"""
+        if self._llm is None:
+            from utils.llm_helper import LLMHelper
+            self._llm = LLMHelper(model=self.model)
+        return self._llm
+
+    def _call_llm(self, prompt):
+        """调用LLM（受每秒请求预算限制；调用次数、prompt 长度和延迟记入运行指标）"""
+        metrics = get_run_metrics()
+        if self.rate_limiter is not None:
+            with metrics.timed('llm.rate_limit_wait_s'):
+                self.rate_limiter.acquire()
+        metrics.incr('llm.calls')
+        metrics.incr('llm.prompt_chars', len(prompt))
+        try:
+            with metrics.timed('llm.latency_s'):
+                return self.llm.call_claude_json(prompt)
+        except Exception:
+            metrics.incr('llm.errors')
+            raise
+
+    def validate_candidates(self, candidates, tweets_map, batch_size=None, concurrency=None):
         """
         验证候选产品
 
         Args:
             candidates: 候选产品列表
             tweets_map: 推文映射 {tweet_id: tweet}
-            batch_size: 批处理大小
+            batch_size: 每次LLM调用打包的推文数（1 为逐条验证，默认读取配置）
+            concurrency: 并发的批次数（默认使用初始化时的设置）
 
         Returns:
-            list: 验证通过的产品
+            list: 验证通过的产品（按推文首次出现的顺序）
         """
+        batch_size = max(1, batch_size or self.batch_size)
+        concurrency = max(1, concurrency or self.concurrency)
+
         print(f"\n🤖 LLM验证产品候选...")
         print(f"   - 候选数量: {len(candidates)}")
         print(f"   - 批处理大小: {batch_size}")
@@ -40,23 +161,45 @@ class ProductValidator:
         grouped = self._group_by_tweet(candidates)
         print(f"   - 涉及推文: {len(grouped)}")
 
+        items = list(grouped.items())
+
+        # 已缓存的推文直接复用，其余推文打包成批次
+        results = {}
+        if self.cache is not None:
+            for tweet_id, tweet_candidates in items:
+                cached = self.cache.get(self._cache_key(tweets_map.get(tweet_id, {}), tweet_candidates))
+                if cached is not None:
+                    results[tweet_id] = cached
+            if results:
+                print(f"   - 缓存命中: {len(results)} 条推文")
+                get_run_metrics().incr('llm.cache_hits', len(results))
+
+        pending = [item for item in items if item[0] not in results]
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        print(f"   - LLM批次: {len(batches)}（并发 {concurrency}）")
+
+        done_tweets = 0
+        for batch, batch_results, error in self._iter_batch_results(batches, tweets_map, concurrency):
+            if error is not None:
+                if len(batch) == 1:
+                    print(f"   ⚠️ 验证推文 {batch[0][0]} 失败: {error}")
+                else:
+                    print(f"   ⚠️ 验证批次（{len(batch)} 条推文，首条 {batch[0][0]}）失败: {error}")
+            else:
+                results.update(batch_results)
+
+            previous = done_tweets
+            done_tweets += len(batch)
+            if done_tweets // 10 > previous // 10:
+                print(f"   进度: {done_tweets}/{len(pending)} 推文")
+
+        # 按推文顺序汇总
         validated = []
-        total_tweets = len(grouped)
-
-        for i, (tweet_id, tweet_candidates) in enumerate(grouped.items(), 1):
-            try:
-                tweet = tweets_map.get(tweet_id, {})
-                result = self._validate_tweet_products(tweet, tweet_candidates)
-
-                if result and result.get('is_about_product'):
-                    validated.extend(result['products'])
-
-                if i % 10 == 0:
-                    print(f"   进度: {i}/{total_tweets} 推文")
-
-            except Exception as e:
-                print(f"   ⚠️ 验证推文 {tweet_id} 失败: {e}")
-                continue
+        for tweet_id, _ in items:
+            result = results.get(tweet_id)
+            if isinstance(result, dict) and result.get('is_about_product'):
+                self._attach_tweet_info(result, tweets_map.get(tweet_id, {}))
+                validated.extend(_result_products(result))
 
         # 过滤低置信度
         validated = [
@@ -65,9 +208,111 @@ class ProductValidator:
         ]
 
         print(f"   ✅ 验证完成: {len(validated)} 个产品通过")
+        if self.cache is not None:
+            print(f"   - LLM缓存: {self.cache.summary()}")
 
         return validated
 
+    def _cache_key(self, tweet, candidates):
+        """单条推文验证结果的缓存键（逐条和批量验证共用，结果格式相同）"""
+        return make_cache_key(
+            self.model,
+            VALIDATION_TEMPLATE_VERSION,
+            tweet.get('text', ''),
+            [[c['product_name'], c['signal_word'], c['signal_category']] for c in candidates],
+        )
+
+    def _iter_batch_results(self, batches, tweets_map, concurrency):
+        """
+        按批次顺序产出验证结果（并发模式下结果按原顺序重排）
+
+        Yields:
+            tuple: (batch, {tweet_id: 验证结果}, error)
+        """
+        if concurrency <= 1 or len(batches) <= 1:
+            for batch in batches:
+                try:
+                    yield batch, self._validate_batch(batch, tweets_map), None
+                except Exception as e:
+                    yield batch, {}, e
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(self._validate_batch, batch, tweets_map): i
+                for i, batch in enumerate(batches)
+            }
+
+            # 乱序完成的结果先缓存，保证输出顺序与串行模式一致
+            pending = {}
+            next_index = 0
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    pending[i] = (future.result(), None)
+                except Exception as e:
+                    pending[i] = ({}, e)
+
+                while next_index in pending:
+                    batch_results, error = pending.pop(next_index)
+                    yield batches[next_index], batch_results, error
+                    next_index += 1
+
+    def _validate_batch(self, batch, tweets_map):
+        """
+        验证一个批次 [(tweet_id, 候选列表), ...]
+
+        单条推文沿用逐条验证的prompt；多条推文打包成一次调用，
+        响应中缺失的推文再逐条验证
+
+        Returns:
+            dict: {tweet_id: 验证结果}
+        """
+        if len(batch) == 1:
+            tweet_id, tweet_candidates = batch[0]
+            return {tweet_id: self._validate_tweet_products(
+                tweets_map.get(tweet_id, {}), tweet_candidates, check_cache=False
+            )}
+
+        prompt = self._build_batch_validation_prompt(batch, tweets_map)
+        response = self._call_llm(prompt)
+
+        returned = {}
+        if isinstance(response, dict):
+            for item in response.get('results') or []:
+                if isinstance(item, dict) and 'tweet_id' in item:
+                    returned.setdefault(str(item['tweet_id']), item)
+
+        results = {}
+        for tweet_id, tweet_candidates in batch:
+            tweet = tweets_map.get(tweet_id, {})
+            result = returned.get(str(tweet_id))
+            if result is None:
+                # 响应中缺失的推文逐条验证；单条失败只跳过该推文，不影响批次中其他推文的结果
+                try:
+                    results[tweet_id] = self._validate_tweet_products(tweet, tweet_candidates, check_cache=False)
+                except Exception as e:
+                    print(f"   ⚠️ 验证推文 {tweet_id} 失败: {e}")
+                continue
+
+            result = {
+                'is_about_product': bool(result.get('is_about_product')),
+                'products': _result_products(result),
+            }
+            if self.cache is not None:
+                self.cache.put(self._cache_key(tweet, tweet_candidates), result)
+            results[tweet_id] = result
+
+        return results
+
+    def _attach_tweet_info(self, result, tweet):
+        """给验证出的产品添加原始推文信息（跳过格式不对的响应）"""
+        if isinstance(result, dict) and result.get('is_about_product'):
+            for product in _result_products(result):
+                product['tweet_id'] = tweet.get('id', '')
+                product['tweet_text'] = tweet.get('text', '')
+                product['author'] = tweet.get('author_id', '')
+
     def _group_by_tweet(self, candidates):
         """按推文ID分组"""
         grouped = {}
@@ -78,31 +323,36 @@ class ProductValidator:
             grouped[tweet_id].append(candidate)
         return grouped
 
-    def _validate_tweet_products(self, tweet, candidates):
+    def _validate_tweet_products(self, tweet, candidates, check_cache=True):
         """
         验证单条推文中的产品候选
 
         Args:
             tweet: 推文数据
             candidates: 该推文的候选列表
+            check_cache: 是否先查缓存（调用方已查过时传 False，响应仍会写入缓存）
 
         Returns:
             dict: 验证结果
         """
         text = tweet.get('text', '')
 
-        # 构建prompt
-        prompt = self._build_validation_prompt(text, candidates)
+        cache_key = self._cache_key(tweet, candidates)
+        result = self.cache.get(cache_key) if self.cache is not None and check_cache else None
+        if result is not None:
+            get_run_metrics().incr('llm.cache_hits')
 
-        # 调用LLM
-        result = self.llm.call_claude_json(prompt)
+        if result is None:
+            # 构建prompt
+            prompt = self._build_validation_prompt(text, candidates)
+
+            # 调用LLM
+            result = self._call_llm(prompt)
+            if self.cache is not None and isinstance(result, dict):
+                self.cache.put(cache_key, result)
 
         # 添加原始信息
-        if result.get('is_about_product') and result.get('products'):
-            for product in result['products']:
-                product['tweet_id'] = tweet.get('id', '')
-                product['tweet_text'] = text
-                product['author'] = tweet.get('author_id', '')
+        self._attach_tweet_info(result, tweet)
 
         return result
 
@@ -169,21 +419,107 @@ class ProductValidator:
 
         return prompt
 
-    def merge_similar_products(self, products):
+    def _build_batch_validation_prompt(self, batch, tweets_map):
         """
-        合并相似的产品名（简单版本）
+        构建批量验证prompt（多条推文的候选打包成一个JSON块，结果按 tweet_id 返回）
 
         Args:
-            products: 产品列表
+            batch: [(tweet_id, 候选列表), ...]
+            tweets_map: 推文映射
 
         Returns:
-            list: 合并后的产品
+            str: prompt
         """
-        from difflib import SequenceMatcher
+        items = [
+            {
+                'tweet_id': str(tweet_id),
+                'text': tweets_map.get(tweet_id, {}).get('text', ''),
+                'candidates': [
+                    {'name': c['product_name'], 'signal': c['signal_word'], 'category': c['signal_category']}
+                    for c in tweet_candidates
+                ],
+            }
+            for tweet_id, tweet_candidates in batch
+        ]
+        tweets_json = json.dumps(items, ensure_ascii=False, indent=2)
 
+        prompt = f"""
+你是一个AI产品识别专家。我从下面 {len(items)} 条推文中检测到一些可能的产品名称，请逐条帮我验证。
+
+【推文及候选产品】
+```json
+{tweets_json}
+```
+
+【任务】
+对每条推文分别分析：
+1. 这条推文是否真的在讨论AI产品/模型/工具？
+2. 如果是，提取出准确的产品名称（可能有多个）
+3. 判断每个产品的类型
+4. 判断是否是新发布的产品
+
+【判断标准】
+- ✅ 是产品: Claude, GPT-4, Midjourney, Cursor（具体的AI产品/模型/工具）
+- ❌ 不是产品: AI, ChatGPT(太通用), Google(公司名), OpenAI(公司名)
+- ❌ 不是产品: 人名、地名、通用词汇
+
+【返回格式】
+请严格按照以下JSON格式返回，每条推文一个结果，tweet_id 原样返回：
+
+{{
+  "results": [
+    {{
+      "tweet_id": "推文ID",
+      "is_about_product": true/false,
+      "products": [
+        {{
+          "name": "准确的产品名（首字母大写）",
+          "type": "model/tool/platform/other",
+          "is_new_release": true/false,
+          "confidence": 0.0-1.0,
+          "reasoning": "简短的判断理由"
+        }}
+      ]
+    }}
+  ]
+}}
+
+注意：
+- 每条推文独立判断，不要把一条推文的产品归到另一条
+- 如果不是在讨论产品，该推文返回 {{"tweet_id": "...", "is_about_product": false, "products": []}}
+- 产品名要准确，去除多余词汇（如"the new"等）
+- 置信度要诚实，不确定的给低分
+- is_new_release: 只有明确说"发布/released/announced"才是true
+"""
+
+        return prompt
+
+    def merge_similar_products(self, products, method=None):
+        """
+        合并相似的产品名
+
+        Args:
+            products: 产品列表
+            method: 'pairwise'（两两比较）/ 'blocked'（字符前缀过滤分块）/ 'auto'，
+                    默认读取 PRODUCT_DISCOVERY['merge_method']
+
+        Returns:
+            list: 合并后的产品（每组保留置信度最高的一个，按组内首个产品的顺序排列）
+        """
         if len(products) <= 1:
             return products
 
+        method = method or self.merge_method
+        if method == 'auto':
+            method = 'pairwise' if len(products) <= PAIRWISE_MERGE_LIMIT else 'blocked'
+
+        if method == 'blocked':
+            return self._merge_blocked(products)
+        return self._merge_pairwise(products)
+
+    def _merge_pairwise(self, products):
+        """两两比较：每个未合并的产品吸收与它相似的后续产品（O(n²)）"""
+
         # 计算相似度矩阵
         n = len(products)
         merged_indices = set()
@@ -211,7 +547,7 @@ class ProductValidator:
                     similarity = max(similarity, 0.8)
 
                 # 相似度阈值
-                if similarity > 0.7:
+                if similarity > SIMILARITY_THRESHOLD:
                     similar_group.append(products[j])
                     merged_indices.add(j)
 
@@ -223,6 +559,70 @@ class ProductValidator:
 
         return final_products
 
+    def _merge_blocked(self, products):
+        """
+        分块合并：只验证可能相似的候选对，分组结果与两两比较完全一致
+
+        候选对由字符多重集的前缀过滤产生：词元按全局出现频率排序（罕见字符在前），相似度超过阈值的
+        两个名称至少有 _min_overlap 个共同字符，因此必然在各自前 len - _min_overlap + 1 个词元中
+        共享一个。包含关系单独生成候选：被包含的名称的最罕见词元必然出现在包含它的名称中；
+        空名称与全部名称比较。
+        分组沿用两两比较的规则（按顺序，未合并的产品吸收与它相似的后续产品），
+        不做传递闭包（并查集），避免通过 "ai" 这类短名称把大量无关产品串成一组
+        """
+        names = [p['name'].lower() for p in products]
+        n = len(names)
+
+        tokens = [_char_tokens(name) for name in names]
+        token_sets = [frozenset(name_tokens) for name_tokens in tokens]
+        frequency = Counter(token for name_tokens in tokens for token in name_tokens)
+        for name_tokens in tokens:
+            name_tokens.sort(key=lambda token: (frequency[token], token))
+
+        prefix_postings = defaultdict(list)   # 前缀词元 → 名称
+        token_postings = defaultdict(list)    # 词元 → 名称（查找包含某名称的名称）
+        by_rarest = defaultdict(list)         # 最罕见词元 → 名称（查找被某名称包含的名称）
+        empty_names = []
+        for i, name_tokens in enumerate(tokens):
+            if not name_tokens:
+                empty_names.append(i)
+                continue
+            prefix_length = len(name_tokens) - _min_overlap(len(name_tokens)) + 1
+            for token in name_tokens[:prefix_length]:
+                prefix_postings[token].append(i)
+            for token in name_tokens:
+                token_postings[token].append(i)
+            by_rarest[name_tokens[0]].append(i)
+
+        merged = [False] * n
+        final_products = []
+
+        for i in range(n):
+            if merged[i]:
+                continue
+
+            name_tokens = tokens[i]
+            if name_tokens:
+                prefix_length = len(name_tokens) - _min_overlap(len(name_tokens)) + 1
+                candidates = {j for token in name_tokens[:prefix_length] for j in prefix_postings[token]}
+                candidates.update(token_postings[name_tokens[0]])
+                candidates.update(j for token in name_tokens for j in by_rarest[token])
+                candidates.update(empty_names)
+                candidates = [j for j in candidates if j > i]
+            else:
+                candidates = range(i + 1, n)
+
+            similar_group = [products[i]]
+            for j in sorted(candidates):
+                if not merged[j] and _names_similar(names[i], names[j], len(token_sets[i] & token_sets[j])):
+                    similar_group.append(products[j])
+                    merged[j] = True
+
+            # 选择置信度最高的作为代表
+            final_products.append(max(similar_group, key=lambda x: x.get('confidence', 0)))
+            merged[i] = True
+
+        return final_products
 
 if __name__ == '__main__':
     # 测试
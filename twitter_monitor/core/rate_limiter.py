@@ -0,0 +1,57 @@
+"""
+速率限制模块
+令牌桶限流器，用于控制并发请求的 credits/秒 或 请求/秒 预算
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限流器
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        初始化限流器
+
+        Args:
+            rate: 每秒补充的令牌数（None 或 <=0 表示不限流）
+            capacity: 桶容量（默认等于 rate，即最多允许 1 秒的突发）
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.capacity = capacity or self.rate or 0
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        获取令牌（不足时阻塞等待）
+
+        Args:
+            amount: 需要的令牌数
+
+        Returns:
+            float: 本次等待的秒数
+        """
+        if self.rate is None:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                # 单次请求超过桶容量时，允许令牌数为负（透支），保证不会永久阻塞
+                if self._tokens >= amount or self._tokens >= self.capacity:
+                    self._tokens -= amount
+                    return waited
+
+                wait = (min(amount, self.capacity) - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,306 @@
+"""
+原始数据读写模块
+周数据以行分隔的推文流（raw_tweets.ndjson）+ 元数据旁路文件（raw_metadata.json）存储，
+推文在采集过程中逐条追加；读取端以生成器方式逐条产出推文，不需要把整周数据载入内存。
+旧格式 raw_data.json（单个 JSON 文档）仍可透明读取。
+紧凑格式（见 core/tweet_schema.py）的推文读取时从元数据的 KOL 表挂上 kol_info；
+原始 API 返回可选写入冷文件 raw_payload.ndjson.gz。
+"""
+
+import gzip
+import json
+import os
+import shutil
+
+from core.tweet_schema import KOLS_FIELD, attach_kol, to_record
+
+
+RAW_DATA_FILE = 'raw_data.json'          # 旧格式：{'tweets': [...], 'metadata': {...}}
+TWEETS_FILE = 'raw_tweets.ndjson'        # 新格式：每行一条推文
+METADATA_FILE = 'raw_metadata.json'      # 新格式：元数据旁路文件
+PAYLOAD_FILE = 'raw_payload.ndjson.gz'   # 冷文件：原始 API 返回（可选，后续步骤不读取）
+PAYLOAD_STAGING_FILE = 'raw_payload.ndjson'  # 冷文件在暂存目录中不压缩（便于续跑时截断）
+
+
+class RawDataWriter:
+    """
+    NDJSON 推文流写入器
+
+    推文先写入暂存文件，采集结束后调用 finalize() 移动到周目录并写入元数据
+    """
+
+    def __init__(self, staging_dir, append=False, index_builder=None, cold_payload=False):
+        """
+        初始化
+
+        Args:
+            staging_dir: 暂存目录
+            append: 是否在已有暂存文件后追加（用于续跑）
+            index_builder: 推文索引构建器（可选，见 core/tweet_index.py）。
+                提供时记录每行的字节偏移，finalize() 时把索引写入周目录
+            cold_payload: 是否把原始 API 返回写入冷文件（append() 时通过 payloads 传入）
+        """
+        os.makedirs(staging_dir, exist_ok=True)
+        self.path = os.path.join(staging_dir, TWEETS_FILE)
+        self.payload_path = os.path.join(staging_dir, PAYLOAD_STAGING_FILE)
+        self.count = 0
+        self.index_builder = index_builder
+        if append and index_builder is not None and os.path.exists(self.path):
+            index_builder.add_file(self.path)
+        self._file = open(self.path, 'ab' if append else 'wb')
+        self._offset = self._file.tell()
+
+        self._payload_file = open(self.payload_path, 'ab' if append else 'wb') if cold_payload else None
+        self._payload_offset = self._payload_file.tell() if cold_payload else 0
+
+    def append(self, tweets, payloads=None):
+        """
+        追加推文
+
+        Args:
+            tweets: 推文列表
+            payloads: 对应的原始 API 返回（可选，启用冷文件时写入）
+        """
+        for tweet in tweets:
+            self._offset += _write_line(self._file, tweet, self._offset, self.index_builder)
+        self._file.flush()
+        self.count += len(tweets)
+
+        if self._payload_file is not None and payloads:
+            for payload in payloads:
+                line = json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n'
+                self._payload_file.write(line)
+                self._payload_offset += len(line)
+            self._payload_file.flush()
+
+    @property
+    def size(self):
+        """暂存推文流当前的字节数（已刷新到文件）"""
+        return self._offset
+
+    @property
+    def payload_size(self):
+        """暂存冷文件当前的字节数（未启用时为 0）"""
+        return self._payload_offset
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if self._payload_file is not None and not self._payload_file.closed:
+            self._payload_file.close()
+
+    def finalize(self, output_dir, metadata):
+        """
+        完成写入：推文流移动到输出目录并写入元数据旁路文件
+
+        Args:
+            output_dir: 周数据目录
+            metadata: 元数据
+
+        Returns:
+            str: 推文流文件路径
+        """
+        self.close()
+        os.makedirs(output_dir, exist_ok=True)
+
+        tweets_path = os.path.join(output_dir, TWEETS_FILE)
+        os.replace(self.path, tweets_path)
+        write_metadata(output_dir, metadata)
+        if self.index_builder is not None:
+            self.index_builder.write(output_dir, tweets_path)
+        if self._payload_file is not None:
+            write_payload(output_dir, self.payload_path)
+            os.remove(self.payload_path)
+
+        return tweets_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _write_line(f, tweet, offset, index_builder=None):
+    """写入一行推文（二进制文件），返回写入的字节数"""
+    # 先建索引：索引构建时解析出的 created_ts 会随推文一起写入
+    if index_builder is not None:
+        index_builder.add(offset, tweet)
+    line = json.dumps(to_record(tweet), ensure_ascii=False).encode('utf-8') + b'\n'
+    f.write(line)
+    return len(line)
+
+
+def write_payload(output_dir, source_path):
+    """把未压缩的原始 API 返回（NDJSON）压缩写入周目录的冷文件"""
+    path = os.path.join(output_dir, PAYLOAD_FILE)
+    with open(source_path, 'rb') as src, gzip.open(path + '.tmp', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def write_metadata(output_dir, metadata):
+    """原子写入元数据旁路文件"""
+    path = os.path.join(output_dir, METADATA_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def save_raw_data(data, output_dir, fmt='ndjson', index_builder=None):
+    """
+    保存一份完整的周数据
+
+    Args:
+        data: {'tweets': [...], 'metadata': {...}}
+        output_dir: 周数据目录
+        fmt: 'ndjson'（推文流 + 元数据）或 'json'（旧格式 raw_data.json）
+        index_builder: 推文索引构建器（可选，仅 ndjson，见 core/tweet_index.py）
+
+    Returns:
+        str: 主数据文件路径
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    if fmt == 'json':
+        output_file = os.path.join(output_dir, RAW_DATA_FILE)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return output_file
+
+    output_file = os.path.join(output_dir, TWEETS_FILE)
+    offset = 0
+    with open(output_file, 'wb') as f:
+        for tweet in data.get('tweets', []):
+            offset += _write_line(f, tweet, offset, index_builder)
+    write_metadata(output_dir, data.get('metadata', {}))
+    if index_builder is not None:
+        index_builder.write(output_dir, output_file)
+    return output_file
+
+
+def resolve_raw_data(path):
+    """
+    解析数据路径
+
+    Args:
+        path: 周目录、raw_data.json、raw_tweets.ndjson 或 raw_metadata.json 的路径，
+              也可以是任意旧格式 JSON 文件
+
+    Returns:
+        tuple: ('ndjson', 推文流路径, 元数据路径) 或 ('json', JSON文件路径, None)
+    """
+    path = str(path)
+    name = os.path.basename(path)
+
+    if os.path.isdir(path):
+        week_dir = path
+    elif name in (RAW_DATA_FILE, TWEETS_FILE, METADATA_FILE):
+        week_dir = os.path.dirname(path)
+    else:
+        return 'json', path, None
+
+    tweets_path = os.path.join(week_dir, TWEETS_FILE)
+    if os.path.exists(tweets_path):
+        return 'ndjson', tweets_path, os.path.join(week_dir, METADATA_FILE)
+
+    return 'json', os.path.join(week_dir, RAW_DATA_FILE), None
+
+
+def find_raw_data(week_dir):
+    """
+    查找周目录中的原始数据文件（优先新格式）
+
+    Returns:
+        str: 数据文件路径（不存在返回 None）
+    """
+    kind, data_path, _ = resolve_raw_data(week_dir)
+    return data_path if os.path.exists(data_path) else None
+
+
+def week_dir_of(path):
+    """数据文件所在的周目录"""
+    path = str(path)
+    return path if os.path.isdir(path) else os.path.dirname(path)
+
+
+def _load_legacy(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # 旧文件的结构可能是 {'tweets': [...]} 或直接是列表
+    if isinstance(data, dict):
+        return data.get('tweets', data.get('all_tweets', [])), data.get('metadata', {})
+    return data, {}
+
+
+def iter_tweets(path):
+    """
+    逐条读取推文（生成器）
+
+    Args:
+        path: 见 resolve_raw_data
+
+    Yields:
+        dict: 推文（紧凑格式的推文挂上元数据 KOL 表中的 kol_info）
+    """
+    kind, data_path, metadata_path = resolve_raw_data(path)
+
+    if kind == 'json':
+        tweets, _ = _load_legacy(data_path)
+        yield from tweets
+        return
+
+    kols = load_kols(metadata_path)
+    with open(data_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                tweet = json.loads(line)
+                yield attach_kol(tweet, kols) if kols else tweet
+
+
+def load_kols(metadata_path):
+    """元数据中的 KOL 表（紧凑格式，没有时返回空字典）"""
+    if metadata_path is None or not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get(KOLS_FIELD) or {}
+
+
+def load_metadata(path):
+    """
+    读取元数据
+
+    Args:
+        path: 见 resolve_raw_data
+
+    Returns:
+        dict: 元数据
+    """
+    kind, data_path, metadata_path = resolve_raw_data(path)
+
+    if kind == 'json':
+        _, metadata = _load_legacy(data_path)
+        return metadata
+
+    if not os.path.exists(metadata_path):
+        return {}
+
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_raw_data(path):
+    """
+    一次性读取完整周数据（兼容旧的 raw_data.json 结构）
+
+    Returns:
+        dict: {'tweets': [...], 'metadata': {...}}
+    """
+    return {
+        'tweets': list(iter_tweets(path)),
+        'metadata': load_metadata(path),
+    }
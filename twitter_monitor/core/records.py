@@ -0,0 +1,79 @@
+"""
+紧凑的推文/提及记录
+提到产品的推文在共享推文表中只存一份 TweetRecord（__slots__，没有逐实例字典），
+产品的提及只是推文表下标组成的 array('l')，不再为每个 (推文, 产品) 复制一份提及字典；
+输出 JSON 时再按原来的字段顺序展开为字典
+"""
+
+from array import array
+
+
+class TweetRecord:
+    """
+    被提及推文的紧凑记录（每条推文一份，被多个产品的提及共享）
+    """
+
+    __slots__ = ('text', 'kol', 'rank', 'followers', 'likes', 'retweets', 'created_at', 'sentiment', 'is_new',
+                 'timestamp')
+
+    def __init__(self, text, kol, rank, followers, likes, retweets, created_at, sentiment, is_new,
+                 timestamp=None):
+        self.text = text
+        self.kol = kol
+        self.rank = rank
+        self.followers = followers
+        self.likes = likes
+        self.retweets = retweets
+        self.created_at = created_at
+        self.sentiment = sentiment
+        self.is_new = is_new
+        self.timestamp = timestamp  # created_at 的 epoch 秒（见 core/timeutil.py），不输出
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @property
+    def engagement(self):
+        """互动数（likes + retweets）"""
+        return self.likes + self.retweets
+
+    def to_mention(self):
+        """展开为产品提及字典（sample_tweets 的输出格式）"""
+        return {
+            'text': self.text,
+            'kol': self.kol,
+            'rank': self.rank,
+            'followers': self.followers,
+            'likes': self.likes,
+            'retweets': self.retweets,
+            'created_at': self.created_at,
+            'sentiment': self.sentiment,
+            'is_new': self.is_new,
+        }
+
+
+class MentionIndex(dict):
+    """
+    产品 → 提及推文在共享推文表中的下标（array('l')，按提及顺序排列）
+    """
+
+    def __missing__(self, product):
+        indices = self[product] = array('l')
+        return indices
+
+    def merge(self, other, offset):
+        """
+        合并另一个分片的提及（other 的下标指向该分片自己的推文表，
+        其推文表追加到本推文表之后，下标整体偏移 offset）
+        """
+        for product, indices in other.items():
+            self[product].extend(index + offset for index in indices)
+        return self
+
+    def records(self, product, tweets):
+        """某个产品的提及推文记录（按提及顺序）"""
+        return [tweets[index] for index in self.get(product, ())]
@@ -0,0 +1,85 @@
+"""
+重试模块
+对暂时性失败（网络错误、超时、429 / 5xx）按带抖动的指数退避重试，
+非暂时性错误（参数错误、404 等）直接抛出
+"""
+
+import random
+import time
+
+
+# 视为暂时性失败的 HTTP 状态码
+TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# 视为暂时性失败的异常类名（requests / httpx 的网络错误不继承内置 ConnectionError，按类名匹配，不引入依赖）
+TRANSIENT_ERROR_NAMES = {'ConnectionError', 'Timeout', 'ConnectTimeout', 'ReadTimeout', 'TimeoutException',
+                         'ChunkedEncodingError', 'RemoteProtocolError'}
+
+
+def status_code_of(error):
+    """从异常中取 HTTP 状态码（requests / httpx 风格的 status_code 或 response.status_code，没有时返回 None）"""
+    code = getattr(error, 'status_code', None)
+    if code is None:
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient_error(error):
+    """是否为值得重试的暂时性失败"""
+    code = status_code_of(error)
+    if code is not None:
+        return code in TRANSIENT_STATUS_CODES
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def attempt_calls(error):
+    """
+    一次失败的尝试消耗的 API 调用数
+
+    底层采集器在分页中途失败时可在异常上带 api_calls（本次尝试已发出的请求数，含失败的那次）；
+    没有时按失败的那一次请求计
+    """
+    calls = getattr(error, 'api_calls', None)
+    return calls if isinstance(calls, int) and calls > 0 else 1
+
+
+def backoff_delay(attempt, base_delay, max_delay, rng=random):
+    """
+    第 attempt 次重试（从 0 开始）前的等待秒数：在 [0, min(max_delay, base_delay * 2^attempt)] 内均匀抖动
+
+    全抖动避免并发采集的多个KOL在同一时刻集中重试
+    """
+    return rng.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(func, max_retries=3, base_delay=1.0, max_delay=30.0, is_transient=is_transient_error,
+                    on_retry=None, sleep=time.sleep, rng=random):
+    """
+    调用 func()，暂时性失败时按带抖动的指数退避重试
+
+    Args:
+        func: 无参可调用对象
+        max_retries: 最多重试次数（0 为不重试）
+        base_delay: 首次重试的退避上限（秒）
+        max_delay: 单次退避上限（秒）
+        is_transient: 判断异常是否可重试
+        on_retry: 每次重试前的回调 on_retry(attempt, error, delay)（可选）
+        sleep / rng: 等待函数和随机数源（测试和基准可替换）
+
+    Returns:
+        func() 的返回值；重试用尽或遇到非暂时性错误时抛出最后一次的异常
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_transient(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay, rng)
+            if on_retry is not None:
+                on_retry(attempt, e, delay)
+            sleep(delay)
+            attempt += 1
@@ -3,27 +3,87 @@
 检测推文中的产品发布/讨论信号
 """
 
-import re
 from config.config import RELEASE_SIGNALS
+from core.metrics import get_run_metrics
+from core.signal_matcher import get_matcher
 
 
 class SignalDetector:
     """
     产品发布/讨论信号检测器
+
+    所有信号词在初始化时编译为一个 Aho–Corasick 自动机，每条推文只需线性扫描一次
     """
 
-    def __init__(self):
+    def __init__(self, word_boundary=False):
+        """
+        初始化
+
+        Args:
+            word_boundary: 是否默认要求信号词两端为单词边界
+                           （False 与子串匹配语义一致，例如 'vs' 也会匹配 'cvs'）
+        """
         self.signals = RELEASE_SIGNALS
+        self.word_boundary = word_boundary
+
+        # (category, signal) 按 RELEASE_SIGNALS 的顺序编号；同一个词可能属于多个类别
+        self._entries = [
+            (category, signal)
+            for category, signal_list in self.signals.items()
+            for signal in signal_list
+        ]
+        patterns = []
+        self._pattern_entries = []
+        pattern_index = {}
+        for entry_index, (_, signal) in enumerate(self._entries):
+            pattern = signal.lower()
+            if pattern not in pattern_index:
+                pattern_index[pattern] = len(patterns)
+                patterns.append(pattern)
+                self._pattern_entries.append([])
+            self._pattern_entries[pattern_index[pattern]].append(entry_index)
+
+        self._matcher = get_matcher(tuple(patterns))
+
+    def find_signal_hits(self, tweet_text, word_boundary=None):
+        """
+        找出推文中每个信号词的每一次出现
 
-    def detect_signals(self, tweet_text):
+        Args:
+            tweet_text: 推文文本
+            word_boundary: 是否要求单词边界（默认使用初始化参数）
+
+        Returns:
+            list: [{'category': ..., 'signal': ..., 'position': ...}, ...]，按位置排序
+        """
+        if word_boundary is None:
+            word_boundary = self.word_boundary
+
+        hits = []
+        for start, pattern_index in self._matcher.find_all(tweet_text.lower(), word_boundary):
+            for entry_index in self._pattern_entries[pattern_index]:
+                hits.append((start, entry_index))
+        hits.sort()
+
+        return [
+            {
+                'category': self._entries[entry_index][0],
+                'signal': self._entries[entry_index][1],
+                'position': start,
+            }
+            for start, entry_index in hits
+        ]
+
+    def detect_signals(self, tweet_text, word_boundary=None):
         """
         检测推文中的信号词
 
         Args:
             tweet_text: 推文文本
+            word_boundary: 是否要求单词边界（默认使用初始化参数）
 
         Returns:
-            list: 检测到的信号列表
+            list: 检测到的信号列表（每个信号词只报告首次出现位置，按信号词库顺序排列）
             [
                 {
                     'category': 'launch',
@@ -33,21 +93,28 @@ class SignalDetector:
                 ...
             ]
         """
-        text_lower = tweet_text.lower()
-        detected = []
+        if word_boundary is None:
+            word_boundary = self.word_boundary
 
-        for category, signal_list in self.signals.items():
-            for signal in signal_list:
-                # 查找信号词位置
-                pos = text_lower.find(signal.lower())
-                if pos != -1:
-                    detected.append({
-                        'category': category,
-                        'signal': signal,
-                        'position': pos,
-                    })
+        first_positions = {}
+        for start, pattern_index in self._matcher.find_all(tweet_text.lower(), word_boundary):
+            if pattern_index not in first_positions or start < first_positions[pattern_index]:
+                first_positions[pattern_index] = start
 
-        return detected
+        detected = []
+        for pattern_index, start in first_positions.items():
+            for entry_index in self._pattern_entries[pattern_index]:
+                detected.append((entry_index, start))
+        detected.sort()
+
+        return [
+            {
+                'category': self._entries[entry_index][0],
+                'signal': self._entries[entry_index][1],
+                'position': start,
+            }
+            for entry_index, start in detected
+        ]
 
     def find_tweets_with_signals(self, tweets):
         """
@@ -61,13 +128,19 @@ class SignalDetector:
         """
         signaled_tweets = []
 
-        for tweet in tweets:
-            text = tweet.get('text', '')
-            signals = self.detect_signals(text)
+        metrics = get_run_metrics()
+        scanned = 0
+        with metrics.span('signal_detection'):
+            for tweet in tweets:
+                scanned += 1
+                text = tweet.get('text', '')
+                signals = self.detect_signals(text)
 
-            if signals:
-                signaled_tweets.append((tweet, signals))
+                if signals:
+                    signaled_tweets.append((tweet, signals))
 
+        metrics.incr('signals.tweets_scanned', scanned)
+        metrics.incr('signals.tweets_with_signals', len(signaled_tweets))
         return signaled_tweets
 
     def get_signal_statistics(self, tweets):
@@ -82,11 +155,15 @@ class SignalDetector:
         """
         signal_counts = {}
         category_counts = {}
+        total_signaled_tweets = 0
 
         for tweet in tweets:
             text = tweet.get('text', '')
             signals = self.detect_signals(text)
 
+            if signals:
+                total_signaled_tweets += 1
+
             for sig in signals:
                 # 统计具体信号词
                 signal_word = sig['signal']
@@ -103,7 +180,7 @@ class SignalDetector:
         return {
             'signal_counts': dict(sorted_signals),
             'category_counts': dict(sorted_categories),
-            'total_signaled_tweets': len([t for t in tweets if self.detect_signals(t.get('text', ''))]),
+            'total_signaled_tweets': total_signaled_tweets,
         }
 
     def get_context_window(self, text, signal_position, window_size=50):
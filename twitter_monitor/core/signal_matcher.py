@@ -0,0 +1,110 @@
+"""
+多模式字符串匹配模块
+Aho–Corasick 自动机：一次线性扫描找出文本中所有模式词的所有出现位置
+"""
+
+from collections import deque
+from functools import lru_cache
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class AhoCorasickMatcher:
+    """
+    Aho–Corasick 多模式匹配器
+
+    构建时把 goto/fail 函数展开为完整的状态转移表（DFA），
+    扫描时每个字符只需一次字典查找
+    """
+
+    def __init__(self, patterns):
+        """
+        构建自动机
+
+        Args:
+            patterns: 模式字符串列表（大小写敏感，调用方负责归一化）
+        """
+        self.patterns = list(patterns)
+        self.lengths = [len(p) for p in self.patterns]
+
+        # 1. 构建 trie
+        goto = [{}]
+        outputs = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    goto.append({})
+                    outputs.append([])
+                    next_state = len(goto) - 1
+                    goto[state][ch] = next_state
+                state = next_state
+            outputs[state].append(index)
+
+        # 2. BFS 计算 fail 函数，同时展开为完整转移表
+        fail = [0] * len(goto)
+        delta = [dict(transitions) for transitions in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # 父状态的 fail 已计算完毕，缺失的转移沿 fail 链继承
+            for ch, next_state in delta[fail[state]].items():
+                delta[state].setdefault(ch, next_state)
+            for ch, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(ch, 0) if state else 0
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+                queue.append(next_state)
+
+        self._delta = delta
+        self._outputs = [tuple(sorted(out)) for out in outputs]
+
+    def find_all(self, text, word_boundary=False):
+        """
+        查找所有模式的所有出现位置
+
+        Args:
+            text: 文本
+            word_boundary: 是否要求匹配两端为单词边界
+
+        Returns:
+            list: [(start, pattern_index), ...]，按结束位置排序
+        """
+        delta = self._delta
+        outputs = self._outputs
+        lengths = self.lengths
+        text_len = len(text)
+
+        hits = []
+        state = 0
+        for end, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for index in outputs[state]:
+                    start = end - lengths[index] + 1
+                    if word_boundary and (
+                        (start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start])) or
+                        (end + 1 < text_len and _is_word_char(text[end + 1]) and _is_word_char(text[end]))
+                    ):
+                        continue
+                    hits.append((start, index))
+
+        return hits
+
+
+@lru_cache(maxsize=16)
+def get_matcher(patterns):
+    """
+    获取（缓存的）匹配器
+
+    Args:
+        patterns: 模式字符串元组
+
+    Returns:
+        AhoCorasickMatcher
+    """
+    return AhoCorasickMatcher(patterns)
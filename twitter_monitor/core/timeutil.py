@@ -0,0 +1,132 @@
+"""
+推文时间解析模块
+Twitter 的 created_at 是固定格式（Thu Oct 16 13:20:19 +0000 2025），按固定位置切片、
+查月份表、用整数公式换算 epoch 秒，不再逐条走 dateutil 的通用解析；
+采集时解析一次写入推文的 created_ts 字段，日期过滤和按天/按小时分桶都直接使用它
+"""
+
+import calendar
+from datetime import datetime
+from functools import lru_cache
+
+
+# 解析结果写入推文的字段（epoch 秒，UTC）
+TIMESTAMP_FIELD = 'created_ts'
+
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+# 'Thu Oct 16 13:20:19 +0000 2025'
+_TWITTER_LAYOUT_LENGTH = 30
+
+SECONDS_PER_DAY = 86400
+
+
+@lru_cache(maxsize=4096)
+def _days_from_civil(year, month, day):
+    """公历日期 → 1970-01-01 起的天数（Howard Hinnant 的 days_from_civil）"""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+@lru_cache(maxsize=4096)
+def _civil_from_days(days):
+    """1970-01-01 起的天数 → 'YYYY-MM-DD'"""
+    days += 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (month <= 2)
+    return f'{year:04d}-{month:02d}-{day:02d}'
+
+
+def _parse_iso(value):
+    """ISO 8601（2025-10-16T13:20:19.000Z）兜底解析；无时区时按 UTC 处理"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return calendar.timegm(parsed.timetuple())
+    return int(parsed.timestamp())
+
+
+def parse_twitter_time(value):
+    """
+    解析推文时间为 epoch 秒（UTC）
+
+    Args:
+        value: Twitter 格式（Thu Oct 16 13:20:19 +0000 2025），其他格式按 ISO 8601 兜底
+
+    Returns:
+        int: epoch 秒，无法解析时返回 None
+    """
+    if not value:
+        return None
+    if len(value) != _TWITTER_LAYOUT_LENGTH or value[3] != ' ' or value[19] != ' ':
+        return _parse_iso(value)
+
+    month = _MONTHS.get(value[4:7])
+    if month is None:
+        return None
+    try:
+        days = _days_from_civil(int(value[26:30]), month, int(value[8:10]))
+        seconds = int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+        offset = value[20:25]
+        offset_seconds = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+    except ValueError:
+        return None
+
+    if offset[0] == '-':
+        offset_seconds = -offset_seconds
+    return days * SECONDS_PER_DAY + seconds - offset_seconds
+
+
+def tweet_timestamp(tweet):
+    """
+    推文的发布时间（epoch 秒）
+
+    优先使用采集时写入的 created_ts；旧数据没有该字段时解析 created_at / createdAt 并写回推文，
+    同一条推文只解析一次
+
+    Returns:
+        int: epoch 秒，没有或无法解析时返回 None
+    """
+    timestamp = tweet.get(TIMESTAMP_FIELD)
+    if timestamp is None:
+        timestamp = parse_twitter_time(tweet.get('created_at') or tweet.get('createdAt'))
+        if timestamp is not None:
+            tweet[TIMESTAMP_FIELD] = timestamp
+    return timestamp
+
+
+def to_epoch(moment):
+    """
+    datetime 转为 epoch 秒（用于和 created_ts 比较）
+
+    无时区的 datetime 按 UTC 墙上时间处理（与原来去掉推文时区后再比较的行为一致），
+    保留微秒部分，边界比较结果与直接比较 datetime 相同
+    """
+    if moment.tzinfo is not None:
+        return moment.timestamp()
+    return calendar.timegm(moment.timetuple()) + moment.microsecond / 1000000
+
+
+def day_key(timestamp):
+    """epoch 秒 → UTC 日期 'YYYY-MM-DD'"""
+    return _civil_from_days(timestamp // SECONDS_PER_DAY)
+
+
+def hour_key(timestamp):
+    """epoch 秒 → UTC 小时 'YYYY-MM-DD HH'"""
+    return f'{day_key(timestamp)} {timestamp % SECONDS_PER_DAY // 3600:02d}'
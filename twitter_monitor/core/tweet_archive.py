@@ -0,0 +1,245 @@
+"""
+分片压缩的推文归档模块
+集成结果不再写成一个包含全部推文（且每条存两份）的 JSON 文档，而是：
+- tweets_<周名>.ndjson.gz: 每周一个分片，每行一条推文；每 block_size 条压缩为一个独立的 gzip 成员
+  （整个分片仍是合法的 gzip 文件，可直接 zcat）
+- manifest.json: 每周的推文数、分片大小和各压缩块的 [字节偏移, 字节数, 条数]
+- summary.json: 除推文外的集成汇总（统计、KOL 活跃度、周摘要等）
+读取单周或前 N 条推文时只解压用到的块，不需要解压整个归档
+"""
+
+import gzip
+import json
+import os
+
+
+ARCHIVE_DIR = 'integrated_all_tweets'
+MANIFEST_FILE = 'manifest.json'
+SUMMARY_FILE = 'summary.json'
+
+ARCHIVE_VERSION = 1
+DEFAULT_BLOCK_SIZE = 1000
+COMPRESS_LEVEL = 6
+
+
+def shard_name(week_name):
+    return f"tweets_{week_name}.ndjson.gz"
+
+
+class ShardWriter:
+    """
+    单周分片写入器：推文按 block_size 条一组压缩成独立的 gzip 成员追加到分片
+    """
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self.blocks = []
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._offset = 0
+        self._pending = []
+
+    def append(self, tweet):
+        self._pending.append(json.dumps(tweet, ensure_ascii=False).encode('utf-8') + b'\n')
+        if len(self._pending) >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        data = gzip.compress(b''.join(self._pending), compresslevel=COMPRESS_LEVEL, mtime=0)
+        self._file.write(data)
+        self.blocks.append([self._offset, len(data), len(self._pending)])
+        self._offset += len(data)
+        self.count += len(self._pending)
+        self._pending = []
+
+    def close(self):
+        """写完剩余推文并关闭，返回分片大小（字节）"""
+        if not self._file.closed:
+            self._flush_block()
+            self._file.close()
+        return self._offset
+
+
+def _write_json(path, data, indent=None):
+    """原子写入 JSON 文件"""
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(path + '.tmp', path)
+
+
+def write_shard(archive_dir, week_name, tweets, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    写入（或覆盖）一周的分片
+
+    Returns:
+        dict: 该周的清单条目
+    """
+    file_name = shard_name(week_name)
+    writer = ShardWriter(os.path.join(archive_dir, file_name), block_size)
+    for tweet in tweets:
+        writer.append(tweet)
+    size = writer.close()
+    return {
+        'week': week_name,
+        'file': file_name,
+        'tweet_count': writer.count,
+        'size': size,
+        'blocks': writer.blocks,
+    }
+
+
+def _finish_archive(archive_dir, entries, summary, block_size):
+    """写入汇总，最后原子替换清单，并删除不在清单中的旧分片"""
+    manifest = {
+        'version': ARCHIVE_VERSION,
+        'format': 'ndjson.gz',
+        'block_size': block_size,
+        'total_tweets': sum(entry['tweet_count'] for entry in entries),
+        'weeks': entries,
+    }
+
+    if summary is not None:
+        _write_json(os.path.join(archive_dir, SUMMARY_FILE), summary, indent=2)
+    _write_json(os.path.join(archive_dir, MANIFEST_FILE), manifest)
+
+    current = {entry['file'] for entry in entries}
+    for name in os.listdir(archive_dir):
+        if name.startswith('tweets_') and name.endswith('.ndjson.gz') and name not in current:
+            os.remove(os.path.join(archive_dir, name))
+
+    return manifest
+
+
+def write_archive(archive_dir, weeks, summary=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    写入分片归档（先写分片和汇总，最后原子替换清单；不在新清单中的旧分片会被删除）
+
+    Args:
+        archive_dir: 归档目录
+        weeks: [(周名, 推文可迭代对象), ...]，按周序排列
+        summary: 除推文外的集成汇总（可选）
+        block_size: 每个压缩块的推文数
+
+    Returns:
+        dict: 清单
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    entries = [write_shard(archive_dir, week_name, tweets, block_size) for week_name, tweets in weeks]
+    return _finish_archive(archive_dir, entries, summary, block_size)
+
+
+def update_archive(archive_dir, week_names, weeks, summary=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    更新分片归档：只重写 weeks 中的周，其余周沿用已有分片和清单条目（增量集成使用）
+
+    Args:
+        archive_dir: 归档目录
+        week_names: 更新后归档包含的全部周名（按周序）
+        weeks: {周名: 推文可迭代对象}，需要新写或重写的周
+        summary: 除推文外的集成汇总（可选）
+        block_size: 每个压缩块的推文数
+
+    Returns:
+        dict: 清单
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    existing = {}
+    if is_archive(archive_dir):
+        existing = {entry['week']: entry for entry in TweetArchive(archive_dir).manifest['weeks']}
+
+    entries = []
+    for week_name in week_names:
+        if week_name in weeks:
+            entries.append(write_shard(archive_dir, week_name, weeks[week_name], block_size))
+        elif week_name in existing:
+            entries.append(existing[week_name])
+        else:
+            raise ValueError(f"归档中没有 {week_name} 的分片，且本次未提供其推文")
+    return _finish_archive(archive_dir, entries, summary, block_size)
+
+
+def is_archive(path):
+    """path 是否为分片归档目录"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+class TweetArchive:
+    """
+    只读的分片推文归档
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        with open(os.path.join(archive_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self._weeks = {week['week']: week for week in self.manifest['weeks']}
+
+    def weeks(self):
+        """所有周名（按周序）"""
+        return [week['week'] for week in self.manifest['weeks']]
+
+    def is_intact(self):
+        """清单中的每个分片都存在且大小与清单一致"""
+        for week in self.manifest['weeks']:
+            path = os.path.join(self.archive_dir, week['file'])
+            if not os.path.exists(path) or os.path.getsize(path) != week['size']:
+                return False
+        return True
+
+    def count(self, week_name=None):
+        """推文数（指定周名时为该周的推文数）"""
+        if week_name is None:
+            return self.manifest['total_tweets']
+        week = self._weeks.get(week_name)
+        return week['tweet_count'] if week else 0
+
+    def summary(self):
+        """除推文外的集成汇总（没有时返回空字典）"""
+        path = os.path.join(self.archive_dir, SUMMARY_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _iter_blocks(self, week, limit=None):
+        """逐块解压一周的分片，产出推文；取满 limit 条后不再读取后续块"""
+        remaining = limit
+        with open(os.path.join(self.archive_dir, week['file']), 'rb') as f:
+            for offset, length, count in week['blocks']:
+                if remaining is not None and remaining <= 0:
+                    return
+                f.seek(offset)
+                lines = gzip.decompress(f.read(length)).splitlines()
+                if remaining is not None:
+                    lines = lines[:remaining]
+                    remaining -= len(lines)
+                for line in lines:
+                    yield json.loads(line)
+
+    def iter_week(self, week_name):
+        """逐条读取一周的推文（周名不存在时不产出）"""
+        week = self._weeks.get(week_name)
+        if week is not None:
+            yield from self._iter_blocks(week)
+
+    def load_week(self, week_name):
+        """读取一周的全部推文"""
+        return list(self.iter_week(week_name))
+
+    def iter_tweets(self, limit=None):
+        """按周序逐条读取推文；指定 limit 时只解压前 limit 条所在的块"""
+        remaining = limit
+        for week in self.manifest['weeks']:
+            if remaining is not None and remaining <= 0:
+                return
+            for tweet in self._iter_blocks(week, remaining):
+                yield tweet
+                if remaining is not None:
+                    remaining -= 1
+
+    def head(self, n):
+        """前 n 条推文"""
+        return list(self.iter_tweets(limit=n))
@@ -0,0 +1,153 @@
+"""
+推文特征提取模块
+每条推文只做一次小写化、只扫描一次产品，一次性算出产品、情感、新品标记和话题命中，
+analyze_tweets.py 和 integrate_product_knowledge_v3.py 共用同一份特征记录
+（weekly_monitor.py 进程内流水线每次运行只提取一次，传给两个步骤）
+"""
+
+from collections import namedtuple
+
+from core.parallel import DEFAULT_SHARD_SIZE, map_shards
+from core.product_patterns import ALL_KINDS, KIND_PRODUCT, get_default_engine
+
+
+# 情感词
+POSITIVE_WORDS = ['love', 'amazing', 'great', 'awesome', 'excellent', 'fantastic', 'incredible', 'best']
+NEGATIVE_WORDS = ['hate', 'terrible', 'awful', 'bad', 'poor', 'disappointed', 'worst', 'sucks']
+
+# 新产品提及关键词
+NEW_PRODUCT_KEYWORDS = [
+    'launch', 'just released', 'announcing', 'new', 'released',
+    'unveil', 'debut', 'introduce', 'coming soon', 'now available',
+    '刚发布', '新推出', '新功能', '即将发布', '今天发布'
+]
+
+# 宽松的新品标记（Product Knowledge 集成使用）
+LAUNCH_WORDS = ['launch', 'new']
+
+# 话题关键词（大小写不敏感的子串匹配）
+TOPIC_KEYWORDS = ['AI', 'AGI', 'LLM', 'ML', 'agent', 'model', 'open source',
+                  'coding', 'development', 'design', 'startup', 'funding']
+
+_TOPIC_PATTERNS = [(keyword, keyword.lower()) for keyword in TOPIC_KEYWORDS]
+
+
+# 单条推文的特征记录
+#   products: 识别出的产品（提取器 product_kinds 中的类别，按出现顺序去重）
+#   known_products: 其中的已知产品（KIND_PRODUCT，Product Knowledge 集成使用）
+#   sentiment: 'positive' / 'negative' / 'neutral'
+#   is_new: 是否提到新产品（NEW_PRODUCT_KEYWORDS）
+#   launch_or_new: 是否包含 'launch' 或 'new'
+#   topics: 命中的话题关键词（按 TOPIC_KEYWORDS 顺序）
+TweetFeatures = namedtuple('TweetFeatures', ['products', 'known_products', 'sentiment', 'is_new',
+                                             'launch_or_new', 'topics'])
+
+
+def _unique(names):
+    """按首次出现顺序去重"""
+    unique = []
+    seen = set()
+    for name in names:
+        if name not in seen:
+            seen.add(name)
+            unique.append(name)
+    return unique
+
+
+def _sentiment(text_lower):
+    pos_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+    neg_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+
+    if pos_count > neg_count:
+        return 'positive'
+    elif neg_count > pos_count:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+def get_sentiment(text):
+    """简单情感分析"""
+    return _sentiment(text.lower())
+
+
+def is_new_product_mention(text):
+    """判断是否提到新产品"""
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in NEW_PRODUCT_KEYWORDS)
+
+
+class TweetFeatureExtractor:
+    """
+    推文特征提取器
+    """
+
+    def __init__(self, engine=None, product_kinds=ALL_KINDS):
+        """
+        初始化
+
+        Args:
+            engine: 产品识别引擎（ProductPatternEngine，默认使用内置产品词表的共享引擎）
+            product_kinds: 要提取的产品类别（见 core/product_patterns.py）
+        """
+        self.engine = engine or get_default_engine()
+        self.product_kinds = product_kinds
+
+    def extract(self, text):
+        """
+        提取一条推文的特征
+
+        Args:
+            text: 推文文本
+
+        Returns:
+            TweetFeatures
+        """
+        text_lower = text.lower()
+        hits = self.engine.scan(text)
+
+        return TweetFeatures(
+            products=_unique(name for kind, name, _, _ in hits if kind in self.product_kinds),
+            known_products=_unique(name for kind, name, _, _ in hits if kind == KIND_PRODUCT),
+            sentiment=_sentiment(text_lower),
+            is_new=any(keyword in text_lower for keyword in NEW_PRODUCT_KEYWORDS),
+            launch_or_new=any(word in text_lower for word in LAUNCH_WORDS),
+            topics=tuple(keyword for keyword, pattern in _TOPIC_PATTERNS if pattern in text_lower),
+        )
+
+
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    """工作进程初始化：传入特征提取器"""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _extract_shard(tweets):
+    """进程池中提取一个分片的特征"""
+    return [_worker_extractor.extract(tweet.get('text', '')) for tweet in tweets]
+
+
+def extract_features(tweets, extractor, workers=1, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    提取一组推文的特征（与推文一一对应）
+
+    Args:
+        tweets: 推文列表
+        extractor: TweetFeatureExtractor
+        workers: 并行进程数（1 为串行）
+        shard_size: 并行时每个分片的推文数
+
+    Returns:
+        list: TweetFeatures，顺序与 tweets 一致
+    """
+    if workers <= 1:
+        return [extractor.extract(tweet.get('text', '')) for tweet in tweets]
+
+    features = []
+    for part in map_shards(_extract_shard, tweets, workers, shard_size,
+                           initializer=_init_worker, initargs=(extractor,)):
+        features.extend(part)
+    return features
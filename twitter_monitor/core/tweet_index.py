@@ -0,0 +1,323 @@
+"""
+推文倒排索引模块
+采集写入推文流（raw_tweets.ndjson）时顺带记录每条推文所在行的字节偏移，
+按 KOL、UTC 日期、产品三个字段建立倒排表，写在周目录中：
+- tweet_index.json: 字段 → {键: [起始位置, 条数]}，以及数据文件指纹（大小、修改时间、SHA-256，用于判断索引是否过期）
+  和产品识别引擎指纹（产品键为该引擎的规范名称，查询方使用其他引擎时重建）
+- tweet_index.bin: 所有倒排表依次排列的 uint64 偏移（小端），读取时 mmap 映射，不整体载入
+查询某个 KOL / 某天 / 某个产品的推文时只 seek 到对应行解析，不再全量扫描推文流
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import defaultdict
+
+from core.archive_manifest import file_fingerprint, sha256_file
+from core.product_patterns import get_default_engine
+from core.raw_data_io import METADATA_FILE, TWEETS_FILE, iter_tweets, load_kols, resolve_raw_data, week_dir_of
+from core.timeutil import day_key, tweet_timestamp
+from core.tweet_schema import attach_kol, tweet_kol
+
+
+INDEX_FILE = 'tweet_index.json'
+POSTINGS_FILE = 'tweet_index.bin'
+
+INDEX_VERSION = 2
+
+FIELD_KOL = 'kol'
+FIELD_DAY = 'day'
+FIELD_PRODUCT = 'product'
+FIELDS = (FIELD_KOL, FIELD_DAY, FIELD_PRODUCT)
+
+
+class TweetIndexBuilder:
+    """
+    倒排索引构建器
+
+    RawDataWriter / save_raw_data 每写一行推文调用一次 add()，写完后调用 write()
+    """
+
+    def __init__(self, engine=None):
+        """
+        初始化
+
+        Args:
+            engine: 产品识别引擎（默认使用内置产品词表的共享引擎，产品键为其规范名称）
+        """
+        self.engine = engine or get_default_engine()
+        self.postings = {field: defaultdict(list) for field in FIELDS}
+        self.count = 0
+
+    def add(self, offset, tweet):
+        """
+        记录一条推文
+
+        Args:
+            offset: 推文所在行在推文流中的字节偏移
+            tweet: 推文
+        """
+        self.count += 1
+
+        kol = tweet_kol(tweet)
+        if kol:
+            self.postings[FIELD_KOL][kol].append(offset)
+
+        timestamp = tweet_timestamp(tweet)
+        if timestamp is not None:
+            self.postings[FIELD_DAY][day_key(timestamp)].append(offset)
+
+        for product in self.engine.extract(tweet.get('text', '')):
+            self.postings[FIELD_PRODUCT][product].append(offset)
+
+    def add_file(self, tweets_path):
+        """扫描已有的推文流（续跑时暂存文件中已写入的部分）"""
+        for offset, tweet in iter_lines_with_offsets(tweets_path):
+            self.add(offset, tweet)
+
+    def write(self, week_dir, tweets_path):
+        """
+        写入索引文件（先写倒排表，再原子替换 JSON 目录）
+
+        Args:
+            week_dir: 周目录
+            tweets_path: 推文流路径（记录其指纹用于过期判断）
+
+        Returns:
+            str: 索引 JSON 路径
+        """
+        postings = array('Q')
+        fields = {}
+        for field in FIELDS:
+            entries = {}
+            for key, offsets in self.postings[field].items():
+                entries[key] = [len(postings), len(offsets)]
+                postings.extend(offsets)
+            fields[field] = entries
+
+        if sys.byteorder != 'little':
+            postings.byteswap()
+
+        postings_path = os.path.join(week_dir, POSTINGS_FILE)
+        with open(postings_path + '.tmp', 'wb') as f:
+            postings.tofile(f)
+        os.replace(postings_path + '.tmp', postings_path)
+
+        index_path = os.path.join(week_dir, INDEX_FILE)
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'data_file': os.path.basename(tweets_path),
+                'data_fingerprint': file_fingerprint(tweets_path),
+                'tweet_count': self.count,
+                'product_engine': self.engine.signature,
+                'fields': fields,
+            }, f, ensure_ascii=False)
+        os.replace(index_path + '.tmp', index_path)
+
+        return index_path
+
+
+def iter_lines_with_offsets(tweets_path):
+    """逐行读取推文流，产出 (字节偏移, 推文)"""
+    with open(tweets_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+
+def build_index(path, engine=None):
+    """
+    为已有周数据重建索引（只支持 NDJSON 推文流；旧格式 raw_data.json 返回 None）
+
+    Returns:
+        str: 索引 JSON 路径
+    """
+    kind, tweets_path, _ = resolve_raw_data(path)
+    if kind != 'ndjson':
+        return None
+
+    builder = TweetIndexBuilder(engine)
+    builder.add_file(tweets_path)
+    return builder.write(os.path.dirname(tweets_path), tweets_path)
+
+
+def _data_unchanged(tweets_path, fingerprint):
+    """
+    推文流是否仍是建立索引时的内容：大小不同即已变化；大小和修改时间都相同视为未变；
+    只有修改时间变化（大小相同）时比较内容 SHA-256，原地改写同样长度的内容也能发现
+    """
+    if not fingerprint:
+        return False
+    stat = os.stat(tweets_path)
+    if stat.st_size != fingerprint.get('size'):
+        return False
+    if stat.st_mtime_ns == fingerprint.get('mtime_ns'):
+        return True
+    return sha256_file(tweets_path) == fingerprint.get('sha256')
+
+
+class TweetIndex:
+    """
+    只读的推文倒排索引（倒排表通过 mmap 访问）
+    """
+
+    def __init__(self, week_dir, catalog):
+        self.week_dir = week_dir
+        self.tweets_path = os.path.join(week_dir, catalog.get('data_file', TWEETS_FILE))
+        self.tweet_count = catalog.get('tweet_count', 0)
+        self.fields = catalog.get('fields', {})
+
+        self._postings_file = open(os.path.join(week_dir, POSTINGS_FILE), 'rb')
+        self._mmap = None
+        if not os.fstat(self._postings_file.fileno()).st_size:
+            self._postings = array('Q')
+        elif sys.byteorder != 'little':
+            # 大端机器上无法直接映射小端数据，读入后转换字节序
+            self._postings = array('Q', self._postings_file.read())
+            self._postings.byteswap()
+        else:
+            self._mmap = mmap.mmap(self._postings_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._postings = memoryview(self._mmap).cast('Q')
+        self._tweets_file = None
+        self._kols = None
+
+    @classmethod
+    def open(cls, path, engine=None):
+        """
+        打开周目录的索引
+
+        Args:
+            path: 周目录或数据文件
+            engine: 查询产品时使用的识别引擎（可选）。传入时要求索引由同一引擎建立
+
+        Returns:
+            TweetIndex: 索引不存在、版本不符、推文流已变化（见 _data_unchanged()）或产品引擎不一致时返回 None
+        """
+        kind, tweets_path, _ = resolve_raw_data(path)
+        if kind != 'ndjson':
+            return None
+
+        week_dir = week_dir_of(tweets_path)
+        index_path = os.path.join(week_dir, INDEX_FILE)
+        if not os.path.exists(index_path) or not os.path.exists(os.path.join(week_dir, POSTINGS_FILE)):
+            return None
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if catalog.get('version') != INDEX_VERSION:
+            return None
+        if not _data_unchanged(tweets_path, catalog.get('data_fingerprint')):
+            return None
+        if engine is not None and catalog.get('product_engine') != engine.signature:
+            return None
+
+        return cls(week_dir, catalog)
+
+    def keys(self, field):
+        """某个字段的所有键"""
+        return list(self.fields.get(field, {}))
+
+    def count(self, field, key):
+        """命中的推文数"""
+        entry = self.fields.get(field, {}).get(key)
+        return entry[1] if entry else 0
+
+    def offsets(self, field, key):
+        """
+        命中推文的字节偏移（按推文流顺序）
+
+        Returns:
+            list: 偏移（只从 mmap 中复制这一段倒排表）
+        """
+        entry = self.fields.get(field, {}).get(key)
+        if not entry:
+            return []
+        start, count = entry
+        return self._postings[start:start + count].tolist()
+
+    def read_at(self, offset):
+        """读取某个偏移处的推文"""
+        if self._tweets_file is None:
+            self._tweets_file = open(self.tweets_path, 'rb')
+        self._tweets_file.seek(offset)
+        tweet = json.loads(self._tweets_file.readline())
+
+        # 紧凑格式的推文挂上元数据 KOL 表中的 kol_info（与 iter_tweets 一致）
+        if self._kols is None:
+            self._kols = load_kols(os.path.join(self.week_dir, METADATA_FILE))
+        return attach_kol(tweet, self._kols) if self._kols else tweet
+
+    def tweets(self, field, key):
+        """命中的推文（按推文流顺序）"""
+        return [self.read_at(offset) for offset in self.offsets(field, key)]
+
+    def close(self):
+        if self._mmap is not None:
+            self._postings.release()
+            self._mmap.close()
+        self._postings_file.close()
+        if self._tweets_file is not None:
+            self._tweets_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_index(path, build=True, engine=None):
+    """
+    打开周数据的索引；索引缺失或过期且 build=True 时先重建
+
+    engine 为查询产品时使用的识别引擎（可选）：索引由其他引擎建立时按该引擎重建，
+    产品键与调用方的识别结果一致
+
+    Returns:
+        TweetIndex: 旧格式 raw_data.json 或无法建立索引时返回 None
+    """
+    index = TweetIndex.open(path, engine)
+    if index is None and build and build_index(path, engine) is not None:
+        index = TweetIndex.open(path, engine)
+    return index
+
+
+def select_tweets(path, field, key):
+    """
+    查询某个 KOL / UTC 日期 / 产品的推文；有索引时按偏移读取，否则（旧格式数据）全量扫描
+
+    Args:
+        path: 周目录或数据文件
+        field: FIELD_KOL / FIELD_DAY / FIELD_PRODUCT
+        key: KOL 用户名 / 'YYYY-MM-DD' / 产品规范名称
+
+    Returns:
+        list: 推文（按推文流顺序）
+    """
+    index = open_index(path)
+    if index is not None:
+        with index:
+            return index.tweets(field, key)
+
+    engine = get_default_engine()
+    matched = []
+    for tweet in iter_tweets(path):
+        if field == FIELD_KOL:
+            hit = tweet_kol(tweet) == key
+        elif field == FIELD_DAY:
+            timestamp = tweet_timestamp(tweet)
+            hit = timestamp is not None and day_key(timestamp) == key
+        else:
+            hit = key in engine.extract(tweet.get('text', ''))
+        if hit:
+            matched.append(tweet)
+    return matched
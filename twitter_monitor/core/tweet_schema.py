@@ -0,0 +1,181 @@
+"""
+推文规范格式模块
+API 返回的推文带有重复字段（created_at / createdAt、likeCount / public_metrics.like_count）、
+完整的 author 字典，采集时又给每条推文复制一份 kol_info，这些字段随推文进入后续每个步骤。
+采集入口把推文投影为固定字段的紧凑格式：
+
+    {'id', 'text', 'created_at', 'created_ts', 'lang', 'kol', 'public_metrics'}
+
+- kol 只记 KOL 用户名，KOL 信息（排名、粉丝数等）在元数据 kols 中只存一份，
+  读取时以共享引用挂到推文的 kol_info 上（不逐条复制），下游读取 kol_info 的代码无需修改
+- public_metrics 统一为 like_count / retweet_count / reply_count / quote_count / impression_count
+- 发推账号与 KOL 不同时（如转推、合作账号）另记 author（发推账号用户名），PK 按发推账号统计提及
+- 增量采集沿用缓存的推文另记 metrics_fetched_at（其互动数的采集时间，早于本次采集）
+- 原始 API 返回可选写入单独的冷文件（raw_payload.ndjson.gz），不参与后续步骤
+"""
+
+from core.timeutil import tweet_timestamp
+
+
+# 元数据中标记紧凑格式的字段和取值
+SCHEMA_FIELD = 'tweet_schema'
+COMPACT_SCHEMA = 'compact-v1'
+
+# 元数据中的 KOL 表（username → kol_info）
+KOLS_FIELD = 'kols'
+
+# 紧凑格式的字段（写入顺序）
+COMPACT_FIELDS = ('id', 'text', 'created_at', 'created_ts', 'lang', 'kol', 'author', 'public_metrics',
+                  'metrics_fetched_at')
+
+# 互动数采集时间字段（只出现在增量采集沿用缓存的推文上，见 core/watermark_store.py）
+METRICS_FETCHED_AT = 'metrics_fetched_at'
+
+# 指标列 → 原始格式顶层字段 / public_metrics 字段
+TOP_LEVEL_KEYS = {
+    'likes': 'likeCount',
+    'retweets': 'retweetCount',
+    'replies': 'replyCount',
+    'views': 'viewCount',
+    'quotes': 'quoteCount',
+}
+PUBLIC_METRICS_KEYS = {
+    'likes': 'like_count',
+    'retweets': 'retweet_count',
+    'replies': 'reply_count',
+    'views': 'impression_count',
+    'quotes': 'quote_count',
+}
+
+
+def is_compact(tweet):
+    """是否为紧凑格式的推文"""
+    return 'kol' in tweet
+
+
+def tweet_kol(tweet):
+    """推文所属 KOL（紧凑格式的 kol，其次 kol_info，再次 author）"""
+    kol = tweet.get('kol')
+    if kol:
+        return kol
+    kol_info = tweet.get('kol_info') or {}
+    if kol_info.get('username'):
+        return kol_info['username']
+    author = tweet.get('author')
+    if isinstance(author, dict):
+        return author.get('username')
+    return None
+
+
+def tweet_author(tweet):
+    """推文的发推账号用户名（紧凑格式的 author，与 KOL 相同时未记录则取 kol；原始格式取 author）"""
+    if is_compact(tweet):
+        return tweet.get('author') or tweet.get('kol')
+    author = tweet.get('author', {})
+    return author.get('username') if isinstance(author, dict) else str(author)
+
+
+def kol_record(kol):
+    """KOL 表中的一项（与原来逐条写入推文的 kol_info 相同）"""
+    return {
+        'username': kol['username'],
+        'rank': kol['rank'],
+        'score': kol['score'],
+        'is_top_100': kol['rank'] <= 100,
+        'followers': kol['followers'],
+        'verified': kol['verified'],
+    }
+
+
+def metric(tweet, column):
+    """
+    推文的互动指标（likes / retweets / replies / views / quotes）
+
+    紧凑格式取 public_metrics，原始格式取顶层字段（likeCount 等）
+    """
+    if is_compact(tweet):
+        return (tweet.get('public_metrics') or {}).get(PUBLIC_METRICS_KEYS[column], 0)
+    return tweet.get(TOP_LEVEL_KEYS[column], 0)
+
+
+def metric_values(tweet):
+    """
+    推文中存在的互动指标 {指标列: 值}（两种格式通用，缺失的指标不出现）
+
+    原始格式优先取顶层字段（与 metric() 一致），没有时取 public_metrics
+    """
+    public_metrics = tweet.get('public_metrics') or {}
+    compact = is_compact(tweet)
+    values = {}
+    for column, key in PUBLIC_METRICS_KEYS.items():
+        top_level = TOP_LEVEL_KEYS[column]
+        if not compact and tweet.get(top_level) is not None:
+            values[column] = tweet[top_level]
+        elif public_metrics.get(key) is not None:
+            values[column] = public_metrics[key]
+    return values
+
+
+def set_metric_values(tweet, values):
+    """按推文自身的格式写入互动指标 {指标列: 值}（原始格式同时更新顶层字段和 public_metrics）"""
+    public_metrics = dict(tweet.get('public_metrics') or {})
+    for column, value in values.items():
+        public_metrics[PUBLIC_METRICS_KEYS[column]] = value
+        if not is_compact(tweet):
+            tweet[TOP_LEVEL_KEYS[column]] = value
+    tweet['public_metrics'] = public_metrics
+
+
+def compact_tweet(tweet, username=None):
+    """
+    把 API 返回（或旧格式）的推文投影为紧凑格式
+
+    Args:
+        tweet: 原始推文
+        username: 所属 KOL（默认取推文中的 kol_info / author）
+
+    Returns:
+        dict: 紧凑格式推文（不含 kol_info）
+    """
+    public_metrics = tweet.get('public_metrics') or {}
+    metrics = {}
+    for column, key in PUBLIC_METRICS_KEYS.items():
+        value = public_metrics.get(key)
+        if value is None:
+            value = tweet.get(TOP_LEVEL_KEYS[column])
+        metrics[key] = value or 0
+
+    kol = username or tweet_kol(tweet)
+    record = {
+        'id': tweet.get('id'),
+        'text': tweet.get('text', ''),
+        'created_at': tweet.get('created_at') or tweet.get('createdAt'),
+        'created_ts': tweet_timestamp(tweet),
+        'lang': tweet.get('lang'),
+        'kol': kol,
+    }
+    author = tweet_author(tweet)
+    if author and author != kol:
+        record['author'] = author
+    record['public_metrics'] = metrics
+    if tweet.get(METRICS_FETCHED_AT):
+        record[METRICS_FETCHED_AT] = tweet[METRICS_FETCHED_AT]
+    return record
+
+
+def to_record(tweet):
+    """
+    写入推文流的记录：紧凑格式只保留 COMPACT_FIELDS（去掉读取时挂上的 kol_info），
+    原始格式原样写入
+    """
+    if not is_compact(tweet):
+        return tweet
+    return {field: tweet[field] for field in COMPACT_FIELDS if field in tweet}
+
+
+def attach_kol(tweet, kols):
+    """把 KOL 表中的信息以共享引用挂到紧凑格式推文的 kol_info 上"""
+    kol_info = kols.get(tweet.get('kol'))
+    if kol_info is not None:
+        tweet['kol_info'] = kol_info
+    return tweet
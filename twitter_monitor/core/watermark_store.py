@@ -0,0 +1,200 @@
+"""
+KOL 水位线存储模块
+记录每个KOL上次采集到的最新推文（ID + 时间），并缓存窗口内已采集的推文，
+使增量采集只需请求更新的推文
+
+只请求新推文时缓存推文的互动数不会更新：缓存推文带 metrics_fetched_at（其互动数的采集时间），
+超过 refresh_days 未整页重新请求的KOL下次不带 since_id 请求一次，刷新窗口内缓存推文的互动数
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from core.timeutil import tweet_timestamp
+from core.tweet_schema import METRICS_FETCHED_AT
+
+
+# Twitter snowflake 纪元（毫秒）
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def tweet_id_int(tweet_id):
+    """推文ID转为整数（非数字ID返回 None）"""
+    try:
+        return int(tweet_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def snowflake_timestamp(tweet_id):
+    """从 snowflake 推文ID中解析发布时间（秒级 epoch，无法解析时返回 None）"""
+    value = tweet_id_int(tweet_id)
+    if value is None or value < (1 << 22):
+        return None
+    return ((value >> 22) + TWITTER_EPOCH_MS) / 1000
+
+
+class KOLWatermarkStore:
+    """
+    每个KOL的采集水位线存储（JSON文件持久化）
+    """
+
+    def __init__(self, path, retention_days=30, refresh_days=None):
+        """
+        初始化
+
+        Args:
+            path: 存储文件路径
+            retention_days: 缓存推文保留天数（应不小于最大采集窗口）
+            refresh_days: 缓存推文的互动数超过这么多天未刷新时，下次不带 since_id 整页请求（None 不刷新）
+        """
+        self.path = path
+        self.retention_days = retention_days
+        self.refresh_days = refresh_days
+        self._lock = threading.Lock()
+        self._kols = {}
+
+        # 本次运行的统计
+        self.stats = {
+            'kols_with_watermark': 0,
+            'new_tweets': 0,
+            'refreshed_tweets': 0,
+            'cached_tweets_reused': 0,
+            'kols_metrics_refreshed': 0,
+        }
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._kols = json.load(f).get('kols', {})
+
+    def __len__(self):
+        return len(self._kols)
+
+    def get(self, username):
+        """获取KOL的水位线信息（不存在返回 None）"""
+        entry = self._kols.get(username)
+        if not entry:
+            return None
+        return {
+            'last_tweet_id': entry.get('last_tweet_id'),
+            'last_created_at': entry.get('last_created_at'),
+            'updated_at': entry.get('updated_at'),
+            'metrics_refreshed_at': entry.get('metrics_refreshed_at'),
+        }
+
+    def since_id(self, username):
+        """获取KOL上次采集到的最新推文ID"""
+        entry = self._kols.get(username)
+        return entry.get('last_tweet_id') if entry else None
+
+    def watermark_time(self, username):
+        """KOL水位线推文的发布时间（秒级 epoch，没有水位线时返回 None）"""
+        entry = self._kols.get(username)
+        if not entry:
+            return None
+        ts = snowflake_timestamp(entry.get('last_tweet_id'))
+        if ts is None:
+            timestamps = [t for t in map(tweet_timestamp, entry.get('tweets', [])) if t is not None]
+            ts = max(timestamps) if timestamps else None
+        return ts
+
+    def tweet_rate(self, username):
+        """按缓存推文估计KOL每天的发推数（没有缓存推文时返回 None）"""
+        entry = self._kols.get(username)
+        timestamps = [t for t in map(tweet_timestamp, (entry or {}).get('tweets', [])) if t is not None]
+        if not timestamps:
+            return None
+        return len(timestamps) / max((max(timestamps) - min(timestamps)) / 86400, 1.0)
+
+    def needs_refresh(self, username):
+        """KOL缓存推文的互动数是否该刷新（有缓存且超过 refresh_days 未整页请求）"""
+        entry = self._kols.get(username)
+        if self.refresh_days is None or not entry or not entry.get('tweets'):
+            return False
+        refreshed_at = entry.get('metrics_refreshed_at')
+        if not refreshed_at:
+            return True
+        return datetime.now() - datetime.fromisoformat(refreshed_at) >= timedelta(days=self.refresh_days)
+
+    def merge(self, username, new_tweets, full_fetch=False):
+        """
+        合并新采集的推文与缓存推文，并推进水位线
+
+        Args:
+            username: KOL用户名
+            new_tweets: 本次采集到的推文（通常比水位线更新；与缓存重叠时以本次为准）
+            full_fetch: 本次请求没有带 since_id（与缓存重叠的推文的互动数已刷新）
+
+        Returns:
+            list: 合并后的推文列表（从新到旧）。本次采集到的推文不带 metrics_fetched_at，
+                  沿用缓存的推文带 metrics_fetched_at（其互动数的采集时间）
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            entry = self._kols.get(username, {})
+            cached = entry.get('tweets', [])
+            # 旧版缓存的推文没有 metrics_fetched_at，以水位线上次更新时间为上限
+            cached_by_id = {}
+            for t in cached:
+                if METRICS_FETCHED_AT not in t:
+                    t = {**t, METRICS_FETCHED_AT: entry.get('updated_at')}
+                cached_by_id[t.get('id')] = t
+
+            # 本次采集到的推文优先：与缓存重叠的推文以新采集的互动数等字段覆盖缓存中的旧值
+            fetched = {}
+            for tweet in new_tweets:
+                tweet_id = tweet.get('id')
+                if tweet_id not in fetched:
+                    fetched[tweet_id] = {**cached_by_id.get(tweet_id, {}), **tweet, METRICS_FETCHED_AT: now}
+
+            merged = list(fetched.values())
+            merged.extend(t for tweet_id, t in cached_by_id.items() if tweet_id not in fetched)
+
+            merged.sort(key=lambda t: tweet_id_int(t.get('id')) or 0, reverse=True)
+
+            # 清理超过保留期的缓存
+            cutoff = datetime.now().timestamp() - self.retention_days * 86400
+            retained = [
+                t for t in merged
+                if (snowflake_timestamp(t.get('id')) or cutoff) >= cutoff
+            ]
+
+            if merged:
+                newest = merged[0]
+                entry = {
+                    'last_tweet_id': newest.get('id'),
+                    'last_created_at': newest.get('created_at') or newest.get('createdAt'),
+                    'updated_at': now,
+                    'metrics_refreshed_at': now if full_fetch or not cached else entry.get('metrics_refreshed_at'),
+                    # 缓存原始推文（不含 kol_info 等采集后附加字段）
+                    'tweets': [{k: v for k, v in t.items() if k != 'kol_info'} for t in retained],
+                }
+                self._kols[username] = entry
+
+            if cached:
+                self.stats['kols_with_watermark'] += 1
+                if full_fetch:
+                    self.stats['kols_metrics_refreshed'] += 1
+            # 采集器忽略 since_id 时会返回缓存中已有的推文：只统计缓存没见过的ID
+            refreshed = sum(1 for tweet_id in fetched if tweet_id in cached_by_id)
+            self.stats['new_tweets'] += len(fetched) - refreshed
+            self.stats['refreshed_tweets'] += refreshed
+            self.stats['cached_tweets_reused'] += len(merged) - len(fetched)
+
+        # 返回副本，避免调用方修改缓存；本次采集到的推文去掉 metrics_fetched_at
+        return [{k: v for k, v in t.items() if k != METRICS_FETCHED_AT} if t.get('id') in fetched else dict(t)
+                for t in merged]
+
+    def save(self):
+        """原子写入存储文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'kols': self._kols}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -7,10 +7,15 @@ Twitter Weekly Monitor - 统一入口脚本
 用法:
     python3 weekly_monitor.py --days 7 --kol-count 300
     python3 weekly_monitor.py --days 7 --kol-count 300 --model deepseek-v3.1-terminus
+    python3 weekly_monitor.py --skip-collection --subprocess   # 各步骤以独立子进程运行（旧方式）
+
+默认各步骤在同一进程内运行：推文只加载一次，产品识别模式和 Product Knowledge 状态在步骤间共享；
+结束时打印各步骤耗时
 
 输出:
     weekly_reports/week_YYYY-MM-DD_to_YYYY-MM-DD/
-    ├── raw_data.json                    # 原始推文数据
+    ├── raw_tweets.ndjson                # 原始推文流（旧数据为 raw_data.json）
+    ├── raw_metadata.json                # 原始数据元数据
     ├── analysis_summary.json            # 分析摘要
     ├── product_classification_v3.json   # 产品分类结果
     └── enhanced_report_v3.md            # 增强报告
@@ -21,12 +26,121 @@ import os
 import json
 import argparse
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent
 
+sys.path.insert(0, str(PROJECT_ROOT / "twitter_monitor"))
+sys.path.insert(1, str(PROJECT_ROOT / "scripts"))
+
+from core.metrics import peak_rss_mb, start_run
+from core.parallel import resolve_workers
+from core.raw_data_io import find_raw_data, iter_tweets, load_metadata
+
+
+class StageTimer:
+    """记录各步骤耗时（同时作为运行指标的顶层 span，步骤内部的子阶段嵌套在其下）"""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.stages = []
+
+    def run(self, name, func, *args, **kwargs):
+        """运行一个步骤并记录耗时（异常照常抛出，耗时仍会记录）"""
+        start = time.perf_counter()
+        try:
+            with self.metrics.span(name):
+                return func(*args, **kwargs)
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def report(self, mode):
+        print(f"\n⏱️  步骤耗时（{mode}）:")
+        for name, seconds in self.stages:
+            print(f"   - {name}: {seconds:.2f}s")
+        print(f"   - 合计: {sum(seconds for _, seconds in self.stages):.2f}s")
+
+
+def find_latest_week_dir():
+    """weekly_reports 下最新的周目录（不存在时返回 None）"""
+    weekly_reports_dir = PROJECT_ROOT / "weekly_reports"
+    if not weekly_reports_dir.exists():
+        return None
+
+    week_dirs = sorted([d for d in weekly_reports_dir.iterdir()
+                        if d.is_dir() and d.name.startswith('week_')],
+                       key=lambda x: x.name, reverse=True)
+    return week_dirs[0] if week_dirs else None
+
+
+def collect_in_process(args):
+    """进程内采集，返回 (数据文件, 内存中的推文)"""
+    from collect_data import collect
+
+    output_file, data = collect(
+        days=args.days,
+        kol_count=args.kol_count,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+        resume=args.resume,
+        adaptive_depth=False if args.fixed_depth else None,
+        cold_payload=True if args.cold_payload else None,
+    )
+    return Path(output_file), data['tweets']
+
+
+def collect_subprocess(args):
+    """以子进程运行 collect_data.py"""
+    collect_cmd = [
+        sys.executable,
+        str(PROJECT_ROOT / "twitter_monitor" / "collect_data.py"),
+        "--days", str(args.days),
+        "--kol-count", str(args.kol_count)
+    ]
+    if args.concurrency:
+        collect_cmd += ["--concurrency", str(args.concurrency)]
+    if args.incremental:
+        collect_cmd.append("--incremental")
+    if args.resume:
+        collect_cmd.append("--resume")
+    if args.fixed_depth:
+        collect_cmd.append("--fixed-depth")
+    if args.cold_payload:
+        collect_cmd.append("--cold-payload")
+
+    subprocess.run(collect_cmd, check=True, cwd=str(PROJECT_ROOT))
+
+
+def analyze_subprocess(raw_data_file, workers=1):
+    """以子进程运行 analyze_tweets.py"""
+    analyze_cmd = [
+        sys.executable,
+        str(PROJECT_ROOT / "twitter_monitor" / "analyze_tweets.py"),
+        str(raw_data_file),
+        "--workers", str(workers)
+    ]
+    subprocess.run(analyze_cmd, check=True, cwd=str(PROJECT_ROOT))
+
+
+def integrate_pk_subprocess(pk_script, raw_data_file, workers=1):
+    """以子进程运行 integrate_product_knowledge_v3.py"""
+    pk_cmd = [
+        sys.executable,
+        str(pk_script),
+        str(raw_data_file),
+        "--workers", str(workers)
+    ]
+    # 自动输入 'n' 跳过更新 Product Knowledge 数据库的提示
+    subprocess.run(
+        pk_cmd,
+        input=b'n\n',
+        check=True,
+        cwd=str(PROJECT_ROOT)
+    )
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -39,6 +153,9 @@ def main():
 
     # 指定分析模型
     python3 weekly_monitor.py --days 7 --kol-count 300 --model deepseek-v3.1-terminus
+
+    # 仅重新分析已有数据，各步骤以子进程运行
+    python3 weekly_monitor.py --skip-collection --subprocess
         """
     )
 
@@ -47,6 +164,16 @@ def main():
     parser.add_argument('--kol-count', type=int, default=200,
                        choices=[100, 200, 300],
                        help='采集Top N个KOL（默认200）')
+    parser.add_argument('--concurrency', type=int, default=None,
+                       help='并发采集的KOL数（默认读取配置，1 为串行）')
+    parser.add_argument('--incremental', action='store_true',
+                       help='增量采集：只请求每个KOL上次水位线之后的新推文')
+    parser.add_argument('--resume', action='store_true',
+                       help='采集从上次中断运行的检查点续跑，已完成的KOL不再请求')
+    parser.add_argument('--fixed-depth', action='store_true',
+                       help='采集时每个KOL使用固定请求深度，不按历史发推频率自适应')
+    parser.add_argument('--cold-payload', action='store_true',
+                       help='采集时原始 API 返回另存冷文件 raw_payload.ndjson.gz')
     parser.add_argument('--model', type=str, default=None,
                        help='分析使用的AI模型（可选）')
     parser.add_argument('--skip-collection', action='store_true',
@@ -55,8 +182,15 @@ def main():
                        help='跳过 analyze_tweets，仅采集数据')
     parser.add_argument('--skip-pk-integration', action='store_true',
                        help='跳过 Product Knowledge 集成')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='分析和 Product Knowledge 集成的并行进程数（默认 1 串行，0 使用全部 CPU）')
+    parser.add_argument('--subprocess', action='store_true',
+                       help='各步骤以独立子进程运行（旧方式，每步重新启动解释器并重新读取数据）')
 
     args = parser.parse_args()
+    in_process = not args.subprocess
+    workers = resolve_workers(args.workers)
+    mode = "进程内" if in_process else "子进程"
 
     print("\n" + "="*80)
     print("🚀 Twitter Weekly Monitor - 完整工作流")
@@ -66,66 +200,97 @@ def main():
     print(f"   - 时间范围: 过去 {args.days} 天")
     if args.model:
         print(f"   - 分析模型: {args.model}")
+    print(f"   - 运行方式: {mode}")
+    if workers > 1:
+        print(f"   - 并行进程: {workers}")
     print()
 
+    if in_process:
+        # 与子进程方式一致：相对路径（weekly_reports/、缓存文件等）以项目根目录为准
+        os.chdir(PROJECT_ROOT)
+
+    metrics = start_run()
+    timer = StageTimer(metrics)
+    raw_data_file = None
+    tweets = None
+
     # ============ 步骤 1: 数据采集 ============
     if not args.skip_collection:
         print("=" * 80)
         print("📊 步骤 1: 数据采集")
         print("=" * 80)
 
-        collect_cmd = [
-            sys.executable,
-            str(PROJECT_ROOT / "twitter_monitor" / "collect_data.py"),
-            "--days", str(args.days),
-            "--kol-count", str(args.kol_count)
-        ]
-
         try:
-            result = subprocess.run(collect_cmd, check=True, cwd=str(PROJECT_ROOT))
+            if in_process:
+                raw_data_file, tweets = timer.run("数据采集", collect_in_process, args)
+            else:
+                timer.run("数据采集", collect_subprocess, args)
             print("\n✅ 数据采集完成")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             print(f"\n❌ 数据采集失败: {e}")
             sys.exit(1)
     else:
         print("⏭️  跳过数据采集\n")
 
-    # 查找最新的数据目录
-    weekly_reports_dir = PROJECT_ROOT / "weekly_reports"
-    latest_week_dir = None
-
-    if weekly_reports_dir.exists():
-        week_dirs = sorted([d for d in weekly_reports_dir.iterdir() if d.is_dir()],
-                          key=lambda x: x.name, reverse=True)
-        if week_dirs:
-            latest_week_dir = week_dirs[0]
-            print(f"📂 使用数据目录: {latest_week_dir.name}\n")
+    # 查找最新的数据目录（进程内采集时直接使用本次输出）
+    if raw_data_file is not None:
+        latest_week_dir = raw_data_file.parent
+    else:
+        latest_week_dir = find_latest_week_dir()
 
-    if not latest_week_dir:
+    if latest_week_dir:
+        print(f"📂 使用数据目录: {latest_week_dir.name}\n")
+    else:
         print("❌ 错误: 未找到数据目录")
         sys.exit(1)
 
-    raw_data_file = latest_week_dir / "raw_data.json"
-    if not raw_data_file.exists():
-        print(f"❌ 错误: 未找到数据文件 {raw_data_file}")
+    if raw_data_file is None:
+        raw_data_file = find_raw_data(latest_week_dir)
+    if not raw_data_file:
+        print(f"❌ 错误: 未找到数据文件 (raw_tweets.ndjson / raw_data.json) 于 {latest_week_dir}")
         sys.exit(1)
 
+    # 进程内: 推文只加载一次，后续步骤共享
+    metadata = None
+    if in_process and not (args.skip_analysis and args.skip_pk_integration):
+        metadata = load_metadata(str(raw_data_file))
+        if tweets is None:
+            tweets = timer.run("加载推文", lambda: list(iter_tweets(str(raw_data_file))))
+            print(f"📥 已加载 {len(tweets)} 条推文（后续步骤共享）\n")
+
+    # 进程内: Product Knowledge 状态（知识库、索引、产品识别引擎）只加载一次，
+    # 推文分析和 Product Knowledge 集成共用同一个编译好的识别引擎
+    knowledge = None
+    if in_process and not (args.skip_analysis and args.skip_pk_integration):
+        try:
+            import integrate_product_knowledge_v3 as pk_v3
+            knowledge = timer.run("加载 Product Knowledge", pk_v3.load_knowledge_state)
+        except Exception as e:
+            print(f"⚠️  加载 Product Knowledge 失败，推文分析使用内置产品词表: {e}\n")
+
+    # 进程内: 每条推文的特征（产品、情感、新品标记、话题）只提取一次，分析和集成共用
+    features = None
+    if knowledge is not None and tweets is not None:
+        from core.tweet_features import TweetFeatureExtractor, extract_features
+        features = timer.run("提取推文特征", extract_features, tweets,
+                             TweetFeatureExtractor(knowledge['engine']), workers)
+
     # ============ 步骤 2: 推文分析 ============
     if not args.skip_analysis:
         print("=" * 80)
         print("📈 步骤 2: 推文分析")
         print("=" * 80)
 
-        analyze_cmd = [
-            sys.executable,
-            str(PROJECT_ROOT / "twitter_monitor" / "analyze_tweets.py"),
-            str(raw_data_file)
-        ]
-
         try:
-            result = subprocess.run(analyze_cmd, check=True, cwd=str(PROJECT_ROOT))
+            if in_process:
+                from analyze_tweets import run_analysis
+                timer.run("推文分析", run_analysis, str(raw_data_file), tweets=tweets, metadata=metadata,
+                          workers=workers, engine=knowledge['engine'] if knowledge else None,
+                          features=features)
+            else:
+                timer.run("推文分析", analyze_subprocess, raw_data_file, workers)
             print("\n✅ 推文分析完成")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             print(f"\n❌ 推文分析失败: {e}")
             sys.exit(1)
     else:
@@ -143,22 +308,20 @@ def main():
             print(f"⚠️  警告: Product Knowledge 脚本不存在: {pk_script}")
             print("    跳过 Product Knowledge 集成")
         else:
-            pk_cmd = [
-                sys.executable,
-                str(pk_script),
-                str(raw_data_file)
-            ]
-
             try:
-                # 自动输入 'n' 跳过更新 Product Knowledge 数据库的提示
-                result = subprocess.run(
-                    pk_cmd,
-                    input=b'n\n',
-                    check=True,
-                    cwd=str(PROJECT_ROOT)
-                )
+                if in_process:
+                    import integrate_product_knowledge_v3 as pk_v3
+                    # 不交互：与子进程方式自动回答 'n' 一致，不更新 Product Knowledge 数据库
+                    timer.run(
+                        "Product Knowledge 集成", pk_v3.main, str(raw_data_file),
+                        tweets=tweets, metadata=metadata, knowledge=knowledge, interactive=False, workers=workers,
+                        features=features
+                    )
+                else:
+                    timer.run("Product Knowledge 集成", integrate_pk_subprocess, pk_script, raw_data_file,
+                              workers)
                 print("\n✅ Product Knowledge 集成完成")
-            except subprocess.CalledProcessError as e:
+            except Exception as e:
                 print(f"\n❌ Product Knowledge 集成失败: {e}")
                 print("    继续执行后续步骤...")
     else:
@@ -173,7 +336,7 @@ def main():
     print("\n生成的文件:")
 
     files_to_check = [
-        ("raw_data.json", "原始推文数据"),
+        (Path(raw_data_file).name, "原始推文数据"),
         ("analysis_summary.json", "分析摘要"),
         ("product_classification_v3.json", "产品分类结果"),
         ("enhanced_report_v3.md", "增强报告")
@@ -186,6 +349,15 @@ def main():
         else:
             print(f"   ⚠️  {filename} - 未生成")
 
+    timer.report(mode)
+
+    extra = {'mode': mode, 'workers': workers, 'week': latest_week_dir.name}
+    if not in_process:
+        # 子进程方式下各步骤内部的子阶段不可见，记录子进程的峰值内存
+        extra['children_max_rss_mb'] = peak_rss_mb('children')
+    metrics_file = metrics.write(latest_week_dir, **extra)
+    print(f"📈 运行指标: {metrics_file}")
+
     print("\n" + "=" * 80)
 
 